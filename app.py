@@ -1,13 +1,15 @@
+import logging
+import os
+import threading
+import uuid
 import streamlit as st
+from contextlib import contextmanager
 from pathlib import Path
-from src.core.audio_transcriber import AudioTranscriber
-from src.core.meeting_summarizer import MeetingSummarizer
 from src.core.utils import save_uploaded_file, get_unique_filename
-from src.core.db import DatabaseManager
-from src.api.integrations.slack.notifier import SlackNotifier
-from config import ASSEMBLYAI_API_KEY, IBM_API_KEY, IBM_PROJECT_ID
-from src.synthetic.streamlit_component import render_synthetic_meeting_generator
-from src.synthetic.meeting_generator import SyntheticMeetingGenerator
+from src.core import events, pipeline, tracing
+from src.core.services import get_services
+
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 
 # Enhanced page configuration
 st.set_page_config(
@@ -31,40 +33,58 @@ except FileNotFoundError:
 if "current_tab" not in st.session_state:
     st.session_state.current_tab = "Instructions"
 
-# Initialize components with improved error handling
-if 'initialization_error' not in st.session_state:
-    st.session_state.initialization_error = None
-
-try:
-    with st.spinner("📥 Initializing application components..."):
-        if 'transcriber' not in st.session_state:
-            st.session_state.transcriber = AudioTranscriber(ASSEMBLYAI_API_KEY)
-
-        if 'db' not in st.session_state:
-            st.session_state.db = DatabaseManager()
-
-        if 'summarizer' not in st.session_state:
-            st.session_state.summarizer = MeetingSummarizer(
-                api_key=IBM_API_KEY,
-                project_id=IBM_PROJECT_ID,
-                space_id=None
-            )
-
-        if 'slack_notifier' not in st.session_state:
-            st.session_state.slack_notifier = SlackNotifier()
-
-        if 'synthetic_generator' not in st.session_state:
-            st.session_state.synthetic_generator = SyntheticMeetingGenerator(
-                api_key=IBM_API_KEY,
-                project_id=IBM_PROJECT_ID
-            )
-except Exception as e:
-    st.session_state.initialization_error = str(e)
-
-# Display initialization error if any
-if st.session_state.initialization_error:
-    st.error(f"🚨 Application initialization failed: {st.session_state.initialization_error}")
-    st.stop()
+# Components come from the process-wide service container: they are built on
+# first use and shared by every session, so 50 users still mean one Supabase
+# client and one IAM token. Heavy client libraries (assemblyai, supabase, yaml)
+# are imported when a component is first built, so the Instructions tab
+# renders without touching any of them.
+def component(name):
+    """Return a shared component, stopping the page with an error if it can't be built"""
+    services = get_services()
+    try:
+        if services.is_built(name):
+            return services.get(name)
+        with st.spinner("📥 Initializing application components..."):
+            return services.get(name)
+    except Exception as e:
+        # Failures are not cached, the next rerun tries again
+        st.error(f"🚨 Application initialization failed: {str(e)}")
+        st.stop()
+
+def queue_notification(transcript, summary, saved_summary):
+    """Queue a saved summary for Slack if SLACK_AUTO_NOTIFY is on; delivery happens in the background"""
+    if os.getenv("SLACK_AUTO_NOTIFY", "false").lower() != "true":
+        return
+    try:
+        dispatcher = get_services().notifications
+    except Exception as e:
+        # Slack is optional for the app
+        print(f"Slack notifications disabled: {e}")
+        return
+    dispatcher.enqueue(transcript["id"], transcript["meeting_title"], summary, saved_summary["id"])
+
+@contextmanager
+def track_progress(*stages):
+    """Drive a progress bar from the progress events published inside the block"""
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+    script_thread = threading.current_thread()
+
+    def show(event):
+        # Elements can only be updated from the script thread
+        if threading.current_thread() is script_thread:
+            progress_bar.progress(event["progress"])
+            if event["message"]:
+                status_text.text(event["message"])
+
+    topic = f"streamlit-{uuid.uuid4().hex}"
+    unsubscribe = events.BUS.subscribe(topic, show)
+    try:
+        with events.topic(topic, stages=stages):
+            yield
+    finally:
+        unsubscribe()
+        status_text.empty()
 
 # Enhanced sidebar navigation
 with st.sidebar:
@@ -179,7 +199,8 @@ elif selected_tab == "Transcript Management":
 
         if uploaded_file and meeting_title:
             if st.button("🚀 Start Transcription", use_container_width=True):
-                with st.spinner("🔄 Processing audio file..."):
+                with st.spinner("🔄 Processing audio file..."), \
+                        tracing.span("meeting.ingest", meeting_title=meeting_title, source_type="audio"):
                     try:
                         # Save uploaded file
                         file_path, error = save_uploaded_file(uploaded_file)
@@ -195,32 +216,27 @@ elif selected_tab == "Transcript Management":
                         safe_title = "".join(c if c.isalnum() else "_" for c in meeting_title)
                         output_path = get_unique_filename(f"transcripts/{safe_title}.json")
 
-                        # Progress indicators
-                        progress_bar = st.progress(0)
-                        status_text = st.empty()
-
-                        # Transcription process
-                        status_text.text("🎯 Starting transcription...")
-                        progress_bar.progress(25)
-
-                        result = st.session_state.transcriber.transcribe(
-                            audio_path=file_path,
-                            meeting_title=meeting_title,
-                            output_path=output_path
-                        )
-
-                        progress_bar.progress(75)
-                        status_text.text("💾 Saving to database...")
-
-                        # Save to database
-                        saved_transcript = st.session_state.db.save_transcript(
-                            title=meeting_title,
-                            content=result["plain"],
-                            source_type=result["source_type"]
-                        )
-
-                        progress_bar.progress(100)
-                        status_text.empty()
+                        # Progress comes from the events the transcriber publishes
+                        transcriber = component("transcriber")
+                        db = component("db")
+                        with track_progress("transcribe", "format", "save"):
+                            events.publish("transcribe", 0.0, "🎯 Starting transcription...")
+                            result = transcriber.transcribe(
+                                audio_path=file_path,
+                                meeting_title=meeting_title,
+                                output_path=output_path
+                            )
+
+                            output_path = result.get("output_path") or output_path
+                            events.publish("save", 0.0, "💾 Saving to database...")
+
+                            # Save to database
+                            saved_transcript = db.save_transcript(
+                                title=meeting_title,
+                                content=result["plain"],
+                                source_type=result["source_type"]
+                            )
+                            events.publish("save", 1.0)
 
                         if saved_transcript:
                             st.success("✅ Transcription completed successfully!")
@@ -231,7 +247,7 @@ elif selected_tab == "Transcript Management":
                                 for line in preview_text:
                                     st.markdown(f"> {line}")
 
-                                st.info("""
+                                st.info(f"""
                                 📂 **Storage Location:**
                                 - Database (for application use)
                                 - Backup JSON file: {output_path}
@@ -268,7 +284,7 @@ elif selected_tab == "Transcript Management":
             if st.button("💾 Save Transcript", use_container_width=True):
                 with st.spinner("🔄 Processing text..."):
                     try:
-                        saved_transcript = st.session_state.db.save_transcript(
+                        saved_transcript = component("db").save_transcript(
                             title=meeting_title,
                             content=text_transcript,
                             source_type='text'
@@ -283,11 +299,13 @@ elif selected_tab == "Transcript Management":
                         st.error(f"❌ Processing failed: {str(e)}")
 
     else:  # Generate Synthetic Meeting
+        from src.synthetic.streamlit_component import render_synthetic_meeting_generator
+
         # Use the streamlit component for synthetic meeting generation
         try:
             render_synthetic_meeting_generator(
-                generator=st.session_state.synthetic_generator,
-                save_callback=lambda title, content, source_type: st.session_state.db.save_transcript(
+                generator=component("synthetic_generator"),
+                save_callback=lambda title, content, source_type: component("db").save_transcript(
                     title=title,
                     content=content,
                     source_type=source_type
@@ -301,7 +319,7 @@ elif selected_tab == "Transcript Management":
     st.markdown("---")
     st.subheader("📚 Existing Transcripts")
 
-    transcripts = st.session_state.db.get_all_transcripts()
+    transcripts = component("db").get_all_transcripts()
     if transcripts:
         for transcript in transcripts:
             with st.expander(f"📄 {transcript['meeting_title']}"):
@@ -318,7 +336,7 @@ elif selected_tab == "Generate Summary":
     st.markdown("---")
 
     try:
-        transcripts = st.session_state.db.get_all_transcripts()
+        transcripts = component("db").get_all_transcripts()
 
         if not transcripts:
             st.warning("⚠️ No transcripts available")
@@ -338,7 +356,7 @@ elif selected_tab == "Generate Summary":
             selected_id = selected_transcript["id"]
 
             # Check for existing summary
-            existing_summary = st.session_state.db.get_summary_by_transcript_id(selected_id)
+            existing_summary = component("db").get_summary_by_transcript_id(selected_id)
 
             if existing_summary:
                 # Display existing summary without generate button
@@ -358,23 +376,21 @@ elif selected_tab == "Generate Summary":
 
                 # Option to regenerate at the bottom
                 if st.button("🔄 Regenerate Summary", type="secondary", use_container_width=True):
-                    with st.spinner("🔄 Regenerating summary..."):
+                    with st.spinner("🔄 Regenerating summary..."), \
+                            tracing.span("meeting.summarize", transcript_id=selected_id, regenerate=True):
                         try:
-                            transcript = st.session_state.db.get_transcript_by_id(selected_id)
+                            transcript = component("db").get_transcript_by_id(selected_id)
                             if transcript:
-                                summary_result = st.session_state.summarizer.generate_summary(
-                                    transcript_data=transcript["content"],
-                                    transcript_id=selected_id
-                                )
-
-                                saved_summary = st.session_state.db.save_summary(
-                                    transcript_id=selected_id,
-                                    summary_text=summary_result["summary_text"],
-                                    key_decisions=summary_result["key_decisions"],
-                                    action_items=summary_result["action_items"]
-                                )
+                                # Built up front so a failure stops the page with an error, not mid-generation
+                                component("summarizer")
+                                # Shares the generation with anyone summarizing this meeting right now
+                                with track_progress("summarize", "save"):
+                                    saved_summary, summary_result, _ = pipeline.summary_version(
+                                        get_services(), selected_id, transcript
+                                    )
 
                                 if saved_summary:
+                                    queue_notification(transcript, summary_result, saved_summary)
                                     st.success("✅ Summary regenerated successfully!")
                                     st.rerun()
                         except Exception as e:
@@ -383,23 +399,21 @@ elif selected_tab == "Generate Summary":
                 # Show generate button only when no summary exists
                 st.info("ℹ️ No summary available for this transcript")
                 if st.button("✨ Generate Summary", type="primary", use_container_width=True):
-                    with st.spinner("🔄 Generating summary..."):
+                    with st.spinner("🔄 Generating summary..."), \
+                            tracing.span("meeting.summarize", transcript_id=selected_id):
                         try:
-                            transcript = st.session_state.db.get_transcript_by_id(selected_id)
+                            transcript = component("db").get_transcript_by_id(selected_id)
                             if transcript:
-                                summary_result = st.session_state.summarizer.generate_summary(
-                                    transcript_data=transcript["content"],
-                                    transcript_id=selected_id
-                                )
-
-                                saved_summary = st.session_state.db.save_summary(
-                                    transcript_id=selected_id,
-                                    summary_text=summary_result["summary_text"],
-                                    key_decisions=summary_result["key_decisions"],
-                                    action_items=summary_result["action_items"]
-                                )
+                                # Built up front so a failure stops the page with an error, not mid-generation
+                                component("summarizer")
+                                # Shares the generation with anyone summarizing this meeting right now
+                                with track_progress("summarize", "save"):
+                                    saved_summary, summary_result, _ = pipeline.summary_version(
+                                        get_services(), selected_id, transcript
+                                    )
 
                                 if saved_summary:
+                                    queue_notification(transcript, summary_result, saved_summary)
                                     st.success("✅ Summary generated successfully!")
                                     st.rerun()
                         except Exception as e:
@@ -0,0 +1,81 @@
+"""
+Cold-start benchmark for the Streamlit app.
+
+Each run starts a fresh interpreter, imports Streamlit (the server does this
+once before any session connects) and then times the first script run of
+app.py, which renders the Instructions tab. It also lists which heavy client
+libraries that first run imported; with lazy startup there should be none.
+
+Usage:
+    python -m benchmarks.cold_start --runs 5 --target 1.0
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+HEAVY_MODULES = ["assemblyai", "supabase", "yaml", "transformers", "httpx", "requests"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+streamlit_import = time.perf_counter() - start
+
+before = set(sys.modules)
+app = AppTest.from_file("app.py", default_timeout=60)
+start = time.perf_counter()
+app.run()
+first_render = time.perf_counter() - start
+
+print(json.dumps({
+    "streamlit_import_s": streamlit_import,
+    "first_render_s": first_render,
+    "titles": [t.value for t in app.title],
+    "errors": [e.value for e in app.error] + [str(e.value) for e in app.exception],
+    "imported": sorted({m.split(".")[0] for m in set(sys.modules) - before})
+}))
+"""
+
+
+def run_once() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        timeout=300
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Probe failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure Streamlit cold-start time")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to measure")
+    parser.add_argument("--target", type=float, default=1.0, help="Maximum median first render time in seconds")
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    render = statistics.median(r["first_render_s"] for r in runs)
+    streamlit_import = statistics.median(r["streamlit_import_s"] for r in runs)
+    heavy = sorted({m for r in runs for m in r["imported"] if m in HEAVY_MODULES})
+
+    print(f"Streamlit import:   {streamlit_import:.3f}s (median of {args.runs})")
+    print(f"First render:       {render:.3f}s (median of {args.runs}, "
+          f"min {min(r['first_render_s'] for r in runs):.3f}s, max {max(r['first_render_s'] for r in runs):.3f}s)")
+    print(f"Rendered titles:    {runs[-1]['titles']}")
+    print(f"Heavy imports:      {', '.join(heavy) or 'none'}")
+
+    errors = runs[-1]["errors"]
+    if errors:
+        print(f"Errors on first render: {errors}")
+        raise SystemExit(1)
+    if render > args.target:
+        print(f"First render exceeds the {args.target:.1f}s target")
+        raise SystemExit(1)
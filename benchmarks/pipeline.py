@@ -0,0 +1,258 @@
+"""
+End-to-end benchmark of ingest -> transcribe -> summarize -> notify with
+local stand-ins for AssemblyAI, watsonx, Supabase and Slack.
+
+Usage:
+    python -m benchmarks.pipeline --meetings 50 --concurrency 8
+    python -m benchmarks.pipeline --baseline benchmarks/results/main.json --max-regression 0.2
+"""
+import argparse
+import json
+import math
+import os
+import resource
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List
+from src.core import tracing
+from benchmarks.stubs import AssemblyAIStub, WatsonxStub, SlackStub, FakeSupabaseClient
+
+STAGES = ["transcribe", "format", "save_transcript", "summarize", "save_summary", "notify", "total"]
+
+
+class StageTimer:
+    """Collects wall-clock durations and errors per pipeline stage."""
+
+    def __init__(self):
+        self.durations: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float, failed: bool = False) -> None:
+        with self._lock:
+            self.durations[stage].append(seconds)
+            if failed:
+                self.errors[stage] += 1
+
+    def wrap(self, obj: Any, method: str, stage: str) -> None:
+        """Replace obj.method with a version that records its duration."""
+        original = getattr(obj, method)
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            failed = False
+            try:
+                result = original(*args, **kwargs)
+                failed = result is None or result is False
+                return result
+            except Exception:
+                failed = True
+                raise
+            finally:
+                self.record(stage, time.perf_counter() - start, failed)
+
+        setattr(obj, method, timed)
+
+    def report(self) -> Dict[str, Any]:
+        report = {}
+        for stage in STAGES:
+            values = sorted(self.durations.get(stage, []))
+            if not values:
+                continue
+            report[stage] = {
+                "count": len(values),
+                "errors": self.errors.get(stage, 0),
+                "p50_s": percentile(values, 50),
+                "p95_s": percentile(values, 95),
+                "p99_s": percentile(values, 99),
+                "max_s": values[-1]
+            }
+        return report
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def build_pipeline(args, timer: StageTimer, stubs: Dict[str, Any]) -> Dict[str, Any]:
+    """Create the real MeetGist components wired to the stand-ins."""
+    import assemblyai as aai
+    from src.core.audio_transcriber import AudioTranscriber
+    from src.core.db import DatabaseManager
+    from src.core.meeting_summarizer import MeetingSummarizer
+    from src.core.chunk_cache import ChunkCache
+    from src.core.llm_backends import WatsonxBackend
+    from src.api.integrations.slack.notifier import SlackNotifier
+
+    # The SDK reads its settings when the transcriber's client is created
+    aai.settings.base_url = stubs["assemblyai"].base_url
+    aai.settings.polling_interval = args.poll_interval
+    transcriber = AudioTranscriber("stub-key")
+
+    db = DatabaseManager(client=stubs["supabase"])
+
+    backend = WatsonxBackend("stub-key", "stub-project", url=stubs["watsonx"].base_url,
+                             iam_url=stubs["watsonx"].base_url)
+    summarizer = MeetingSummarizer("stub-key", "stub-project", backend=backend,
+                                   chunk_cache=ChunkCache(tempfile.mkdtemp()))
+
+    notifier = SlackNotifier(token="stub-token", channel="C-BENCH")
+    notifier.base_url = f"{stubs['slack'].base_url}/api/chat.postMessage"
+
+    timer.wrap(transcriber, "_transcribe_audio", "transcribe")
+    timer.wrap(transcriber.formatter, "format_transcript", "format")
+    timer.wrap(db, "save_transcript", "save_transcript")
+    timer.wrap(summarizer, "generate_summary", "summarize")
+    timer.wrap(db, "save_summary", "save_summary")
+    timer.wrap(notifier, "send_meeting_summary", "notify")
+
+    return {"transcriber": transcriber, "db": db, "summarizer": summarizer, "notifier": notifier}
+
+
+def run_meeting(index: int, pipeline: Dict[str, Any], audio_path: str, output_dir: str,
+                timer: StageTimer) -> bool:
+    """Drive one meeting through the same steps as the Streamlit app, as one trace."""
+    title = f"Benchmark meeting {index}"
+    start = time.perf_counter()
+    ok = False
+    with tracing.span("meeting.benchmark", meeting_title=title) as span:
+        try:
+            result = pipeline["transcriber"].transcribe(
+                audio_path=audio_path,
+                meeting_title=title,
+                output_path=os.path.join(output_dir, f"meeting_{index}.json")
+            )
+            saved = pipeline["db"].save_transcript(title=title, content=result["plain"], source_type="audio")
+            if saved:
+                summary = pipeline["summarizer"].generate_summary(result["plain"], transcript_id=saved["id"])
+                pipeline["db"].save_summary(
+                    transcript_id=saved["id"],
+                    summary_text=summary["summary_text"],
+                    key_decisions=summary["key_decisions"],
+                    action_items=summary["action_items"]
+                )
+                ok = pipeline["notifier"].send_meeting_summary(title, summary)
+        except Exception as e:
+            span.record_exception(e)
+            print(f"Meeting {index} failed: {e}")
+        finally:
+            span.set_attribute("ok", ok)
+            timer.record("total", time.perf_counter() - start, failed=not ok)
+    return ok
+
+
+def run_benchmark(args) -> Dict[str, Any]:
+    timer = StageTimer()
+    work_dir = tempfile.mkdtemp(prefix="meetgist-bench-")
+    audio_path = os.path.join(work_dir, "meeting.mp3")
+    with open(audio_path, "wb") as f:
+        f.write(os.urandom(args.audio_kb * 1024))
+
+    stubs = {
+        "assemblyai": AssemblyAIStub(processing_time=args.asr_time, duration_minutes=args.duration_minutes,
+                                     latency=args.http_latency, error_rate=args.error_rate, seed=1),
+        "watsonx": WatsonxStub(seconds_per_input_token=args.llm_input_cost,
+                               seconds_per_output_token=args.llm_output_cost,
+                               latency=args.http_latency, error_rate=args.error_rate, seed=2),
+        "slack": SlackStub(latency=args.http_latency, error_rate=args.error_rate, seed=3),
+        "supabase": FakeSupabaseClient(latency=args.db_latency, error_rate=args.error_rate, seed=4)
+    }
+    for name in ("assemblyai", "watsonx", "slack"):
+        stubs[name].start()
+
+    try:
+        pipeline = build_pipeline(args, timer, stubs)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            outcomes = list(pool.map(
+                lambda i: run_meeting(i, pipeline, audio_path, work_dir, timer),
+                range(args.meetings)
+            ))
+        elapsed = time.perf_counter() - start
+        _, peak_traced = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        for name in ("assemblyai", "watsonx", "slack"):
+            stubs[name].stop()
+
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "config": vars(args),
+        "meetings": args.meetings,
+        "succeeded": sum(outcomes),
+        "elapsed_s": elapsed,
+        "throughput_meetings_per_s": sum(outcomes) / elapsed if elapsed else 0.0,
+        "peak_traced_memory_mb": peak_traced / 2**20,
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "stages": timer.report()
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """List stages whose p95 got worse than the baseline by more than max_regression."""
+    regressions = []
+    for stage, stats in results["stages"].items():
+        before = baseline.get("stages", {}).get(stage)
+        if before and before["p95_s"] > 0 and stats["p95_s"] > before["p95_s"] * (1 + max_regression):
+            regressions.append(f"{stage}: p95 {before['p95_s']:.3f}s -> {stats['p95_s']:.3f}s")
+    before = baseline.get("throughput_meetings_per_s")
+    if before and results["throughput_meetings_per_s"] < before * (1 - max_regression):
+        regressions.append(f"throughput: {before:.2f}/s -> {results['throughput_meetings_per_s']:.2f}/s")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end MeetGist pipeline benchmark")
+    parser.add_argument("--meetings", type=int, default=20, help="Meetings to push through the pipeline")
+    parser.add_argument("--concurrency", type=int, default=4, help="Meetings processed concurrently")
+    parser.add_argument("--duration-minutes", type=int, default=30, help="Length of each fake meeting")
+    parser.add_argument("--audio-kb", type=int, default=512, help="Size of the fake audio upload")
+    parser.add_argument("--asr-time", type=float, default=1.0, help="Seconds AssemblyAI takes per transcript")
+    parser.add_argument("--poll-interval", type=float, default=0.2, help="AssemblyAI polling interval")
+    parser.add_argument("--llm-input-cost", type=float, default=0.0001, help="Stub seconds per input token")
+    parser.add_argument("--llm-output-cost", type=float, default=0.005, help="Stub seconds per output token")
+    parser.add_argument("--http-latency", type=float, default=0.02, help="Base latency of every stub request")
+    parser.add_argument("--db-latency", type=float, default=0.01, help="Latency of every DB query")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of stub requests that fail")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/pipeline-<time>.json)")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed p95/throughput regression")
+    args = parser.parse_args()
+
+    results = run_benchmark(args)
+
+    print(f"\n{'stage':<16}{'count':>7}{'errors':>8}{'p50 s':>9}{'p95 s':>9}{'p99 s':>9}")
+    for stage, stats in results["stages"].items():
+        print(f"{stage:<16}{stats['count']:>7}{stats['errors']:>8}"
+              f"{stats['p50_s']:>9.3f}{stats['p95_s']:>9.3f}{stats['p99_s']:>9.3f}")
+    print(f"\n{results['succeeded']}/{results['meetings']} meetings in {results['elapsed_s']:.1f}s "
+          f"({results['throughput_meetings_per_s']:.2f}/s), peak traced memory "
+          f"{results['peak_traced_memory_mb']:.1f} MB, max RSS {results['max_rss_mb']:.0f} MB")
+
+    output = Path(args.output or f"benchmarks/results/pipeline-{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            raise SystemExit(1)
+        print("No regressions against baseline")
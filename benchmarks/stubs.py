@@ -0,0 +1,732 @@
+import itertools
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional
+from urllib.parse import parse_qs, urlparse
+import requests
+from src.core.llm_backends import respond_to_prompt
+from src.core.prompt_builder import TokenCounter
+
+
+class StubServer:
+    """Local HTTP stand-in for an external API, with configurable latency and error rate."""
+
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.stats = {"requests": 0, "errors": 0}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub._dispatch(self, "GET")
+
+            def do_POST(self):
+                stub._dispatch(self, "POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def handle(self, method: str, path: str, body: bytes, headers: Dict[str, str]) -> tuple:
+        """Return (status, payload dict, extra delay in seconds). Implemented by subclasses."""
+        return 404, {"error": "not found"}, 0.0
+
+    def _read_body(self, request: BaseHTTPRequestHandler) -> bytes:
+        if request.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int(request.rfile.readline().strip() or b"0", 16)
+                if size == 0:
+                    request.rfile.readline()
+                    break
+                chunks.append(request.rfile.read(size))
+                request.rfile.readline()
+            return b"".join(chunks)
+        length = int(request.headers.get("Content-Length") or 0)
+        return request.rfile.read(length) if length else b""
+
+    def _dispatch(self, request: BaseHTTPRequestHandler, method: str) -> None:
+        body = self._read_body(request)
+
+        with self._lock:
+            self.stats["requests"] += 1
+            failed = self.random.random() < self.error_rate
+            if failed:
+                self.stats["errors"] += 1
+
+        if failed:
+            time.sleep(self.latency)
+            status, payload, delay = 503, {"error": "injected failure"}, 0.0
+        else:
+            status, payload, delay = self.handle(method, request.path, body, dict(request.headers))
+            time.sleep(self.latency + delay)
+
+        # Handlers return bytes for a raw text/event-stream body
+        raw = isinstance(payload, bytes)
+        data = payload if raw else json.dumps(payload).encode("utf-8")
+        request.send_response(status)
+        request.send_header("Content-Type", "text/event-stream" if raw else "application/json")
+        request.send_header("Content-Length", str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
+
+
+class WatsonxStub(StubServer):
+    """
+    Stand-in for the IBM IAM and watsonx text generation endpoints.
+
+    Generation time is modelled as prompt processing plus decoding:
+    input_tokens * seconds_per_input_token + output_tokens * seconds_per_output_token.
+    """
+
+    def __init__(self, seconds_per_input_token: float = 0.0002, seconds_per_output_token: float = 0.02,
+                 **kwargs):
+        super().__init__(**kwargs)
+        self.seconds_per_input_token = seconds_per_input_token
+        self.seconds_per_output_token = seconds_per_output_token
+        self.counter = TokenCounter("stub")
+        self.stats.update({"input_tokens": 0, "output_tokens": 0})
+
+    def handle(self, method: str, path: str, body: bytes, headers: Dict[str, str]) -> tuple:
+        if path.startswith("/identity/token"):
+            return 200, {"access_token": "stub-token", "expires_in": 3600}, 0.0
+
+        if not path.startswith("/ml/v1/text/generation"):
+            return 404, {"error": "not found"}, 0.0
+
+        request = json.loads(body or b"{}")
+        prompt = request.get("input", "")
+        max_new_tokens = request.get("parameters", {}).get("max_new_tokens", 500)
+
+        text = respond_to_prompt(prompt)
+        input_tokens = self.counter.count(prompt)
+        output_tokens = min(self.counter.count(text), max_new_tokens)
+
+        with self._lock:
+            self.stats["input_tokens"] += input_tokens
+            self.stats["output_tokens"] += output_tokens
+
+        delay = input_tokens * self.seconds_per_input_token + output_tokens * self.seconds_per_output_token
+        if path.startswith("/ml/v1/text/generation_stream"):
+            return 200, self._events(request.get("model_id"), text, input_tokens, output_tokens), delay
+        return 200, {
+            "model_id": request.get("model_id"),
+            "results": [{
+                "generated_text": text,
+                "input_token_count": input_tokens,
+                "generated_token_count": output_tokens,
+                "stop_reason": "eos_token"
+            }]
+        }, delay
+
+    def _events(self, model_id: str, text: str, input_tokens: int, output_tokens: int) -> bytes:
+        """Server-sent events of the text word by word, with cumulative token counts as watsonx reports them."""
+        words = text.split(" ")
+        lines = []
+        for i, word in enumerate(words):
+            last = i == len(words) - 1
+            lines.append("id: {}\nevent: message\ndata: {}\n\n".format(i + 1, json.dumps({
+                "model_id": model_id,
+                "results": [{
+                    "generated_text": word if i == 0 else " " + word,
+                    "input_token_count": input_tokens,
+                    "generated_token_count": output_tokens if last else max(output_tokens * (i + 1) // len(words), 1),
+                    "stop_reason": "eos_token" if last else "not_finished"
+                }]
+            })))
+        return "".join(lines).encode("utf-8")
+
+
+class AssemblyAIStub(StubServer):
+    """
+    Stand-in for the AssemblyAI upload and transcript endpoints.
+
+    Point the SDK at it with aai.settings.base_url = stub.base_url. Each
+    transcript completes processing_time seconds after it is created, with
+    utterances from the procedural meeting generator. If the request has a
+    webhook_url, the completion callback is POSTed to it like the real API.
+    """
+
+    def __init__(self, processing_time: float = 1.0, duration_minutes: int = 30, **kwargs):
+        super().__init__(**kwargs)
+        from src.synthetic.procedural import ProceduralMeetingGenerator
+
+        self.processing_time = processing_time
+        self.duration_minutes = duration_minutes
+        self.generator = ProceduralMeetingGenerator()
+        self.transcripts: Dict[str, Dict[str, Any]] = {}
+        self._seeds = itertools.count()
+
+    def handle(self, method: str, path: str, body: bytes, headers: Dict[str, str]) -> tuple:
+        if method == "POST" and path == "/v2/upload":
+            return 200, {"upload_url": f"{self.base_url}/files/{uuid.uuid4().hex}"}, 0.0
+
+        if method == "POST" and path == "/v2/transcript":
+            request = json.loads(body or b"{}")
+            transcript_id = uuid.uuid4().hex
+            with self._lock:
+                self.transcripts[transcript_id] = {
+                    "ready_at": time.time() + self.processing_time,
+                    "seed": next(self._seeds),
+                    "request": request
+                }
+            if request.get("webhook_url"):
+                threading.Timer(self.processing_time, self._send_webhook, args=(transcript_id,)).start()
+            return 200, self._response(transcript_id), 0.0
+
+        if method == "GET" and path.startswith("/v2/transcript/"):
+            transcript_id = path.rsplit("/", 1)[-1]
+            if transcript_id not in self.transcripts:
+                return 404, {"error": "Transcript not found"}, 0.0
+            return 200, self._response(transcript_id), 0.0
+
+        return 404, {"error": "not found"}, 0.0
+
+    def _response(self, transcript_id: str) -> Dict[str, Any]:
+        record = self.transcripts[transcript_id]
+        if time.time() < record["ready_at"]:
+            return {"id": transcript_id, "status": "processing", "audio_url": record["request"].get("audio_url", "")}
+
+        if "utterances" not in record:
+            meeting = self.generator.generate_meeting(
+                "project_kickoff", duration_minutes=self.duration_minutes, seed=record["seed"]
+            )
+            record["utterances"] = [
+                {
+                    "text": segment["text"],
+                    "start": int(segment["start"] * 1000),
+                    "end": int(segment["end"] * 1000),
+                    "confidence": 0.95,
+                    "speaker": segment["speaker"].replace("Speaker ", ""),
+                    "words": []
+                }
+                for segment in meeting["segments"]
+            ]
+
+        return {
+            "id": transcript_id,
+            "status": "completed",
+            "audio_url": record["request"].get("audio_url", ""),
+            "text": " ".join(u["text"] for u in record["utterances"]),
+            "utterances": record["utterances"],
+            "audio_duration": self.duration_minutes * 60,
+            "webhook_url": record["request"].get("webhook_url")
+        }
+
+    def _send_webhook(self, transcript_id: str) -> None:
+        request = self.transcripts[transcript_id]["request"]
+        headers = {}
+        if request.get("webhook_auth_header_name"):
+            headers[request["webhook_auth_header_name"]] = request.get("webhook_auth_header_value", "")
+        try:
+            requests.post(
+                request["webhook_url"],
+                json={"transcript_id": transcript_id, "status": "completed"},
+                headers=headers,
+                timeout=10
+            )
+        except requests.RequestException as e:
+            print(f"Webhook delivery failed: {e}")
+
+
+class SlackStub(StubServer):
+    """
+    Stand-in for Slack's chat.postMessage, recording every message it
+    receives, and users.info answering for the display names in users.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.messages: List[Dict[str, Any]] = []
+        self.users: Dict[str, str] = {}
+
+    def handle(self, method: str, path: str, body: bytes, headers: Dict[str, str]) -> tuple:
+        if path.startswith("/api/chat.postMessage"):
+            with self._lock:
+                self.messages.append(json.loads(body or b"{}"))
+            return 200, {"ok": True, "ts": f"{time.time():.6f}"}, 0.0
+        if path.startswith("/api/users.info"):
+            user_id = parse_qs(urlparse(path).query).get("user", [""])[0]
+            if user_id not in self.users:
+                return 200, {"ok": False, "error": "user_not_found"}, 0.0
+            return 200, {"ok": True, "user": {"id": user_id, "profile": {"display_name": self.users[user_id]}}}, 0.0
+        return 404, {"ok": False, "error": "unknown_method"}, 0.0
+
+
+class FakeSupabaseClient:
+    """
+    In-memory stand-in for the supabase-py client covering the query builder
+    calls MeetGist uses, with configurable latency and error rate per query.
+    """
+
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.lock = threading.Lock()
+        self.stats = {"queries": 0, "errors": 0}
+
+    def table(self, name: str) -> "FakeQuery":
+        return FakeQuery(self, name)
+
+    def rpc(self, name: str, params: Optional[Dict[str, Any]] = None) -> "FakeRpc":
+        return FakeRpc(self, name, params or {})
+
+    def _before_execute(self) -> None:
+        with self.lock:
+            self.stats["queries"] += 1
+            failed = self.random.random() < self.error_rate
+            if failed:
+                self.stats["errors"] += 1
+        time.sleep(self.latency)
+        if failed:
+            raise Exception("injected database failure")
+
+
+class FakeResponse:
+    def __init__(self, data: Any):
+        self.data = data
+
+
+class FakeRpc:
+    """The database functions from supabase/migrations, run on the in-memory tables under one lock."""
+
+    def __init__(self, client: FakeSupabaseClient, name: str, params: Dict[str, Any]):
+        self.client = client
+        self.name = name
+        self.params = params
+
+    def execute(self) -> FakeResponse:
+        handler = getattr(self, f"_{self.name}", None)
+        if handler is None:
+            raise Exception(f"Could not find the function public.{self.name}")
+        self.client._before_execute()
+        with self.client.lock:
+            return FakeResponse(handler(**self.params))
+
+    def _save_summary_version(self, p_transcript_id: str, p_summary_text: str, p_key_decisions: Any,
+                              p_action_items: Any, p_content_hash: str,
+                              p_action_index: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        rows = self.client.tables.setdefault("summaries", [])
+        versions = [r for r in rows if r["transcript_id"] == p_transcript_id]
+        latest = next((r for r in versions if r.get("is_latest")), None)
+        if latest is not None and latest.get("content_hash") == p_content_hash:
+            return dict(latest)
+
+        for row in versions:
+            row["is_latest"] = False
+        row = {
+            "id": str(uuid.uuid4()),
+            "created_at": _now(),
+            "transcript_id": p_transcript_id,
+            "summary_text": p_summary_text,
+            "key_decisions": p_key_decisions,
+            "action_items": p_action_items,
+            "content_hash": p_content_hash,
+            "version": max((r.get("version", 1) for r in versions), default=0) + 1,
+            "is_latest": True
+        }
+        rows.append(row)
+        if p_action_index is not None:
+            self._index_action_items(p_transcript_id, row["id"], p_action_index)
+        return dict(row)
+
+    def _index_action_items(self, p_transcript_id: str, p_summary_id: str,
+                            p_items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        items = self.client.tables.setdefault("action_items", [])
+        previous = {r["text_key"]: r["status"] for r in items
+                    if r["transcript_id"] == p_transcript_id and r["status"] != "open"}
+        self.client.tables["action_items"] = items = [r for r in items if r["transcript_id"] != p_transcript_id]
+        added = []
+        for position, item in enumerate(p_items or []):
+            row = {
+                "id": str(uuid.uuid4()),
+                "created_at": _now(),
+                "updated_at": _now(),
+                "transcript_id": p_transcript_id,
+                "summary_id": p_summary_id,
+                "position": position,
+                **item,
+                "status": previous.get(item["text_key"]) or item.get("status") or "open"
+            }
+            items.append(row)
+            added.append(dict(row))
+        return added
+
+    def _save_meeting(self, p_title: str, p_content: str, p_source_type: str, p_content_hash: str,
+                      p_summary: Optional[Dict[str, Any]] = None,
+                      p_notification_channel: Optional[str] = None,
+                      p_notification_delay_seconds: int = 0) -> Dict[str, Any]:
+        transcripts = self.client.tables.setdefault("transcripts", [])
+        transcript = next((r for r in transcripts if r.get("content_hash") == p_content_hash), None)
+        if transcript is None:
+            transcript = {
+                "id": str(uuid.uuid4()),
+                "created_at": _now(),
+                "content": p_content,
+                "source_type": p_source_type,
+                "content_hash": p_content_hash
+            }
+            transcripts.append(transcript)
+        transcript["meeting_title"] = p_title
+
+        summary = notification = None
+        if p_summary is not None:
+            summary = self._save_summary_version(
+                transcript["id"], p_summary["summary_text"], p_summary.get("key_decisions"),
+                p_summary.get("action_items"), p_summary["content_hash"], p_summary.get("action_index")
+            )
+            if p_notification_channel is not None:
+                notification = self._enqueue_notification(
+                    transcript["id"], p_notification_channel, summary["id"],
+                    {
+                        "meeting_title": p_title,
+                        "summary_text": summary["summary_text"],
+                        "key_decisions": summary["key_decisions"],
+                        "action_items": summary["action_items"]
+                    },
+                    p_notification_delay_seconds
+                )
+
+        return {"transcript": dict(transcript), "summary": summary, "notification": notification}
+
+    def _enqueue_notification(self, p_transcript_id: str, p_channel: str, p_summary_id: str,
+                              p_payload: Dict[str, Any], p_delay_seconds: int = 0) -> Dict[str, Any]:
+        notifications = self.client.tables.setdefault("notifications", [])
+        row = next((
+            r for r in notifications
+            if r["transcript_id"] == p_transcript_id and r["notification_channel"] == p_channel
+        ), None)
+        if row is not None and row.get("summary_id") == p_summary_id and row.get("status") != "failed":
+            return dict(row)
+
+        if row is None:
+            row = {
+                "id": str(uuid.uuid4()),
+                "created_at": _now(),
+                "transcript_id": p_transcript_id,
+                "notification_channel": p_channel
+            }
+            notifications.append(row)
+        row.update({
+            "status": "pending",
+            "summary_id": p_summary_id,
+            "payload": p_payload,
+            "attempts": 0,
+            "last_error": None,
+            "next_attempt_at": _now(p_delay_seconds),
+            "updated_at": _now()
+        })
+        return dict(row)
+
+    def _claim_notifications(self, p_limit: int = 50, p_lease_seconds: int = 120) -> List[Dict[str, Any]]:
+        now = _now()
+        notifications = self.client.tables.setdefault("notifications", [])
+        due_channels = {
+            r["notification_channel"] for r in notifications
+            if r.get("status") in ("pending", "sending") and r.get("next_attempt_at", now) <= now
+        }
+        claimable = sorted((
+            r for r in notifications
+            if r["notification_channel"] in due_channels
+            and r.get("status") in ("pending", "sending")
+            and (r.get("next_attempt_at", now) <= now or (r.get("status") == "pending" and not r.get("attempts")))
+        ), key=lambda r: r["created_at"])[:p_limit]
+        for row in claimable:
+            row.update({
+                "status": "sending",
+                "attempts": row.get("attempts", 0) + 1,
+                "next_attempt_at": _now(p_lease_seconds),
+                "updated_at": now
+            })
+        return [dict(r) for r in claimable]
+
+    def _claim_jobs(self, p_worker: str, p_kinds: Optional[List[str]] = None, p_limit: int = 1,
+                    p_lease_seconds: int = 300) -> List[Dict[str, Any]]:
+        now = _now()
+        jobs = [j for j in self.client.tables.setdefault("jobs", []) if p_kinds is None or j["kind"] in p_kinds]
+        for job in jobs:
+            if job["status"] == "running" and job["lease_expires_at"] <= now \
+                    and job["attempts"] >= job.get("max_attempts", 3):
+                job.update({"status": "failed", "error": f"Worker lost the job {job['attempts']} times",
+                            "lease_owner": None, "lease_expires_at": None, "finished_at": now, "updated_at": now})
+        claimable = sorted((
+            j for j in jobs
+            if (j["status"] == "queued" and j["run_after"] <= now)
+            or (j["status"] == "running" and j["lease_expires_at"] <= now)
+        ), key=lambda j: (j["run_after"], j["created_at"]))[:p_limit]
+        for job in claimable:
+            job.update({
+                "status": "running",
+                "attempts": job.get("attempts", 0) + 1,
+                "lease_owner": p_worker,
+                "lease_expires_at": _now(p_lease_seconds),
+                "started_at": job.get("started_at") or now,
+                "updated_at": now
+            })
+        return [dict(j) for j in claimable]
+
+    def _renew_job_leases(self, p_worker: str, p_ids: List[str], p_lease_seconds: int = 300) -> List[str]:
+        held = [j for j in self.client.tables.setdefault("jobs", [])
+                if j["id"] in p_ids and j.get("lease_owner") == p_worker and j["status"] == "running"]
+        for job in held:
+            job["lease_expires_at"] = _now(p_lease_seconds)
+        return [j["id"] for j in held]
+
+    def _finish_job(self, p_id: str, p_worker: str, p_status: str, p_result: Any = None,
+                    p_error: Optional[str] = None) -> List[Dict[str, Any]]:
+        job = next((j for j in self.client.tables.setdefault("jobs", [])
+                    if j["id"] == p_id and j.get("lease_owner") == p_worker and j["status"] == "running"), None)
+        if job is None:
+            return []
+        continuation = job.get("continuation") if p_status == "waiting" else None
+        job.update({
+            "status": "queued" if continuation else p_status,
+            "task": continuation["task"] if continuation else job["task"],
+            "payload": continuation["payload"] if continuation else job["payload"],
+            "continuation": None if p_status == "waiting" else job.get("continuation"),
+            "attempts": 0 if p_status == "waiting" else job["attempts"],
+            "run_after": _now(),
+            "result": p_result,
+            "error": p_error,
+            "lease_owner": None,
+            "lease_expires_at": None,
+            "finished_at": _now() if p_status in ("succeeded", "failed") else None,
+            "updated_at": _now()
+        })
+        return [dict(job)]
+
+    def _resume_job(self, p_id: str, p_task: str, p_payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        job = next((j for j in self.client.tables.setdefault("jobs", [])
+                    if j["id"] == p_id and not j.get("resumed") and j["status"] in ("queued", "running", "waiting")),
+                   None)
+        if job is None:
+            return []
+        waiting = job["status"] == "waiting"
+        job.update({
+            "resumed": True,
+            "status": "queued" if waiting else job["status"],
+            "task": p_task if waiting else job["task"],
+            "payload": p_payload if waiting else job["payload"],
+            "attempts": 0 if waiting else job["attempts"],
+            "continuation": None if waiting else {"task": p_task, "payload": p_payload},
+            "run_after": _now(),
+            "updated_at": _now()
+        })
+        return [dict(job)]
+
+    def _begin_flight(self, p_key: str, p_owner: str, p_lease_seconds: int = 300) -> List[Dict[str, Any]]:
+        flights = self.client.tables.setdefault("flights", [])
+        flight = next((f for f in flights if f["key"] == p_key), None)
+        if flight is None:
+            flight = {"key": p_key}
+            flights.append(flight)
+        elif not (flight["owner"] == p_owner or flight["status"] != "running" or flight["expires_at"] <= _now()):
+            return [dict(flight)]
+        flight.update({
+            "owner": p_owner,
+            "status": "running",
+            "result": None,
+            "error": None,
+            "expires_at": _now(p_lease_seconds),
+            "updated_at": _now()
+        })
+        return [dict(flight)]
+
+    def _finish_flight(self, p_key: str, p_owner: str, p_status: str, p_result: Any = None,
+                       p_error: Optional[str] = None) -> List[Dict[str, Any]]:
+        flight = next((f for f in self.client.tables.setdefault("flights", [])
+                       if f["key"] == p_key and f["owner"] == p_owner and f["status"] == "running"), None)
+        if flight is None:
+            return []
+        flight.update({"status": p_status, "result": p_result, "error": p_error, "expires_at": _now(),
+                       "updated_at": _now()})
+        return [dict(flight)]
+
+
+# Column defaults of tables whose rows the code inserts partially
+TABLE_DEFAULTS = {
+    "jobs": lambda: {
+        "status": "queued", "attempts": 0, "max_attempts": 3, "run_after": _now(), "lease_owner": None,
+        "lease_expires_at": None, "resumed": False, "continuation": None, "progress": None, "result": None,
+        "error": None, "started_at": None, "finished_at": None, "updated_at": _now()
+    }
+}
+
+
+class FakeQuery:
+    def __init__(self, client: FakeSupabaseClient, table: str):
+        self.client = client
+        self.table = table
+        self.operation = "select"
+        self.payload: Any = None
+        self.filters: List[tuple] = []
+        self.ordering: Optional[tuple] = None
+        self.bounds: Optional[tuple] = None
+        self.single_row = False
+        self.maybe = False
+        self.on_conflict: Optional[str] = None
+
+    def select(self, columns: str = "*", **kwargs) -> "FakeQuery":
+        self.operation = "select"
+        return self
+
+    def insert(self, rows: Any, **kwargs) -> "FakeQuery":
+        self.operation, self.payload = "insert", rows
+        return self
+
+    def upsert(self, rows: Any, on_conflict: Optional[str] = None, **kwargs) -> "FakeQuery":
+        self.operation, self.payload, self.on_conflict = "upsert", rows, on_conflict
+        return self
+
+    def update(self, values: Dict[str, Any], **kwargs) -> "FakeQuery":
+        self.operation, self.payload = "update", values
+        return self
+
+    def delete(self, **kwargs) -> "FakeQuery":
+        self.operation = "delete"
+        return self
+
+    def eq(self, column: str, value: Any) -> "FakeQuery":
+        self.filters.append((column, lambda v, value=value: v == value))
+        return self
+
+    def neq(self, column: str, value: Any) -> "FakeQuery":
+        self.filters.append((column, lambda v, value=value: v != value))
+        return self
+
+    def gt(self, column: str, value: Any) -> "FakeQuery":
+        self.filters.append((column, lambda v, value=value: v is not None and v > value))
+        return self
+
+    def gte(self, column: str, value: Any) -> "FakeQuery":
+        self.filters.append((column, lambda v, value=value: v is not None and v >= value))
+        return self
+
+    def lt(self, column: str, value: Any) -> "FakeQuery":
+        self.filters.append((column, lambda v, value=value: v is not None and v < value))
+        return self
+
+    def lte(self, column: str, value: Any) -> "FakeQuery":
+        self.filters.append((column, lambda v, value=value: v is not None and v <= value))
+        return self
+
+    def in_(self, column: str, values: List[Any]) -> "FakeQuery":
+        self.filters.append((column, lambda v, values=tuple(values): v in values))
+        return self
+
+    def is_(self, column: str, value: Any) -> "FakeQuery":
+        value = None if value in ("null", None) else value
+        self.filters.append((column, lambda v, value=value: v is value or v == value))
+        return self
+
+    def order(self, column: str, desc: bool = False, **kwargs) -> "FakeQuery":
+        self.ordering = (column, desc)
+        return self
+
+    def limit(self, count: int) -> "FakeQuery":
+        self.bounds = (0, count - 1)
+        return self
+
+    def range(self, start: int, end: int) -> "FakeQuery":
+        self.bounds = (start, end)
+        return self
+
+    def single(self) -> "FakeQuery":
+        self.single_row = True
+        return self
+
+    def maybe_single(self) -> "FakeQuery":
+        self.maybe = True
+        return self.single()
+
+    def execute(self) -> Optional[FakeResponse]:
+        self.client._before_execute()
+        with self.client.lock:
+            rows = self.client.tables.setdefault(self.table, [])
+            result = self._run(rows)
+        # postgrest's maybe_single() returns no response at all when nothing matched
+        return None if result is None else FakeResponse(result)
+
+    def _matches(self, row: Dict[str, Any]) -> bool:
+        return all(test(row.get(column)) for column, test in self.filters)
+
+    def _run(self, rows: List[Dict[str, Any]]) -> Any:
+        if self.operation in ("insert", "upsert"):
+            new_rows = self.payload if isinstance(self.payload, list) else [self.payload]
+            result = []
+            for new_row in new_rows:
+                existing = None
+                if self.operation == "upsert" and self.on_conflict:
+                    keys = [k.strip() for k in self.on_conflict.split(",")]
+                    existing = next((r for r in rows if all(r.get(k) == new_row.get(k) for k in keys)), None)
+                if existing is not None:
+                    existing.update(new_row)
+                    result.append(dict(existing))
+                    continue
+                defaults = TABLE_DEFAULTS.get(self.table)
+                row = {"id": str(uuid.uuid4()), "created_at": _now(), **(defaults() if defaults else {}), **new_row}
+                rows.append(row)
+                result.append(dict(row))
+            return result
+
+        matched = [r for r in rows if self._matches(r)]
+
+        if self.operation == "update":
+            for row in matched:
+                row.update(self.payload)
+            return [dict(r) for r in matched]
+
+        if self.operation == "delete":
+            self.client.tables[self.table] = [r for r in rows if not self._matches(r)]
+            return [dict(r) for r in matched]
+
+        if self.ordering:
+            column, desc = self.ordering
+            matched.sort(key=lambda r: (r.get(column) is None, r.get(column)), reverse=desc)
+        if self.bounds:
+            matched = matched[self.bounds[0]:self.bounds[1] + 1]
+
+        if self.single_row:
+            if self.maybe and not matched:
+                return None
+            if len(matched) != 1:
+                raise Exception(f"Expected a single row, found {len(matched)}")
+            return dict(matched[0])
+        return [dict(r) for r in matched]
+
+
+def _now(offset_seconds: float = 0) -> str:
+    from datetime import datetime, timedelta, timezone
+    return (datetime.now(timezone.utc) + timedelta(seconds=offset_seconds)).isoformat()
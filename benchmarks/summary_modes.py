@@ -0,0 +1,88 @@
+"""
+Compare latency and token usage of the separate (three prompts) and
+combined (one JSON generation) summary modes against a local watsonx stub.
+
+Usage:
+    python -m benchmarks.summary_modes --runs 3 --output summary_modes.json
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+from benchmarks.stubs import WatsonxStub
+from src.core.chunk_cache import ChunkCache
+from src.core.storage import load_transcript_file
+
+
+def load_transcripts(directory: str) -> List[str]:
+    """Load the plain text of every transcript backup in a directory."""
+    texts = []
+    for path in sorted(Path(directory).glob("*.json*")):
+        data = load_transcript_file(str(path))
+        if "segments" in data:
+            texts.append("\n\n".join(f"{s['speaker']}: {s['text']}" for s in data["segments"]))
+        else:
+            texts.append(data.get("content") or data.get("text", ""))
+    return texts
+
+
+def run_mode(mode: str, transcripts: List[str], runs: int) -> Dict[str, Any]:
+    """Summarize every transcript `runs` times in the given mode."""
+    from src.core.meeting_summarizer import MeetingSummarizer
+
+    # Fresh cache so chunked transcripts are not served from earlier runs
+    summarizer = MeetingSummarizer("stub-key", "stub-project", mode=mode,
+                                   chunk_cache=ChunkCache(tempfile.mkdtemp()))
+    latencies, input_tokens, output_tokens, calls = [], 0, 0, 0
+
+    for _ in range(runs):
+        for text in transcripts:
+            start = time.perf_counter()
+            result = summarizer.generate_summary(text)
+            latencies.append(time.perf_counter() - start)
+            input_tokens += result["usage"]["input_tokens"]
+            output_tokens += result["usage"]["output_tokens"]
+            calls += len(result["usage"]["calls"])
+
+    count = len(latencies)
+    return {
+        "mode": mode,
+        "summaries": count,
+        "mean_latency_s": statistics.mean(latencies),
+        "p95_latency_s": sorted(latencies)[max(int(count * 0.95) - 1, 0)],
+        "calls_per_summary": calls / count,
+        "input_tokens_per_summary": input_tokens / count,
+        "output_tokens_per_summary": output_tokens / count
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark separate vs combined summary modes")
+    parser.add_argument("--transcripts", default="transcripts", help="Directory of transcript backups")
+    parser.add_argument("--runs", type=int, default=1, help="Passes over the transcript set per mode")
+    parser.add_argument("--input-token-cost", type=float, default=0.0002, help="Stub seconds per input token")
+    parser.add_argument("--output-token-cost", type=float, default=0.02, help="Stub seconds per output token")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    transcripts = load_transcripts(args.transcripts)
+
+    with WatsonxStub(seconds_per_input_token=args.input_token_cost,
+                     seconds_per_output_token=args.output_token_cost) as stub:
+        os.environ["WATSONX_URL"] = stub.base_url
+        os.environ["IBM_IAM_URL"] = stub.base_url
+        results = [run_mode(mode, transcripts, args.runs) for mode in ("separate", "combined")]
+
+    print(f"\n{'mode':<10}{'mean s':>10}{'p95 s':>10}{'calls':>8}{'tokens in':>12}{'tokens out':>12}")
+    for r in results:
+        print(f"{r['mode']:<10}{r['mean_latency_s']:>10.2f}{r['p95_latency_s']:>10.2f}"
+              f"{r['calls_per_summary']:>8.1f}{r['input_tokens_per_summary']:>12.0f}"
+              f"{r['output_tokens_per_summary']:>12.0f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
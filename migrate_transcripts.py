@@ -0,0 +1,96 @@
+import argparse
+from src.core.storage import migrate_directory, compress_content, CONTENT_MARKER
+from src.core.workers import CpuPool
+
+
+def migrate_database(compression: str, batch_size: int = 100, pool: CpuPool = None, db=None) -> int:
+    """Compress the content column of existing transcript rows in place, a batch at a time on the pool."""
+    from src.core.db import DatabaseManager
+
+    db = db or DatabaseManager()
+    pool = pool or CpuPool(workers=0)
+    converted = 0
+    offset = 0
+
+    while True:
+        rows = db.get_stored_transcript_contents(offset, batch_size)
+        if rows is None:
+            raise RuntimeError(f"Could not read transcripts {offset}-{offset + batch_size - 1}, stopping the migration")
+        if not rows:
+            break
+
+        rows = [row for row in rows if row.get("content") and not row["content"].startswith(CONTENT_MARKER)]
+        compressed_rows = pool.map(compress_content, [row["content"] for row in rows], compression)
+
+        for row, compressed in zip(rows, compressed_rows):
+            if compressed == row["content"]:
+                continue
+            if db.set_stored_transcript_content(row["id"], compressed) is not None:
+                converted += 1
+
+        offset += batch_size
+
+    return converted
+
+
+def index_existing_action_items(batch_size: int = 100, pool: CpuPool = None, db=None) -> int:
+    """Index the action items of every latest summary saved before the action_items table existed."""
+    from datetime import datetime
+    from src.core.action_items import index_action_items
+    from src.core.db import DatabaseManager
+
+    db = db or DatabaseManager()
+    pool = pool or CpuPool(workers=0)
+    indexed = 0
+    offset = 0
+
+    while True:
+        rows = db.get_latest_summaries(offset, batch_size)
+        if rows is None:
+            raise RuntimeError(f"Could not read summaries {offset}-{offset + batch_size - 1}, stopping the indexing")
+        if not rows:
+            break
+
+        # Relative deadlines count from the day the summary was written
+        parsed = [pool.submit(index_action_items, row.get("action_items"),
+                              reference=datetime.fromisoformat(row["created_at"]).date()) for row in rows]
+
+        for row, future in zip(rows, parsed):
+            items = future.result()
+            if db.index_action_items(row["transcript_id"], row["id"], items) is not None:
+                indexed += len(items)
+
+        offset += batch_size
+
+    return indexed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert transcript backups and DB content to compressed storage")
+    parser.add_argument("--dir", default="transcripts", help="Directory containing transcript backups")
+    parser.add_argument("--compression", choices=["zstd", "gzip", "none"], default=None,
+                        help="Target codec (defaults to TRANSCRIPT_COMPRESSION or gzip)")
+    parser.add_argument("--keep-originals", action="store_true", help="Keep the original files after conversion")
+    parser.add_argument("--db", action="store_true", help="Also compress the content column in Supabase")
+    parser.add_argument("--action-items", action="store_true",
+                        help="Also index the action items of existing summaries in Supabase")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes for compressing and parsing (defaults to CPU_WORKERS or all cores)")
+    args = parser.parse_args()
+
+    pool = CpuPool(workers=args.workers)
+    stats = migrate_directory(args.dir, compression=args.compression, keep_original=args.keep_originals, pool=pool)
+    saved = stats["bytes_before"] - stats["bytes_after"]
+    print(f"\nConverted {stats['converted']} files, skipped {stats['skipped']}, failed {stats['failed']}")
+    if stats["bytes_before"]:
+        print(f"Size: {stats['bytes_before']:,} -> {stats['bytes_after']:,} bytes ({saved / stats['bytes_before']:.0%} saved)")
+
+    if args.db:
+        count = migrate_database(args.compression or "gzip", pool=pool)
+        print(f"Compressed content of {count} transcripts in the database")
+
+    if args.action_items:
+        count = index_existing_action_items(pool=pool)
+        print(f"Indexed {count} action items")
+
+    pool.shutdown()
@@ -1,9 +1,23 @@
+import argparse
+import os
 import uvicorn
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the MeetGist API")
+    parser.add_argument("--host", default=os.getenv("API_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("API_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("API_WORKERS", "1")),
+                        help="Server processes; more than one is the production mode, without auto-reload")
+    args = parser.parse_args()
+
+    if args.workers > 1 and os.getenv("JOB_BACKEND", "memory").lower() != "queue":
+        # In-memory jobs are only visible to the process that queued them
+        print("Warning: with several API workers set JOB_BACKEND=queue and run run_worker.py")
+
     uvicorn.run(
         "src.api.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        reload=args.workers == 1
     )
\ No newline at end of file
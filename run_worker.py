@@ -0,0 +1,41 @@
+import argparse
+import logging
+import os
+import signal
+import threading
+from src.core.job_queue import QueueWorker
+from src.core.services import get_services
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run queued MeetGist jobs (JOB_BACKEND=queue)")
+    parser.add_argument("--kinds", default=os.getenv("JOB_KINDS", ""),
+                        help="Comma separated job kinds to run, e.g. transcribe or summarize,ingest_text "
+                             "(default: all)")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("JOB_WORKERS", "4")),
+                        help="Jobs run at the same time by this process")
+    parser.add_argument("--drain-timeout", type=float, default=600,
+                        help="Seconds to let running jobs finish on SIGTERM/SIGINT")
+    args = parser.parse_args()
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    services = get_services()
+    worker = QueueWorker(
+        services,
+        kinds=[kind.strip() for kind in args.kinds.split(",") if kind.strip()],
+        concurrency=args.concurrency
+    )
+
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+
+    worker.start()
+    while not stop.wait(1):
+        pass
+
+    print(f"Stopping: waiting for {worker.running_jobs} running jobs")
+    worker.stop(timeout=args.drain_timeout)
+    if services.is_built("notifications"):
+        services.notifications.stop(timeout=5)
+    if services.is_built("cpu"):
+        services.cpu.shutdown()
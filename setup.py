@@ -10,6 +10,15 @@ setup(
         "supabase",
         "python-dotenv",
         "assemblyai",
-        "requests"
+        "requests",
+        "httpx"
     ],
+    extras_require={
+        # LLM_BACKEND=local runs models with llama.cpp
+        "local": ["llama-cpp-python"],
+        # Exact prompt token counts with the model's tokenizer instead of a character estimate
+        "tokenizers": ["transformers"],
+        # zstd codec for transcript storage, gzip is always available without it
+        "zstd": ["zstandard"]
+    },
 )
\ No newline at end of file
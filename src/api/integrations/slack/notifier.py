@@ -2,8 +2,22 @@ from typing import List, Optional, Dict, Any
 import os
 import requests
 from datetime import datetime
+from ....core import metrics, tracing
+from ....core.resilience import DependencyUnavailable, dependency
+
+# Slack "error" values worth retrying; anything else (channel_not_found,
+# invalid_auth, ...) fails the same way every time
+RETRYABLE_ERRORS = {"ratelimited", "internal_error", "fatal_error", "service_unavailable", "request_timeout"}
+
+# Keep digests within Slack's limits of 50 blocks and 3000 characters per section
+DIGEST_MAX_MEETINGS = 20
+DIGEST_SUMMARY_CHARS = 600
+SLACK_SECTION_CHARS = 3000
+SLACK_MAX_BLOCKS = 50
 
 class SlackNotifier:
+    digest_max_meetings = DIGEST_MAX_MEETINGS
+
     def __init__(self, token: str = None, channel: str = None):
         """Initialize Slack notifier with credentials."""
         self.token = token or os.getenv("SLACK_BOT_TOKEN")
@@ -18,6 +32,11 @@ class SlackNotifier:
         }
         self.base_url = "https://slack.com/api/chat.postMessage"
 
+        # Pooled connections, plus a cap on concurrent posts and a circuit
+        # breaker shared by all callers
+        self.session = requests.Session()
+        self.resilience = dependency("slack")
+
         # Define colors for different sections
         self.colors = {
             "title": "#36a64f",      # Green
@@ -36,76 +55,242 @@ class SlackNotifier:
     ) -> bool:
         """Send meeting summary to Slack channel with enhanced formatting."""
         try:
-            if not timestamp:
-                timestamp = datetime.now().isoformat()
+            return self._send_message(self.meeting_summary_payload(meeting_title, summary_data, timestamp, channel))
 
-            summary = summary_data.get('summary_text', 'No summary available')
-            decisions = summary_data.get('key_decisions', [])
-            actions = summary_data.get('action_items', [])
+        except Exception as e:
+            print(f"Error sending meeting summary: {str(e)}")
+            return False
 
-            # Create the message payload
-            payload = {
-                "channel": channel or self.channel,
-                "text": "📝 *New Meeting Summary*",
-                "attachments": [
-                    # Meeting Title (Green)
-                    {
-                        "color": self.colors["title"],
-                        "fields": [{
-                            "title": "Meeting Title",
-                            "value": meeting_title,
-                            "short": True
-                        }]
-                    },
-                    # Timestamp (Yellow)
-                    {
-                        "color": self.colors["timestamp"],
-                        "fields": [{
-                            "title": "Generated At",
-                            "value": timestamp,
-                            "short": True
-                        }]
-                    },
-                    # Summary (Orange/Red)
-                    {
-                        "color": self.colors["summary"],
-                        "fields": [{
-                            "title": "Summary",
-                            "value": summary,
-                            "short": False
-                        }]
-                    }
-                ]
-            }
+    def meeting_summary_payload(
+        self,
+        meeting_title: str,
+        summary_data: Dict[str, Any],
+        timestamp: Optional[str] = None,
+        channel: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Build the chat.postMessage payload for one meeting summary."""
+        if not timestamp:
+            timestamp = datetime.now().isoformat()
+
+        summary = summary_data.get('summary_text', 'No summary available')
+        decisions = summary_data.get('key_decisions', [])
+        actions = summary_data.get('action_items', [])
 
-            # Add colored decisions section if available
-            if decisions:
-                payload["attachments"].append({
-                    "color": self.colors["decisions"],
+        # Create the message payload
+        payload = {
+            "channel": channel or self.channel,
+            "text": "📝 *New Meeting Summary*",
+            "attachments": [
+                # Meeting Title (Green)
+                {
+                    "color": self.colors["title"],
                     "fields": [{
-                        "title": "Key Decisions",
-                        "value": self._format_list(decisions),
-                        "short": False
+                        "title": "Meeting Title",
+                        "value": meeting_title,
+                        "short": True
                     }]
-                })
-
-            # Add colored actions section if available
-            if actions:
-                payload["attachments"].append({
-                    "color": self.colors["actions"],
+                },
+                # Timestamp (Yellow)
+                {
+                    "color": self.colors["timestamp"],
                     "fields": [{
-                        "title": "Action Items",
-                        "value": self._format_list(actions),
+                        "title": "Generated At",
+                        "value": timestamp,
+                        "short": True
+                    }]
+                },
+                # Summary (Orange/Red)
+                {
+                    "color": self.colors["summary"],
+                    "fields": [{
+                        "title": "Summary",
+                        "value": summary,
                         "short": False
                     }]
-                })
+                }
+            ]
+        }
+
+        # Add colored decisions section if available
+        if decisions:
+            payload["attachments"].append({
+                "color": self.colors["decisions"],
+                "fields": [{
+                    "title": "Key Decisions",
+                    "value": self._format_list(decisions),
+                    "short": False
+                }]
+            })
+
+        # Add colored actions section if available
+        if actions:
+            payload["attachments"].append({
+                "color": self.colors["actions"],
+                "fields": [{
+                    "title": "Action Items",
+                    "value": self._format_list(actions),
+                    "short": False
+                }]
+            })
 
-            return self._send_message(payload)
+        return payload
+
+    def send_digest(
+        self,
+        meetings: List[Dict[str, Any]],
+        channel: Optional[str] = None
+    ) -> bool:
+        """Send several meeting summaries as one message."""
+        try:
+            return self._send_message(self.digest_payload(meetings, channel))
 
         except Exception as e:
-            print(f"Error sending meeting summary: {str(e)}")
+            print(f"Error sending digest: {str(e)}")
             return False
 
+    def digest_payload(
+        self,
+        meetings: List[Dict[str, Any]],
+        channel: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Build one message for several summaries (dicts with meeting_title,
+        summary_text, key_decisions and action_items).
+        """
+        blocks = [
+            {
+                "type": "header",
+                "text": {
+                    "type": "plain_text",
+                    "text": f"📝 {len(meetings)} New Meeting Summaries",
+                    "emoji": True
+                }
+            }
+        ]
+
+        for meeting in meetings[:DIGEST_MAX_MEETINGS]:
+            summary = meeting.get('summary_text') or 'No summary available'
+            if len(summary) > DIGEST_SUMMARY_CHARS:
+                summary = summary[:DIGEST_SUMMARY_CHARS].rsplit(" ", 1)[0] + "…"
+            text = f"*{meeting.get('meeting_title', 'Unknown Meeting')}*\n{summary}"
+            if meeting.get('key_decisions'):
+                text += f"\n*Key Decisions*\n{self._format_list(meeting['key_decisions'])}"
+            if meeting.get('action_items'):
+                text += f"\n*Action Items*\n{self._format_list(meeting['action_items'])}"
+            blocks.append({"type": "divider"})
+            blocks.append({
+                "type": "section",
+                "text": {
+                    "type": "mrkdwn",
+                    "text": text[:SLACK_SECTION_CHARS]
+                }
+            })
+
+        if len(meetings) > DIGEST_MAX_MEETINGS:
+            blocks.append({
+                "type": "context",
+                "elements": [{
+                    "type": "mrkdwn",
+                    "text": f"…and {len(meetings) - DIGEST_MAX_MEETINGS} more"
+                }]
+            })
+
+        return {
+            "channel": channel or self.channel,
+            "text": f"📝 {len(meetings)} new meeting summaries",
+            "blocks": blocks
+        }
+
+    def send_rollup(
+        self,
+        title: str,
+        meetings: List[Dict[str, Any]],
+        overview: Optional[str] = None,
+        channel: Optional[str] = None
+    ) -> bool:
+        """Send the decisions and action items of a period's meetings as one message."""
+        try:
+            return self._send_message(self.rollup_payload(title, meetings, overview, channel))
+
+        except Exception as e:
+            print(f"Error sending rollup: {str(e)}")
+            return False
+
+    def rollup_payload(
+        self,
+        title: str,
+        meetings: List[Dict[str, Any]],
+        overview: Optional[str] = None,
+        channel: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Build one message listing the key decisions and action items of
+        meetings (dicts with meeting_title, key_decisions and action_items),
+        each attributed to its meeting.
+        """
+        decisions = [f"{item} _({m.get('meeting_title', 'Unknown Meeting')})_"
+                     for m in meetings for item in m.get('key_decisions') or []]
+        actions = [f"{item} _({m.get('meeting_title', 'Unknown Meeting')})_"
+                   for m in meetings for item in m.get('action_items') or []]
+
+        blocks = [
+            {
+                "type": "header",
+                "text": {
+                    "type": "plain_text",
+                    "text": f"🗓️ {title}",
+                    "emoji": True
+                }
+            },
+            {
+                "type": "context",
+                "elements": [{
+                    "type": "mrkdwn",
+                    "text": f"{len(meetings)} meetings · {len(decisions)} decisions · {len(actions)} action items"
+                }]
+            }
+        ]
+        if overview:
+            blocks.append({
+                "type": "section",
+                "text": {
+                    "type": "mrkdwn",
+                    "text": overview[:SLACK_SECTION_CHARS]
+                }
+            })
+
+        for heading, items in (("Key Decisions", decisions), ("Action Items", actions)):
+            if not items:
+                continue
+            blocks.append({"type": "divider"})
+            for text in self._pack_lines(f"*{heading}*", items):
+                blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": text}})
+
+        if len(blocks) > SLACK_MAX_BLOCKS:
+            blocks = blocks[:SLACK_MAX_BLOCKS - 1] + [{
+                "type": "context",
+                "elements": [{"type": "mrkdwn", "text": "…truncated, see MeetGist for the full list"}]
+            }]
+
+        return {
+            "channel": channel or self.channel,
+            "text": f"🗓️ {title}",
+            "blocks": blocks
+        }
+
+    def _pack_lines(self, heading: str, items: List[str], prefix: str = "• ") -> List[str]:
+        """Split a bulleted list into section texts within Slack's per-section limit."""
+        texts, current = [], heading
+        for item in items:
+            line = f"{prefix}{item}"[:SLACK_SECTION_CHARS - 1]
+            if len(current) + 1 + len(line) > SLACK_SECTION_CHARS:
+                texts.append(current)
+                current = line
+            else:
+                current = f"{current}\n{line}"
+        texts.append(current)
+        return texts
+
     def send_transcripts_list(
         self,
         transcripts: List[Dict[str, Any]],
@@ -193,30 +378,180 @@ class SlackNotifier:
             print(f"Error sending summaries list: {str(e)}")
             return False
 
-    def _send_message(self, payload: Dict[str, Any]) -> bool:
-        """Send message to Slack."""
+    def send_action_items(
+        self,
+        items: List[Dict[str, Any]],
+        title: str = "Action Items",
+        channel: Optional[str] = None
+    ) -> bool:
+        """Send indexed action items (rows of the action_items table) with owner and due date."""
         try:
-            response = requests.post(
-                self.base_url,
-                headers=self.headers,
-                json=payload
-            )
+            if not items:
+                return self._send_message({
+                    "channel": channel or self.channel,
+                    "text": f"No {title.lower()} found."
+                })
+
+            today = datetime.now().date().isoformat()
+            lines = []
+            for item in items:
+                due = item.get("due_date")
+                details = [item.get("assignee") or "Unassigned"]
+                if due:
+                    details.append(f"{'⚠️ overdue since' if due < today and item.get('status') != 'done' else 'due'} {due}")
+                if item.get("status") and item["status"] != "open":
+                    details.append(item["status"])
+                meeting = (item.get("transcripts") or {}).get("meeting_title", "Unknown Meeting")
+                lines.append(f"{item['text']}\n   _{' · '.join(details)} · {meeting}_")
+
+            blocks = [
+                {
+                    "type": "header",
+                    "text": {
+                        "type": "plain_text",
+                        "text": f"✅ {title}",
+                        "emoji": True
+                    }
+                }
+            ]
+            for text in self._pack_lines(f"{len(items)} items", lines):
+                blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": text}})
 
-            if not response.ok:
-                print(f"Slack API Error: {response.status_code} - {response.text}")
-                return False
+            return self._send_message({
+                "channel": channel or self.channel,
+                "text": f"✅ {title}",
+                "blocks": blocks[:SLACK_MAX_BLOCKS]
+            })
 
-            result = response.json()
+        except Exception as e:
+            print(f"Error sending action items: {str(e)}")
+            return False
+
+    def get_user_name(self, user_id: str) -> Optional[str]:
+        """Display name (or real name) of a Slack user; needs the users:read scope."""
+        try:
+            with self.resilience.call():
+                response = self.session.get(
+                    self.base_url.rsplit("/", 1)[0] + "/users.info",
+                    headers=self.headers,
+                    params={"user": user_id},
+                    timeout=self.resilience.timeout
+                )
+            result = response.json() if response.ok else {}
             if not result.get("ok"):
-                print(f"Slack API Error: {result.get('error', 'Unknown error')}")
-                return False
+                print(f"Slack API Error: {result.get('error', response.status_code)}")
+                return None
+            profile = result["user"].get("profile", {})
+            return profile.get("display_name") or profile.get("real_name") or result["user"].get("name")
+
+        except Exception as e:
+            metrics.ERRORS.inc(component="slack")
+            print(f"Error looking up Slack user: {str(e)}")
+            return None
 
-            return True
+    def send_job_status(
+        self,
+        jobs: List[Dict[str, Any]],
+        channel: Optional[str] = None
+    ) -> bool:
+        """Send progress of running background jobs."""
+        try:
+            if not jobs:
+                return self._send_message({
+                    "channel": channel or self.channel,
+                    "text": "No meetings are being processed."
+                })
+
+            blocks = [
+                {
+                    "type": "header",
+                    "text": {
+                        "type": "plain_text",
+                        "text": "⏳ Meetings in Progress",
+                        "emoji": True
+                    }
+                }
+            ]
+
+            for job in jobs:
+                progress = job.get("progress") or {}
+                percent = int((progress.get("progress") or 0) * 100)
+                title = job.get("metadata", {}).get("title") or job["kind"]
+                blocks.append({
+                    "type": "section",
+                    "text": {
+                        "type": "mrkdwn",
+                        "text": f"*{title}* ({job['status']}) {percent}%\n{progress.get('message') or 'Queued'}"
+                    }
+                })
+
+            return self._send_message({
+                "channel": channel or self.channel,
+                "blocks": blocks
+            })
 
         except Exception as e:
-            print(f"Error sending message to Slack: {str(e)}")
+            print(f"Error sending job status: {str(e)}")
             return False
 
+    def _send_message(self, payload: Dict[str, Any]) -> bool:
+        """Send message to Slack."""
+        return self.deliver(payload)["ok"]
+
+    def deliver(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Post a message and report the outcome.
+
+        Returns:
+            Dict with ok, error, retryable (rate limits, server and network
+            errors) and retry_after (seconds Slack asked us to wait, if any)
+        """
+        try:
+            with self.resilience.call() as attempt, metrics.SLACK_SEND_SECONDS.time(), \
+                    tracing.span("slack.send", channel=payload.get("channel")) as span:
+                response = self.session.post(
+                    self.base_url,
+                    headers=self.headers,
+                    json=payload,
+                    timeout=self.resilience.timeout
+                )
+                span.set_attribute("http.status_code", response.status_code)
+                outcome = self._outcome(response)
+                if outcome["retryable"]:
+                    # Rate limits and Slack outages count against the circuit breaker
+                    attempt.fail(RuntimeError(outcome["error"]))
+            return outcome
+
+        except DependencyUnavailable as e:
+            # Circuit open or every slot busy: nothing was sent, try again later
+            return {"ok": False, "error": str(e), "retryable": True, "retry_after": e.retry_after}
+        except Exception as e:
+            metrics.ERRORS.inc(component="slack")
+            print(f"Error sending message to Slack: {str(e)}")
+            return {"ok": False, "error": str(e), "retryable": True, "retry_after": None}
+
+    def _outcome(self, response: requests.Response) -> Dict[str, Any]:
+        """deliver() result for a chat.postMessage response."""
+        if not response.ok:
+            metrics.ERRORS.inc(component="slack")
+            print(f"Slack API Error: {response.status_code} - {response.text}")
+            retry_after = response.headers.get("Retry-After")
+            return {
+                "ok": False,
+                "error": f"HTTP {response.status_code}",
+                "retryable": response.status_code == 429 or response.status_code >= 500,
+                "retry_after": float(retry_after) if retry_after and retry_after.isdigit() else None
+            }
+
+        result = response.json()
+        if not result.get("ok"):
+            metrics.ERRORS.inc(component="slack")
+            error = result.get('error', 'Unknown error')
+            print(f"Slack API Error: {error}")
+            return {"ok": False, "error": error, "retryable": error in RETRYABLE_ERRORS, "retry_after": None}
+
+        return {"ok": True, "error": None, "retryable": False, "retry_after": None}
+
     def _format_list(self, items: List[str], prefix: str = "• ") -> str:
         """Format a list of items for Slack display."""
         if not items:
@@ -1,22 +1,83 @@
-from fastapi import FastAPI
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from .routes import slack
+from .routes import slack, meetings, webhooks, metrics as metrics_routes
+from .services.auth import API_KEY_HEADER
+from ..core import metrics, quota, resilience
+from ..core.services import get_services
+
+# Runs in every server process (uvicorn imports the app in its workers)
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Deliver queued Slack notifications, including ones left by an earlier run, and post digests"""
+    services = get_services()
+    if os.getenv("NOTIFICATION_DISPATCHER", "true").lower() == "true":
+        try:
+            services.notifications.start()
+        except Exception as e:
+            print(f"Slack notifications disabled: {e}")
+    if os.getenv("DIGEST_PERIODS", "").strip():
+        try:
+            services.digests.start()
+        except Exception as e:
+            print(f"Slack digests disabled: {e}")
+    yield
+    for name in ("notifications", "digests"):
+        if services.is_built(name):
+            services.get(name).stop(timeout=5)
+    if services.is_built("cpu"):
+        services.cpu.shutdown()
 
 app = FastAPI(
     title="MeetGist API",
-    description="API for MeetGist Slack bot integration",
-    version="1.0.0"
+    description="API for MeetGist ingest, summarization and Slack bot integration",
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-# Add CORS middleware
+# Browser origins allowed to call the API (comma separated); none by default
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=[origin.strip() for origin in os.getenv("CORS_ORIGINS", "").split(",") if origin.strip()],
+    allow_credentials=False,
+    allow_methods=["GET", "POST", "PATCH"],
+    allow_headers=["Content-Type", API_KEY_HEADER],
 )
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Time every request by route template, skipping all work when metrics are disabled"""
+    if not metrics.enabled():
+        return await call_next(request)
+
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        metrics.HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status)
+        )
+
+@app.exception_handler(resilience.DependencyUnavailable)
+async def dependency_unavailable(request: Request, exc: resilience.DependencyUnavailable):
+    """A dependency's circuit is open or its bulkhead is full: fail fast with 503 instead of hanging"""
+    headers = {"Retry-After": str(int(exc.retry_after) + 1)} if exc.retry_after is not None else None
+    return JSONResponse(status_code=503, content={"detail": str(exc), "dependency": exc.dependency},
+                        headers=headers)
+
 # Include routers - Note the prefix change
 app.include_router(
     slack.router,
@@ -24,7 +85,32 @@ app.include_router(
     tags=["slack"]
 )
 
+app.include_router(
+    meetings.router,
+    prefix="/api/v1",
+    tags=["meetings"]
+)
+
+app.include_router(
+    webhooks.router,
+    prefix="/api/v1/webhooks",
+    tags=["webhooks"]
+)
+
+app.include_router(metrics_routes.router, tags=["metrics"])
+
 # Root health check
 @app.get("/")
 async def root():
-    return {"status": "ok", "message": "MeetGist API is running"}
\ No newline at end of file
+    return {"status": "ok", "message": "MeetGist API is running"}
+
+@app.get("/health")
+async def health():
+    """
+    Circuit breaker state of each external service, and the watsonx quota
+    scheduler's limit and queue. Answers 200 while any service is down
+    ("degraded"), so the API isn't restarted for an outage it can't fix
+    """
+    dependencies = resilience.snapshot()
+    degraded = any(dep["state"] != resilience.CLOSED for dep in dependencies.values())
+    return {"status": "degraded" if degraded else "ok", "dependencies": dependencies, "quotas": quota.snapshot()}
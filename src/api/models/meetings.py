@@ -0,0 +1,77 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, List, Dict, Any, Literal
+
+class TextTranscriptRequest(BaseModel):
+    """Model for ingesting a text transcript"""
+    title: str = Field(..., min_length=1, description="Meeting title")
+    content: str = Field(..., min_length=1, description="Transcript text")
+    summarize: bool = Field(False, description="Queue a summary job after saving")
+    notify: bool = Field(False, description="Post the summary to Slack when it is ready")
+
+class SummaryRequest(BaseModel):
+    """Model for enqueueing summarization of a stored transcript"""
+    transcript_id: str
+    notify: bool = False
+
+class BulkMeeting(BaseModel):
+    """One meeting in a bulk ingest, given as text or as a recording URL"""
+    title: str = Field(..., min_length=1)
+    content: Optional[str] = Field(None, description="Transcript text")
+    audio_url: Optional[str] = Field(None, description="http(s) URL of a recording AssemblyAI can fetch")
+    summarize: bool = True
+    notify: bool = False
+
+    @model_validator(mode="after")
+    def check_source(self):
+        if bool(self.content) == bool(self.audio_url):
+            raise ValueError("Provide exactly one of content or audio_url")
+        return self
+
+class BulkIngestRequest(BaseModel):
+    """Model for pushing many meetings in one call"""
+    meetings: List[BulkMeeting] = Field(..., min_length=1, max_length=500)
+
+class JobAccepted(BaseModel):
+    """Response for work queued in the background"""
+    job_id: str
+    kind: str
+    status: str
+    status_url: str
+
+class BulkAccepted(BaseModel):
+    """Response for a bulk ingest, one job per meeting in request order"""
+    jobs: List[JobAccepted]
+
+class TranscriptCreated(BaseModel):
+    """Response for a saved text transcript"""
+    transcript_id: str
+    job: Optional[JobAccepted] = None
+
+class SpeakerCorrection(BaseModel):
+    """Model for renaming speakers of a stored transcript"""
+    names: Dict[str, str] = Field(..., min_length=1, description='Current speaker to correct name, e.g. {"Speaker A": "Sarah Chen"}')
+    summarize: bool = Field(False, description="Queue a new summary version with the corrected names")
+    notify: bool = Field(False, description="Post the new summary to Slack when it is ready")
+
+class SpeakersCorrected(BaseModel):
+    """Response for a speaker correction"""
+    transcript_id: str
+    speakers: List[str]
+    job: Optional[JobAccepted] = None
+
+class JobStatus(BaseModel):
+    """Model for a background job and its outcome"""
+    job_id: str
+    kind: str
+    status: str
+    metadata: Dict[str, Any] = {}
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    progress: Optional[Dict[str, Any]] = Field(None, description="Latest progress event of the job")
+
+class ActionItemUpdate(BaseModel):
+    """Model for changing the status of an indexed action item"""
+    status: Literal["open", "done", "blocked"]
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class AssemblyAIWebhook(BaseModel):
+    """Completion callback AssemblyAI POSTs to the webhook_url of a transcript"""
+    transcript_id: str
+    status: str
+
+class WebhookAccepted(BaseModel):
+    """Response to a webhook, naming the job that continues the pipeline"""
+    status: str
+    job_id: Optional[str] = None
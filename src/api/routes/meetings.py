@@ -0,0 +1,398 @@
+import asyncio
+import json
+import os
+import shutil
+import uuid
+from datetime import date
+from pathlib import Path
+from typing import Dict, Any, AsyncIterator, List, Optional
+from fastapi import (
+    APIRouter, HTTPException, Depends, File, Form, Request, Response, UploadFile, WebSocket,
+    WebSocketDisconnect, status
+)
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from ..models.meetings import (
+    TextTranscriptRequest, SummaryRequest, BulkIngestRequest,
+    JobAccepted, BulkAccepted, TranscriptCreated, JobStatus, ActionItemUpdate,
+    SpeakerCorrection, SpeakersCorrected
+)
+from ..services.auth import require_api_key
+from ...core import events, pipeline, speakers
+from ...core.jobs import Job, SUCCEEDED
+from ...core.services import ServiceContainer, get_services
+
+# Every route spends LLM/AssemblyAI quota, reads meetings or writes them
+router = APIRouter(dependencies=[Depends(require_api_key)])
+
+UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", "uploads"))
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".m4a", ".mp4", ".ogg", ".flac", ".webm"}
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+# Comment line sent on idle event streams so proxies keep the connection open
+SSE_KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", "15"))
+# How often progress of jobs run by queue workers is read from the jobs table
+JOB_EVENTS_POLL_SECONDS = float(os.getenv("JOB_EVENTS_POLL_SECONDS", "1"))
+
+
+def _accepted(job: Job, request: Request, response: Optional[Response] = None) -> JobAccepted:
+    status_url = str(request.url_for("get_job", job_id=job.id).path)
+    if response is not None:
+        response.headers["Location"] = status_url
+    return JobAccepted(job_id=job.id, kind=job.kind, status=job.status, status_url=status_url)
+
+
+def _job_status(job: Job) -> JobStatus:
+    return JobStatus(**job.to_dict(), progress=events.BUS.latest(job.id) or job.progress)
+
+
+def _copy_upload(upload: UploadFile, destination: Path) -> int:
+    """Copy the spooled upload to disk in chunks, never holding the whole file in memory"""
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    upload.file.seek(0)
+    with open(destination, "wb") as f:
+        shutil.copyfileobj(upload.file, f, UPLOAD_CHUNK_BYTES)
+    return destination.stat().st_size
+
+
+@router.post("/transcripts/audio", status_code=status.HTTP_202_ACCEPTED, response_model=JobAccepted)
+async def upload_audio(
+    request: Request,
+    response: Response,
+    file: UploadFile = File(..., description="Meeting recording"),
+    title: str = Form(..., min_length=1),
+    summarize: bool = Form(False),
+    notify: bool = Form(False),
+    services: ServiceContainer = Depends(get_services)
+) -> JobAccepted:
+    """Upload a recording and queue its transcription (and optionally summary)"""
+    suffix = Path(file.filename or "").suffix.lower()
+    if suffix not in AUDIO_EXTENSIONS:
+        raise HTTPException(status_code=415, detail=f"Unsupported audio format: {suffix or 'unknown'}")
+
+    # The multipart parser streams the body into a spooled temp file; move it
+    # to the uploads directory off the event loop
+    audio_path = UPLOAD_DIR / f"{uuid.uuid4().hex}{suffix}"
+    try:
+        size = await run_in_threadpool(_copy_upload, file, audio_path)
+    finally:
+        await file.close()
+
+    job = await run_in_threadpool(
+        services.jobs.submit,
+        "transcribe",
+        pipeline.ingest_audio,
+        services, str(audio_path), title,
+        summarize=summarize, notify=notify, delete_audio=True,
+        metadata={"title": title, "audio_bytes": size}
+    )
+    return _accepted(job, request, response)
+
+
+@router.post("/transcripts/text", status_code=status.HTTP_201_CREATED, response_model=TranscriptCreated)
+async def create_text_transcript(
+    body: TextTranscriptRequest,
+    request: Request,
+    services: ServiceContainer = Depends(get_services)
+) -> TranscriptCreated:
+    """Save a text transcript, optionally queueing its summary"""
+    try:
+        saved = await run_in_threadpool(pipeline.ingest_text, services, body.title, body.content)
+    except RuntimeError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+
+    job = None
+    if body.summarize:
+        job = await run_in_threadpool(
+            services.jobs.submit,
+            "summarize",
+            pipeline.summarize_transcript,
+            services, saved["id"], notify=body.notify,
+            metadata={"transcript_id": saved["id"]}
+        )
+    return TranscriptCreated(transcript_id=saved["id"], job=_accepted(job, request) if job else None)
+
+
+@router.get("/transcripts/{transcript_id}")
+async def get_transcript(
+    transcript_id: str,
+    services: ServiceContainer = Depends(get_services)
+) -> Dict[str, Any]:
+    """Fetch a transcript by id"""
+    transcript = await run_in_threadpool(services.db.get_transcript_by_id, transcript_id)
+    if not transcript:
+        raise HTTPException(status_code=404, detail="Transcript not found")
+    return transcript
+
+
+@router.post("/transcripts/{transcript_id}/speakers", response_model=SpeakersCorrected)
+async def correct_speakers(
+    transcript_id: str,
+    body: SpeakerCorrection,
+    request: Request,
+    services: ServiceContainer = Depends(get_services)
+) -> SpeakersCorrected:
+    """Rename speakers of a transcript; future meetings recognize them by how they speak"""
+    transcript = await run_in_threadpool(services.db.get_transcript_by_id, transcript_id)
+    if not transcript:
+        raise HTTPException(status_code=404, detail="Transcript not found")
+
+    current = {segment["speaker"] for segment in speakers.parse_turns(transcript["content"])}
+    unknown = sorted(set(body.names) - current)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Speakers not in transcript: {', '.join(unknown)}")
+
+    content = await run_in_threadpool(services.speakers.correct, transcript["content"], body.names)
+    if not await run_in_threadpool(services.db.update_transcript_content, transcript_id, content):
+        raise HTTPException(status_code=502, detail="Failed to update transcript")
+
+    job = None
+    if body.summarize:
+        job = await run_in_threadpool(
+            services.jobs.submit,
+            "summarize",
+            pipeline.summarize_transcript,
+            services, transcript_id, notify=body.notify,
+            metadata={"transcript_id": transcript_id}
+        )
+    return SpeakersCorrected(
+        transcript_id=transcript_id,
+        speakers=sorted({segment["speaker"] for segment in speakers.parse_turns(content)}),
+        job=_accepted(job, request) if job else None
+    )
+
+
+@router.post("/summaries", status_code=status.HTTP_202_ACCEPTED, response_model=JobAccepted)
+async def enqueue_summary(
+    body: SummaryRequest,
+    request: Request,
+    response: Response,
+    services: ServiceContainer = Depends(get_services)
+) -> JobAccepted:
+    """Queue summarization of a stored transcript"""
+    job = await run_in_threadpool(
+        services.jobs.submit,
+        "summarize",
+        pipeline.summarize_transcript,
+        services, body.transcript_id, notify=body.notify,
+        metadata={"transcript_id": body.transcript_id}
+    )
+    return _accepted(job, request, response)
+
+
+@router.get("/summaries/{transcript_id}")
+async def get_summary(
+    transcript_id: str,
+    services: ServiceContainer = Depends(get_services)
+) -> Dict[str, Any]:
+    """Fetch the summary of a transcript"""
+    summary = await run_in_threadpool(services.db.get_summary_by_transcript_id, transcript_id)
+    if not summary:
+        raise HTTPException(status_code=404, detail="Summary not found")
+    return summary
+
+
+@router.get("/action-items")
+async def list_action_items(
+    assignee: Optional[str] = None,
+    status: Optional[str] = None,
+    overdue: bool = False,
+    due_before: Optional[date] = None,
+    transcript_id: Optional[str] = None,
+    limit: int = 100,
+    services: ServiceContainer = Depends(get_services)
+) -> List[Dict[str, Any]]:
+    """List indexed action items, soonest due first; overdue means open and due before today"""
+    if overdue:
+        status, due_before = status or "open", min(due_before or date.today(), date.today())
+    return await run_in_threadpool(
+        services.db.get_action_items,
+        assignee=assignee,
+        status=status,
+        due_before=due_before.isoformat() if due_before else None,
+        transcript_id=transcript_id,
+        limit=limit
+    )
+
+
+@router.patch("/action-items/{item_id}")
+async def update_action_item(
+    item_id: str,
+    body: ActionItemUpdate,
+    services: ServiceContainer = Depends(get_services)
+) -> Dict[str, Any]:
+    """Mark an action item open, done or blocked"""
+    item = await run_in_threadpool(services.db.update_action_item_status, item_id, body.status)
+    if not item:
+        raise HTTPException(status_code=404, detail="Action item not found")
+    return item
+
+
+@router.post("/meetings/bulk", status_code=status.HTTP_202_ACCEPTED, response_model=BulkAccepted)
+async def bulk_ingest(
+    body: BulkIngestRequest,
+    request: Request,
+    services: ServiceContainer = Depends(get_services)
+) -> BulkAccepted:
+    """Queue many meetings (text or recording URLs) in one call, one job each"""
+    jobs = []
+    for meeting in body.meetings:
+        if meeting.audio_url:
+            job = await run_in_threadpool(
+                services.jobs.submit,
+                "transcribe",
+                pipeline.ingest_audio,
+                services, meeting.audio_url, meeting.title,
+                summarize=meeting.summarize, notify=meeting.notify,
+                metadata={"title": meeting.title}
+            )
+        else:
+            job = await run_in_threadpool(
+                services.jobs.submit,
+                "ingest_text",
+                pipeline.process_text,
+                services, meeting.title, meeting.content,
+                summarize=meeting.summarize, notify=meeting.notify,
+                metadata={"title": meeting.title}
+            )
+        jobs.append(_accepted(job, request))
+    return BulkAccepted(jobs=jobs)
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(
+    job_id: str,
+    services: ServiceContainer = Depends(get_services)
+) -> JobStatus:
+    """Fetch the status and result of a background job"""
+    return _job_status(await _job_or_404(services, job_id))
+
+
+@router.get("/jobs", response_model=List[JobStatus])
+async def list_jobs(
+    kind: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = 100,
+    services: ServiceContainer = Depends(get_services)
+) -> List[JobStatus]:
+    """List recent background jobs, newest first"""
+    jobs = await run_in_threadpool(services.jobs.list, kind=kind, status=status, limit=limit)
+    return [_job_status(job) for job in jobs]
+
+
+async def _job_or_404(services: ServiceContainer, job_id: str) -> Job:
+    job = await run_in_threadpool(services.jobs.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+def _outcome_event(job: Job) -> Dict[str, Any]:
+    """A final event reporting how a job ended, for when its own events are gone."""
+    return {"topic": job.id, "seq": 0, "stage": "job", "progress": 1.0 if job.status == SUCCEEDED else None,
+            "stage_progress": None, "message": f"{job.kind} {job.status}", "data": {"status": job.status},
+            "final": True, "ts": None}
+
+
+async def _job_events(job: Job, services: ServiceContainer) -> AsyncIterator[Optional[Dict[str, Any]]]:
+    """
+    Progress events of a job until its final one; None when nothing
+    happened for SSE_KEEPALIVE_SECONDS.
+    """
+    if services.jobs.shared:
+        async for event in _queued_job_events(job, services):
+            yield event
+        return
+
+    if job.done and events.BUS.latest(job.id) is None:
+        # Finished so long ago its events were dropped; report the outcome
+        yield _outcome_event(job)
+        return
+
+    stream = events.BUS.stream(job.id)
+    pending = None
+    try:
+        while True:
+            pending = pending or asyncio.ensure_future(stream.__anext__())
+            done, _ = await asyncio.wait({pending}, timeout=SSE_KEEPALIVE_SECONDS)
+            if not done:
+                yield None
+                continue
+            try:
+                event = pending.result()
+            except StopAsyncIteration:
+                return
+            pending = None
+            yield event
+    finally:
+        if pending is not None:
+            pending.cancel()
+        await stream.aclose()
+
+
+async def _queued_job_events(job: Job, services: ServiceContainer) -> AsyncIterator[Optional[Dict[str, Any]]]:
+    """
+    Progress of a job run by a queue worker, possibly on another node, as
+    recorded in the jobs table: the latest event each time it changes.
+    """
+    last_ts, idle = None, 0.0
+    while True:
+        event = job.progress
+        if event and event.get("ts") != last_ts:
+            last_ts, idle = event.get("ts"), 0.0
+            yield event
+            if event.get("final"):
+                return
+        if job.done:
+            if not (event and event.get("final")):
+                yield _outcome_event(job)
+            return
+        if idle >= SSE_KEEPALIVE_SECONDS:
+            idle = 0.0
+            yield None
+        await asyncio.sleep(JOB_EVENTS_POLL_SECONDS)
+        idle += JOB_EVENTS_POLL_SECONDS
+        job = await run_in_threadpool(services.jobs.get, job.id) or job
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    services: ServiceContainer = Depends(get_services)
+) -> StreamingResponse:
+    """Stream a job's progress as server-sent events, ending after the final event"""
+    job = await _job_or_404(services, job_id)
+
+    async def body() -> AsyncIterator[str]:
+        async for event in _job_events(job, services):
+            if event is None:
+                yield ": keepalive\n\n"
+            else:
+                yield f"id: {event['seq']}\nevent: progress\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/jobs/{job_id}/ws")
+async def job_events_websocket(
+    websocket: WebSocket,
+    job_id: str,
+    services: ServiceContainer = Depends(get_services)
+) -> None:
+    """Send a job's progress events as JSON messages, closing after the final event"""
+    job = await run_in_threadpool(services.jobs.get, job_id)
+    if job is None:
+        await websocket.close(code=4404, reason="Job not found")
+        return
+
+    await websocket.accept()
+    try:
+        async for event in _job_events(job, services):
+            if event is not None:
+                await websocket.send_json(event)
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
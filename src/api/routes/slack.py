@@ -1,19 +1,25 @@
 from fastapi import APIRouter, HTTPException, Header, Request, Depends
+from starlette.concurrency import run_in_threadpool
 from ..models.slack import SlackChallenge, SlackResponse
 from ..integrations.slack.notifier import SlackNotifier
-from ..services.query import QueryService, get_query_service
-from typing import Dict, Any
+from ..services.query import QueryService, get_query_service, get_slack_notifier
+from ...core import events, metrics
+from ...core.jobs import QUEUED, RUNNING, WAITING
+from ...core.services import ServiceContainer, get_services
+from typing import Dict, Any, Optional, Tuple
 import hmac
 import hashlib
 import os
-from datetime import datetime
+import re
+from datetime import date, datetime
 import json
 
 router = APIRouter()
 SLACK_SIGNING_SECRET = os.getenv("SLACK_SIGNING_SECRET")
 
-# Initialize the notifier
-slack_notifier = SlackNotifier()
+
+class UnresolvedUser(Exception):
+    """A Slack user an action items query refers to has no name to filter by; the message is the reply."""
 
 @router.get("/test")
 async def test_endpoint():
@@ -30,7 +36,9 @@ async def health_check():
 @router.post("/")  # Note: This is the main events endpoint
 async def slack_events(
     request: Request,
-    query_service: QueryService = Depends(get_query_service)
+    query_service: QueryService = Depends(get_query_service),
+    slack_notifier: SlackNotifier = Depends(get_slack_notifier),
+    services: ServiceContainer = Depends(get_services)
 ) -> Dict[str, Any]:
     """Handle Slack events"""
     print("\n=== New Request Received ===")
@@ -92,14 +100,98 @@ async def slack_events(
                 else:
                     print("Successfully sent response to Slack")
 
+            elif "overdue" in text or "actions" in text:
+                print("Processing action items command")
+                try:
+                    # users.info and the query block; keep them off the event loop
+                    assignee, overdue = await run_in_threadpool(
+                        resolve_action_query, body_json["event"], slack_notifier
+                    )
+                except UnresolvedUser as e:
+                    # Never fall back to everyone's action items
+                    print(f"Action items query not answered: {e}")
+                    result = await run_in_threadpool(slack_notifier.deliver, {"channel": channel, "text": str(e)})
+                    success = result["ok"]
+                else:
+                    items = await run_in_threadpool(
+                        services.db.get_action_items,
+                        assignee=assignee,
+                        status="open",
+                        due_before=date.today().isoformat() if overdue else None,
+                        limit=50
+                    )
+                    print(f"Found {len(items)} action items for {assignee or 'everyone'}")
+
+                    success = await run_in_threadpool(
+                        slack_notifier.send_action_items,
+                        items=items,
+                        title=f"{'Overdue' if overdue else 'Open'} action items"
+                              + (f" for {assignee}" if assignee else ""),
+                        channel=channel
+                    )
+
+                if not success:
+                    print("Failed to send response to Slack")
+                else:
+                    print("Successfully sent response to Slack")
+
+            elif "status" in text:
+                print("Processing 'status' command")
+                jobs = [
+                    {**job.to_dict(), "progress": events.BUS.latest(job.id) or job.progress}
+                    for job in services.jobs.list()
+                    if job.status in (QUEUED, RUNNING, WAITING)
+                ]
+                print(f"Found {len(jobs)} active jobs")
+
+                success = slack_notifier.send_job_status(
+                    jobs=jobs,
+                    channel=channel
+                )
+
+                if not success:
+                    print("Failed to send response to Slack")
+                else:
+                    print("Successfully sent response to Slack")
+
         # Always return a 200 OK to Slack
         return {"status": "ok"}
 
     except Exception as e:
+        metrics.ERRORS.inc(component="slack_events")
         print(f"Error processing request: {str(e)}")
         print(f"Error details: {type(e).__name__}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def resolve_action_query(event: Dict[str, Any], slack_notifier: SlackNotifier) -> Tuple[Optional[str], bool]:
+    """
+    Assignee and overdue flag of an action items mention: "my actions",
+    "actions for Speaker B", "overdue for @alice" or just "overdue".
+
+    Raises UnresolvedUser when the asker or a mentioned user can't be
+    looked up, rather than answering with everyone's action items.
+    """
+    raw_text = event.get("text", "")
+    overdue = "overdue" in raw_text.lower()
+    if re.search(r"\bmy\b", raw_text, re.I):
+        name = slack_notifier.get_user_name(event["user"]) if event.get("user") else None
+        if not name:
+            raise UnresolvedUser("Sorry, I couldn't resolve your Slack user, so I can't tell which action items "
+                                 "are yours. Try \"actions for <name>\".")
+        return name, overdue
+
+    match = re.search(r"\bfor\s+(.+)$", raw_text, re.I)
+    if not match:
+        return None, overdue
+    name = match.group(1).strip().rstrip("?.!")
+    mention = re.fullmatch(r"<@(\w+)(?:\|[^>]*)?>", name)
+    if mention:
+        name = slack_notifier.get_user_name(mention.group(1))
+        if not name:
+            raise UnresolvedUser(f"Sorry, I couldn't resolve the Slack user <@{mention.group(1)}>. "
+                                 "Try \"actions for <name>\".")
+    return name or None, overdue
+
 def format_summaries_response(summaries: list, channel: str) -> SlackResponse:
     """Format summaries list for Slack response"""
     if not summaries:
@@ -0,0 +1,53 @@
+import hmac
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Header
+from starlette.concurrency import run_in_threadpool
+from ..models.webhooks import AssemblyAIWebhook, WebhookAccepted
+from ...core import pipeline
+from ...core.audio_transcriber import WEBHOOK_AUTH_HEADER
+from ...core.services import ServiceContainer, get_services
+
+router = APIRouter()
+
+
+def _verify_secret(secret: Optional[str]) -> None:
+    expected = pipeline.webhook_secret()
+    if not expected:
+        # Webhooks are only registered with a secret; an unsigned delivery isn't ours
+        raise HTTPException(status_code=403, detail="Webhooks are not enabled")
+    if not hmac.compare_digest(secret or "", expected):
+        raise HTTPException(status_code=401, detail="Invalid webhook secret")
+
+
+@router.post("/assemblyai", response_model=WebhookAccepted)
+async def assemblyai_completed(
+    body: AssemblyAIWebhook,
+    title: str,
+    summarize: bool = False,
+    notify: bool = False,
+    job_id: Optional[str] = None,
+    secret: Optional[str] = Header(None, alias=WEBHOOK_AUTH_HEADER),
+    services: ServiceContainer = Depends(get_services)
+) -> WebhookAccepted:
+    """
+    Continue a meeting submitted with a webhook once AssemblyAI has finished it.
+
+    Responds straight away; fetching, formatting, saving, summarizing and
+    notifying run as the rest of the original job.
+    """
+    _verify_secret(secret)
+    print(f"AssemblyAI webhook: {body.transcript_id} {body.status}")
+
+    job = await run_in_threadpool(
+        services.jobs.resume,
+        job_id,
+        "transcribe",
+        pipeline.complete_transcription,
+        services, body.transcript_id, title,
+        summarize=summarize, notify=notify,
+        metadata={"title": title, "assemblyai_transcript_id": body.transcript_id}
+    )
+    if job is None:
+        # AssemblyAI retries deliveries it thinks failed; the job already continued
+        return WebhookAccepted(status="duplicate", job_id=job_id)
+    return WebhookAccepted(status="accepted", job_id=job.id)
@@ -0,0 +1,30 @@
+import hmac
+import os
+from typing import Optional
+from fastapi import HTTPException, Header, Query, WebSocketException, status
+from starlette.requests import HTTPConnection
+
+API_KEY_HEADER = "X-API-Key"
+
+def require_api_key(
+    connection: HTTPConnection,
+    header_key: Optional[str] = Header(None, alias=API_KEY_HEADER),
+    query_key: Optional[str] = Query(None, alias="api_key")
+) -> None:
+    """
+    Dependency guarding the meetings API with the MEETGIST_API_KEY shared key.
+
+    Clients send it in the X-API-Key header; EventSource and WebSocket
+    clients, which can't set headers, may pass ?api_key= instead. Every
+    request is refused while no key is configured.
+    """
+    expected = os.getenv("MEETGIST_API_KEY")
+    websocket = connection.scope["type"] == "websocket"
+    if not expected:
+        if websocket:
+            raise WebSocketException(code=status.WS_1011_INTERNAL_ERROR, reason="API key not configured")
+        raise HTTPException(status_code=500, detail="API key not configured")
+    if not hmac.compare_digest(header_key or query_key or "", expected):
+        if websocket:
+            raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid API key")
+        raise HTTPException(status_code=401, detail="Invalid API key", headers={"WWW-Authenticate": API_KEY_HEADER})
@@ -1,16 +1,19 @@
 from typing import List, Dict, Any
 from ...core.db import DatabaseManager
+from ...core.services import get_services
 from fastapi import Depends
 
 class QueryService:
-    def __init__(self):
-        self.db = DatabaseManager()
+    def __init__(self, db: DatabaseManager = None):
+        # Shares the process-wide Supabase client instead of creating one per request
+        self.db = db or get_services().db
 
     async def get_all_summaries(self) -> List[Dict[str, Any]]:
         """Get all summaries with basic metadata"""
         try:
             response = self.db.supabase.table('summaries')\
                 .select("id, created_at, transcripts(meeting_title)")\
+                .eq('is_latest', True)\
                 .execute()
             return response.data
         except Exception as e:
@@ -30,4 +33,8 @@ class QueryService:
 
 def get_query_service() -> QueryService:
     """Dependency injection for QueryService"""
-    return QueryService()
\ No newline at end of file
+    return QueryService()
+
+def get_slack_notifier():
+    """Dependency injection for the shared SlackNotifier"""
+    return get_services().slack_notifier
\ No newline at end of file
@@ -0,0 +1,228 @@
+"""
+Structured index of summary action items.
+
+The summarizer stores action items as free-text bullets such as "Speaker B
+to confirm vendor pricing by Friday". parse_action_item() pulls out who it
+is assigned to, when it is due and whether it is already done, so they can
+be stored in the indexed action_items table (see supabase/migrations) and
+"what's overdue for Speaker B" is a query rather than an LLM call over
+every summary.
+
+Parsing is rule based and deliberately conservative: an item whose owner
+or deadline isn't recognized is still indexed, with None for that field.
+Relative deadlines ("Friday", "end of month", "in 2 weeks") are resolved
+against the date the summary was saved.
+"""
+import calendar
+import re
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+from .chunking import content_hash
+
+OPEN = "open"
+DONE = "done"
+BLOCKED = "blocked"
+STATUSES = (OPEN, DONE, BLOCKED)
+
+MONTHS = {name.lower(): i for i, name in enumerate(calendar.month_name) if name}
+MONTHS.update({name.lower(): i for i, name in enumerate(calendar.month_abbr) if name})
+MONTHS["sept"] = 9
+WEEKDAYS = {name.lower(): i for i, name in enumerate(calendar.day_name)}
+WEEKDAYS.update({name.lower(): i for i, name in enumerate(calendar.day_abbr)})
+
+# Capitalized subjects that are not a person
+NOT_ASSIGNEES = {
+    "the", "we", "i", "you", "they", "team", "the team", "everyone", "everybody", "all", "someone",
+    "each", "both", "none", "follow", "next", "action", "todo", "to do", "tbd",
+    # Checklist status words ("Done: update roadmap")
+    "done", "completed", "complete", "finished", "resolved", "blocked", "on hold", "open", "pending",
+    "in progress", "wip", "closed", "cancelled", "canceled", "update", "note"
+}
+
+_NAME = r"@?[A-Z][\w.'-]*(?:\s+(?:[A-Z][\w.'-]*|(?!and\b|or\b)[a-z]{1,3}\s+[A-Z][\w.'-]*)){0,2}"
+_MONTH = r"(?:" + "|".join(sorted(MONTHS, key=len, reverse=True)) + r")\.?"
+_WEEKDAY = r"(?:" + "|".join(sorted(WEEKDAYS, key=len, reverse=True)) + r")"
+
+_ASSIGNEE_PATTERNS = [
+    # "Owner: Alice", "assigned to Speaker B", "responsible: Bob"
+    re.compile(rf"\b(?:owner|assignee|responsible|assigned to|owned by)\s*[:\-]?\s*(?P<name>{_NAME})", re.I),
+    # "Speaker A to circulate ...", "Alice will send ..."
+    re.compile(rf"^(?P<name>{_NAME})\s+(?:to|will|should|must|shall|needs to|is to|has to|agreed to|owns)\b"),
+    # "Alice: send the report", "Speaker B - confirm pricing"
+    re.compile(rf"^(?P<name>{_NAME})\s*(?::|\s[-–—])\s+"),
+    # "Send the report (Alice)"
+    re.compile(rf"\((?P<name>{_NAME})\)"),
+    # "Send the report - Alice"
+    re.compile(rf"\s[-–—]\s+(?P<name>{_NAME})\s*\.?$"),
+    # "@alice please review"
+    re.compile(r"(?:^|\s)@(?P<name>[\w.-]+)"),
+]
+
+_DONE = re.compile(r"^\s*(?:\[x\]|✅|✔)|\b(?:done|completed|finished|resolved)\s*[.)]?\s*$|^\s*(?:done|completed)\s*:", re.I)
+_BLOCKED = re.compile(r"\bblocked\b|\bon hold\b", re.I)
+_CHECKBOX = re.compile(r"^\s*(?:\[[ xX]\]|✅|✔)\s*")
+# "Done: ", "Blocked - ", "TODO: " ahead of the item itself
+_STATUS_PREFIX = re.compile(
+    r"^\s*(?:done|completed?|finished|resolved|blocked|on hold|open|pending|in progress|wip|closed"
+    r"|cancell?ed|to[\s-]?do)\s*(?::|[-–—]\s)\s*",
+    re.I
+)
+
+
+def normalize_assignee(name: Optional[str]) -> Optional[str]:
+    """Canonical spelling of an assignee: "speaker b" and "@Speaker  B" become "Speaker B"."""
+    if not name:
+        return None
+    name = " ".join(name.strip().lstrip("@").strip(" .,:;()").split())
+    if not name or name.lower() in NOT_ASSIGNEES or MONTHS.get(name.lower().rstrip(".")) \
+            or name.lower() in WEEKDAYS:
+        return None
+    # Lowercased names get title case; single-letter speaker labels are upper case
+    if name.islower():
+        name = name.title()
+    return " ".join(w.upper() if len(w) == 1 else w for w in name.split())
+
+
+def assignee_key(name: Optional[str]) -> Optional[str]:
+    """Case-insensitive lookup key of an assignee, the indexed column."""
+    name = normalize_assignee(name)
+    return name.lower() if name else None
+
+
+def parse_assignee(text: str) -> Optional[str]:
+    text = _STATUS_PREFIX.sub("", _CHECKBOX.sub("", text)).strip()
+    for pattern in _ASSIGNEE_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            name = normalize_assignee(match.group("name"))
+            if name:
+                return name
+    return None
+
+
+def parse_due_date(text: str, reference: date) -> Optional[date]:
+    """The deadline mentioned in text, resolved against reference, or None."""
+    lower = text.lower()
+
+    match = re.search(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b", lower)
+    if match:
+        return _date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+
+    match = re.search(rf"\b(?:end of|eo)\s*(?:the\s+)?({_MONTH})\b", lower)
+    if match:
+        month = MONTHS[match.group(1).rstrip(".")]
+        year = reference.year + (1 if month < reference.month else 0)
+        return date(year, month, calendar.monthrange(year, month)[1])
+
+    match = (re.search(rf"\b({_MONTH})\s+(\d{{1,2}})(?:st|nd|rd|th)?\b(?:,?\s+(\d{{4}}))?", lower)
+             or re.search(rf"\b(\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?({_MONTH})\b(?:,?\s+(\d{{4}}))?", lower))
+    if match:
+        first, second, year = match.groups()
+        month, day = (first, second) if not first.isdigit() else (second, first)
+        return _in_year(MONTHS[month.rstrip(".")], int(day), year, reference)
+
+    match = re.search(r"\b(\d{1,2})/(\d{1,2})(?:/(\d{2,4}))?\b", lower)
+    if match:
+        month, day, year = match.groups()
+        if year and len(year) == 2:
+            year = f"20{year}"
+        return _in_year(int(month), int(day), year, reference)
+
+    if re.search(r"\b(?:today|eod|end of (?:the )?day|tonight|asap)\b", lower):
+        return reference
+    if re.search(r"\btomorrow\b", lower):
+        return reference + timedelta(days=1)
+
+    match = re.search(r"\bin\s+(\d+|a|one|two|three|four)\s+(day|week|month)s?\b", lower)
+    if match:
+        count = {"a": 1, "one": 1, "two": 2, "three": 3, "four": 4}.get(match.group(1)) or int(match.group(1))
+        days = {"day": 1, "week": 7, "month": 30}[match.group(2)] * count
+        return reference + timedelta(days=days)
+
+    if re.search(r"\b(?:end of (?:the )?week|eow)\b", lower):
+        return _next_weekday(reference, 4, allow_same_day=True)
+    if re.search(r"\bnext week\b", lower):
+        return _next_weekday(reference, 0) + timedelta(days=4)
+    if re.search(r"\b(?:end of (?:the )?month|eom)\b", lower):
+        return date(reference.year, reference.month, calendar.monthrange(reference.year, reference.month)[1])
+    if re.search(r"\b(?:end of (?:the )?quarter|eoq)\b", lower):
+        month = ((reference.month - 1) // 3 + 1) * 3
+        return date(reference.year, month, calendar.monthrange(reference.year, month)[1])
+
+    match = re.search(rf"\b(next\s+)?({_WEEKDAY})\b", lower)
+    if match:
+        due = _next_weekday(reference, WEEKDAYS[match.group(2)])
+        # "next Friday" said on a Monday means the Friday after this one
+        if match.group(1) and due.isocalendar()[:2] == reference.isocalendar()[:2]:
+            due += timedelta(days=7)
+        return due
+
+    return None
+
+
+def parse_status(text: str) -> str:
+    if _DONE.search(text):
+        return DONE
+    if _BLOCKED.search(text):
+        return BLOCKED
+    return OPEN
+
+
+def parse_action_item(text: str, reference: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Structured fields of one action item bullet.
+
+    Returns:
+        Dict with text, text_key (identifies the item across summary
+        versions), assignee, assignee_key, due_date (ISO date or None) and
+        status (open, done or blocked)
+    """
+    reference = reference or date.today()
+    text = " ".join(str(text).split())
+    assignee = parse_assignee(text)
+    due = parse_due_date(text, reference)
+    return {
+        "text": text,
+        "text_key": content_hash(text.lower(), "action_item"),
+        "assignee": assignee,
+        "assignee_key": assignee.lower() if assignee else None,
+        "due_date": due.isoformat() if due else None,
+        "status": parse_status(text)
+    }
+
+
+def index_action_items(items: Any, reference: Optional[date] = None) -> List[Dict[str, Any]]:
+    """Parse a summary's action_items array, in order, skipping empty and placeholder entries."""
+    if not isinstance(items, list):
+        items = [items] if items else []
+    parsed = []
+    for item in items:
+        text = str(item).strip()
+        if text and text.lower() not in ("none", "n/a"):
+            parsed.append(parse_action_item(text, reference))
+    return parsed
+
+
+def _date(year: int, month: int, day: int) -> Optional[date]:
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _in_year(month: int, day: int, year: Optional[str], reference: date) -> Optional[date]:
+    """A month and day in the given year, or else the next one on or after reference."""
+    if year:
+        return _date(int(year), month, day)
+    due = _date(reference.year, month, day)
+    if due is not None and due < reference - timedelta(days=7):
+        # A date more than a week past is a deadline next year
+        due = _date(reference.year + 1, month, day)
+    return due
+
+
+def _next_weekday(reference: date, weekday: int, allow_same_day: bool = False) -> date:
+    days = (weekday - reference.weekday()) % 7
+    if days == 0 and not allow_same_day:
+        days = 7
+    return reference + timedelta(days=days)
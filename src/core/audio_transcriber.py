@@ -1,17 +1,35 @@
+import copy
 import os
-import json
+import time
 from typing import Dict, Any, Optional
+from urllib.parse import urlparse
 import assemblyai as aai
 from .transcript_formatter import TranscriptFormatter
+from .storage import save_transcript_file
+from . import events, metrics, tracing
+from .resilience import dependency
+
+# Header AssemblyAI echoes back on webhook calls so the API can verify them
+WEBHOOK_AUTH_HEADER = "X-MeetGist-Webhook-Secret"
+
+# Share of the transcribe stage reported per AssemblyAI status; AssemblyAI
+# gives no percentage, so processing sits here until it completes
+POLL_PROGRESS = {"queued": 0.2, "processing": 0.4}
 
 class AudioTranscriber:
-    def __init__(self, assemblyai_key: str):
+    def __init__(self, assemblyai_key: str, speakers=None):
         if not assemblyai_key:
             raise ValueError("AssemblyAI API key is missing!")
 
         # Configure AssemblyAI
         aai.settings.api_key = assemblyai_key
 
+        # Bulkhead and circuit breaker shared by every AssemblyAI caller;
+        # AssemblyAI also limits concurrent jobs per account (ASSEMBLYAI_MAX_CONCURRENCY)
+        self.resilience = dependency("assemblyai")
+        # Per HTTP request; waiting for a transcript is many short polls
+        aai.settings.http_timeout = self.resilience.timeout
+
         # Configure transcription settings
         self.config = aai.TranscriptionConfig(
             speech_model=aai.SpeechModel.best,
@@ -21,6 +39,97 @@ class AudioTranscriber:
 
         self.transcriber = aai.Transcriber(config=self.config)
         self.formatter = TranscriptFormatter()
+        # SpeakerDirectory naming diarized speakers at format time (None keeps the letters)
+        self.speakers = speakers
+
+    def _transcribe_audio(self, audio_path: str) -> aai.Transcript:
+        """Upload, submit and poll as separate steps so each gets its own span"""
+        with tracing.span("assemblyai.transcribe") as span:
+            if is_url(audio_path):
+                # AssemblyAI fetches remote recordings itself
+                audio_url = audio_path
+            else:
+                span.set_attribute("audio_bytes", os.path.getsize(audio_path))
+                events.publish("transcribe", 0.0, "Uploading audio")
+                with tracing.span("assemblyai.upload"):
+                    audio_url = self.transcriber.upload_file(audio_path)
+
+            with tracing.span("assemblyai.submit"):
+                transcript = self.transcriber.submit(audio_url)
+            span.set_attribute("transcript_id", transcript.id)
+
+            with tracing.span("assemblyai.poll", transcript_id=transcript.id):
+                transcript = self._wait_for_completion(transcript)
+
+            span.set_attribute("status", str(transcript.status))
+            return transcript
+
+    def _wait_for_completion(self, transcript: aai.Transcript) -> aai.Transcript:
+        """Poll like Transcript.wait_for_completion(), publishing each status change"""
+        status = None
+        while transcript.status not in (aai.TranscriptStatus.completed, aai.TranscriptStatus.error):
+            if transcript.status != status:
+                status = transcript.status
+                events.publish("transcribe", POLL_PROGRESS.get(status.value, 0.2), f"AssemblyAI: {status.value}",
+                               transcript_id=transcript.id)
+            time.sleep(aai.settings.polling_interval)
+            transcript = aai.Transcript.get_by_id(transcript.id)
+        events.publish("transcribe", 1.0, f"AssemblyAI: {transcript.status.value}", transcript_id=transcript.id)
+        return transcript
+
+    def submit(self, audio_path: str, webhook_url: str, auth_header_value: Optional[str] = None) -> str:
+        """
+        Upload (if local) and submit audio without waiting for the result.
+
+        AssemblyAI POSTs {"transcript_id", "status"} to webhook_url when the
+        transcript is done; fetch and format it then with fetch() and
+        format_result().
+
+        Args:
+            audio_path: Path to audio file, or an http(s) URL AssemblyAI can download
+            webhook_url: Callback URL for the completion notification
+            auth_header_value: Optional secret sent back in WEBHOOK_AUTH_HEADER
+
+        Returns:
+            AssemblyAI transcript id
+        """
+        if not is_url(audio_path) and not os.path.exists(audio_path):
+            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+        config = copy.deepcopy(self.config)
+        config.set_webhook(
+            webhook_url,
+            auth_header_name=WEBHOOK_AUTH_HEADER if auth_header_value else None,
+            auth_header_value=auth_header_value
+        )
+        try:
+            # The slot only covers upload and submit; nothing waits on the result
+            with self.resilience.call(), tracing.span("assemblyai.transcribe", webhook=True) as span:
+                if is_url(audio_path):
+                    audio_url = audio_path
+                else:
+                    span.set_attribute("audio_bytes", os.path.getsize(audio_path))
+                    events.publish("transcribe", 0.0, "Uploading audio")
+                    with tracing.span("assemblyai.upload"):
+                        audio_url = self.transcriber.upload_file(audio_path)
+
+                with tracing.span("assemblyai.submit"):
+                    transcript = self.transcriber.submit(audio_url, config=config)
+                span.set_attribute("transcript_id", transcript.id)
+            events.publish("transcribe", POLL_PROGRESS["queued"], "Submitted, waiting for AssemblyAI",
+                           transcript_id=transcript.id)
+
+            print(f"Submitted {audio_path} for transcription ({transcript.id})")
+            return transcript.id
+        except Exception as e:
+            metrics.ERRORS.inc(component="assemblyai")
+            print(f"\nError submitting transcription: {str(e)}")
+            raise
+
+    def fetch(self, transcript_id: str) -> aai.Transcript:
+        """Fetch a submitted transcript, e.g. after its completion webhook"""
+        with self.resilience.call(), tracing.span("assemblyai.fetch", transcript_id=transcript_id):
+            return aai.Transcript.get_by_id(transcript_id)
 
     def transcribe(
         self,
@@ -32,39 +141,72 @@ class AudioTranscriber:
         Transcribe audio file and return formatted result.
 
         Args:
-            audio_path: Path to audio file
+            audio_path: Path to audio file, or an http(s) URL AssemblyAI can download
             meeting_title: Title of the meeting
-            output_path: Optional path to save JSON output
+            output_path: Optional path to save the JSON backup (compressed
+                according to TRANSCRIPT_COMPRESSION, suffix added if missing)
 
         Returns:
             Dictionary containing formatted transcript and metadata
         """
         try:
-            if not os.path.exists(audio_path):
+            if not is_url(audio_path) and not os.path.exists(audio_path):
                 raise FileNotFoundError(f"Audio file not found: {audio_path}")
 
             print(f"Starting transcription of: {audio_path}")
-            transcript = self.transcriber.transcribe(audio_path)
-
-            if transcript.status == aai.TranscriptStatus.error:
-                raise Exception(f"Transcription failed: {transcript.error}")
-
-            # Convert AssemblyAI transcript to our format
-            raw_result = {
-                "segments": [
-                    {
-                        "text": u.text,
-                        "start": u.start / 1000,  # Convert to seconds
-                        "end": u.end / 1000,
-                        "speaker": f"Speaker {u.speaker}"
-                    }
-                    for u in transcript.utterances
-                ],
-                "text": transcript.text
-            }
-
-            # Format the transcript
-            # Get both structured (for file) and plain (for DB) versions
+            with self.resilience.call(), metrics.STAGE_SECONDS.time(stage="transcribe"):
+                transcript = self._transcribe_audio(audio_path)
+
+            return self.format_result(transcript, meeting_title, output_path)
+
+        except Exception as e:
+            metrics.ERRORS.inc(component="assemblyai")
+            print(f"\nError in transcription: {str(e)}")
+            raise
+
+    def format_result(
+        self,
+        transcript: aai.Transcript,
+        meeting_title: str,
+        output_path: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Format a completed AssemblyAI transcript and optionally save the backup.
+
+        Returns:
+            Dictionary containing formatted transcript and metadata
+        """
+        if transcript.status == aai.TranscriptStatus.error:
+            raise Exception(f"Transcription failed: {transcript.error}")
+        if transcript.status != aai.TranscriptStatus.completed:
+            raise Exception(f"Transcript {transcript.id} is not ready: {transcript.status}")
+
+        # Convert AssemblyAI transcript to our format
+        raw_result = {
+            "segments": [
+                {
+                    "text": u.text,
+                    "start": u.start / 1000,  # Convert to seconds
+                    "end": u.end / 1000,
+                    "speaker": f"Speaker {u.speaker}"
+                }
+                for u in transcript.utterances
+            ],
+            "text": transcript.text
+        }
+
+        # Format the transcript
+        # Get both structured (for file) and plain (for DB) versions
+        events.publish("format", 0.0, "Formatting transcript", segments=len(raw_result["segments"]))
+        with metrics.STAGE_SECONDS.time(stage="format"), tracing.span("transcript.format"):
+            if self.speakers is not None:
+                try:
+                    raw_result["segments"] = self.speakers.apply(raw_result["segments"])
+                except Exception as e:
+                    # Names are a nicety; the letters still make a usable transcript
+                    metrics.ERRORS.inc(component="speakers")
+                    print(f"Speaker name resolution failed: {e}")
+
             formatted_structured = self.formatter.format_transcript(
                 content=raw_result,
                 source_type='audio',
@@ -78,20 +220,20 @@ class AudioTranscriber:
                 structured=False
             )
 
-            # Save to file if output path provided
-            if output_path:
-                os.makedirs(os.path.dirname(output_path), exist_ok=True)
-                with open(output_path, "w", encoding="utf-8") as f:
-                    json.dump(formatted_structured, f, indent=2, ensure_ascii=False)
-                print(f"\nTranscript saved to {output_path}")
+        # Save to file if output path provided
+        if output_path:
+            output_path = save_transcript_file(formatted_structured, output_path)
+            print(f"\nTranscript saved to {output_path}")
 
-            # Return both formats for database storage and further use
-            return {
-                "structured": formatted_structured,
-                "plain": formatted_plain,
-                "source_type": "audio"
-            }
+        events.publish("format", 1.0, "Transcript formatted")
+        # Return both formats for database storage and further use
+        return {
+            "structured": formatted_structured,
+            "plain": formatted_plain,
+            "source_type": "audio",
+            "output_path": output_path
+        }
 
-        except Exception as e:
-            print(f"\nError in transcription: {str(e)}")
-            raise
\ No newline at end of file
+
+def is_url(audio_path: str) -> bool:
+    return urlparse(audio_path).scheme in ("http", "https")
@@ -0,0 +1,85 @@
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional
+from . import metrics
+
+
+class ChunkCache:
+    """
+    Per-chunk map results keyed by chunk hash, on disk with the most
+    recently used max_entries also kept in memory.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_entries: Optional[int] = None):
+        self.cache_dir = Path(cache_dir or os.getenv("SUMMARY_CACHE_DIR", ".cache/summary_chunks"))
+        self.max_entries = int(max_entries if max_entries is not None
+                               else os.getenv("SUMMARY_CACHE_MEMORY_ENTRIES", "2048"))
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result for a chunk hash, or None."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                metrics.CACHE_LOOKUPS.inc(cache="summary_chunks", result="hit")
+                return self._memory[key]
+
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            with self._lock:
+                self.misses += 1
+            metrics.CACHE_LOOKUPS.inc(cache="summary_chunks", result="miss")
+            return None
+
+        with self._lock:
+            self._remember(key, value)
+            self.hits += 1
+        metrics.CACHE_LOOKUPS.inc(cache="summary_chunks", result="hit")
+        return value
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Store the result for a chunk hash."""
+        with self._lock:
+            self._remember(key, value)
+
+        path = self._path(key)
+        tmp_path = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # A temp file per writer, so concurrent writers of a key never share one
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=path.parent, prefix=f"{key}.",
+                                             suffix=".tmp", delete=False) as f:
+                tmp_path = f.name
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing chunk cache: {e}")
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+
+    def _remember(self, key: str, value: Dict[str, Any]) -> None:
+        """Keep value in memory, dropping the least recently used entries beyond max_entries."""
+        if self.max_entries <= 0:
+            return
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> Path:
+        # Fan out into subdirectories so large archives don't make one huge folder
+        return self.cache_dir / key[:2] / f"{key}.json"
@@ -0,0 +1,67 @@
+import hashlib
+from typing import List
+
+# A chunk boundary is placed after a turn whose hash is divisible by this
+# value (once the chunk is past min_chars). Boundaries depend only on the
+# turn text, so an edit only moves the boundaries next to it and every other
+# chunk keeps the same content and hash.
+BOUNDARY_DIVISOR = 8
+
+
+def split_turns(text: str) -> List[str]:
+    """Split formatted transcript text into speaker turns."""
+    if "\n\n" in text:
+        turns = text.split("\n\n")
+    else:
+        turns = text.split("\n")
+    return [turn.strip() for turn in turns if turn.strip()]
+
+
+def chunk_transcript(text: str, min_chars: int = 4000, max_chars: int = 12000) -> List[str]:
+    """
+    Split a transcript into content-defined chunks of whole speaker turns.
+
+    Args:
+        text: Formatted transcript text
+        min_chars: Never cut a chunk before it reaches this size
+        max_chars: Always cut before a chunk would exceed this size
+
+    Returns:
+        List of chunk texts, turns joined with blank lines
+    """
+    chunks = []
+    current = []
+    size = 0
+
+    for turn in split_turns(text):
+        if current and size + len(turn) > max_chars:
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+
+        current.append(turn)
+        size += len(turn) + 2
+
+        if size >= min_chars and _is_boundary(turn):
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+
+    if current:
+        chunks.append("\n\n".join(current))
+
+    return chunks
+
+
+def content_hash(text: str, *parts: str) -> str:
+    """Stable SHA-256 of a text plus any extra key parts (model id, prompt version)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _is_boundary(turn: str) -> bool:
+    """Decide whether a chunk may end after this turn, based on its content only."""
+    digest = hashlib.blake2b(turn.encode("utf-8"), digest_size=4).digest()
+    return int.from_bytes(digest, "big") % BOUNDARY_DIVISOR == 0
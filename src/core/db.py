@@ -1,91 +1,820 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, TYPE_CHECKING
+import json
 import os
+import threading
+from datetime import datetime, timezone
+from functools import wraps
 from dotenv import load_dotenv
-from supabase import create_client, Client
+from .action_items import assignee_key, index_action_items as parse_action_items
+from .chunking import content_hash
+from .storage import compress_content, decompress_content
+from . import metrics, tracing
+from .resilience import FAILURE_STATUSES, dependency
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 # Load environment variables
 load_dotenv()
 
+# PostgREST codes for a database it can't reach or that timed out the statement
+OUTAGE_CODES = {"PGRST000", "PGRST001", "PGRST002", "57014"}
+
+def _instrumented(func):
+    """
+    Time and trace a DatabaseManager query under the method's name, within
+    the Supabase bulkhead and circuit breaker. Raises DependencyUnavailable
+    instead of querying while the breaker is open.
+    """
+    timed = metrics.timed(metrics.DB_QUERY_SECONDS, operation=func.__name__)(func)
+
+    @wraps(func)
+    def limited(self, *args, **kwargs):
+        with self.resilience.call() as attempt:
+            self._calls.attempt = attempt
+            try:
+                return timed(self, *args, **kwargs)
+            finally:
+                self._calls.attempt = None
+    return tracing.traced(f"db.{func.__name__}")(limited)
+
+def _is_outage(error: Exception) -> bool:
+    """
+    Whether a query error means Supabase is down rather than the query (or
+    our handling of its result) being wrong.
+    """
+    # Only reached after a query, by which time supabase has loaded httpx
+    import httpx
+    if isinstance(error, httpx.TransportError):
+        # Connection errors and timeouts (httpx.TimeoutException is one)
+        return True
+    if not hasattr(error, "hint"):
+        # Not a PostgREST APIError: a bug of ours, e.g. a KeyError on the response
+        return False
+    code = getattr(error, "code", None)
+    return code in OUTAGE_CODES or str(code) in {str(status) for status in FAILURE_STATUSES}
+
+def transcript_hash(title: str, content: str, source_type: str) -> str:
+    """Idempotency key of a transcript: the same meeting saved twice maps to one row."""
+    return content_hash(content, "transcript", title, source_type)
+
+def summary_hash(summary_text: str, key_decisions: Any = None, action_items: Any = None) -> str:
+    """Identifies a summary version, so saving an unchanged summary adds no version."""
+    return content_hash(summary_text, "summary", json.dumps([key_decisions, action_items], sort_keys=True))
+
 class DatabaseManager:
-    def __init__(self):
-        self.supabase: Client = create_client(
-            os.getenv("SUPABASE_URL"),
-            os.getenv("SUPABASE_KEY")
-        )
+    def __init__(self, client: "Client" = None):
+        if client is None:
+            # supabase pulls in several HTTP/realtime packages, import it only when needed
+            from supabase import ClientOptions, create_client
+            client = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"),
+                                   options=ClientOptions(postgrest_client_timeout=dependency("supabase").timeout))
+        self.supabase: "Client" = client
+        # Caps concurrent queries from all threads and fails fast while Supabase is down
+        self.resilience = dependency("supabase")
+        self._calls = threading.local()
+
+    def _failed(self, error: Exception) -> None:
+        """Count a query error the method handled, and report an outage to the circuit breaker."""
+        metrics.ERRORS.inc(component="supabase")
+        attempt = getattr(self._calls, "attempt", None)
+        if attempt is not None and _is_outage(error):
+            attempt.fail(error)
 
+    @_instrumented
     def get_all_transcripts(self) -> List[Dict[str, Any]]:
         """Retrieve all transcripts from the database."""
         try:
             response = self.supabase.table('transcripts').select("*").execute()
-            return response.data
+            return [self._decompress_transcript(t) for t in response.data]
         except Exception as e:
+            self._failed(e)
             print(f"Error fetching transcripts: {e}")
             return []
 
+    @_instrumented
     def get_transcript_by_id(self, transcript_id: str) -> Dict[str, Any]:
         """Retrieve a specific transcript by ID."""
         try:
             response = self.supabase.table('transcripts').select("*").eq('id', transcript_id).single().execute()
-            return response.data
+            return self._decompress_transcript(response.data)
         except Exception as e:
+            self._failed(e)
             print(f"Error fetching transcript: {e}")
             return None
 
+    @_instrumented
+    def get_transcript_id_by_hash(self, content_hash: str) -> Optional[str]:
+        """ID of the transcript saved under an idempotency key (see transcript_hash), or None."""
+        try:
+            response = self.supabase.table('transcripts').select("id")\
+                .eq('content_hash', content_hash)\
+                .limit(1)\
+                .execute()
+            return response.data[0]["id"] if response.data else None
+        except Exception as e:
+            self._failed(e)
+            print(f"Error looking up transcript: {e}")
+            return None
+
+    @_instrumented
     def save_transcript(self, title: str, content: str, source_type: str) -> Dict[str, Any]:
-        """Save a new transcript to the database."""
+        """Save a transcript, returning the existing row if this meeting was saved before."""
         try:
-            response = self.supabase.table('transcripts').insert({
-                "meeting_title": title,
-                "content": content,
-                "source_type": source_type
-            }).execute()
-            return response.data[0]
+            response = self.supabase.table('transcripts').upsert(
+                self._transcript_row(title, content, source_type),
+                on_conflict="content_hash"
+            ).execute()
+            return self._decompress_transcript(response.data[0])
         except Exception as e:
+            self._failed(e)
             print(f"Error saving transcript: {e}")
             return None
 
-    def get_summary_by_transcript_id(self, transcript_id: str) -> Dict[str, Any]:
-        """Retrieve summary for a specific transcript."""
+    @_instrumented
+    def save_transcripts_bulk(self, transcripts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Save several transcripts (dicts with title, content, source_type) in one upsert."""
+        try:
+            rows = {}
+            for t in transcripts:
+                row = self._transcript_row(t["title"], t["content"], t["source_type"])
+                # One statement can't touch a row twice; duplicates in a batch collapse
+                rows[row["content_hash"]] = row
+            response = self.supabase.table('transcripts').upsert(
+                list(rows.values()),
+                on_conflict="content_hash"
+            ).execute()
+            return response.data
+        except Exception as e:
+            self._failed(e)
+            print(f"Error saving transcripts: {e}")
+            return None
+
+    @_instrumented
+    def update_transcript_content(self, transcript_id: str, content: str) -> Dict[str, Any]:
+        """Rewrite the content of a transcript, compressing it if enabled."""
+        try:
+            response = self.supabase.table('transcripts').update({
+                "content": compress_content(content)
+            }).eq('id', transcript_id).execute()
+            return self._decompress_transcript(response.data[0])
+        except Exception as e:
+            self._failed(e)
+            print(f"Error updating transcript: {e}")
+            return None
+
+    @_instrumented
+    def get_stored_transcript_contents(self, offset: int, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        A page of transcript ids and their content as stored, ordered by id.
+
+        The content is returned without decompressing it, for migrations that
+        re-encode the column. Returns None when the page could not be read, so
+        a failed page is not mistaken for the end of the table.
+        """
         try:
-            response = self.supabase.table('summaries').select("*").eq('transcript_id', transcript_id).single().execute()
+            response = self.supabase.table('transcripts')\
+                .select("id, content")\
+                .order('id')\
+                .range(offset, offset + limit - 1)\
+                .execute()
             return response.data
         except Exception as e:
+            self._failed(e)
+            print(f"Error fetching transcript contents: {e}")
+            return None
+
+    @_instrumented
+    def set_stored_transcript_content(self, transcript_id: str, stored: str) -> Dict[str, Any]:
+        """Write already encoded content (see storage.compress_content) to a transcript, as is."""
+        try:
+            response = self.supabase.table('transcripts').update({"content": stored}).eq('id', transcript_id).execute()
+            return response.data[0] if response.data else None
+        except Exception as e:
+            self._failed(e)
+            print(f"Error storing transcript content: {e}")
+            return None
+
+    @_instrumented
+    def save_meeting(self, title: str, content: str, source_type: str,
+                     summary: Optional[Dict[str, Any]] = None,
+                     notification_channel: Optional[str] = None,
+                     notification_delay: int = 0) -> Dict[str, Any]:
+        """
+        Save a transcript, its summary and a pending notification in one transaction.
+
+        Runs the save_meeting database function (supabase/migrations), so a
+        meeting costs one round trip and is either fully saved or not at all.
+        Repeating the call is harmless: the transcript is matched by content
+        hash, an unchanged summary adds no version and a sent notification
+        stays sent.
+
+        Args:
+            summary: Dict with summary_text, key_decisions and action_items
+            notification_channel: Slack channel to queue the summary for
+            notification_delay: Seconds before the notification is due
+
+        Returns:
+            Dict with "transcript", "summary" and "notification" rows (None when not saved)
+        """
+        try:
+            params = {
+                "p_title": title,
+                "p_content": compress_content(content),
+                "p_source_type": source_type,
+                "p_content_hash": transcript_hash(title, content, source_type),
+                "p_summary": self._summary_params(summary) if summary else None,
+                "p_notification_channel": notification_channel,
+                "p_notification_delay_seconds": notification_delay
+            }
+            saved = self.supabase.rpc("save_meeting", params).execute().data
+            saved["transcript"] = self._decompress_transcript(saved["transcript"])
+            return saved
+        except Exception as e:
+            self._failed(e)
+            print(f"Error saving meeting: {e}")
+            return None
+
+    def _transcript_row(self, title: str, content: str, source_type: str) -> Dict[str, Any]:
+        return {
+            "meeting_title": title,
+            "content": compress_content(content),
+            "source_type": source_type,
+            "content_hash": transcript_hash(title, content, source_type)
+        }
+
+    def _summary_params(self, summary: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "summary_text": summary["summary_text"],
+            "key_decisions": summary.get("key_decisions"),
+            "action_items": summary.get("action_items"),
+            "content_hash": summary_hash(summary["summary_text"], summary.get("key_decisions"),
+                                         summary.get("action_items")),
+            # Assignee, due date and status of each item, indexed with the version
+            "action_index": parse_action_items(summary.get("action_items"))
+        }
+
+    def _decompress_transcript(self, transcript: Dict[str, Any]) -> Dict[str, Any]:
+        """Transparently decompress the content column of a transcript row."""
+        if transcript and transcript.get("content"):
+            transcript["content"] = decompress_content(transcript["content"])
+        return transcript
+
+    @_instrumented
+    def get_summary_by_transcript_id(self, transcript_id: str) -> Dict[str, Any]:
+        """Retrieve the latest summary version for a specific transcript."""
+        try:
+            response = self.supabase.table('summaries').select("*")\
+                .eq('transcript_id', transcript_id)\
+                .eq('is_latest', True)\
+                .limit(1)\
+                .execute()
+            return response.data[0] if response.data else None
+        except Exception as e:
+            self._failed(e)
             print(f"Error fetching summary: {e}")
             return None
 
+    @_instrumented
+    def get_latest_summaries(self, offset: int, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        A page of the latest summary of every transcript, ordered by id.
+
+        Returns None when the page could not be read, so a failed page is not
+        mistaken for the end of the table.
+        """
+        try:
+            response = self.supabase.table('summaries')\
+                .select("id, transcript_id, action_items, created_at")\
+                .eq('is_latest', True)\
+                .order('id')\
+                .range(offset, offset + limit - 1)\
+                .execute()
+            return response.data
+        except Exception as e:
+            self._failed(e)
+            print(f"Error fetching latest summaries: {e}")
+            return None
+
+    @_instrumented
+    def get_summary_versions(self, transcript_id: str) -> List[Dict[str, Any]]:
+        """All summary versions of a transcript, newest first."""
+        try:
+            response = self.supabase.table('summaries').select("*")\
+                .eq('transcript_id', transcript_id)\
+                .order('version', desc=True)\
+                .execute()
+            return response.data
+        except Exception as e:
+            self._failed(e)
+            print(f"Error fetching summary versions: {e}")
+            return []
+
+    @_instrumented
     def save_summary(self, transcript_id: str, summary_text: str,
                     key_decisions: str = None, action_items: str = None) -> Dict[str, Any]:
-        """Save a new summary to the database."""
+        """
+        Save a summary as the transcript's latest version.
+
+        Regenerating adds a version and marks it latest, replacing the
+        transcript's indexed action items; saving a summary identical to the
+        latest one returns that version unchanged.
+        """
         try:
-            response = self.supabase.table('summaries').insert({
-                "transcript_id": transcript_id,
+            params = self._summary_params({
                 "summary_text": summary_text,
                 "key_decisions": key_decisions,
                 "action_items": action_items
+            })
+            response = self.supabase.rpc("save_summary_version", {
+                "p_transcript_id": transcript_id,
+                "p_summary_text": params["summary_text"],
+                "p_key_decisions": params["key_decisions"],
+                "p_action_items": params["action_items"],
+                "p_content_hash": params["content_hash"],
+                "p_action_index": params["action_index"]
             }).execute()
-            return response.data[0]
+            return response.data
         except Exception as e:
+            self._failed(e)
             print(f"Error saving summary: {e}")
             return None
 
-    def save_notification(self, transcript_id: str, channel: str, status: str) -> Dict[str, Any]:
-        """Save notification record to the database."""
+    @_instrumented
+    def finish_notification(self, claimed: Dict[str, Any], status: str, error: Optional[str] = None,
+                            retry_at: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """
+        Record the outcome of delivering a claimed notification.
+
+        Only the row as claimed is updated: if a newer summary version was
+        queued meanwhile, or the lease ran out and another dispatcher claimed
+        it again, nothing changes and None is returned, so the newer row is
+        still delivered.
+
+        Args:
+            claimed: The row returned by claim_notifications
+            status: "pending", "sent" or "failed"
+            error: Reason of the last failed attempt
+            retry_at: When a pending notification is due again
+        """
         try:
-            response = self.supabase.table('notifications').insert({
-                "transcript_id": transcript_id,
-                "notification_channel": channel,
-                "status": status
-            }).execute()
-            return response.data[0]
+            now = datetime.now(timezone.utc)
+            values = {
+                "status": status,
+                "last_error": error,
+                "updated_at": now.isoformat()
+            }
+            if status == "sent":
+                values["sent_at"] = now.isoformat()
+            if retry_at is not None:
+                values["next_attempt_at"] = retry_at.isoformat()
+            response = self.supabase.table('notifications').update(values)\
+                .eq('id', claimed["id"])\
+                .eq('summary_id', claimed["summary_id"])\
+                .eq('attempts', claimed["attempts"])\
+                .eq('status', 'sending')\
+                .execute()
+            return response.data[0] if response.data else None
         except Exception as e:
+            self._failed(e)
             print(f"Error saving notification: {e}")
             return None
 
-    def get_notification_by_transcript(self, transcript_id: str) -> Dict[str, Any]:
-        """Get notification status for a transcript."""
+    @_instrumented
+    def enqueue_notification(self, transcript_id: str, channel: str, summary_id: str,
+                             payload: Dict[str, Any], delay: int = 0) -> Dict[str, Any]:
+        """
+        Queue a summary for delivery to a channel after delay seconds.
+
+        A summary already queued or sent is left alone; a new summary
+        version replaces the queued one.
+        """
         try:
-            response = self.supabase.table('notifications').select("*").eq('transcript_id', transcript_id).single().execute()
+            response = self.supabase.rpc("enqueue_notification", {
+                "p_transcript_id": transcript_id,
+                "p_channel": channel,
+                "p_summary_id": summary_id,
+                "p_payload": payload,
+                "p_delay_seconds": delay
+            }).execute()
             return response.data
         except Exception as e:
+            self._failed(e)
+            print(f"Error queueing notification: {e}")
+            return None
+
+    @_instrumented
+    def claim_notifications(self, limit: int = 50, lease_seconds: int = 120) -> List[Dict[str, Any]]:
+        """
+        Claim due notifications for delivery (status "sending" for lease_seconds).
+
+        Claims are exclusive between processes; rows not finished within
+        the lease become claimable again.
+        """
+        try:
+            response = self.supabase.rpc("claim_notifications", {
+                "p_limit": limit,
+                "p_lease_seconds": lease_seconds
+            }).execute()
+            return response.data or []
+        except Exception as e:
+            self._failed(e)
+            print(f"Error claiming notifications: {e}")
+            return []
+
+    @_instrumented
+    def get_notification_by_transcript(self, transcript_id: str) -> Dict[str, Any]:
+        """Get the most recently updated notification status for a transcript."""
+        try:
+            response = self.supabase.table('notifications').select("*")\
+                .eq('transcript_id', transcript_id)\
+                .order('updated_at', desc=True)\
+                .limit(1)\
+                .execute()
+            return response.data[0] if response.data else None
+        except Exception as e:
+            self._failed(e)
             print(f"Error fetching notification: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    @_instrumented
+    def get_summaries_created_between(self, since: str, until: str, limit: int = 500) -> List[Dict[str, Any]]:
+        """
+        Summary versions created in [since, until), oldest first, with their
+        meeting title (under "transcripts").
+        """
+        try:
+            response = self.supabase.table('summaries')\
+                .select("id, created_at, transcript_id, version, summary_text, key_decisions, action_items, "
+                        "transcripts(meeting_title)")\
+                .gte('created_at', since)\
+                .lt('created_at', until)\
+                .order('created_at')\
+                .limit(limit)\
+                .execute()
+            return response.data
+        except Exception as e:
+            self._failed(e)
+            print(f"Error fetching summaries: {e}")
+            return []
+
+    @_instrumented
+    def get_latest_digest(self, channel: str, period: str) -> Dict[str, Any]:
+        """The digest of a channel and period with the newest period start."""
+        try:
+            response = self.supabase.table('digests').select("*")\
+                .eq('channel', channel)\
+                .eq('period', period)\
+                .order('period_start', desc=True)\
+                .limit(1)\
+                .execute()
+            return response.data[0] if response.data else None
+        except Exception as e:
+            self._failed(e)
+            print(f"Error fetching digest: {e}")
+            return None
+
+    @_instrumented
+    def get_digests(self, channel: str, period: str, period_starts: List[str]) -> List[Dict[str, Any]]:
+        """Digests of a channel and period starting at any of period_starts; None if the query failed."""
+        try:
+            response = self.supabase.table('digests').select("*")\
+                .eq('channel', channel)\
+                .eq('period', period)\
+                .in_('period_start', period_starts)\
+                .execute()
+            return response.data
+        except Exception as e:
+            self._failed(e)
+            print(f"Error fetching digests: {e}")
+            return None
+
+    @_instrumented
+    def save_digests(self, digests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert or replace digest rollups, matched by channel, period and period start."""
+        try:
+            now = datetime.now(timezone.utc).isoformat()
+            response = self.supabase.table('digests').upsert(
+                [{**digest, "updated_at": now} for digest in digests],
+                on_conflict="channel,period,period_start"
+            ).execute()
+            return response.data
+        except Exception as e:
+            self._failed(e)
+            print(f"Error saving digests: {e}")
+            return None
+
+    @_instrumented
+    def get_unsent_digests(self, channel: str, period: str, ended_before: str) -> List[Dict[str, Any]]:
+        """Digests of a channel and period that ended before ended_before and were not posted."""
+        try:
+            response = self.supabase.table('digests').select("*")\
+                .eq('channel', channel)\
+                .eq('period', period)\
+                .is_('sent_at', 'null')\
+                .lte('period_end', ended_before)\
+                .order('period_start')\
+                .execute()
+            return response.data
+        except Exception as e:
+            self._failed(e)
+            print(f"Error fetching unsent digests: {e}")
+            return []
+
+    @_instrumented
+    def claim_digest(self, digest_id: str) -> Dict[str, Any]:
+        """Mark a digest sent unless it already is; returns the row only if this call claimed it."""
+        try:
+            now = datetime.now(timezone.utc).isoformat()
+            response = self.supabase.table('digests').update({"sent_at": now, "updated_at": now})\
+                .eq('id', digest_id)\
+                .is_('sent_at', 'null')\
+                .execute()
+            return response.data[0] if response.data else None
+        except Exception as e:
+            self._failed(e)
+            print(f"Error claiming digest: {e}")
+            return None
+
+    @_instrumented
+    def update_digest(self, digest_id: str, values: Dict[str, Any]) -> Dict[str, Any]:
+        """Set columns of a digest, e.g. its overview, or sent_at back to None after a failed post."""
+        try:
+            response = self.supabase.table('digests').update({
+                **values,
+                "updated_at": datetime.now(timezone.utc).isoformat()
+            }).eq('id', digest_id).execute()
+            return response.data[0] if response.data else None
+        except Exception as e:
+            self._failed(e)
+            print(f"Error updating digest: {e}")
+            return None
+
+    @_instrumented
+    def index_action_items(self, transcript_id: str, summary_id: str,
+                           items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Replace the indexed action items of a transcript with items parsed by action_items.index_action_items."""
+        try:
+            response = self.supabase.rpc("index_action_items", {
+                "p_transcript_id": transcript_id,
+                "p_summary_id": summary_id,
+                "p_items": items
+            }).execute()
+            return response.data
+        except Exception as e:
+            self._failed(e)
+            print(f"Error indexing action items: {e}")
+            return None
+
+    @_instrumented
+    def get_action_items(self, assignee: Optional[str] = None, status: Optional[str] = None,
+                         due_before: Optional[str] = None, transcript_id: Optional[str] = None,
+                         limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Indexed action items, soonest due first (undated last), with their
+        meeting title (under "transcripts").
+
+        Args:
+            assignee: Assignee in any spelling ("speaker b", "@Speaker B")
+            status: "open", "done" or "blocked"; None for all
+            due_before: ISO date; only items due before it (e.g. today for overdue)
+        """
+        try:
+            query = self.supabase.table('action_items').select("*, transcripts(meeting_title)")
+            if assignee is not None:
+                query = query.eq('assignee_key', assignee_key(assignee))
+            if status is not None:
+                query = query.eq('status', status)
+            if due_before is not None:
+                query = query.lt('due_date', due_before)
+            if transcript_id is not None:
+                query = query.eq('transcript_id', transcript_id)
+            response = query.order('due_date').limit(limit).execute()
+            return response.data
+        except Exception as e:
+            self._failed(e)
+            print(f"Error fetching action items: {e}")
+            return []
+
+    @_instrumented
+    def update_action_item_status(self, item_id: str, status: str) -> Dict[str, Any]:
+        """Set the status of an action item; kept when its summary is regenerated."""
+        try:
+            response = self.supabase.table('action_items').update({
+                "status": status,
+                "updated_at": datetime.now(timezone.utc).isoformat()
+            }).eq('id', item_id).execute()
+            return response.data[0] if response.data else None
+        except Exception as e:
+            self._failed(e)
+            print(f"Error updating action item: {e}")
+            return None
+
+    @_instrumented
+    def get_speaker_identities(self, organization: str) -> List[Dict[str, Any]]:
+        """Known speakers of an organization with their text signatures."""
+        try:
+            response = self.supabase.table('speaker_identities').select("*")\
+                .eq('organization', organization)\
+                .execute()
+            return response.data
+        except Exception as e:
+            self._failed(e)
+            print(f"Error fetching speaker identities: {e}")
+            return []
+
+    @_instrumented
+    def save_speaker_identities(self, identities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert or replace speaker identities, matched by organization and name key."""
+        try:
+            now = datetime.now(timezone.utc).isoformat()
+            response = self.supabase.table('speaker_identities').upsert(
+                [{**identity, "updated_at": now} for identity in identities],
+                on_conflict="organization,name_key"
+            ).execute()
+            return response.data
+        except Exception as e:
+            self._failed(e)
+            print(f"Error saving speaker identities: {e}")
+            return None
+
+    @_instrumented
+    def enqueue_job(self, kind: str, task: str, payload: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None,
+                    max_attempts: int = 3) -> Dict[str, Any]:
+        """Add a job to the shared queue (see job_queue.py)."""
+        try:
+            response = self.supabase.table('jobs').insert({
+                "kind": kind,
+                "task": task,
+                "payload": payload,
+                "metadata": metadata or {},
+                "max_attempts": max_attempts
+            }).execute()
+            return response.data[0]
+        except Exception as e:
+            self._failed(e)
+            print(f"Error queueing job: {e}")
+            return None
+
+    @_instrumented
+    def claim_jobs(self, worker: str, kinds: Optional[List[str]] = None, limit: int = 1,
+                   lease_seconds: int = 300) -> List[Dict[str, Any]]:
+        """
+        Claim due jobs of the given kinds for a worker (status "running" for lease_seconds).
+
+        Claims are exclusive between workers; jobs whose lease runs out
+        become claimable again.
+        """
+        try:
+            response = self.supabase.rpc("claim_jobs", {
+                "p_worker": worker,
+                "p_kinds": kinds,
+                "p_limit": limit,
+                "p_lease_seconds": lease_seconds
+            }).execute()
+            return response.data or []
+        except Exception as e:
+            self._failed(e)
+            print(f"Error claiming jobs: {e}")
+            return []
+
+    @_instrumented
+    def renew_job_leases(self, worker: str, job_ids: List[str], lease_seconds: int = 300) -> Optional[List[str]]:
+        """Extend a worker's leases; returns the ids it still holds, or None if the query failed."""
+        try:
+            response = self.supabase.rpc("renew_job_leases", {
+                "p_worker": worker,
+                "p_ids": job_ids,
+                "p_lease_seconds": lease_seconds
+            }).execute()
+            return [str(job_id) for job_id in response.data or []]
+        except Exception as e:
+            self._failed(e)
+            print(f"Error renewing job leases: {e}")
+            return None
+
+    @_instrumented
+    def finish_job(self, job_id: str, worker: str, status: str, result: Optional[Dict[str, Any]] = None,
+                   error: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Record the outcome of a job step ("succeeded", "failed" or "waiting").
+
+        Returns None if the worker no longer held the job's lease.
+        """
+        try:
+            response = self.supabase.rpc("finish_job", {
+                "p_id": job_id,
+                "p_worker": worker,
+                "p_status": status,
+                "p_result": result,
+                "p_error": error
+            }).execute()
+            return response.data[0] if response.data else None
+        except Exception as e:
+            self._failed(e)
+            print(f"Error finishing job: {e}")
+            return None
+
+    @_instrumented
+    def resume_job(self, job_id: str, task: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue the continuation of a job; None if it was already resumed, finished or is unknown."""
+        try:
+            response = self.supabase.rpc("resume_job", {
+                "p_id": job_id,
+                "p_task": task,
+                "p_payload": payload
+            }).execute()
+            return response.data[0] if response.data else None
+        except Exception as e:
+            self._failed(e)
+            print(f"Error resuming job: {e}")
+            return None
+
+    @_instrumented
+    def update_job_progress(self, job_id: str, worker: str, progress: Dict[str, Any]) -> bool:
+        """Store the latest progress event of a job the worker holds."""
+        try:
+            response = self.supabase.table('jobs').update({"progress": progress})\
+                .eq('id', job_id)\
+                .eq('lease_owner', worker)\
+                .execute()
+            return bool(response.data)
+        except Exception as e:
+            self._failed(e)
+            print(f"Error saving job progress: {e}")
+            return False
+
+    @_instrumented
+    def get_job(self, job_id: str) -> Dict[str, Any]:
+        try:
+            response = self.supabase.table('jobs').select("*").eq('id', job_id).execute()
+            return response.data[0] if response.data else None
+        except Exception as e:
+            self._failed(e)
+            print(f"Error fetching job: {e}")
+            return None
+
+    @_instrumented
+    def list_jobs(self, kind: Optional[str] = None, status: Optional[str] = None,
+                  limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recent jobs first, optionally filtered."""
+        try:
+            query = self.supabase.table('jobs').select("*")
+            if kind is not None:
+                query = query.eq('kind', kind)
+            if status is not None:
+                query = query.eq('status', status)
+            response = query.order('created_at', desc=True).limit(limit).execute()
+            return response.data
+        except Exception as e:
+            self._failed(e)
+            print(f"Error fetching jobs: {e}")
+            return []
+
+    @_instrumented
+    def begin_flight(self, key: str, owner: str, lease_seconds: int = 300) -> Dict[str, Any]:
+        """
+        Start or renew owner's single-flight lease on key (see single_flight.py).
+
+        Returns the flight row, owned by whoever computes the key now, or
+        None if the query failed.
+        """
+        try:
+            response = self.supabase.rpc("begin_flight", {
+                "p_key": key,
+                "p_owner": owner,
+                "p_lease_seconds": lease_seconds
+            }).execute()
+            return response.data[0] if response.data else None
+        except Exception as e:
+            self._failed(e)
+            print(f"Error starting flight: {e}")
+            return None
+
+    @_instrumented
+    def finish_flight(self, key: str, owner: str, status: str, result: Any = None,
+                      error: Optional[str] = None) -> Dict[str, Any]:
+        """Record the outcome of owner's flight; None if another owner took it over."""
+        try:
+            response = self.supabase.rpc("finish_flight", {
+                "p_key": key,
+                "p_owner": owner,
+                "p_status": status,
+                "p_result": result,
+                "p_error": error
+            }).execute()
+            return response.data[0] if response.data else None
+        except Exception as e:
+            self._failed(e)
+            print(f"Error finishing flight: {e}")
+            return None
+
+    @_instrumented
+    def get_flight(self, key: str) -> Dict[str, Any]:
+        try:
+            response = self.supabase.table('flights').select("*").eq('key', key).execute()
+            return response.data[0] if response.data else None
+        except Exception as e:
+            self._failed(e)
+            print(f"Error fetching flight: {e}")
+            return None
@@ -0,0 +1,293 @@
+"""
+Daily and weekly Slack digests of the decisions and action items of meetings.
+
+DigestScheduler keeps one running rollup per channel, period and period
+start in the digests table (see supabase/migrations). Each run reads only
+the summaries created since the newest rollup's high-water mark and folds
+them in, keyed by transcript id so a regenerated summary replaces its
+earlier version; nothing re-reads transcripts or rescans old summaries.
+Once a period has ended its rollup is posted, optionally opened by an
+overview written with one small LLM call. Each channel in DIGEST_CHANNELS
+(default: the notifier's channel) gets its own rollups and high-water mark. A summary that only arrives
+after its period's rollup was posted is carried into the current period's.
+"""
+import logging
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Any, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+from . import metrics, quota, tracing
+
+PERIODS = ("daily", "weekly")
+
+logger = logging.getLogger(__name__)
+
+# Summaries younger than this are left for the next run: one committed late
+# by a slow transaction would otherwise land behind the high-water mark
+SETTLE_SECONDS = 60
+
+# Decisions and action items listed in the overview prompt, per kind
+OVERVIEW_MAX_ITEMS = 60
+
+
+def period_bounds(period: str, at: datetime, tz: tzinfo = timezone.utc) -> Tuple[datetime, datetime]:
+    """Start and end (UTC) of the day or the Monday-to-Sunday week containing at, in tz."""
+    start = at.astimezone(tz).replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == "daily":
+        end = start + timedelta(days=1)
+    elif period == "weekly":
+        start -= timedelta(days=start.weekday())
+        end = start + timedelta(days=7)
+    else:
+        raise ValueError(f"Unknown digest period: {period}")
+    return start.astimezone(timezone.utc), end.astimezone(timezone.utc)
+
+
+def _parse(timestamp: str) -> datetime:
+    return datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+
+
+def _items(value: Any) -> List[str]:
+    if isinstance(value, list):
+        return [str(item) for item in value if item]
+    return [value] if value else []
+
+
+class DigestScheduler:
+    """Folds new summaries into period rollups and posts each rollup once its period ends."""
+
+    def __init__(self, db, notifier, backend=None, periods: Optional[List[str]] = None,
+                 channels: Optional[List[str]] = None, timezone_name: Optional[str] = None,
+                 interval: Optional[float] = None, overview: Optional[bool] = None,
+                 model_id: Optional[str] = None, batch_size: int = 500, settle_seconds: float = SETTLE_SECONDS):
+        self.db = db
+        self.notifier = notifier
+        self.backend = backend
+        if periods is None:
+            periods = [p.strip() for p in os.getenv("DIGEST_PERIODS", "").split(",") if p.strip()]
+        for period in periods:
+            if period not in PERIODS:
+                raise ValueError(f"Unknown digest period: {period}")
+        self.periods = periods
+        if channels is None:
+            channels = [c.strip() for c in os.getenv("DIGEST_CHANNELS", "").split(",") if c.strip()]
+        self.channels = channels or [notifier.channel]
+        self.tz = ZoneInfo(timezone_name or os.getenv("DIGEST_TIMEZONE", "UTC"))
+        self.interval = float(interval if interval is not None else os.getenv("DIGEST_INTERVAL", "300"))
+        if overview is None:
+            overview = os.getenv("DIGEST_OVERVIEW", "true").lower() == "true"
+        self.overview = overview and backend is not None
+        self.model_id = model_id or os.getenv("SUMMARY_MODEL_ID", "ibm/granite-3-8b-instruct")
+        self.batch_size = batch_size
+        self.settle_seconds = settle_seconds
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the background scheduler thread, once per process."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="meetgist-digests", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def wake(self) -> None:
+        """Run now instead of at the next interval."""
+        self._wake.set()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                # Overviews wait behind interactive summaries for watsonx quota
+                with quota.priority(quota.BATCH):
+                    self.run_once()
+            except Exception as e:
+                metrics.ERRORS.inc(component="digests")
+                logger.exception("Digest run failed: %s", e)
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def run_once(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Fold in new summaries, then post every rollup whose period has ended."""
+        now = now or datetime.now(timezone.utc)
+        stats = {"summaries": 0, "sent": 0, "failed": 0}
+        for channel in self.channels:
+            for period in self.periods:
+                with tracing.span("digests.run", period=period, channel=channel):
+                    stats["summaries"] += self.collect(period, now, channel=channel)
+                    sent, failed = self.send_due(period, now, channel=channel)
+                stats["sent"] += sent
+                stats["failed"] += failed
+        return stats
+
+    def collect(self, period: str, now: Optional[datetime] = None, channel: Optional[str] = None) -> int:
+        """
+        Fold the summaries created since the period's high-water mark into
+        the channel's rollups; returns how many summaries were read.
+
+        The first run starts at the beginning of the current period rather
+        than the start of history.
+        """
+        channel = channel or self.channels[0]
+        until = (now or datetime.now(timezone.utc)) - timedelta(seconds=self.settle_seconds)
+        latest = self.db.get_latest_digest(channel, period)
+        since = latest["high_water_at"] if latest else period_bounds(period, until, self.tz)[0].isoformat()
+
+        total = 0
+        while True:
+            rows = self.db.get_summaries_created_between(since, until.isoformat(), limit=self.batch_size)
+            if not rows:
+                break
+            self._fold(channel, period, rows, until)
+            total += len(rows)
+            # The mark is inclusive; folding a boundary summary twice changes nothing
+            if len(rows) < self.batch_size or rows[-1]["created_at"] == since:
+                break
+            since = rows[-1]["created_at"]
+        return total
+
+    def _fold(self, channel: str, period: str, rows: List[Dict[str, Any]], until: datetime) -> None:
+        by_start: Dict[datetime, List[Dict[str, Any]]] = defaultdict(list)
+        for row in rows:
+            by_start[period_bounds(period, _parse(row["created_at"]), self.tz)[0]].append(row)
+        existing = self._get_digests(channel, period, list(by_start))
+
+        # A summary that arrives after its period's digest was posted goes out
+        # with the current period's digest instead of being dropped
+        current = period_bounds(period, until, self.tz)[0]
+        for start in [s for s in by_start if s != current and (existing.get(s) or {}).get("sent_at")]:
+            posted = existing[start].get("meetings") or {}
+            by_start[current].extend(
+                row for row in by_start.pop(start)
+                # The boundary summary read again was already posted
+                if posted.get(row["transcript_id"], {}).get("summary_id") != row["id"]
+            )
+        if not by_start[current]:
+            del by_start[current]
+        if current in by_start and current not in existing:
+            existing.update(self._get_digests(channel, period, [current]))
+
+        updated = []
+        for start, summaries in by_start.items():
+            digest = existing.get(start) or {}
+            meetings = dict(digest.get("meetings") or {})
+            for row in summaries:
+                previous = meetings.get(row["transcript_id"])
+                if previous and previous.get("version", 0) > row.get("version", 1):
+                    continue
+                meetings[row["transcript_id"]] = {
+                    "summary_id": row["id"],
+                    "version": row.get("version", 1),
+                    "meeting_title": (row.get("transcripts") or {}).get("meeting_title") or "Unknown Meeting",
+                    "key_decisions": _items(row.get("key_decisions")),
+                    "action_items": _items(row.get("action_items")),
+                    "created_at": row["created_at"]
+                }
+            if meetings == digest.get("meetings") and digest.get("high_water_at") == rows[-1]["created_at"]:
+                # Only the boundary summary was read again
+                continue
+            updated.append({
+                "channel": channel,
+                "period": period,
+                "period_start": start.isoformat(),
+                "period_end": period_bounds(period, start, self.tz)[1].isoformat(),
+                "meetings": meetings,
+                "high_water_at": rows[-1]["created_at"]
+            })
+
+        if updated and self.db.save_digests(updated) is None:
+            raise RuntimeError(f"Failed to save {period} digests")
+
+    def _get_digests(self, channel: str, period: str, starts: List[datetime]) -> Dict[datetime, Dict[str, Any]]:
+        digests = self.db.get_digests(channel, period, [s.isoformat() for s in starts])
+        if digests is None:
+            # Saving without the stored meetings would drop them from the rollup
+            raise RuntimeError(f"Failed to read {period} digests")
+        return {_parse(digest["period_start"]): digest for digest in digests}
+
+    def send_due(self, period: str, now: Optional[datetime] = None,
+                 channel: Optional[str] = None) -> Tuple[int, int]:
+        """Post the channel's rollups of ended periods not posted yet; returns (sent, failed)."""
+        channel = channel or self.channels[0]
+        now = now or datetime.now(timezone.utc)
+        # Only periods collect() has seen in full
+        ended_before = now - timedelta(seconds=self.settle_seconds)
+        sent = failed = 0
+        for digest in self.db.get_unsent_digests(channel, period, ended_before.isoformat()):
+            # Another scheduler may have posted it since the read
+            if not self.db.claim_digest(digest["id"]):
+                continue
+            if self._post(digest):
+                sent += 1
+            else:
+                failed += 1
+        return sent, failed
+
+    def _post(self, digest: Dict[str, Any]) -> bool:
+        meetings = sorted((digest.get("meetings") or {}).values(), key=lambda m: m.get("created_at") or "")
+        title = self.title(digest)
+        overview = digest.get("overview") or self._overview(title, meetings)
+
+        ok = self.notifier.send_rollup(title, meetings, overview=overview, channel=digest["channel"])
+        if ok:
+            if overview:
+                self.db.update_digest(digest["id"], {"overview": overview})
+            logger.info("Posted %s (%d meetings) to %s", title, len(meetings), digest["channel"])
+        else:
+            # Unclaim, so the next run tries again; keep the overview already paid for
+            self.db.update_digest(digest["id"], {"sent_at": None, "overview": overview})
+            logger.warning("Failed to post %s; retrying next run", title)
+        return ok
+
+    def title(self, digest: Dict[str, Any]) -> str:
+        start = _parse(digest["period_start"]).astimezone(self.tz)
+        if digest["period"] == "daily":
+            return f"Daily digest: {start:%a %b %d}"
+        last_day = _parse(digest["period_end"]).astimezone(self.tz) - timedelta(days=1)
+        return f"Weekly digest: {start:%b %d} – {last_day:%b %d}"
+
+    def _overview(self, title: str, meetings: List[Dict[str, Any]]) -> Optional[str]:
+        """A few sentences on the period's themes, or None if disabled or the call fails."""
+        if not self.overview or not meetings:
+            return None
+        decisions = [f"- {item} ({m['meeting_title']})" for m in meetings for item in m["key_decisions"]]
+        actions = [f"- {item} ({m['meeting_title']})" for m in meetings for item in m["action_items"]]
+        if not decisions and not actions:
+            return None
+
+        prompt = f"""The following are the key decisions and action items from {len(meetings)} meetings ({title}).
+Write a short overview of two to four sentences: the main themes, and anything that needs follow-up.
+
+Key Decisions:
+{chr(10).join(decisions[:OVERVIEW_MAX_ITEMS]) or 'None'}
+
+Action Items:
+{chr(10).join(actions[:OVERVIEW_MAX_ITEMS]) or 'None'}
+
+Overview:"""
+        try:
+            result = self.backend.generate(prompt, self.model_id, {
+                "decoding_method": "greedy",
+                "max_new_tokens": 200,
+                "min_new_tokens": 20,
+                "repetition_penalty": 1
+            })
+        except Exception as e:
+            metrics.ERRORS.inc(component="digests")
+            logger.warning("Digest overview failed: %s", e)
+            return None
+        metrics.LLM_TOKENS.inc(result["input_tokens"] or 0, backend=self.backend.name, direction="input")
+        metrics.LLM_TOKENS.inc(result["output_tokens"] or 0, backend=self.backend.name, direction="output")
+        return result["text"].strip() or None
@@ -0,0 +1,209 @@
+"""
+Progress events for long-running meeting work.
+
+Pipeline stages publish progress for the current topic: a background job
+id, or whatever name a caller such as a Streamlit run opens with topic().
+Subscribers receive events as they are published, so the API can stream
+them (SSE or WebSocket) and the UI can drive a real progress bar.
+
+Each event is a dict:
+
+    {"topic", "seq", "stage", "progress", "stage_progress", "message",
+     "data", "final", "ts"}
+
+progress is the overall fraction (0..1) for the topic, derived from the
+stage's fraction and the stages planned for the topic (see plan()).
+Without a topic, publish() only checks a context variable and returns.
+"""
+import asyncio
+import contextvars
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional
+
+# Relative share of the overall progress bar per stage
+STAGE_WEIGHTS = {
+    "transcribe": 50,
+    "format": 5,
+    "save": 5,
+    "summarize": 35,
+    "notify": 5,
+}
+
+_topic: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("meetgist_progress_topic", default=None)
+
+Event = Dict[str, Any]
+
+
+class EventBus:
+    """
+    In-process publish/subscribe of progress events, keyed by topic.
+
+    Publishers may be any thread; subscribers are called in the publishing
+    thread. The last history events per topic are kept so a late subscriber
+    (e.g. a client that connects after the job started) can catch up.
+    """
+
+    def __init__(self, history: int = 100, max_topics: int = 1000):
+        self.history_size = history
+        self.max_topics = max_topics
+        self._topics: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _state(self, topic: str) -> Dict[str, Any]:
+        state = self._topics.get(topic)
+        if state is None:
+            state = self._topics[topic] = {
+                "seq": 0,
+                "progress": 0.0,
+                "ranges": _ranges(STAGE_WEIGHTS),
+                "history": deque(maxlen=self.history_size),
+                "subscribers": []
+            }
+            # Forget the oldest topics nobody is listening to
+            for name in [name for name, s in self._topics.items() if not s["subscribers"]]:
+                if len(self._topics) <= self.max_topics:
+                    break
+                del self._topics[name]
+        return state
+
+    def plan(self, topic: str, stages: Iterable[str]) -> None:
+        """Spread the overall progress over just these stages, in order."""
+        with self._lock:
+            self._state(topic)["ranges"] = _ranges({s: STAGE_WEIGHTS.get(s, 5) for s in stages})
+
+    def publish(self, topic: str, stage: str, fraction: Optional[float] = None, message: str = "",
+                final: bool = False, **data) -> Event:
+        """Record a progress event and hand it to the topic's subscribers."""
+        with self._lock:
+            state = self._state(topic)
+            span = state["ranges"].get(stage)
+            if final and fraction is not None:
+                progress = fraction
+            elif span is not None and fraction is not None:
+                start, end = span
+                # Never move the bar backwards, e.g. when a stage is retried
+                progress = max(state["progress"], start + (end - start) * min(max(fraction, 0.0), 1.0))
+            else:
+                progress = state["progress"]
+            state["progress"] = progress
+            state["seq"] += 1
+            event = {
+                "topic": topic,
+                "seq": state["seq"],
+                "stage": stage,
+                "progress": round(progress, 4),
+                "stage_progress": fraction,
+                "message": message,
+                "data": data,
+                "final": final,
+                "ts": time.time()
+            }
+            state["history"].append(event)
+            subscribers = list(state["subscribers"])
+
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Progress subscriber failed: {e}")
+        return event
+
+    def subscribe(self, topic: str, callback: Callable[[Event], None]) -> Callable[[], None]:
+        """Call callback for every new event on topic; returns an unsubscribe function."""
+        with self._lock:
+            self._state(topic)["subscribers"].append(callback)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                state = self._topics.get(topic)
+                if state and callback in state["subscribers"]:
+                    state["subscribers"].remove(callback)
+        return unsubscribe
+
+    def history(self, topic: str) -> List[Event]:
+        with self._lock:
+            state = self._topics.get(topic)
+            return list(state["history"]) if state else []
+
+    def latest(self, topic: str) -> Optional[Event]:
+        with self._lock:
+            state = self._topics.get(topic)
+            return state["history"][-1] if state and state["history"] else None
+
+    async def stream(self, topic: str, replay: bool = True) -> AsyncIterator[Event]:
+        """
+        Yield the topic's events on the running event loop until a final one.
+
+        With replay, events already published are yielded first, so nothing
+        between the job starting and the client connecting is missed.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        # Subscribe before reading history; seq numbers drop the overlap
+        unsubscribe = self.subscribe(topic, lambda event: loop.call_soon_threadsafe(queue.put_nowait, event))
+        try:
+            last_seq = 0
+            if replay:
+                for event in self.history(topic):
+                    last_seq = event["seq"]
+                    yield event
+                    if event["final"]:
+                        return
+            while True:
+                event = await queue.get()
+                if event["seq"] <= last_seq:
+                    continue
+                last_seq = event["seq"]
+                yield event
+                if event["final"]:
+                    return
+        finally:
+            unsubscribe()
+
+
+def _ranges(weights: Dict[str, float]) -> Dict[str, tuple]:
+    total = sum(weights.values()) or 1
+    ranges, start = {}, 0.0
+    for stage, weight in weights.items():
+        end = start + weight / total
+        ranges[stage] = (start, end)
+        start = end
+    return ranges
+
+
+BUS = EventBus()
+
+
+def current_topic() -> Optional[str]:
+    return _topic.get()
+
+
+@contextmanager
+def topic(name: str, stages: Optional[Iterable[str]] = None):
+    """Publish events from this context (and threads it propagates to) under name."""
+    if stages is not None:
+        BUS.plan(name, stages)
+    token = _topic.set(name)
+    try:
+        yield name
+    finally:
+        _topic.reset(token)
+
+
+def plan(*stages: str) -> None:
+    """Declare the stages the current topic will go through, in order."""
+    name = _topic.get()
+    if name is not None:
+        BUS.plan(name, stages)
+
+
+def publish(stage: str, fraction: Optional[float] = None, message: str = "", final: bool = False,
+            **data) -> Optional[Event]:
+    """Publish progress for the current topic; a no-op outside one."""
+    name = _topic.get()
+    if name is None:
+        return None
+    return BUS.publish(name, stage, fraction, message, final=final, **data)
@@ -0,0 +1,262 @@
+"""
+Shared job queue, so the API and the pipeline workers scale separately.
+
+With JOB_BACKEND=queue, QueueJobManager stands in for the in-memory
+JobManager: API processes insert jobs into the jobs table (see
+supabase/migrations) and read their status from it, holding no job state
+themselves, so any number of uvicorn/gunicorn workers on any node can
+serve any request. QueueWorker processes (run_worker.py) claim the jobs
+with a lease, run them and record the outcome; transcription and
+summarization workers can be run, and scaled, independently with
+JOB_KINDS.
+
+A claimed job's lease is renewed while it runs. If its worker dies, the
+lease runs out and another worker claims the job again, up to
+JOB_MAX_ATTEMPTS. Progress events are written to the job row so API
+processes can stream them.
+
+Only the pipeline functions in TASKS can be queued; they take the
+ServiceContainer as first argument, which each worker supplies itself,
+and otherwise JSON arguments.
+"""
+import json
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from . import events, metrics, tracing
+from .jobs import Job, Pending, FAILED, RUNNING, SUCCEEDED, WAITING, running
+
+# Pipeline functions a queued job can run, by name
+TASKS = ("ingest_audio", "complete_transcription", "summarize_transcript", "process_text")
+
+
+def resolve_task(name: str) -> Callable[..., Dict[str, Any]]:
+    from . import pipeline
+    if name not in TASKS:
+        raise ValueError(f"Unknown job task: {name}")
+    return getattr(pipeline, name)
+
+
+def task_name(func: Callable) -> str:
+    """The TASKS name of a pipeline function."""
+    name = getattr(func, "__name__", "")
+    if name not in TASKS or resolve_task(name) is not func:
+        raise ValueError(f"{name or func!r} can't run on the job queue; add it to TASKS")
+    return name
+
+
+def _payload(args: tuple, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON arguments of a task, without the ServiceContainer."""
+    from .services import ServiceContainer
+    if args and isinstance(args[0], ServiceContainer):
+        args = args[1:]
+    payload = {"args": list(args), "kwargs": kwargs}
+    # Fail at submit time rather than in a worker
+    json.dumps(payload)
+    return payload
+
+
+def _jsonable(value: Any) -> Any:
+    return json.loads(json.dumps(value, default=str))
+
+
+class QueueJobManager:
+    """The JobManager interface over the shared jobs table."""
+
+    # Job state lives in the database, visible to every API and worker process
+    shared = True
+
+    def __init__(self, db, max_attempts: Optional[int] = None):
+        self.db = db
+        self.max_attempts = int(max_attempts if max_attempts is not None else os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+    def submit(self, kind: str, func: Callable[..., Dict[str, Any]], *args,
+               metadata: Optional[Dict[str, Any]] = None, **kwargs) -> Job:
+        """Queue func(services, *args, **kwargs) for a worker serving kind."""
+        row = self.db.enqueue_job(kind, task_name(func), _payload(args, kwargs), _jsonable(metadata or {}),
+                                  max_attempts=self.max_attempts)
+        if row is None:
+            raise RuntimeError(f"Could not queue {kind} job")
+        return Job.from_row(row)
+
+    def resume(self, job_id: Optional[str], kind: str, func: Callable[..., Dict[str, Any]], *args,
+               metadata: Optional[Dict[str, Any]] = None, **kwargs) -> Optional[Job]:
+        """
+        Queue the continuation of a job that returned Pending.
+
+        Returns None if the job was already resumed (a repeated callback); an
+        unknown job runs the work as a new job, as JobManager.resume() does.
+        """
+        if job_id:
+            row = self.db.resume_job(job_id, task_name(func), _payload(args, kwargs))
+            if row is not None:
+                return Job.from_row(row)
+            if self.db.get_job(job_id) is not None:
+                return None
+        return self.submit(kind, func, *args, metadata=metadata, **kwargs)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        row = self.db.get_job(job_id)
+        return Job.from_row(row) if row else None
+
+    def list(self, kind: Optional[str] = None, status: Optional[str] = None, limit: int = 100) -> List[Job]:
+        """Most recent jobs first, optionally filtered."""
+        return [Job.from_row(row) for row in self.db.list_jobs(kind=kind, status=status, limit=limit)]
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Nothing runs in this process; queued jobs stay with the workers."""
+
+
+class QueueWorker:
+    """Claims jobs from the shared queue and runs them on a bounded thread pool."""
+
+    def __init__(self, services, kinds: Optional[List[str]] = None, concurrency: Optional[int] = None,
+                 worker_id: Optional[str] = None, poll_interval: Optional[float] = None,
+                 lease_seconds: Optional[int] = None, progress_interval: float = 2.0):
+        self.services = services
+        if kinds is None:
+            kinds = [kind.strip() for kind in os.getenv("JOB_KINDS", "").split(",") if kind.strip()]
+        # None serves every kind
+        self.kinds = list(kinds) or None
+        self.concurrency = int(concurrency if concurrency is not None else os.getenv("JOB_WORKERS", "4"))
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.poll_interval = float(poll_interval if poll_interval is not None
+                                   else os.getenv("JOB_POLL_INTERVAL", "2"))
+        self.lease_seconds = int(lease_seconds if lease_seconds is not None
+                                 else os.getenv("JOB_LEASE_SECONDS", "300"))
+        self.progress_interval = progress_interval
+
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="meetgist-worker")
+        self._running: Dict[str, Dict[str, Any]] = {}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start claiming jobs in a background thread."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="meetgist-queue-worker", daemon=True)
+            self._thread.start()
+        print(f"Worker {self.worker_id} serving {', '.join(self.kinds or ['all kinds'])} "
+              f"with {self.concurrency} threads")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop claiming and wait up to timeout for running jobs to finish,
+        renewing their leases meanwhile. Jobs still running after that are
+        claimed again by another worker once their lease runs out.
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._executor.shutdown(wait=False)
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    @property
+    def running_jobs(self) -> int:
+        return len(self._running)
+
+    def _loop(self) -> None:
+        renewed_at = time.monotonic()
+        while True:
+            stopping = self._stop.is_set()
+            if stopping and not self._running:
+                return
+            try:
+                if time.monotonic() - renewed_at >= self.lease_seconds / 3:
+                    self.renew_leases()
+                    renewed_at = time.monotonic()
+                # Keep claiming while there are free threads and due jobs
+                while not stopping and self.run_once() and not self._stop.is_set():
+                    pass
+            except Exception as e:
+                metrics.ERRORS.inc(component="job_queue")
+                print(f"Job queue poll failed: {e}")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def run_once(self) -> int:
+        """Claim due jobs for the free threads and start them; returns how many were claimed."""
+        free = self.concurrency - len(self._running)
+        if free <= 0:
+            return 0
+        rows = self.services.db.claim_jobs(self.worker_id, self.kinds, limit=free,
+                                           lease_seconds=self.lease_seconds)
+        for row in rows:
+            with self._lock:
+                self._running[row["id"]] = row
+            self._executor.submit(self._execute, row)
+        return len(rows)
+
+    def renew_leases(self) -> None:
+        """Extend the leases of running jobs; a job another worker took over is reported."""
+        job_ids = list(self._running)
+        if not job_ids:
+            return
+        held = self.services.db.renew_job_leases(self.worker_id, job_ids, self.lease_seconds)
+        if held is None:
+            return
+        for job_id in set(job_ids) - set(held):
+            metrics.ERRORS.inc(component="job_queue")
+            print(f"Worker {self.worker_id} lost the lease on job {job_id}; its outcome will be discarded")
+
+    def _execute(self, row: Dict[str, Any]) -> None:
+        job = Job.from_row(row)
+        unsubscribe = events.BUS.subscribe(job.id, self._progress_recorder(job.id))
+        with running(job), events.topic(job.id), \
+                tracing.span(f"job.{job.kind}", job_id=job.id, worker=self.worker_id, **job.metadata) as span:
+            events.publish("job", message=f"{job.kind} running", status=RUNNING)
+            try:
+                payload = row.get("payload") or {}
+                result = resolve_task(row["task"])(self.services, *payload.get("args", []),
+                                                   **payload.get("kwargs", {}))
+                if row.get("result") and result is not None:
+                    result = {**row["result"], **result}
+                if isinstance(result, Pending):
+                    events.publish("job", message="Waiting for external callback", status=WAITING)
+                    self._finish(job, WAITING, result=result)
+                else:
+                    events.publish("job", 1.0, message=f"{job.kind} succeeded", final=True, status=SUCCEEDED)
+                    self._finish(job, SUCCEEDED, result=result)
+            except Exception as e:
+                metrics.ERRORS.inc(component=f"job.{job.kind}")
+                span.record_exception(e)
+                print(f"Job {job.id} ({job.kind}) failed: {e}")
+                traceback.print_exc()
+                events.publish("job", message=f"{job.kind} failed: {e}", final=True, status=FAILED, error=str(e))
+                self._finish(job, FAILED, error=str(e))
+            finally:
+                unsubscribe()
+                with self._lock:
+                    self._running.pop(job.id, None)
+                self._wake.set()
+
+    def _finish(self, job: Job, status: str, result: Optional[Dict[str, Any]] = None,
+                error: Optional[str] = None) -> None:
+        saved = self.services.db.finish_job(job.id, self.worker_id, status,
+                                            result=_jsonable(result) if result is not None else None, error=error)
+        if saved is None:
+            print(f"Outcome of job {job.id} not recorded: the lease was lost or the database is unavailable")
+
+    def _progress_recorder(self, job_id: str) -> Callable[[Dict[str, Any]], None]:
+        """Subscriber writing a job's progress to its row, at most every progress_interval seconds."""
+        last = [0.0]
+
+        def record(event: Dict[str, Any]) -> None:
+            now = time.monotonic()
+            if event["final"] or event["stage"] == "job" or now - last[0] >= self.progress_interval:
+                last[0] = now
+                self.services.db.update_job_progress(job_id, self.worker_id, _jsonable(event))
+        return record
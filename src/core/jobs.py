@@ -0,0 +1,214 @@
+import contextvars
+import threading
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Any, Callable, List, Optional
+from . import events, metrics, tracing
+
+QUEUED = "queued"
+RUNNING = "running"
+WAITING = "waiting"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+_current_job: contextvars.ContextVar[Optional["Job"]] = contextvars.ContextVar("meetgist_job", default=None)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def current_job() -> Optional["Job"]:
+    """The job whose function is running in this thread, if any."""
+    return _current_job.get()
+
+
+@contextmanager
+def running(job: "Job"):
+    """Make job the current_job() while one of its steps runs outside JobManager (a queue worker)."""
+    token = _current_job.set(job)
+    try:
+        yield job
+    finally:
+        _current_job.reset(token)
+
+
+class Pending(dict):
+    """
+    Result of a job step that continues after an external callback.
+
+    Returning one leaves the job WAITING with this partial result until
+    JobManager.resume() runs the rest.
+    """
+
+
+class Job:
+    """One unit of background work (transcription, summary, ...) and its outcome."""
+
+    def __init__(self, kind: str, metadata: Optional[Dict[str, Any]] = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.metadata = metadata or {}
+        self.status = QUEUED
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = _now()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        # Set by JobManager.resume() once a callback has continued the job
+        self.resumed = False
+        self.continuation: Optional[tuple] = None
+        # Latest progress event, for jobs run by another process (see job_queue.py)
+        self.progress: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "Job":
+        """A job as stored in the shared queue's jobs table."""
+        job = cls(row["kind"], row.get("metadata"))
+        job.id = row["id"]
+        job.status = row["status"]
+        job.result = row.get("result")
+        job.error = row.get("error")
+        job.created_at = row.get("created_at")
+        job.started_at = row.get("started_at")
+        job.finished_at = row.get("finished_at")
+        job.resumed = bool(row.get("resumed"))
+        job.progress = row.get("progress")
+        return job
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "metadata": self.metadata,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+class JobManager:
+    """
+    Runs long pipeline steps on a bounded thread pool and keeps their status.
+
+    Jobs live in memory only: the newest max_jobs are kept, finished jobs
+    beyond that are forgotten oldest first. See job_queue.QueueJobManager
+    for jobs shared between processes.
+    """
+
+    # Job state is visible to this process only
+    shared = False
+
+    def __init__(self, max_workers: int = 4, max_jobs: int = 10000):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="meetgist-job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_jobs = max_jobs
+
+    def submit(self, kind: str, func: Callable[..., Dict[str, Any]], *args,
+               metadata: Optional[Dict[str, Any]] = None, **kwargs) -> Job:
+        """Queue func(*args, **kwargs); its return value becomes the job result."""
+        job = Job(kind, metadata)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict()
+        self._executor.submit(self._run, job, func, args, kwargs)
+        return job
+
+    def resume(self, job_id: Optional[str], kind: str, func: Callable[..., Dict[str, Any]], *args,
+               metadata: Optional[Dict[str, Any]] = None, **kwargs) -> Optional[Job]:
+        """
+        Continue a job that returned Pending with func, merging its result
+        into the job's.
+
+        A callback can beat the step that returned Pending; the continuation
+        then runs as soon as that step finishes. Returns None if the job was
+        already resumed (a repeated callback). If the job is unknown, e.g. the
+        process restarted while it waited, the work runs as a new job of the
+        given kind.
+        """
+        continuation = (func, args, kwargs)
+        with self._lock:
+            job = self._jobs.get(job_id) if job_id else None
+            if job is not None:
+                if job.resumed or job.done:
+                    return None
+                job.resumed = True
+                if job.status != WAITING:
+                    job.continuation = continuation
+                    return job
+                job.status = QUEUED
+        if job is None:
+            return self.submit(kind, func, *args, metadata=metadata, **kwargs)
+        self._executor.submit(self._run, job, *continuation)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def list(self, kind: Optional[str] = None, status: Optional[str] = None, limit: int = 100) -> List[Job]:
+        """Most recent jobs first, optionally filtered."""
+        with self._lock:
+            jobs = list(reversed(self._jobs.values()))
+        return [
+            job for job in jobs
+            if (kind is None or job.kind == kind) and (status is None or job.status == status)
+        ][:limit]
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job: Job, func: Callable, args: tuple, kwargs: Dict[str, Any]) -> None:
+        job.status = RUNNING
+        job.started_at = job.started_at or _now()
+        token = _current_job.set(job)
+        # Every job step is its own trace; progress events go to the job id
+        with tracing.span(f"job.{job.kind}", job_id=job.id, **job.metadata) as span, events.topic(job.id):
+            events.publish("job", message=f"{job.kind} running", status=RUNNING)
+            try:
+                result = func(*args, **kwargs)
+                if job.result and result is not None:
+                    result = {**job.result, **result}
+                job.result = result
+                if isinstance(result, Pending):
+                    with self._lock:
+                        continuation, job.continuation = job.continuation, None
+                        job.status = QUEUED if continuation else WAITING
+                    if continuation:
+                        self._executor.submit(self._run, job, *continuation)
+                    else:
+                        events.publish("job", message="Waiting for external callback", status=WAITING)
+                    return
+                job.status = SUCCEEDED
+                events.publish("job", 1.0, message=f"{job.kind} succeeded", final=True, status=SUCCEEDED)
+            except Exception as e:
+                metrics.ERRORS.inc(component=f"job.{job.kind}")
+                span.record_exception(e)
+                job.error = str(e)
+                job.status = FAILED
+                print(f"Job {job.id} ({job.kind}) failed: {e}")
+                traceback.print_exc()
+                events.publish("job", message=f"{job.kind} failed: {e}", final=True, status=FAILED, error=str(e))
+            finally:
+                _current_job.reset(token)
+                if job.status not in (WAITING, QUEUED):
+                    job.finished_at = _now()
+
+    def _evict(self) -> None:
+        excess = len(self._jobs) - self.max_jobs
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.done][:excess]:
+            del self._jobs[job_id]
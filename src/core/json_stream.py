@@ -0,0 +1,136 @@
+import json
+import re
+from typing import Any, Iterable, List, Optional
+
+TRAILING_COMMA = re.compile(r",\s*([}\]])")
+# A key left without its value by truncated output: `"action_items":` or `"action_items"`
+DANGLING_KEY = re.compile(r'"(?:[^"\\]|\\.)*"\s*:\s*$')
+LONE_KEY = re.compile(r'([{,])\s*"(?:[^"\\]|\\.)*"$')
+
+
+class IncrementalJSONParser:
+    """
+    Extract the first JSON object from model output as it is generated.
+
+    Text before the object (prose, ``` fences) is skipped, and the parser
+    tracks string and nesting state per character, so feed() returns the
+    object as soon as its closing brace arrives without re-scanning the
+    buffer. If generation stops early, close() repairs the truncated object
+    by closing open strings, arrays and objects. A closing bracket that
+    doesn't match the open one raises ValueError.
+    """
+
+    def __init__(self):
+        self._chars: List[str] = []
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self.done = False
+        self.value: Any = None
+
+    def feed(self, text: str) -> Optional[Any]:
+        """Consume more output; returns the parsed object once it is complete."""
+        for ch in text:
+            if self.done:
+                break
+
+            if not self._stack:
+                if ch != "{":
+                    continue
+                self._stack.append("}")
+                self._chars.append(ch)
+                continue
+
+            self._chars.append(ch)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = len(self._chars) - 1
+            elif ch == "{":
+                self._stack.append("}")
+            elif ch == "[":
+                self._stack.append("]")
+            elif ch in "}]":
+                expected = self._stack.pop()
+                if ch != expected:
+                    raise ValueError(f"Malformed JSON in model output: expected '{expected}', got '{ch}'")
+                if not self._stack:
+                    self.value = _loads("".join(self._chars))
+                    self.done = True
+
+        return self.value if self.done else None
+
+    def close(self) -> Any:
+        """Return the parsed object, repairing it if the output was cut off."""
+        if self.done:
+            return self.value
+        if not self._chars:
+            raise ValueError("No JSON object found in model output")
+
+        text = "".join(self._chars)
+        if self._in_string:
+            # Drop the unfinished string rather than keep half an item
+            text = text[:self._string_start]
+        text = DANGLING_KEY.sub("", text.rstrip()).rstrip().rstrip(",")
+
+        closers = _closers(text)
+        if closers and closers[-1] == "}":
+            text = LONE_KEY.sub(r"\1", text).rstrip(",")
+
+        self.value = _loads(text + "".join(reversed(closers)))
+        self.done = True
+        return self.value
+
+
+def parse_json_object(chunks: Iterable[str]) -> Any:
+    """Parse the first JSON object from a string or an iterable of streamed chunks."""
+    parser = IncrementalJSONParser()
+    if isinstance(chunks, str):
+        chunks = [chunks]
+    for chunk in chunks:
+        if parser.feed(chunk) is not None:
+            return parser.value
+    return parser.close()
+
+
+def _closers(text: str) -> List[str]:
+    """Closing brackets needed for the structures still open in text."""
+    closers = []
+    in_string = escape = False
+    for ch in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            closers.append("}" if ch == "{" else "]")
+        elif ch in "}]" and closers:
+            if closers.pop() != ch:
+                raise ValueError(f"Malformed JSON in model output: unexpected '{ch}'")
+    return closers
+
+
+def _loads(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    try:
+        return json.loads(TRAILING_COMMA.sub(r"\1", text))
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Malformed JSON in model output: {e}") from e
@@ -0,0 +1,430 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Callable, Generator, Iterator, List, Optional, Tuple
+import requests
+from .prompt_builder import TokenCounter
+from . import metrics, tracing
+from .quota import scheduler
+from .resilience import dependency
+
+WATSONX_API_VERSION = "2023-05-29"
+
+
+class LLMRequestError(Exception):
+    """A generation request the backend answered with an error status."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def _check(response) -> None:
+    """Raise LLMRequestError for a non-200 watsonx response."""
+    if response.status_code != 200:
+        metrics.ERRORS.inc(component="watsonx")
+        retry_after = response.headers.get("Retry-After")
+        raise LLMRequestError("API request failed: " + str(response.text), status_code=response.status_code,
+                              retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None)
+
+
+class LLMBackend:
+    """
+    Interface for text generation backends.
+
+    generate() returns a dict with "text", "input_tokens" and "output_tokens".
+    Subclasses implement generate(); async, streaming and batch generation
+    fall back to it unless a backend has a native implementation.
+    """
+
+    name = "base"
+
+    def generate(self, prompt: str, model_id: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    async def agenerate(self, prompt: str, model_id: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate without blocking the event loop."""
+        return await asyncio.to_thread(self.generate, prompt, model_id, parameters)
+
+    def stream(self, prompt: str, model_id: str, parameters: Dict[str, Any]) -> Iterator[str]:
+        """Yield generated text as it becomes available."""
+        yield self.generate(prompt, model_id, parameters)["text"]
+
+    def generate_batch(
+        self,
+        prompts: List[str],
+        model_id: str,
+        parameters: Dict[str, Any],
+        max_concurrency: int = 4,
+        on_result: Optional[Callable[[int], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate for several prompts concurrently, preserving order.
+
+        on_result(index) is called in the calling thread as each prompt
+        finishes, e.g. to report progress.
+        """
+        def run(index: int, prompt: str) -> Dict[str, Any]:
+            with tracing.span("llm.generate", backend=self.name, index=index):
+                return self.generate(prompt, model_id, parameters)
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(prompts)
+        if len(prompts) <= 1 or max_concurrency <= 1:
+            for i, prompt in enumerate(prompts):
+                results[i] = run(i, prompt)
+                if on_result:
+                    on_result(i)
+            return results
+
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(prompts))) as pool:
+            futures = {pool.submit(tracing.propagate(run), i, prompt): i for i, prompt in enumerate(prompts)}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                if on_result:
+                    on_result(futures[future])
+        return results
+
+
+class WatsonxBackend(LLMBackend):
+    """IBM watsonx.ai text generation with IAM token handling."""
+
+    name = "watsonx"
+
+    def __init__(self, api_key: str, project_id: str, url: Optional[str] = None,
+                 iam_url: Optional[str] = None, timeout: Optional[float] = None):
+        self.api_key = api_key
+        self.project_id = project_id
+        self.url = url or os.getenv("WATSONX_URL", "https://us-south.ml.cloud.ibm.com")
+        self.iam_url = iam_url or os.getenv("IBM_IAM_URL", "https://iam.cloud.ibm.com")
+        self._token_lock = threading.Lock()
+
+        # One pooled session, and one bulkhead and circuit breaker for every
+        # watsonx caller in the process
+        self.session = requests.Session()
+        self.resilience = dependency("watsonx")
+        self.timeout = timeout or self.resilience.timeout
+        # Admission within the project's quotas, interactive requests first
+        self.scheduler = scheduler("watsonx")
+        self.throttle_retries = int(os.getenv("WATSONX_THROTTLE_RETRIES", "3"))
+        self._counters: Dict[str, TokenCounter] = {}
+
+        # Fetched on the first request, so constructing the backend never blocks
+        self.iam_token: Optional[str] = None
+
+    def _get_iam_token(self) -> str:
+        """Get IAM token using API key"""
+        headers = {
+            "Content-Type": "application/x-www-form-urlencoded",
+            "Accept": "application/json",
+        }
+        data = {
+            "grant_type": "urn:ibm:params:oauth:grant-type:apikey",
+            "apikey": self.api_key
+        }
+
+        response = self.session.post(f"{self.iam_url}/identity/token", headers=headers, data=data, timeout=30)
+        if response.status_code != 200:
+            raise Exception(f"Failed to get IAM token: {response.text}")
+
+        return response.json()["access_token"]
+
+    def _refresh_token(self, stale_token: Optional[str]) -> None:
+        """Refresh the IAM token once, even if several threads saw it expire."""
+        with self._token_lock:
+            if self.iam_token == stale_token:
+                self.iam_token = self._get_iam_token()
+
+    def _current_token(self) -> str:
+        if self.iam_token is None:
+            self._refresh_token(None)
+        return self.iam_token
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Accept": "application/json",
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.iam_token}"
+        }
+
+    def _payload(self, prompt: str, model_id: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "input": prompt,
+            "parameters": parameters,
+            "model_id": model_id,
+            "project_id": self.project_id
+        }
+
+    def _endpoint(self, method: str) -> str:
+        return f"{self.url}/ml/v1/text/{method}?version={WATSONX_API_VERSION}"
+
+    def _reservation(self, prompt: str, model_id: str, parameters: Dict[str, Any]) -> int:
+        """Tokens to reserve from the quota: the prompt plus the most the model may generate."""
+        counter = self._counters.get(model_id)
+        if counter is None:
+            counter = self._counters[model_id] = TokenCounter(model_id)
+        return counter.count(prompt) + int(parameters.get("max_new_tokens") or 0)
+
+    def generate(self, prompt: str, model_id: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        payload = self._payload(prompt, model_id, parameters)
+        reservation = self._reservation(prompt, model_id, parameters)
+
+        with metrics.LLM_REQUEST_SECONDS.time(backend=self.name, model=model_id), \
+                tracing.span("watsonx.generate", model=model_id) as span:
+            for throttled in range(self.throttle_retries + 1):
+                try:
+                    with self.scheduler.slot(reservation) as ticket:
+                        result = self._parse_result(self._post_generation(payload, span).json())
+                        ticket.settle(result["input_tokens"] + result["output_tokens"])
+                    return result
+                except LLMRequestError as e:
+                    # The scheduler has lowered the limit (and paused for Retry-After)
+                    if e.status_code != 429 or throttled == self.throttle_retries:
+                        raise
+                    metrics.RETRIES.inc(component="watsonx", reason="throttled")
+
+    def _post_generation(self, payload: Dict[str, Any], span) -> requests.Response:
+        for attempt in range(2):
+            with self.resilience.call():
+                token = self._current_token()
+                response = self.session.post(
+                    self._endpoint("generation"),
+                    headers=self._headers(),
+                    json=payload,
+                    timeout=self.timeout
+                )
+                span.set_attribute("http.status_code", response.status_code)
+                span.set_attribute("attempts", attempt + 1)
+                if response.status_code == 401 and attempt == 0:
+                    # Token might be expired, refresh and retry
+                    metrics.RETRIES.inc(component="watsonx", reason="token_expired")
+                    with tracing.span("watsonx.refresh_token"):
+                        self._refresh_token(token)
+                    continue
+                _check(response)
+                return response
+
+    async def agenerate(self, prompt: str, model_id: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        import httpx
+
+        payload = self._payload(prompt, model_id, parameters)
+        reservation = self._reservation(prompt, model_id, parameters)
+        with metrics.LLM_REQUEST_SECONDS.time(backend=self.name, model=model_id), \
+                tracing.span("watsonx.generate", model=model_id):
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                for throttled in range(self.throttle_retries + 1):
+                    try:
+                        # Shares the scheduler, bulkhead and breaker with sync callers
+                        async with self.scheduler.aslot(reservation) as ticket:
+                            result = self._parse_result((await self._apost_generation(client, payload)).json())
+                            ticket.settle(result["input_tokens"] + result["output_tokens"])
+                        return result
+                    except LLMRequestError as e:
+                        if e.status_code != 429 or throttled == self.throttle_retries:
+                            raise
+                        metrics.RETRIES.inc(component="watsonx", reason="throttled")
+
+    async def _apost_generation(self, client, payload: Dict[str, Any]):
+        for attempt in range(2):
+            async with self.resilience.acall():
+                token = self.iam_token or await asyncio.to_thread(self._current_token)
+                response = await client.post(self._endpoint("generation"), headers=self._headers(), json=payload)
+                if response.status_code == 401 and attempt == 0:
+                    metrics.RETRIES.inc(component="watsonx", reason="token_expired")
+                    await asyncio.to_thread(self._refresh_token, token)
+                    continue
+                _check(response)
+                return response
+
+    def stream(self, prompt: str, model_id: str, parameters: Dict[str, Any]) -> Iterator[str]:
+        """
+        Stream tokens from the generation_stream server-sent events endpoint,
+        settling the quota reservation with the token counts watsonx reports.
+        """
+        payload = self._payload(prompt, model_id, parameters)
+        with self.scheduler.slot(self._reservation(prompt, model_id, parameters)) as ticket, \
+                tracing.span("watsonx.stream", model=model_id) as span:
+            for attempt in range(2):
+                with self.resilience.call():
+                    token = self._current_token()
+                    with self.session.post(
+                        self._endpoint("generation_stream"),
+                        headers={**self._headers(), "Accept": "text/event-stream"},
+                        json=payload,
+                        stream=True,
+                        timeout=self.timeout
+                    ) as response:
+                        span.set_attribute("http.status_code", response.status_code)
+                        span.set_attribute("attempts", attempt + 1)
+                        if response.status_code == 401 and attempt == 0:
+                            # Token might be expired, refresh and retry
+                            metrics.RETRIES.inc(component="watsonx", reason="token_expired")
+                            with tracing.span("watsonx.refresh_token"):
+                                self._refresh_token(token)
+                            continue
+                        _check(response)
+                        input_tokens, output_tokens = yield from self._stream_events(response)
+                if input_tokens or output_tokens:
+                    ticket.settle(input_tokens + output_tokens)
+                return
+
+    def _stream_events(self, response: requests.Response) -> Generator[str, None, Tuple[int, int]]:
+        """Yield the text of each event; returns the input and generated token counts of the last one."""
+        input_tokens = output_tokens = 0
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            event = json.loads(line[len("data:"):].strip())
+            for result in event.get("results", []):
+                # Counts are cumulative; the final event has the totals
+                input_tokens = result.get("input_token_count") or input_tokens
+                output_tokens = result.get("generated_token_count") or output_tokens
+                if result.get("generated_text"):
+                    yield result["generated_text"]
+        return input_tokens, output_tokens
+
+    def _parse_result(self, response_data: Dict[str, Any]) -> Dict[str, Any]:
+        result = response_data.get('results', [{'generated_text': ''}])[0]
+        return {
+            "text": result.get('generated_text', ''),
+            "input_tokens": result.get('input_token_count', 0),
+            "output_tokens": result.get('generated_token_count', 0)
+        }
+
+
+class LocalBackend(LLMBackend):
+    """
+    On-prem CPU generation with a GGUF model through llama.cpp.
+
+    Requires the llama-cpp-python package and LOCAL_MODEL_PATH pointing at a
+    model file (e.g. a quantized granite-3-8b-instruct). The model_id passed
+    to generate() is ignored, the loaded file is always used.
+    """
+
+    name = "local"
+
+    def __init__(self, model_path: Optional[str] = None, context_tokens: int = 8192, threads: Optional[int] = None):
+        try:
+            from llama_cpp import Llama
+        except ImportError as e:
+            raise ImportError("The local backend requires llama-cpp-python") from e
+
+        model_path = model_path or os.getenv("LOCAL_MODEL_PATH")
+        if not model_path:
+            raise ValueError("LOCAL_MODEL_PATH is not set")
+
+        self.llm = Llama(model_path=model_path, n_ctx=context_tokens, n_threads=threads, verbose=False)
+        # llama.cpp contexts are not thread safe
+        self._lock = threading.Lock()
+
+    def _options(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        greedy = parameters.get("decoding_method", "greedy") == "greedy"
+        return {
+            "max_tokens": parameters.get("max_new_tokens", 500),
+            "temperature": 0.0 if greedy else parameters.get("temperature", 0.7),
+            "repeat_penalty": parameters.get("repetition_penalty", 1.0)
+        }
+
+    def generate(self, prompt: str, model_id: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock, metrics.LLM_REQUEST_SECONDS.time(backend=self.name, model=model_id):
+            output = self.llm(prompt, **self._options(parameters))
+        usage = output.get("usage", {})
+        return {
+            "text": output["choices"][0]["text"],
+            "input_tokens": usage.get("prompt_tokens", 0),
+            "output_tokens": usage.get("completion_tokens", 0)
+        }
+
+    def stream(self, prompt: str, model_id: str, parameters: Dict[str, Any]) -> Iterator[str]:
+        with self._lock:
+            for chunk in self.llm(prompt, stream=True, **self._options(parameters)):
+                yield chunk["choices"][0]["text"]
+
+    def generate_batch(self, prompts: List[str], model_id: str, parameters: Dict[str, Any],
+                       max_concurrency: int = 1,
+                       on_result: Optional[Callable[[int], None]] = None) -> List[Dict[str, Any]]:
+        # One model instance, so batches run sequentially
+        return super().generate_batch(prompts, model_id, parameters, max_concurrency=1, on_result=on_result)
+
+
+class StubBackend(LLMBackend):
+    """
+    Deterministic offline backend for load tests and development.
+
+    Returns canned output shaped like the prompt asks for, after a simulated
+    delay of latency + input_tokens * seconds_per_input_token
+    + output_tokens * seconds_per_output_token.
+    """
+
+    name = "stub"
+
+    def __init__(self, latency: float = 0.0, seconds_per_input_token: float = 0.0,
+                 seconds_per_output_token: float = 0.0):
+        self.latency = latency
+        self.seconds_per_input_token = seconds_per_input_token
+        self.seconds_per_output_token = seconds_per_output_token
+        self.counter = TokenCounter("stub")
+
+    def generate(self, prompt: str, model_id: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        text = respond_to_prompt(prompt)
+        input_tokens = self.counter.count(prompt)
+        output_tokens = min(self.counter.count(text), parameters.get("max_new_tokens", 500))
+
+        delay = (self.latency + input_tokens * self.seconds_per_input_token
+                 + output_tokens * self.seconds_per_output_token)
+        if delay:
+            time.sleep(delay)
+        metrics.LLM_REQUEST_SECONDS.observe(delay, backend=self.name, model=model_id)
+
+        return {"text": text, "input_tokens": input_tokens, "output_tokens": output_tokens}
+
+    def stream(self, prompt: str, model_id: str, parameters: Dict[str, Any]) -> Iterator[str]:
+        text = self.generate(prompt, model_id, parameters)["text"]
+        for word in text.split(" "):
+            yield word + " "
+
+
+def respond_to_prompt(prompt: str) -> str:
+    """Canned output matching the format each MeetGist prompt asks for."""
+    summary = ("The team reviewed progress on the current priorities, discussed open risks "
+               "and agreed on next steps for the coming weeks.")
+    decisions = ["Approve the revised budget", "Move the launch to the second week of the month"]
+    actions = ["Speaker A to circulate the updated plan by Friday", "Speaker B to confirm vendor pricing"]
+
+    if "JSON" in prompt:
+        return json.dumps({"summary": summary, "key_decisions": decisions, "action_items": actions})
+    if "Transcript part" in prompt:
+        return "\n".join(["Summary:", summary, "Key Decisions:"] + [f"- {d}" for d in decisions]
+                         + ["Action Items:"] + [f"- {a}" for a in actions])
+    if prompt.rstrip().endswith("Key Decisions:"):
+        return "\n".join(f"- {d}" for d in decisions)
+    if prompt.rstrip().endswith("Action Items:"):
+        return "\n".join(f"- {a}" for a in actions)
+    if "Generate a realistic meeting transcript" in prompt:
+        return "\n".join(f"Speaker {chr(65 + i % 3)}: {summary}" for i in range(12))
+    return summary
+
+
+def create_backend(name: Optional[str] = None, api_key: Optional[str] = None,
+                   project_id: Optional[str] = None) -> LLMBackend:
+    """
+    Create the backend selected by name or the LLM_BACKEND environment variable.
+
+    Args:
+        name: "watsonx" (default), "local" or "stub"
+        api_key: IBM API key, watsonx only
+        project_id: watsonx project id, watsonx only
+    """
+    name = (name or os.getenv("LLM_BACKEND", "watsonx")).lower()
+
+    if name == "watsonx":
+        return WatsonxBackend(api_key=api_key, project_id=project_id)
+    if name == "local":
+        return LocalBackend()
+    if name == "stub":
+        return StubBackend(latency=float(os.getenv("STUB_LLM_LATENCY", "0")))
+
+    raise ValueError(f"Unknown LLM backend: {name}")
@@ -1,75 +1,235 @@
-import requests
-from typing import Dict, Any, List
+import os
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+from .chunking import chunk_transcript, content_hash
+from .chunk_cache import ChunkCache
+from .prompt_builder import PromptBuilder
+from .json_stream import parse_json_object
+from .llm_backends import LLMBackend, create_backend
+from .workers import CpuPool, offload
+from . import events, metrics, tracing
+
+# Bump when the map prompt changes so cached chunk results are not reused
+MAP_PROMPT_VERSION = "1"
 
 class MeetingSummarizer:
-    def __init__(self, api_key: str, project_id: str, space_id: str = None):
-        """Initialize the summarizer with IBM watsonx.ai credentials"""
+    def __init__(self, api_key: str, project_id: str, space_id: str = None, chunk_cache: ChunkCache = None,
+                 mode: str = None, backend: LLMBackend = None, cpu: CpuPool = None):
+        """Initialize the summarizer with IBM watsonx.ai credentials or another LLM backend"""
         self.api_key = api_key
         self.project_id = project_id
         self.space_id = space_id
+        self.model_id = os.getenv("SUMMARY_MODEL_ID", "ibm/granite-3-8b-instruct")
 
-        # Get IAM token first
-        self.iam_token = self._get_iam_token()
+        # watsonx by default, LLM_BACKEND=local|stub runs without IBM credentials
+        self.backend = backend or create_backend(api_key=api_key, project_id=project_id)
+        self.batch_concurrency = int(os.getenv("LLM_BATCH_CONCURRENCY", "4"))
 
-        self.base_url = "https://us-south.ml.cloud.ibm.com/ml/v1/text/generation?version=2023-05-29"
+        # "separate" sends three prompts, "combined" asks for one JSON object
+        self.mode = mode or os.getenv("SUMMARY_MODE", "separate")
 
-        self.headers = {
-            "Accept": "application/json",
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.iam_token}"
-        }
-
-    def _get_iam_token(self) -> str:
-        """Get IAM token using API key"""
-        iam_url = "https://iam.cloud.ibm.com/identity/token"
-        headers = {
-            "Content-Type": "application/x-www-form-urlencoded",
-            "Accept": "application/json",
-        }
-        data = {
-            "grant_type": "urn:ibm:params:oauth:grant-type:apikey",
-            "apikey": self.api_key
-        }
+        # Fits prompts into the context window and sizes max_new_tokens
+        self.prompt_builder = PromptBuilder(self.model_id)
+        # Token usage of the summary being generated; per thread because one
+        # summarizer is shared by every session in the process
+        self._local = threading.local()
 
-        response = requests.post(iam_url, headers=headers, data=data)
-        response.raise_for_status()
-
-        return response.json()["access_token"]
+        # Per-chunk map results, so regeneration only reprocesses edited regions
+        self.chunk_cache = chunk_cache or ChunkCache()
+        self.chunk_min_chars = int(os.getenv("SUMMARY_CHUNK_MIN_CHARS", "4000"))
+        self.chunk_max_chars = int(os.getenv("SUMMARY_CHUNK_MAX_CHARS", "12000"))
+        # Worker processes for chunking long transcripts off the request thread (None chunks inline)
+        self.cpu = cpu
 
     def generate_summary(self, transcript_data: Dict[str, Any], transcript_id: str = None) -> Dict[str, Any]:
-        """Generate meeting summary using watsonx.ai"""
+        """Generate meeting summary using the configured LLM backend"""
+        with metrics.STAGE_SECONDS.time(stage="summarize"), \
+                tracing.span("summarize", transcript_id=transcript_id, mode=self.mode, model=self.model_id) as span:
+            summary = self._generate_summary(transcript_data, transcript_id)
+            span.set_attribute("input_tokens", summary["usage"]["input_tokens"])
+            span.set_attribute("output_tokens", summary["usage"]["output_tokens"])
+            span.set_attribute("mode_used", summary["mode"])
+            return summary
+
+    def _generate_summary(self, transcript_data: Dict[str, Any], transcript_id: str = None) -> Dict[str, Any]:
         try:
             print("\nProcessing transcript data...")
+            self.usage = self._empty_usage()
 
             # Get the full text from transcript
             transcript_text = self._prepare_transcript_text(transcript_data)
             print(f"\nTranscript length: {len(transcript_text)} characters")
 
-            # Generate main summary
-            summary_text = self._generate_text(self._create_summary_prompt(transcript_text))
+            chunks = offload(self.cpu, chunk_transcript, transcript_text, self.chunk_min_chars, self.chunk_max_chars)
+            # Prompts expected, for progress events; the chunked path counts its own
+            if len(chunks) == 1:
+                self._start_progress(1 if self.mode == "combined" else 3)
+
+            # The mode actually used, recorded with the summary
+            mode = "map_reduce" if len(chunks) > 1 else self.mode
+            if len(chunks) > 1 and self.mode == "combined":
+                # One prompt can't hold the whole transcript; the reduce step combines the chunks instead
+                metrics.RETRIES.inc(component="summarizer", reason="combined_skipped")
+                print(f"Combined mode skipped: the transcript spans {len(chunks)} chunks, using map-reduce")
+
+            combined = None
+            if len(chunks) == 1 and self.mode == "combined":
+                combined = self._generate_combined(transcript_text)
+                if not combined:
+                    mode = "separate"
+                    self._local.progress["total"] += 3
+
+            if len(chunks) > 1:
+                # Long transcript: map over cached chunks, then reduce
+                summary_text, decisions_list, actions_list = self._summarize_chunks(chunks)
+            elif combined:
+                summary_text, decisions_list, actions_list = combined
+            else:
+                # Generate main summary
+                summary_text = self._generate(self._create_summary_prompt, transcript_text)
+
+                # Generate and format key decisions as JSONB array
+                decisions_text = self._generate(self._create_decisions_prompt, transcript_text)
+                decisions_list = self._convert_bullet_points_to_array(decisions_text)
 
-            # Generate and format key decisions as JSONB array
-            decisions_text = self._generate_text(self._create_decisions_prompt(transcript_text))
-            decisions_list = self._convert_bullet_points_to_array(decisions_text)
+                # Generate and format action items as JSONB array
+                actions_text = self._generate(self._create_actions_prompt, transcript_text)
+                actions_list = self._convert_bullet_points_to_array(actions_text)
 
-            # Generate and format action items as JSONB array
-            actions_text = self._generate_text(self._create_actions_prompt(transcript_text))
-            actions_list = self._convert_bullet_points_to_array(actions_text)
+            print(f"\nToken usage: {self.usage['input_tokens']} sent, "
+                  f"{self.usage['output_tokens']} received over {len(self.usage['calls'])} calls")
 
             # Create the summary in database-compatible format
             summary = {
                 'transcript_id': transcript_id,
                 'summary_text': summary_text,
                 'key_decisions': decisions_list,
-                'action_items': actions_list
+                'action_items': actions_list,
+                'mode': mode,
+                'usage': self.usage
             }
 
             return summary
 
         except Exception as e:
+            metrics.ERRORS.inc(component="summarizer")
             print(f"\nError occurred: {str(e)}")
             raise
 
+    def _generate_combined(self, transcript_text: str) -> Optional[Tuple[str, List[str], List[str]]]:
+        """
+        Extract summary, decisions and action items in a single generation.
+
+        Returns None when the output is not a usable JSON object, so the
+        caller can fall back to the three separate prompts.
+        """
+        output = self._generate(
+            self._create_combined_prompt,
+            transcript_text,
+            max_new_tokens=self.prompt_builder.output_budget(transcript_text, floor=300, ceiling=1000)
+        )
+
+        try:
+            data = parse_json_object(output)
+        except ValueError as e:
+            metrics.RETRIES.inc(component="summarizer", reason="unparsable_json")
+            print(f"Combined output could not be parsed, falling back to separate prompts: {e}")
+            return None
+
+        summary_text = data.get("summary") if isinstance(data, dict) else None
+        if not isinstance(summary_text, str) or not summary_text.strip():
+            metrics.RETRIES.inc(component="summarizer", reason="missing_summary")
+            print("Combined output is missing a summary, falling back to separate prompts")
+            return None
+
+        return (
+            summary_text.strip(),
+            self._coerce_items(data.get("key_decisions", [])),
+            self._coerce_items(data.get("action_items", []))
+        )
+
+    def _coerce_items(self, value: Any) -> List[str]:
+        """Normalize a JSON list (or bullet text) into a list of strings"""
+        if isinstance(value, str):
+            return self._convert_bullet_points_to_array(value)
+        if not isinstance(value, list):
+            return []
+        items = []
+        for item in value:
+            if isinstance(item, dict):
+                item = " - ".join(str(v) for v in item.values() if v)
+            item = str(item).strip()
+            if item:
+                items.append(item)
+        return items
+
+    def _summarize_chunks(self, chunks: List[str]) -> Tuple[str, List[str], List[str]]:
+        """
+        Map-reduce over transcript chunks.
+
+        The map step extracts notes per chunk and is cached by chunk hash, so
+        after an edit only the changed chunks are sent to the model again. The
+        reduce step merges the notes: one call for the overall summary, while
+        decisions and action items are concatenated without a model call.
+        """
+        keys = [content_hash(chunk, self.model_id, MAP_PROMPT_VERSION) for chunk in chunks]
+        notes = [self.chunk_cache.get(key) for key in keys]
+        missing = [i for i, note in enumerate(notes) if note is None]
+        self._start_progress(len(missing) + 1)
+
+        # Map the changed chunks as one concurrent batch
+        outputs = self._generate_batch(self._create_chunk_prompt, [chunks[i] for i in missing], max_new_tokens=400)
+        for i, output in zip(missing, outputs):
+            notes[i] = self._parse_chunk_notes(output)
+            self.chunk_cache.set(keys[i], notes[i])
+
+        print(f"\nMapped {len(chunks)} chunks ({len(chunks) - len(missing)} reused from cache)")
+
+        parts = "\n\n".join(f"Part {i + 1}: {n['summary']}" for i, n in enumerate(notes) if n["summary"])
+        summary_text = self._generate(self._create_reduce_prompt, parts)
+        decisions_list = self._merge_items(n["key_decisions"] for n in notes)
+        actions_list = self._merge_items(n["action_items"] for n in notes)
+
+        return summary_text, decisions_list, actions_list
+
+    def _parse_chunk_notes(self, text: str) -> Dict[str, Any]:
+        """Split map step output into its Summary / Key Decisions / Action Items sections"""
+        sections = {"summary": [], "key_decisions": [], "action_items": []}
+        headers = {
+            "summary:": "summary",
+            "key decisions:": "key_decisions",
+            "action items:": "action_items"
+        }
+        current = "summary"
+
+        for line in text.split('\n'):
+            header = line.strip().lower()
+            if header in headers:
+                current = headers[header]
+                continue
+            sections[current].append(line)
+
+        decisions = self._convert_bullet_points_to_array("\n".join(sections["key_decisions"]))
+        actions = self._convert_bullet_points_to_array("\n".join(sections["action_items"]))
+
+        return {
+            "summary": "\n".join(sections["summary"]).strip(),
+            "key_decisions": [d for d in decisions if d.lower() not in ("none", "n/a")],
+            "action_items": [a for a in actions if a.lower() not in ("none", "n/a")]
+        }
+
+    def _merge_items(self, item_lists) -> List[str]:
+        """Concatenate per-chunk items, dropping exact duplicates"""
+        seen = set()
+        merged = []
+        for items in item_lists:
+            for item in items:
+                key = item.lower()
+                if key not in seen:
+                    seen.add(key)
+                    merged.append(item)
+        return merged
+
     def _convert_bullet_points_to_array(self, text: str) -> List[str]:
         """Convert bullet point text to array of strings"""
         # Split by common bullet point indicators
@@ -85,32 +245,114 @@ class MeetingSummarizer:
 
         return items
 
-    def _generate_text(self, prompt: str) -> str:
-        """Generate text using the API"""
-        payload = {
-            "input": prompt,
-            "parameters": {
-                "decoding_method": "greedy",
-                "max_new_tokens": 500,
-                "min_new_tokens": 50,
-                "repetition_penalty": 1,
-                "temperature": 0.7
-            },
-            "model_id": "ibm/granite-3-8b-instruct",
-            "project_id": self.project_id
-        }
-
-        response = requests.post(
-            self.base_url,
-            headers=self.headers,
-            json=payload
+    def _generate(self, template, text: str, max_new_tokens: int = None) -> str:
+        """Build a prompt that fits the model's context window and generate from it"""
+        with tracing.span("llm.prompt", prompt=self._prompt_name(template), backend=self.backend.name) as span:
+            built = self._build_prompt(template, text, max_new_tokens)
+            output = self._generate_text(
+                built["prompt"],
+                max_new_tokens=built["max_new_tokens"],
+                min_new_tokens=built["min_new_tokens"]
+            )
+            span.set_attribute("input_tokens", self.usage["calls"][-1]["input_tokens"])
+            span.set_attribute("output_tokens", self.usage["calls"][-1]["output_tokens"])
+            span.set_attribute("trimmed", built["trimmed"])
+        self._prompt_done(template)
+        return output
+
+    def _prompt_name(self, template) -> str:
+        """'summary' for _create_summary_prompt, used to label spans"""
+        return template.__name__.replace("_create_", "").replace("_prompt", "")
+
+    def _generate_batch(self, template, texts: List[str], max_new_tokens: int) -> List[str]:
+        """Generate for several texts with the same template as one backend batch"""
+        if not texts:
+            return []
+
+        with tracing.span("llm.batch", prompt=self._prompt_name(template), prompts=len(texts),
+                          backend=self.backend.name):
+            return self._run_batch(template, texts, max_new_tokens)
+
+    def _run_batch(self, template, texts: List[str], max_new_tokens: int) -> List[str]:
+        built = [self._build_prompt(template, text, max_new_tokens) for text in texts]
+        results = self.backend.generate_batch(
+            [b["prompt"] for b in built],
+            self.model_id,
+            self._parameters(
+                max(b["max_new_tokens"] for b in built),
+                min(b["min_new_tokens"] for b in built)
+            ),
+            max_concurrency=self.batch_concurrency,
+            on_result=lambda i: self._prompt_done(template)
         )
 
-        if response.status_code != 200:
-            raise Exception("API request failed: " + str(response.text))
+        for b, result in zip(built, results):
+            self._record_usage(result["input_tokens"] or b["input_tokens"], result["output_tokens"])
+        return [result["text"].strip() for result in results]
+
+    def _build_prompt(self, template, text: str, max_new_tokens: int = None) -> Dict[str, Any]:
+        if max_new_tokens is None:
+            max_new_tokens = self.prompt_builder.output_budget(text)
+
+        built = self.prompt_builder.build(template, text, max_new_tokens=max_new_tokens)
+        if built["trimmed"]:
+            print(f"Transcript trimmed to fit context window ({built['input_tokens']} tokens)")
+        return built
+
+    def _parameters(self, max_new_tokens: int, min_new_tokens: int) -> Dict[str, Any]:
+        return {
+            "decoding_method": "greedy",
+            "max_new_tokens": max_new_tokens,
+            "min_new_tokens": min_new_tokens,
+            "repetition_penalty": 1,
+            "temperature": 0.7
+        }
 
-        response_data = response.json()
-        return response_data.get('results', [{'generated_text': ''}])[0].get('generated_text', '').strip()
+    @property
+    def usage(self) -> Dict[str, Any]:
+        usage = getattr(self._local, "usage", None)
+        if usage is None:
+            usage = self._local.usage = self._empty_usage()
+        return usage
+
+    @usage.setter
+    def usage(self, value: Dict[str, Any]) -> None:
+        self._local.usage = value
+
+    def _start_progress(self, total: int) -> None:
+        self._local.progress = {"done": 0, "total": total}
+        events.publish("summarize", 0.0, f"Summarizing ({total} prompts)", prompts=total)
+
+    def _prompt_done(self, template) -> None:
+        """Publish a summary prompt completion for the current progress topic"""
+        progress = getattr(self._local, "progress", None)
+        if progress is None:
+            return
+        progress["done"] += 1
+        done, total = progress["done"], max(progress["total"], progress["done"])
+        events.publish("summarize", done / total, f"{self._prompt_name(template)} prompt done ({done}/{total})",
+                       prompt=self._prompt_name(template), done=done, total=total)
+
+    def _empty_usage(self) -> Dict[str, Any]:
+        return {"input_tokens": 0, "output_tokens": 0, "calls": []}
+
+    def _record_usage(self, input_tokens: int, output_tokens: int) -> None:
+        """Track tokens sent and received per call"""
+        self.usage["input_tokens"] += input_tokens
+        self.usage["output_tokens"] += output_tokens
+        self.usage["calls"].append({"input_tokens": input_tokens, "output_tokens": output_tokens})
+        metrics.LLM_TOKENS.inc(input_tokens, backend=self.backend.name, direction="input")
+        metrics.LLM_TOKENS.inc(output_tokens, backend=self.backend.name, direction="output")
+        print(f"{self.backend.name} call: {input_tokens} tokens in, {output_tokens} tokens out")
+
+    def _generate_text(self, prompt: str, max_new_tokens: int = 500, min_new_tokens: int = 50) -> str:
+        """Generate text using the configured backend"""
+        result = self.backend.generate(prompt, self.model_id, self._parameters(max_new_tokens, min_new_tokens))
+        self._record_usage(
+            result["input_tokens"] or self.prompt_builder.counter.count(prompt),
+            result["output_tokens"]
+        )
+        return result["text"].strip()
 
     def _create_summary_prompt(self, transcript_text: str) -> str:
         """Create prompt for main summary"""
@@ -141,6 +383,43 @@ Transcript:
 
 Action Items:"""
 
+    def _create_combined_prompt(self, transcript_text: str) -> str:
+        """Create prompt extracting all three sections as one JSON object"""
+        return f"""Read the following meeting transcript and respond with a single JSON object and nothing else.
+
+Transcript:
+{transcript_text}
+
+The JSON object must have exactly these keys:
+- "summary": a concise, organized summary of the main points discussed
+- "key_decisions": an array of strings, one per key decision made during the meeting
+- "action_items": an array of strings, one per action item, including who is responsible (if mentioned) and any deadlines
+
+JSON:"""
+
+    def _create_chunk_prompt(self, chunk_text: str) -> str:
+        """Create map step prompt for one transcript chunk"""
+        return f"""The following is one part of a longer meeting transcript. Extract notes for this part only.
+
+Transcript part:
+{chunk_text}
+
+Answer in exactly this format, writing 'None' under a heading if nothing applies:
+Summary:
+<two to four sentences on what was discussed>
+Key Decisions:
+- <decision>
+Action Items:
+- <action item, including who is responsible and any deadline>"""
+
+    def _create_reduce_prompt(self, parts: str) -> str:
+        """Create reduce step prompt combining the per-chunk summaries"""
+        return f"""Please provide a concise summary of a meeting from the following notes, which cover consecutive parts of the meeting in order:
+
+{parts}
+
+Focus on the main points discussed and provide a clear, organized summary."""
+
     def _prepare_transcript_text(self, transcript_data: Dict[str, Any]) -> str:
         """Convert transcript data to formatted text for processing"""
         try:
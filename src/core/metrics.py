@@ -0,0 +1,238 @@
+"""
+Lightweight in-process metrics with Prometheus text exposition.
+
+Metrics are only recorded when METRICS_ENABLED is set to a true value.
+When disabled every inc()/observe()/time() call returns after a single
+flag check, so instrumented code paths cost next to nothing.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Transcription and summarization of long meetings take minutes, not milliseconds
+SLOW_BUCKETS = (1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1200.0, 1800.0)
+
+_enabled = os.getenv("METRICS_ENABLED", "").lower() in ("1", "true", "yes", "on")
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def set_enabled(value: bool) -> None:
+    """Turn recording on or off at runtime (e.g. from tests or benchmarks)."""
+    global _enabled
+    _enabled = value
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    def __init__(self, histogram: "Histogram", labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _format_labels(self, key: Tuple[str, ...], extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, key))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        escaped = (v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, v in pairs)
+        return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, e.g. errors or tokens."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        if not _enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{self._format_labels(key)} {value:g}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Distribution of durations (or sizes) in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        if not _enabled:
+            return
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[index] += 1
+            self._sums[key] += value
+
+    def time(self, **labels: str):
+        """Context manager observing the wall time of its block."""
+        if not _enabled:
+            return _NULL_TIMER
+        return _Timer(self, labels)
+
+    def count(self, **labels: str) -> int:
+        return sum(self._counts.get(self._key(labels), []))
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key in sorted(self._counts):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), self._counts[key]):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f"{self.name}_bucket{self._format_labels(key, ('le', le))} {cumulative}")
+                lines.append(f"{self.name}_sum{self._format_labels(key)} {self._sums[key]:g}")
+                lines.append(f"{self.name}_count{self._format_labels(key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+def timed(metric: Histogram, **labels: str):
+    """Decorator observing the wall time of every call to the function."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Timer(metric, labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Metrics shared across MeetGist components
+STAGE_SECONDS = histogram(
+    "meetgist_stage_seconds", "Wall time of a pipeline stage (transcribe, format, summarize) per meeting",
+    ["stage"], SLOW_BUCKETS)
+LLM_REQUEST_SECONDS = histogram(
+    "meetgist_llm_request_seconds", "Latency of one LLM generation request", ["backend", "model"])
+LLM_TOKENS = counter(
+    "meetgist_llm_tokens_total", "Tokens sent to and generated by the LLM", ["backend", "direction"])
+DB_QUERY_SECONDS = histogram(
+    "meetgist_db_query_seconds", "Latency of a Supabase query", ["operation"])
+SLACK_SEND_SECONDS = histogram(
+    "meetgist_slack_send_seconds", "Latency of a Slack chat.postMessage call")
+HTTP_REQUEST_SECONDS = histogram(
+    "meetgist_http_request_seconds", "Latency of API requests", ["method", "route", "status"])
+ERRORS = counter(
+    "meetgist_errors_total", "Errors by component", ["component"])
+RETRIES = counter(
+    "meetgist_retries_total", "Retried external calls", ["component", "reason"])
+NOTIFICATIONS = counter(
+    "meetgist_notifications_total", "Slack notifications by delivery outcome (sent, retried, failed)", ["status"])
+CACHE_LOOKUPS = counter(
+    "meetgist_cache_lookups_total", "Cache lookups by cache and result (hit or miss)", ["cache", "result"])
+BREAKER_TRANSITIONS = counter(
+    "meetgist_breaker_transitions_total", "Circuit breaker state changes by dependency and new state",
+    ["dependency", "state"])
+DEPENDENCY_REJECTIONS = counter(
+    "meetgist_dependency_rejections_total",
+    "Calls refused without reaching a dependency (circuit_open, bulkhead_full)", ["dependency", "reason"])
+SINGLE_FLIGHT = counter(
+    "meetgist_single_flight_total",
+    "Coalesced computations by role (leader, waiter in the process, remote_waiter in another, timeout)",
+    ["role"])
@@ -0,0 +1,166 @@
+"""
+Slack delivery of meeting summaries through the notifications table.
+
+The table is an outbox: a summary is queued in the transaction that saves
+it (DatabaseManager.save_meeting or enqueue_notification) and this
+dispatcher delivers it later, off the request or job that produced it. A
+queued row waits SLACK_DIGEST_WINDOW seconds; everything queued for a
+channel by then goes out as one digest message, so a bulk import costs a
+few Slack calls instead of one per meeting. Failed deliveries are retried
+with exponential backoff up to SLACK_MAX_ATTEMPTS, and rows claimed by a
+process that died are picked up again once their lease runs out. While
+Slack's circuit breaker is open nothing is claimed, so notifications stay
+queued until it recovers.
+"""
+import logging
+import os
+import random
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from . import metrics, tracing
+
+PENDING = "pending"
+SENT = "sent"
+FAILED = "failed"
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationDispatcher:
+    """Claims due notifications, posts them per channel and records the outcome."""
+
+    def __init__(self, db, notifier, window: Optional[float] = None, poll_interval: Optional[float] = None,
+                 max_attempts: Optional[int] = None, batch_size: int = 50, lease_seconds: int = 120,
+                 backoff_base: float = 5.0, backoff_max: float = 600.0):
+        self.db = db
+        self.notifier = notifier
+        self.window = int(window if window is not None else os.getenv("SLACK_DIGEST_WINDOW", "30"))
+        self.poll_interval = float(poll_interval if poll_interval is not None
+                                   else os.getenv("SLACK_DISPATCH_INTERVAL", "5"))
+        self.max_attempts = int(max_attempts if max_attempts is not None else os.getenv("SLACK_MAX_ATTEMPTS", "5"))
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # Meetings per digest message, within what the notifier can format
+        self.digest_size = getattr(notifier, "digest_max_meetings", 20)
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def channel(self) -> str:
+        return self.notifier.channel
+
+    def enqueue(self, transcript_id: str, meeting_title: str, summary: Dict[str, Any],
+                summary_id: str, channel: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Queue a saved summary for delivery after the digest window."""
+        payload = {
+            "meeting_title": meeting_title,
+            "summary_text": summary["summary_text"],
+            "key_decisions": summary.get("key_decisions"),
+            "action_items": summary.get("action_items")
+        }
+        row = self.db.enqueue_notification(transcript_id, channel or self.channel, summary_id, payload,
+                                           delay=self.window)
+        self.start()
+        return row
+
+    def start(self) -> None:
+        """Start the background delivery thread, once per process."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="meetgist-notifications", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def wake(self) -> None:
+        """Check for due notifications now instead of at the next poll."""
+        self._wake.set()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                # Keep going while claims come back full
+                while self.run_once()["claimed"] >= self.batch_size and not self._stop.is_set():
+                    pass
+            except Exception as e:
+                metrics.ERRORS.inc(component="notifications")
+                logger.exception("Notification dispatch failed: %s", e)
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def run_once(self) -> Dict[str, int]:
+        """Claim and deliver one batch of due notifications."""
+        stats = {"claimed": 0, "messages": 0, "sent": 0, "retried": 0, "failed": 0}
+        resilience = getattr(self.notifier, "resilience", None)
+        if resilience is not None and not resilience.available:
+            # Slack's circuit is open: leave everything queued, without using
+            # up attempts, until the breaker lets a probe through
+            return stats
+
+        rows = self.db.claim_notifications(limit=self.batch_size, lease_seconds=self.lease_seconds)
+        stats["claimed"] = len(rows)
+        if not rows:
+            return stats
+
+        by_channel: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for row in rows:
+            by_channel[row["notification_channel"]].append(row)
+
+        for channel, channel_rows in by_channel.items():
+            for start in range(0, len(channel_rows), self.digest_size):
+                batch = channel_rows[start:start + self.digest_size]
+                outcome = self._deliver(channel, batch)
+                stats["messages"] += 1
+                stats[outcome] += len(batch)
+        return stats
+
+    def _deliver(self, channel: str, rows: List[Dict[str, Any]]) -> str:
+        """Post one message for rows and record the outcome; returns sent, retried or failed."""
+        meetings = [row.get("payload") or {} for row in rows]
+        with tracing.span("notifications.deliver", channel=channel, meetings=len(rows)):
+            if len(rows) == 1:
+                payload = self.notifier.meeting_summary_payload(
+                    meetings[0].get("meeting_title", "Unknown Meeting"), meetings[0], channel=channel
+                )
+            else:
+                payload = self.notifier.digest_payload(meetings, channel=channel)
+            result = self.notifier.deliver(payload)
+
+        if result["ok"]:
+            outcome, status, retry_at = "sent", SENT, None
+        elif result["retryable"] and max(row.get("attempts", 1) for row in rows) < self.max_attempts:
+            outcome, status = "retried", PENDING
+            retry_at = datetime.now(timezone.utc) + timedelta(
+                seconds=result["retry_after"] or self._backoff(max(row.get("attempts", 1) for row in rows))
+            )
+            metrics.RETRIES.inc(component="slack", reason=result["error"] or "unknown")
+        else:
+            outcome, status, retry_at = "failed", FAILED, None
+
+        for row in rows:
+            # A newer summary queued while this one was sent stays pending
+            if self.db.finish_notification(row, status, error=result["error"], retry_at=retry_at) is None:
+                logger.info("Notification for transcript %s in %s not updated: superseded or claimed again",
+                            row["transcript_id"], channel)
+        metrics.NOTIFICATIONS.inc(len(rows), status=outcome)
+        logger.log(logging.INFO if outcome == "sent" else logging.WARNING, "Notifications for %s: %d %s%s",
+                   channel, len(rows), outcome, f" ({result['error']})" if result["error"] else "")
+        return outcome
+
+    def _backoff(self, attempts: int) -> float:
+        """Exponential backoff with jitter, so retries from many rows don't align."""
+        delay = min(self.backoff_base * 2 ** (attempts - 1), self.backoff_max)
+        return delay * random.uniform(0.5, 1.0)
@@ -0,0 +1,327 @@
+"""
+The ingest -> summarize -> notify steps shared by the API and background jobs.
+
+Each function takes the ServiceContainer so it uses the process-wide
+clients, and raises on failure so a job records the error. A new meeting
+is summarized before it is saved, so its transcript, summary and pending
+notification are written in one transaction (DatabaseManager.save_meeting)
+and running the same meeting again changes nothing.
+"""
+import os
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlencode
+from . import events
+from .chunking import content_hash
+from .db import transcript_hash
+from .jobs import Pending, current_job
+from .utils import get_unique_filename
+
+
+def _stages(transcribe: bool, summarize: bool, notify: bool) -> List[str]:
+    """Progress stages a pipeline run goes through, in order."""
+    stages = ["transcribe", "format"] if transcribe else []
+    if summarize:
+        stages.append("summarize")
+    stages.append("save")
+    if summarize and notify:
+        stages.append("notify")
+    return stages
+
+
+def webhook_secret() -> Optional[str]:
+    """Secret AssemblyAI echoes back on webhook deliveries; the route rejects deliveries without it."""
+    return os.getenv("ASSEMBLYAI_WEBHOOK_SECRET") or None
+
+
+def webhook_url() -> Optional[str]:
+    """Public URL of the AssemblyAI webhook route; set to submit instead of polling."""
+    url = os.getenv("ASSEMBLYAI_WEBHOOK_URL") or None
+    if url and not webhook_secret():
+        # Anyone could otherwise resume jobs, spend LLM quota and post to Slack
+        raise ValueError("ASSEMBLYAI_WEBHOOK_SECRET must be set to use ASSEMBLYAI_WEBHOOK_URL")
+    return url
+
+
+def backup_path(meeting_title: str) -> str:
+    """Unique JSON backup path under transcripts/ for a meeting title."""
+    Path("transcripts").mkdir(exist_ok=True)
+    safe_title = "".join(c if c.isalnum() else "_" for c in meeting_title)
+    return get_unique_filename(f"transcripts/{safe_title}.json")
+
+
+def ingest_audio(services, audio: str, meeting_title: str, summarize: bool = False,
+                 notify: bool = False, delete_audio: bool = False) -> Dict[str, Any]:
+    """
+    Transcribe an audio file (local path or http(s) URL), save it and
+    optionally summarize and notify.
+
+    With ASSEMBLYAI_WEBHOOK_URL set, the audio is only submitted and a
+    Pending result is returned; complete_transcription() finishes the work
+    when AssemblyAI calls back.
+
+    Args:
+        services: ServiceContainer
+        audio: Local audio path or URL AssemblyAI can fetch
+        meeting_title: Title of the meeting
+        summarize: Generate and save a summary after saving the transcript
+        notify: Post the summary to Slack (requires summarize)
+        delete_audio: Remove the local audio file afterwards (e.g. an upload)
+    """
+    events.plan(*_stages(True, summarize, notify))
+    try:
+        if webhook_url():
+            return submit_audio(services, audio, meeting_title, summarize=summarize, notify=notify)
+        result = services.transcriber.transcribe(
+            audio_path=audio,
+            meeting_title=meeting_title,
+            output_path=backup_path(meeting_title)
+        )
+    finally:
+        if delete_audio and Path(audio).exists():
+            Path(audio).unlink()
+
+    return _save_audio_transcript(services, result, meeting_title, summarize, notify)
+
+
+def submit_audio(services, audio: str, meeting_title: str, summarize: bool = False,
+                 notify: bool = False) -> Pending:
+    """
+    Submit audio to AssemblyAI with a completion webhook and return at once.
+
+    Everything the webhook route needs to continue (title, options and the
+    job to resume) travels in the webhook URL's query string, so nothing
+    has to be remembered in between.
+    """
+    params = {"title": meeting_title, "summarize": int(summarize), "notify": int(notify)}
+    job = current_job()
+    if job is not None:
+        params["job_id"] = job.id
+    url = f"{webhook_url()}?{urlencode(params)}"
+
+    transcript_id = services.transcriber.submit(
+        audio,
+        webhook_url=url,
+        auth_header_value=webhook_secret()
+    )
+    return Pending(assemblyai_transcript_id=transcript_id)
+
+
+def complete_transcription(services, assemblyai_transcript_id: str, meeting_title: str,
+                           summarize: bool = False, notify: bool = False) -> Dict[str, Any]:
+    """Fetch a finished AssemblyAI transcript, then format, save, summarize and notify."""
+    events.publish("transcribe", 1.0, "Transcript ready")
+    transcript = services.transcriber.fetch(assemblyai_transcript_id)
+    result = services.transcriber.format_result(
+        transcript,
+        meeting_title=meeting_title,
+        output_path=backup_path(meeting_title)
+    )
+    return _save_audio_transcript(services, result, meeting_title, summarize, notify)
+
+
+def _save_audio_transcript(services, result: Dict[str, Any], meeting_title: str,
+                           summarize: bool, notify: bool) -> Dict[str, Any]:
+    try:
+        outcome = save_meeting(services, meeting_title, result["plain"], result["source_type"],
+                               summarize=summarize, notify=notify)
+    except RuntimeError as e:
+        raise RuntimeError(f"{e} (backup: {result.get('output_path')})")
+    outcome["output_path"] = result.get("output_path")
+    return outcome
+
+
+def save_meeting(services, meeting_title: str, content: str, source_type: str,
+                 summarize: bool = False, notify: bool = False) -> Dict[str, Any]:
+    """
+    Summarize a new meeting if asked, then save transcript, summary and a
+    pending notification in one transaction and post the summary.
+
+    If summarizing fails the transcript is still saved, then the error is
+    raised. A meeting whose summary was already posted is not posted again,
+    and a meeting saved before with a summary reuses its latest summary
+    version instead of generating one again.
+    """
+    summary = _saved_meeting_summary(services, meeting_title, content, source_type) if summarize else None
+    if summarize and summary is None:
+        try:
+            # A retried request (e.g. a Slack event) shares the summary being generated
+            summary, _ = services.flights.do(
+                f"meeting-summary:{content_hash(content, 'summary')}",
+                lambda: services.summarizer.generate_summary(transcript_data=content)
+            )
+        except Exception:
+            ingest_text(services, meeting_title, content, source_type)
+            raise
+
+    dispatcher = services.notifications if summary and notify else None
+    events.publish("save", 0.0, "Saving meeting")
+    saved = services.db.save_meeting(
+        meeting_title, content, source_type,
+        summary=summary,
+        notification_channel=dispatcher.channel if dispatcher else None,
+        notification_delay=dispatcher.window if dispatcher else 0
+    )
+    if not saved or (summary and not saved.get("summary")):
+        raise RuntimeError("Failed to save meeting to database")
+    transcript = saved["transcript"]
+    events.publish("save", 1.0, "Meeting saved", transcript_id=transcript["id"])
+
+    outcome = {"transcript_id": transcript["id"]}
+    if summary:
+        outcome.update(_summary_outcome(saved["summary"], summary))
+    if dispatcher:
+        # Queued in the same transaction; the dispatcher posts it
+        dispatcher.start()
+        outcome["notification"] = _notification_queued(saved.get("notification"))
+    return outcome
+
+
+def _saved_meeting_summary(services, meeting_title: str, content: str, source_type: str) -> Optional[Dict[str, Any]]:
+    """The latest summary of this exact meeting if it was saved before, shaped like generate_summary()'s."""
+    transcript_id = services.db.get_transcript_id_by_hash(transcript_hash(meeting_title, content, source_type))
+    saved_summary = services.db.get_summary_by_transcript_id(transcript_id) if transcript_id else None
+    if not saved_summary:
+        return None
+    events.publish("summarize", 1.0, f"Reusing saved summary version {saved_summary.get('version')}")
+    return {
+        "summary_text": saved_summary["summary_text"],
+        "key_decisions": saved_summary.get("key_decisions"),
+        "action_items": saved_summary.get("action_items"),
+        "usage": {"input_tokens": 0, "output_tokens": 0}
+    }
+
+
+def ingest_text(services, meeting_title: str, content: str, source_type: str = "text") -> Dict[str, Any]:
+    """Save a text transcript and return the stored row."""
+    events.publish("save", 0.0, "Saving transcript")
+    saved = services.db.save_transcript(title=meeting_title, content=content, source_type=source_type)
+    if not saved:
+        raise RuntimeError("Failed to save transcript to database")
+    events.publish("save", 1.0, "Transcript saved", transcript_id=saved["id"])
+    return saved
+
+
+def process_text(services, meeting_title: str, content: str, summarize: bool = True,
+                 notify: bool = False, source_type: str = "text") -> Dict[str, Any]:
+    """Save a text transcript and optionally summarize and notify, as one job."""
+    events.plan(*_stages(False, summarize, notify))
+    return save_meeting(services, meeting_title, content, source_type, summarize=summarize, notify=notify)
+
+
+def summarize_transcript(services, transcript_id: str, transcript: Optional[Dict[str, Any]] = None,
+                         notify: bool = False) -> Dict[str, Any]:
+    """Generate, save (as a new summary version) and optionally post the summary of a stored transcript."""
+    events.plan(*_stages(False, True, notify))
+    transcript = transcript or services.db.get_transcript_by_id(transcript_id)
+    if not transcript:
+        raise LookupError(f"Transcript {transcript_id} not found")
+
+    try:
+        saved_summary, summary, shared = summary_version(services, transcript_id, transcript)
+    except Exception as e:
+        saved_summary = services.db.get_summary_by_transcript_id(transcript_id) if _llm_unavailable(e) else None
+        if not saved_summary:
+            raise
+        return _saved_summary_outcome(services, transcript_id, transcript, saved_summary, e, notify)
+
+    outcome = _summary_outcome(saved_summary, summary)
+    if shared:
+        # The tokens were spent, and counted, by the request that generated it
+        outcome["usage"] = {"input_tokens": 0, "output_tokens": 0}
+        outcome["coalesced"] = True
+    if notify:
+        notification = services.notifications.enqueue(
+            transcript_id, transcript["meeting_title"], summary, saved_summary["id"]
+        )
+        outcome["notification"] = _notification_queued(notification)
+    return outcome
+
+
+def summary_version(services, transcript_id: str,
+                    transcript: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any], bool]:
+    """
+    Generate and save a new summary version of a stored transcript.
+
+    Concurrent requests for the same transcript content, in this process or
+    another, share one generation and one saved version (see single_flight.py).
+
+    Returns:
+        (saved summary row, generated summary, whether it was shared from another request)
+    """
+    def generate() -> Dict[str, Any]:
+        summary = services.summarizer.generate_summary(
+            transcript_data=transcript["content"],
+            transcript_id=transcript_id
+        )
+        events.publish("save", 0.0, "Saving summary")
+        saved_summary = services.db.save_summary(
+            transcript_id=transcript_id,
+            summary_text=summary["summary_text"],
+            key_decisions=summary["key_decisions"],
+            action_items=summary["action_items"]
+        )
+        if not saved_summary:
+            raise RuntimeError("Failed to save summary to database")
+        return {"saved_summary": saved_summary, "summary": summary}
+
+    key = f"summary:{transcript_id}:{content_hash(transcript['content'], 'summary')}"
+    flight, shared = services.flights.do(key, generate)
+    saved_summary = flight["saved_summary"]
+    if shared:
+        events.publish("summarize", 1.0, "Summary generated by a concurrent request", coalesced=True)
+    events.publish("save", 1.0, f"Summary version {saved_summary.get('version')} saved")
+    return saved_summary, flight["summary"], shared
+
+
+def _summary_outcome(saved_summary: Dict[str, Any], summary: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "summary_id": saved_summary["id"],
+        "summary_version": saved_summary.get("version"),
+        "summary_text": summary["summary_text"],
+        "key_decisions": summary["key_decisions"],
+        "action_items": summary["action_items"],
+        "usage": {"input_tokens": summary["usage"]["input_tokens"], "output_tokens": summary["usage"]["output_tokens"]}
+    }
+
+
+def _llm_unavailable(error: Exception) -> bool:
+    """Whether summarizing failed because the LLM service is down, not because of the transcript."""
+    import requests
+    from .llm_backends import LLMRequestError
+    from .resilience import DependencyUnavailable, counts_as_failure
+    if isinstance(error, DependencyUnavailable):
+        return True
+    return isinstance(error, (LLMRequestError, requests.RequestException)) and counts_as_failure(error)
+
+
+def _saved_summary_outcome(services, transcript_id: str, transcript: Dict[str, Any],
+                           saved_summary: Dict[str, Any], error: Exception, notify: bool) -> Dict[str, Any]:
+    """Fallback while the LLM is unavailable: the latest saved summary version, marked stale."""
+    message = f"Summary service unavailable, serving saved version {saved_summary.get('version')}"
+    print(f"{message} of {transcript_id}: {error}")
+    events.publish("summarize", 1.0, message, stale=True)
+    events.publish("save", 1.0, "Nothing to save")
+
+    outcome = _summary_outcome(saved_summary, {**saved_summary, "usage": {"input_tokens": 0, "output_tokens": 0}})
+    outcome["stale"] = True
+    outcome["stale_reason"] = str(error)
+    if notify:
+        # The outbox skips a version that was already posted
+        notification = services.notifications.enqueue(
+            transcript_id, transcript["meeting_title"], saved_summary, saved_summary["id"]
+        )
+        outcome["notification"] = _notification_queued(notification)
+    return outcome
+
+
+def _notification_queued(notification: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Report the queued notification's status as the notify stage."""
+    status = (notification or {}).get("status")
+    if status == "sent":
+        events.publish("notify", 1.0, "Summary was already posted", status=status)
+    elif status:
+        events.publish("notify", 1.0, "Summary queued for Slack", status=status)
+    else:
+        events.publish("notify", 1.0, "Failed to queue Slack notification")
+    return status
@@ -0,0 +1,224 @@
+import logging
+import os
+import re
+import threading
+from typing import Dict, Any, Callable, List, Optional
+from .chunking import split_turns
+
+# Context window (input + output) and output cap per watsonx model
+MODEL_LIMITS = {
+    "ibm/granite-3-8b-instruct": {"context_tokens": 131072, "max_output_tokens": 8192},
+    "google/flan-ul2": {"context_tokens": 4096, "max_output_tokens": 4096},
+}
+DEFAULT_LIMITS = {"context_tokens": 4096, "max_output_tokens": 1024}
+
+# Hugging Face tokenizer matching each model, used when available locally
+MODEL_TOKENIZERS = {
+    "ibm/granite-3-8b-instruct": "ibm-granite/granite-3.0-8b-instruct",
+    "google/flan-ul2": "google/flan-ul2",
+}
+
+logger = logging.getLogger(__name__)
+
+# Models whose missing tokenizer was already reported
+_estimated_models = set()
+_estimated_lock = threading.Lock()
+
+# Tokens kept free for special tokens and tokenizer mismatch with the server
+SAFETY_MARGIN = 64
+
+FILLER_WORDS = re.compile(r"\b(?:um+|uh+|erm+|uh-huh|mm-hmm|hmm+)\b[,.]?\s*", re.IGNORECASE)
+BACKCHANNEL = re.compile(
+    r"^(?:yeah|yes|yep|okay|ok|right|sure|mm-hmm|uh-huh|thanks|thank you|great|cool|"
+    r"sorry|go ahead|crosstalk|inaudible)[.!?,]*$",
+    re.IGNORECASE
+)
+GREETING = re.compile(
+    r"^(?:hi|hello|hey|good (?:morning|afternoon|evening))(?: (?:everyone|all|everybody|there))?[.!,]*$",
+    re.IGNORECASE
+)
+SPEAKER_PREFIX = re.compile(r"^([^:\n]{1,40}):\s*(.*)$", re.DOTALL)
+WORD_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+class TokenCounter:
+    """Count tokens with the model's tokenizer, or a close estimate when it isn't installed."""
+
+    def __init__(self, model_id: str):
+        self.model_id = model_id
+        self._tokenizer = None
+        self._tokenizer_loaded = False
+
+    @property
+    def tokenizer(self):
+        """The local tokenizer, loaded on first use since importing transformers takes seconds."""
+        if not self._tokenizer_loaded:
+            self._tokenizer = self._load_tokenizer(self.model_id)
+            self._tokenizer_loaded = True
+        return self._tokenizer
+
+    def count(self, text: str) -> int:
+        """Return the number of tokens in the text."""
+        if not text:
+            return 0
+        if self.tokenizer is not None:
+            return len(self.tokenizer.encode(text, add_special_tokens=False))
+        return self._estimate(text)
+
+    def _load_tokenizer(self, model_id: str):
+        """Load a local tokenizer without touching the network."""
+        name = os.getenv("LLM_TOKENIZER_PATH") or MODEL_TOKENIZERS.get(model_id)
+        if not name:
+            return None
+        try:
+            from transformers import AutoTokenizer
+        except ImportError:
+            _report_estimate(model_id, "transformers is not installed (the tokenizers extra)")
+            return None
+        try:
+            return AutoTokenizer.from_pretrained(name, local_files_only=True)
+        except Exception as e:
+            _report_estimate(model_id, f"tokenizer {name} is not available locally: {e}")
+            return None
+
+    def _estimate(self, text: str) -> int:
+        """Approximate BPE tokenization: one token per ~4 characters of each word piece."""
+        return sum((len(piece) + 3) // 4 for piece in WORD_PIECES.findall(text))
+
+
+def _report_estimate(model_id: str, reason: str) -> None:
+    """Warn, once per model and process, that its prompts are sized with the character estimate."""
+    with _estimated_lock:
+        if model_id in _estimated_models:
+            return
+        _estimated_models.add(model_id)
+    logger.warning("Estimating %s token counts from characters: %s", model_id, reason)
+
+
+class PromptBuilder:
+    """Fit transcripts into a model's context window and size the generation budget."""
+
+    def __init__(self, model_id: str, counter: Optional[TokenCounter] = None):
+        self.model_id = model_id
+        self.counter = counter or TokenCounter(model_id)
+
+        limits = MODEL_LIMITS.get(model_id, DEFAULT_LIMITS)
+        self.context_tokens = int(os.getenv("LLM_CONTEXT_TOKENS", limits["context_tokens"]))
+        self.max_output_tokens = limits["max_output_tokens"]
+
+    def build(
+        self,
+        template: Callable[[str], str],
+        transcript_text: str,
+        max_new_tokens: int = 500,
+        min_new_tokens: int = 50
+    ) -> Dict[str, Any]:
+        """
+        Render a prompt that fits the context window.
+
+        Args:
+            template: Function rendering the prompt around the transcript text
+            transcript_text: Transcript (or notes) to embed in the prompt
+            max_new_tokens: Upper bound for the answer length
+            min_new_tokens: Lower bound for the answer length
+
+        Returns:
+            Dictionary with the prompt, its token count and the generation budget
+        """
+        max_new_tokens = min(max_new_tokens, self.max_output_tokens)
+        overhead = self.counter.count(template(""))
+        budget = self.context_tokens - overhead - max_new_tokens - SAFETY_MARGIN
+
+        fitted = self.fit(transcript_text, budget)
+        prompt = template(fitted)
+        input_tokens = self.counter.count(prompt)
+
+        # Never ask for more output than the window has room for
+        available = self.context_tokens - input_tokens - SAFETY_MARGIN
+        max_new_tokens = max(min(max_new_tokens, available), 1)
+
+        return {
+            "prompt": prompt,
+            "input_tokens": input_tokens,
+            "max_new_tokens": max_new_tokens,
+            "min_new_tokens": min(min_new_tokens, max_new_tokens),
+            "trimmed": fitted != transcript_text
+        }
+
+    def output_budget(self, text: str, floor: int = 150, ceiling: int = 500) -> int:
+        """Scale the answer length with the amount of transcript being summarized."""
+        return max(floor, min(ceiling, self.counter.count(text) // 8))
+
+    def fit(self, text: str, budget: int) -> str:
+        """Shrink text to the token budget: drop filler first, then omit middle turns."""
+        if self.counter.count(text) <= budget:
+            return text
+
+        text = compress_filler(text)
+        if self.counter.count(text) <= budget:
+            return text
+
+        return self._truncate_middle(text, budget)
+
+    def _truncate_middle(self, text: str, budget: int) -> str:
+        """Keep the opening and closing turns, where agendas and wrap-ups usually are."""
+        turns = split_turns(text)
+        costs = [self.counter.count(turn) + 1 for turn in turns]
+        marker_cost = 16
+
+        head, tail = [], []
+        used = marker_cost
+        i, j = 0, len(turns) - 1
+        take_head = True
+
+        while i <= j:
+            index = i if take_head else j
+            if used + costs[index] > budget:
+                break
+            used += costs[index]
+            if take_head:
+                head.append(turns[i])
+                i += 1
+            else:
+                tail.insert(0, turns[j])
+                j -= 1
+            take_head = not take_head
+
+        omitted = j - i + 1
+        if omitted <= 0:
+            return "\n\n".join(head + tail)
+        return "\n\n".join(head + [f"[... {omitted} turns omitted ...]"] + tail)
+
+
+def compress_filler(text: str) -> str:
+    """
+    Remove low-information content from a formatted transcript.
+
+    Drops filler words, backchannel turns ("Yeah.", "Okay."), repeated
+    greetings and crosstalk markers, and merges consecutive turns by the
+    same speaker.
+    """
+    turns: List[List[str]] = []
+    greeted = set()
+
+    for turn in split_turns(text):
+        match = SPEAKER_PREFIX.match(turn)
+        speaker, body = (match.group(1), match.group(2)) if match else ("", turn)
+
+        body = FILLER_WORDS.sub("", body)
+        body = re.sub(r"\[(?:crosstalk|inaudible)\]", "", body, flags=re.IGNORECASE)
+        body = re.sub(r"\s{2,}", " ", body).strip()
+
+        if not body or BACKCHANNEL.match(body):
+            continue
+        if GREETING.match(body):
+            if speaker in greeted:
+                continue
+            greeted.add(speaker)
+
+        if turns and turns[-1][0] == speaker:
+            turns[-1][1] += " " + body
+        else:
+            turns.append([speaker, body])
+
+    return "\n\n".join(f"{speaker}: {body}" if speaker else body for speaker, body in turns)
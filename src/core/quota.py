@@ -0,0 +1,286 @@
+"""
+Quota-aware scheduling of LLM requests.
+
+watsonx projects have per-minute request and token quotas; a map-reduce
+summary or a synthetic corpus run fans out into enough concurrent prompts
+to exceed them, and every 429 that follows is retried into the same wall.
+Each WatsonxBackend request is therefore admitted by the process-wide
+QuotaScheduler (scheduler("watsonx")), which
+
+- spends from two token buckets, WATSONX_REQUESTS_PER_MINUTE and
+  WATSONX_TOKENS_PER_MINUTE (prompt tokens plus max_new_tokens up front,
+  corrected to the tokens actually used once the response is in);
+- limits concurrent requests adaptively (AIMD): the limit grows by one
+  per limit's worth of successful requests, up to WATSONX_MAX_CONCURRENCY,
+  and halves on a 429 or a request slower than WATSONX_LATENCY_TARGET.
+  A 429's Retry-After also pauses admission;
+- admits waiting interactive requests (the Streamlit app, API requests
+  answered inline) before batch ones (jobs, digests, synthetic corpora).
+
+Quotas are per project but the buckets are per process: with several
+API or worker processes, divide the quotas between them.
+"""
+import contextvars
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, Optional
+from . import metrics
+from .resilience import DependencyUnavailable, acquire_off_loop
+
+INTERACTIVE = 0
+BATCH = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+logger = logging.getLogger(__name__)
+
+_priority: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("meetgist_priority", default=None)
+
+
+@contextmanager
+def priority(level: int):
+    """Schedule the LLM requests made inside the block at level (INTERACTIVE or BATCH)."""
+    token = _priority.set(level)
+    try:
+        yield level
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> int:
+    """The explicit priority of this context; otherwise BATCH inside a job, INTERACTIVE elsewhere."""
+    level = _priority.get()
+    if level is not None:
+        return level
+    from .jobs import current_job
+    return BATCH if current_job() is not None else INTERACTIVE
+
+
+class QuotaExceeded(DependencyUnavailable):
+    """A request waited longer than the scheduler's max_wait to be admitted."""
+
+
+class TokenBucket:
+    """Refills rate_per_minute units per minute up to capacity; 0 disables the bucket."""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount can be spent (a request larger than capacity waits for a full bucket)."""
+        if not self.enabled:
+            return 0.0
+        self._refill(now)
+        needed = min(amount, self.capacity)
+        return 0.0 if self.level >= needed else (needed - self.level) / self.rate
+
+    def spend(self, amount: float, now: float) -> None:
+        """Take amount out; the level may go negative, which later requests wait off."""
+        if self.enabled:
+            self._refill(now)
+            self.level -= amount
+
+    def available(self, now: float) -> float:
+        self._refill(now)
+        return self.level
+
+    def refund(self, amount: float) -> None:
+        if self.enabled:
+            self.level = min(self.capacity, self.level + amount)
+
+
+class Ticket:
+    """An admitted request; settle() corrects its token reservation to the tokens it used."""
+
+    def __init__(self, tokens: int, level: int, started: float):
+        self.tokens = tokens
+        self.priority = level
+        self.started = started
+        self.used: Optional[int] = None
+
+    def settle(self, tokens_used: int) -> None:
+        self.used = tokens_used
+
+
+class QuotaScheduler:
+    """Admits requests by priority within request/token quotas and an AIMD concurrency limit."""
+
+    def __init__(self, name: str, requests_per_minute: float = 0, tokens_per_minute: float = 0,
+                 max_concurrency: int = 8, min_concurrency: int = 1, latency_target: float = 0,
+                 max_wait: float = 600):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min(min_concurrency, max_concurrency)
+        self.limit = float(max_concurrency)
+        self.latency_target = latency_target
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self.throttled = 0
+        self.paused_until = 0.0
+        self._decreased_at = 0.0
+        self._waiting: list = []
+        self._order = itertools.count()
+        self._cond = threading.Condition()
+
+    @classmethod
+    def from_env(cls, name: str) -> "QuotaScheduler":
+        prefix = name.upper()
+        return cls(
+            name,
+            requests_per_minute=float(os.getenv(f"{prefix}_REQUESTS_PER_MINUTE", "0")),
+            tokens_per_minute=float(os.getenv(f"{prefix}_TOKENS_PER_MINUTE", "0")),
+            max_concurrency=int(os.getenv(f"{prefix}_MAX_CONCURRENCY", "8")),
+            min_concurrency=int(os.getenv(f"{prefix}_MIN_CONCURRENCY", "1")),
+            latency_target=float(os.getenv(f"{prefix}_LATENCY_TARGET", "0")),
+            max_wait=float(os.getenv(f"{prefix}_QUOTA_WAIT", "600"))
+        )
+
+    def acquire(self, tokens: int = 0, level: Optional[int] = None) -> Ticket:
+        """
+        Wait until this request is first in line (by priority, then arrival)
+        and within the concurrency limit and both quotas, then spend its quota.
+        """
+        level = current_priority() if level is None else level
+        entry = (level, next(self._order))
+        deadline = time.monotonic() + self.max_wait
+        with self._cond:
+            heapq.heappush(self._waiting, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = self._admission_wait(entry, tokens, now)
+                    if wait == 0:
+                        break
+                    if now >= deadline:
+                        metrics.DEPENDENCY_REJECTIONS.inc(dependency=self.name, reason="quota_wait")
+                        raise QuotaExceeded(self.name, f"not admitted within {self.max_wait:g}s")
+                    # None: woken by a release; otherwise a bucket refills or a pause ends
+                    self._cond.wait(min(deadline - now, wait) if wait is not None else deadline - now)
+                heapq.heappop(self._waiting)
+            except BaseException:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+                raise
+            self.requests.spend(1, now)
+            self.tokens.spend(tokens, now)
+            self.in_flight += 1
+            # The next in line may fit too
+            self._cond.notify_all()
+        return Ticket(tokens, level, now)
+
+    def _admission_wait(self, entry, tokens: int, now: float) -> Optional[float]:
+        """0 when entry may go now, seconds to wait for quota or a pause, None to wait for a release."""
+        if self._waiting[0] != entry or self.in_flight >= int(self.limit):
+            return None
+        return max(self.paused_until - now, self.requests.wait_time(1, now), self.tokens.wait_time(tokens, now), 0)
+
+    def release(self, ticket: Ticket, error: Optional[BaseException] = None) -> None:
+        """Free the ticket's slot, settle its tokens and adapt the limit to how it went."""
+        now = time.monotonic()
+        status = getattr(error, "status_code", None)
+        with self._cond:
+            self.in_flight -= 1
+            if ticket.used is not None:
+                self.tokens.refund(ticket.tokens - ticket.used)
+            if status == 429:
+                self.throttled += 1
+                retry_after = getattr(error, "retry_after", None)
+                if retry_after:
+                    self.paused_until = max(self.paused_until, now + retry_after)
+                self._decrease(ticket, "throttled")
+            elif self.latency_target and now - ticket.started > self.latency_target:
+                self._decrease(ticket, "slow")
+            elif error is None:
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+            elif isinstance(error, DependencyUnavailable):
+                # Refused before it was sent (circuit open, bulkhead full)
+                self.requests.refund(1)
+                self.tokens.refund(ticket.tokens)
+            self._cond.notify_all()
+
+    def _decrease(self, ticket: Ticket, reason: str) -> None:
+        # Requests sent before the last decrease saw the old limit; halving
+        # again for each of them would collapse the limit on one burst
+        if ticket.started < self._decreased_at:
+            return
+        self.limit = max(float(self.min_concurrency), self.limit / 2)
+        self._decreased_at = time.monotonic()
+        metrics.RETRIES.inc(component=f"{self.name}_limiter", reason=reason)
+        logger.warning("%s concurrency limit lowered to %d (%s)", self.name, int(self.limit), reason)
+
+    @contextmanager
+    def slot(self, tokens: int = 0, level: Optional[int] = None):
+        """acquire() around a block, releasing with the block's outcome; yields the Ticket."""
+        ticket = self.acquire(tokens, level)
+        try:
+            yield ticket
+        except BaseException as e:
+            self.release(ticket, e)
+            raise
+        else:
+            self.release(ticket)
+
+    @asynccontextmanager
+    async def aslot(self, tokens: int = 0, level: Optional[int] = None):
+        """slot() for coroutines: the wait for admission happens off the event loop."""
+        ticket = await acquire_off_loop(self.acquire, self.release, tokens, level)
+        try:
+            yield ticket
+        except BaseException as e:
+            self.release(ticket, e)
+            raise
+        else:
+            self.release(ticket)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            waiting = [level for level, _ in self._waiting]
+            now = time.monotonic()
+            return {
+                "concurrency_limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "waiting": {name: waiting.count(level) for level, name in PRIORITY_NAMES.items()},
+                "throttled": self.throttled,
+                "paused_for": round(max(0.0, self.paused_until - now), 1),
+                "requests_available": round(self.requests.available(now), 1) if self.requests.enabled else None,
+                "tokens_available": round(self.tokens.available(now)) if self.tokens.enabled else None
+            }
+
+
+_schedulers: Dict[str, QuotaScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def scheduler(name: str) -> QuotaScheduler:
+    """The process-wide QuotaScheduler of a service, created from the environment on first use."""
+    found = _schedulers.get(name)
+    if found is None:
+        with _schedulers_lock:
+            found = _schedulers.get(name)
+            if found is None:
+                found = _schedulers[name] = QuotaScheduler.from_env(name)
+    return found
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    """State of every scheduler used so far in this process, for the health endpoint."""
+    with _schedulers_lock:
+        return {name: found.snapshot() for name, found in sorted(_schedulers.items())}
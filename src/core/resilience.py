@@ -0,0 +1,281 @@
+"""
+Timeouts, bulkheads and circuit breakers for external services.
+
+Every call to AssemblyAI, watsonx, Supabase or Slack goes through the
+Dependency of that service (dependency("watsonx") etc.), which
+
+- caps concurrent calls from the whole process (the bulkhead,
+  <NAME>_MAX_CONCURRENCY). A caller waits at most <NAME>_QUEUE_TIMEOUT
+  seconds for a slot, then gets DependencyUnavailable, so a slow service
+  can hold only its own slots and never every thread of the process;
+- gives clients the request timeout to use (<NAME>_TIMEOUT);
+- trips a circuit breaker after <NAME>_BREAKER_FAILURES consecutive
+  failures (timeouts, connection errors, 5xx and 429 responses). While
+  open, calls fail at once without touching the service. After
+  <NAME>_BREAKER_RESET_SECONDS one probe call is let through (half-open):
+  its success closes the breaker, its failure opens it again.
+
+Callers fall back where they can: summarize_transcript serves the saved
+summary, the notification dispatcher leaves notifications queued until
+Slack recovers. The state of every breaker is reported at /health.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Dict, Optional
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Per service: concurrent calls, request timeout and how long to wait for a slot
+DEFAULTS = {
+    "watsonx": {"max_concurrency": 8, "timeout": 120, "queue_timeout": 60},
+    # A transcription holds its slot while AssemblyAI processes the audio
+    "assemblyai": {"max_concurrency": 5, "timeout": 60, "queue_timeout": 600},
+    "supabase": {"max_concurrency": 10, "timeout": 30, "queue_timeout": 30},
+    "slack": {"max_concurrency": 4, "timeout": 10, "queue_timeout": 30},
+}
+
+# HTTP statuses that mean the service, not the request, is at fault
+FAILURE_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+class DependencyUnavailable(RuntimeError):
+    """A call was refused without reaching the service (breaker open or bulkhead full)."""
+
+    def __init__(self, dependency: str, reason: str, retry_after: Optional[float] = None):
+        super().__init__(f"{dependency} is unavailable: {reason}")
+        self.dependency = dependency
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def counts_as_failure(error: BaseException) -> bool:
+    """Whether an error says the service is unhealthy, rather than that the request was bad."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        response = getattr(error, "response", None)
+        status = getattr(response, "status_code", None)
+    return status is None or status in FAILURE_STATUSES
+
+
+class Attempt:
+    """One guarded call. fail() records an error the caller handled itself."""
+
+    def __init__(self):
+        self.error: Optional[BaseException] = None
+
+    def fail(self, error: BaseException) -> None:
+        self.error = error
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe."""
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.last_error: Optional[str] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now; in half-open state only the probe may."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def retry_after(self) -> float:
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            if self.state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if error is not None:
+                self.last_error = str(error)[:200]
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                self.opened_at = time.monotonic()
+                self._transition(OPEN)
+
+    def release_probe(self) -> None:
+        """Give up a probe that ended without telling anything about the service."""
+        with self._lock:
+            self._probing = False
+
+    def _transition(self, state: str) -> None:
+        logger.warning("Circuit breaker %s: %s -> %s%s", self.name, self.state, state,
+                       f" ({self.last_error})" if state == OPEN and self.last_error else "")
+        self.state = state
+        metrics.BREAKER_TRANSITIONS.inc(dependency=self.name, state=state)
+
+
+class Dependency:
+    """Resilience policy of one external service: timeout, bulkhead and circuit breaker."""
+
+    def __init__(self, name: str, max_concurrency: int, timeout: float, queue_timeout: float,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.queue_timeout = queue_timeout
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_timeout)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, name: str) -> "Dependency":
+        defaults = DEFAULTS.get(name, {"max_concurrency": 4, "timeout": 30, "queue_timeout": 30})
+        prefix = name.upper()
+        return cls(
+            name,
+            max_concurrency=int(os.getenv(f"{prefix}_MAX_CONCURRENCY", str(defaults["max_concurrency"]))),
+            timeout=float(os.getenv(f"{prefix}_TIMEOUT", str(defaults["timeout"]))),
+            queue_timeout=float(os.getenv(f"{prefix}_QUEUE_TIMEOUT", str(defaults["queue_timeout"]))),
+            failure_threshold=int(os.getenv(f"{prefix}_BREAKER_FAILURES", "5")),
+            reset_timeout=float(os.getenv(f"{prefix}_BREAKER_RESET_SECONDS", "30"))
+        )
+
+    @property
+    def available(self) -> bool:
+        """False while the breaker is open (half-open counts as available, for the probe)."""
+        return self.breaker.state != OPEN or self.breaker.retry_after() <= 0
+
+    @contextmanager
+    def call(self):
+        """
+        Guard one call: refuse it if the breaker is open or no slot frees up
+        in time, and record its outcome. Exceptions raised in the block, or
+        passed to Attempt.fail(), count as failures unless
+        counts_as_failure() says the request was at fault.
+        """
+        self._admit()
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            self._reject_full()
+        with self._outcome() as attempt:
+            yield attempt
+
+    @asynccontextmanager
+    async def acall(self):
+        """call() for coroutines: the wait for a slot happens off the event loop."""
+        self._admit()
+        try:
+            acquired = await acquire_off_loop(self._slots.acquire, lambda late: late and self._slots.release(),
+                                              True, self.queue_timeout)
+        except BaseException:
+            self.breaker.release_probe()
+            raise
+        if not acquired:
+            self._reject_full()
+        with self._outcome() as attempt:
+            yield attempt
+
+    def _admit(self) -> None:
+        if not self.breaker.allow():
+            metrics.DEPENDENCY_REJECTIONS.inc(dependency=self.name, reason="circuit_open")
+            raise DependencyUnavailable(self.name, "circuit open", retry_after=self.breaker.retry_after())
+
+    def _reject_full(self) -> None:
+        self.breaker.release_probe()
+        metrics.DEPENDENCY_REJECTIONS.inc(dependency=self.name, reason="bulkhead_full")
+        raise DependencyUnavailable(self.name, f"all {self.max_concurrency} slots busy")
+
+    @contextmanager
+    def _outcome(self):
+        """Hold an acquired slot around the call and record how it ended."""
+        attempt = Attempt()
+        with self._lock:
+            self._in_flight += 1
+        try:
+            yield attempt
+        except BaseException as e:
+            if isinstance(e, Exception) and counts_as_failure(e):
+                self.breaker.record_failure(e)
+            else:
+                self.breaker.release_probe()
+            raise
+        else:
+            if attempt.error is None:
+                self.breaker.record_success()
+            elif counts_as_failure(attempt.error):
+                self.breaker.record_failure(attempt.error)
+            else:
+                self.breaker.release_probe()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+    def snapshot(self) -> Dict[str, Any]:
+        breaker = self.breaker
+        return {
+            "state": breaker.state,
+            "consecutive_failures": breaker.failures,
+            "retry_after": round(breaker.retry_after(), 1) if breaker.state == OPEN else None,
+            "last_error": breaker.last_error,
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "timeout": self.timeout
+        }
+
+
+async def acquire_off_loop(acquire: Callable[..., Any], release: Callable[[Any], Any], *args) -> Any:
+    """
+    acquire(*args) in a thread, without blocking the event loop. If the
+    awaiting coroutine is cancelled meanwhile, release() is called with
+    what the thread acquires after all, so nothing leaks.
+    """
+    pending = asyncio.ensure_future(asyncio.to_thread(acquire, *args))
+    try:
+        return await asyncio.shield(pending)
+    except asyncio.CancelledError:
+        pending.add_done_callback(lambda done: done.cancelled() or done.exception() or release(done.result()))
+        raise
+
+
+_dependencies: Dict[str, Dependency] = {}
+_dependencies_lock = threading.Lock()
+
+
+def dependency(name: str) -> Dependency:
+    """The process-wide Dependency of a service, created from the environment on first use."""
+    dep = _dependencies.get(name)
+    if dep is None:
+        with _dependencies_lock:
+            dep = _dependencies.get(name)
+            if dep is None:
+                dep = _dependencies[name] = Dependency.from_env(name)
+    return dep
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    """State of every known dependency in this process, for the health endpoint."""
+    for name in DEFAULTS:
+        dependency(name)
+    with _dependencies_lock:
+        return {name: dep.snapshot() for name, dep in sorted(_dependencies.items())}
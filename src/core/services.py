@@ -0,0 +1,222 @@
+"""
+Process-wide shared clients.
+
+Streamlit sessions and API requests all get their transcriber, speaker
+directory, database, summarizer, Slack notifier, notification dispatcher,
+digest scheduler, synthetic generator, background job pool and CPU worker
+processes from one container, so the process holds one Supabase client,
+one IAM token and one connection pool per external API no matter how many
+users are connected.
+Each client also caps its own concurrent requests
+(ASSEMBLYAI_MAX_CONCURRENCY, WATSONX_MAX_CONCURRENCY,
+SUPABASE_MAX_CONCURRENCY, SLACK_MAX_CONCURRENCY), which makes those
+limits process-wide as well.
+"""
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+
+def _llm_backend(container: "ServiceContainer"):
+    from .llm_backends import create_backend
+    return create_backend(api_key=os.getenv("IBM_API_KEY"), project_id=os.getenv("IBM_PROJECT_ID"))
+
+
+def _transcriber(container: "ServiceContainer"):
+    from .audio_transcriber import AudioTranscriber
+    speakers = container.speakers if os.getenv("SPEAKER_NAMES", "true").lower() == "true" else None
+    return AudioTranscriber(os.getenv("ASSEMBLYAI_API_KEY"), speakers=speakers)
+
+
+def _speakers(container: "ServiceContainer"):
+    from .speakers import SpeakerDirectory
+    return SpeakerDirectory(db=container.db)
+
+
+def _db(container: "ServiceContainer"):
+    from .db import DatabaseManager
+    return DatabaseManager()
+
+
+def _summarizer(container: "ServiceContainer"):
+    from .meeting_summarizer import MeetingSummarizer
+    return MeetingSummarizer(
+        api_key=os.getenv("IBM_API_KEY"),
+        project_id=os.getenv("IBM_PROJECT_ID"),
+        backend=container.llm_backend,
+        cpu=container.cpu
+    )
+
+
+def _slack_notifier(container: "ServiceContainer"):
+    from ..api.integrations.slack.notifier import SlackNotifier
+    return SlackNotifier()
+
+
+def _notifications(container: "ServiceContainer"):
+    from .notifications import NotificationDispatcher
+    return NotificationDispatcher(db=container.db, notifier=container.slack_notifier)
+
+
+def _digests(container: "ServiceContainer"):
+    from .digests import DigestScheduler
+    return DigestScheduler(db=container.db, notifier=container.slack_notifier, backend=container.llm_backend)
+
+
+def _synthetic_generator(container: "ServiceContainer"):
+    from ..synthetic.meeting_generator import SyntheticMeetingGenerator
+    return SyntheticMeetingGenerator(
+        api_key=os.getenv("IBM_API_KEY"),
+        project_id=os.getenv("IBM_PROJECT_ID"),
+        backend=container.llm_backend
+    )
+
+
+def _jobs(container: "ServiceContainer"):
+    # "queue" shares jobs through the database with run_worker.py processes
+    if os.getenv("JOB_BACKEND", "memory").lower() == "queue":
+        from .job_queue import QueueJobManager
+        return QueueJobManager(db=container.db)
+    from .jobs import JobManager
+    return JobManager(max_workers=int(os.getenv("JOB_WORKERS", "4")))
+
+
+def _flights(container: "ServiceContainer"):
+    from .single_flight import SingleFlight
+    # Coalesce across processes through the flights table, or only within this one
+    shared = os.getenv("SINGLE_FLIGHT_SHARED", "true").lower() == "true"
+    return SingleFlight(db=container.db if shared else None)
+
+
+def _cpu(container: "ServiceContainer"):
+    from .workers import CpuPool
+    return CpuPool()
+
+
+DEFAULT_FACTORIES: Dict[str, Callable[["ServiceContainer"], Any]] = {
+    "llm_backend": _llm_backend,
+    "transcriber": _transcriber,
+    "speakers": _speakers,
+    "db": _db,
+    "summarizer": _summarizer,
+    "slack_notifier": _slack_notifier,
+    "notifications": _notifications,
+    "digests": _digests,
+    "synthetic_generator": _synthetic_generator,
+    "jobs": _jobs,
+    "cpu": _cpu,
+    "flights": _flights,
+}
+
+
+class ServiceContainer:
+    """Builds each service once, on first use, and shares it between threads."""
+
+    def __init__(self, factories: Optional[Dict[str, Callable[["ServiceContainer"], Any]]] = None):
+        self._factories = dict(DEFAULT_FACTORIES)
+        self._factories.update(factories or {})
+        self._instances: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Any:
+        """Return the shared instance, building it if this is the first request."""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        if name not in self._factories:
+            raise KeyError(f"Unknown service: {name}")
+
+        with self._lock:
+            lock = self._locks.setdefault(name, threading.Lock())
+        # One lock per service, so a slow build doesn't block the others
+        with lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                instance = self._factories[name](self)
+                self._instances[name] = instance
+        return instance
+
+    def register(self, name: str, factory: Callable[["ServiceContainer"], Any]) -> None:
+        """Replace how a service is built (e.g. with a stub), dropping any built instance."""
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+
+    def is_built(self, name: str) -> bool:
+        return name in self._instances
+
+    def built(self) -> List[str]:
+        return sorted(self._instances)
+
+    def reset(self) -> None:
+        """Forget all instances; they are rebuilt on next use."""
+        with self._lock:
+            self._instances.clear()
+
+    @property
+    def llm_backend(self):
+        return self.get("llm_backend")
+
+    @property
+    def transcriber(self):
+        return self.get("transcriber")
+
+    @property
+    def speakers(self):
+        return self.get("speakers")
+
+    @property
+    def db(self):
+        return self.get("db")
+
+    @property
+    def summarizer(self):
+        return self.get("summarizer")
+
+    @property
+    def slack_notifier(self):
+        return self.get("slack_notifier")
+
+    @property
+    def notifications(self):
+        return self.get("notifications")
+
+    @property
+    def digests(self):
+        return self.get("digests")
+
+    @property
+    def synthetic_generator(self):
+        return self.get("synthetic_generator")
+
+    @property
+    def jobs(self):
+        return self.get("jobs")
+
+    @property
+    def cpu(self):
+        return self.get("cpu")
+
+    @property
+    def flights(self):
+        return self.get("flights")
+
+
+_container: Optional[ServiceContainer] = None
+_container_lock = threading.Lock()
+
+
+def get_services() -> ServiceContainer:
+    """The container shared by everything in this process."""
+    global _container
+    if _container is None:
+        with _container_lock:
+            if _container is None:
+                _container = ServiceContainer()
+    return _container
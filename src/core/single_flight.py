@@ -0,0 +1,184 @@
+"""
+Request coalescing (single flight) for expensive, identical computations.
+
+Two users clicking Generate on the same meeting at the same moment, or
+Slack retrying an event, would otherwise run the same summary prompts
+twice and save two summary versions. SingleFlight.do(key, compute) runs
+compute once per key at a time: callers in the same process that arrive
+meanwhile wait for it and share its result, or its error.
+
+With a db, flights are coalesced across processes too, through the
+flights table (see supabase/migrations). The process that holds the key's
+lease computes and records the result, which must be JSON; the others
+poll every SINGLE_FLIGHT_POLL_INTERVAL seconds until it is recorded. The
+owner renews the lease while it computes; if it dies, the lease runs out
+after SINGLE_FLIGHT_LEASE_SECONDS and a waiting process takes over. If
+the owner's computation fails, a waiting process computes for itself.
+When the table can't be reached each process computes on its own.
+
+No caller waits longer than SINGLE_FLIGHT_MAX_WAIT (three leases by
+default) for another's computation: an owner that hangs while still
+renewing its lease would otherwise block every request for the key. A
+caller that gives up computes the result itself.
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+from . import metrics
+from .resilience import DependencyUnavailable
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    """A computation in progress in this process, and its outcome once done."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+def _expired(flight: Dict[str, Any]) -> bool:
+    expires_at = flight.get("expires_at")
+    if not expires_at:
+        return True
+    return datetime.fromisoformat(expires_at.replace("Z", "+00:00")) <= datetime.now(timezone.utc)
+
+
+class SingleFlight:
+    """Runs one computation per key at a time; concurrent callers of the key share its outcome."""
+
+    def __init__(self, db=None, lease_seconds: Optional[int] = None, poll_interval: Optional[float] = None,
+                 owner: Optional[str] = None, max_wait: Optional[float] = None):
+        self.db = db
+        self.lease_seconds = int(lease_seconds if lease_seconds is not None
+                                 else os.getenv("SINGLE_FLIGHT_LEASE_SECONDS", "120"))
+        self.poll_interval = float(poll_interval if poll_interval is not None
+                                   else os.getenv("SINGLE_FLIGHT_POLL_INTERVAL", "1"))
+        self.max_wait = float(max_wait if max_wait is not None
+                              else os.getenv("SINGLE_FLIGHT_MAX_WAIT", str(3 * self.lease_seconds)))
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, compute: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        compute() once for all concurrent callers of key.
+
+        Returns:
+            (result, shared): shared is True for callers that got the result
+            of a computation another caller started
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            metrics.SINGLE_FLIGHT.inc(role="waiter")
+            if not flight.done.wait(self.max_wait):
+                return self._gave_up(key, compute)
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result, shared = self._run(key, compute)
+            return flight.result, shared
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _run(self, key: str, compute: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Compute as this process's flight of key, or wait for another process's."""
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            flight = self._begin(key)
+            if flight is None or flight["owner"] == self.owner:
+                metrics.SINGLE_FLIGHT.inc(role="leader")
+                return self._lead(key, compute, leased=flight is not None), False
+
+            metrics.SINGLE_FLIGHT.inc(role="remote_waiter")
+            finished, result = self._wait(key, deadline)
+            if finished:
+                return result, True
+            if time.monotonic() >= deadline:
+                return self._gave_up(key, compute)
+            # The owner failed or vanished; try to take the flight over
+
+    def _gave_up(self, key: str, compute: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Compute for this caller alone after waiting max_wait for another's flight of key."""
+        metrics.SINGLE_FLIGHT.inc(role="timeout")
+        logger.warning("Flight %s not done after %gs; computing it here", key, self.max_wait)
+        return compute(), False
+
+    def _begin(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.db is None:
+            return None
+        try:
+            return self.db.begin_flight(key, self.owner, self.lease_seconds)
+        except DependencyUnavailable:
+            return None
+
+    def _lead(self, key: str, compute: Callable[[], Any], leased: bool) -> Any:
+        if not leased:
+            return compute()
+
+        stop = threading.Event()
+        renewer = threading.Thread(target=self._renew, args=(key, stop), name="meetgist-flight", daemon=True)
+        renewer.start()
+        try:
+            try:
+                result = compute()
+            finally:
+                # A renewal after the outcome is recorded would mark the flight running again
+                stop.set()
+                renewer.join()
+        except Exception as e:
+            self._finish(key, "failed", error=str(e))
+            raise
+        self._finish(key, "succeeded", result=json.loads(json.dumps(result, default=str)))
+        return result
+
+    def _renew(self, key: str, stop: threading.Event) -> None:
+        while not stop.wait(self.lease_seconds / 3):
+            self._begin(key)
+
+    def _finish(self, key: str, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        try:
+            self.db.finish_flight(key, self.owner, status, result=result, error=error)
+        except DependencyUnavailable as e:
+            # Waiting processes take over once the lease runs out
+            logger.warning("Flight %s not recorded: %s", key, e)
+
+    def _wait(self, key: str, deadline: float) -> Tuple[bool, Any]:
+        """
+        Poll another process's flight until deadline; (True, result) once it
+        succeeded, (False, None) to take over or give up.
+        """
+        while time.monotonic() < deadline:
+            time.sleep(min(self.poll_interval, max(0.0, deadline - time.monotonic())))
+            try:
+                flight = self.db.get_flight(key)
+            except DependencyUnavailable:
+                return False, None
+            if flight is None or flight["status"] == "failed":
+                return False, None
+            if flight["status"] == "succeeded":
+                # A later flight of the key by a new owner would be running, not succeeded
+                return True, flight["result"]
+            if _expired(flight):
+                return False, None
+        return False, None
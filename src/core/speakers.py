@@ -0,0 +1,278 @@
+"""
+Real names for diarized speakers, learned across meetings.
+
+AssemblyAI labels speakers "Speaker A", "Speaker B", ... per recording, so
+a recurring participant is a different letter in every meeting. The
+SpeakerDirectory turns labels into names at format time, in one pass over
+the segments and without an LLM call:
+
+1. Self-introductions in the meeting ("Hi, I'm Sarah Chen", "This is
+   Mayor Thompson") name a speaker directly.
+2. Remaining speakers are matched against the text signatures of people
+   already known to the organization: a profile of the words and word
+   pairs each person tends to use, built from meetings where their name
+   was known (an introduction or a correction).
+3. Corrections made afterwards (correct()) rename the speaker in the
+   stored transcript and teach the directory that speaker's signature,
+   so the next meeting with that person resolves by itself.
+
+AssemblyAI doesn't expose voice embeddings, so signatures are text only.
+Identities are stored per organization in the speaker_identities table
+(see supabase/migrations) and cached in memory for SPEAKER_CACHE_SECONDS.
+"""
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+from . import metrics, tracing
+
+# Labels AssemblyAI (and TranscriptFormatter) give unnamed speakers
+LABEL = re.compile(r"^Speaker [A-Z]{1,2}$")
+
+# Titles kept as part of a name ("Mayor Thompson", "Dr. Patel")
+TITLES = r"(?:Mayor|Councilmember|Councilman|Councilwoman|Commissioner|Chair|Chairman|Chairwoman|Director|" \
+         r"President|Governor|Senator|Judge|Dr\.?|Prof\.?|Mr\.?|Mrs\.?|Ms\.?)"
+_NAME = rf"(?:{TITLES}\s+)?[A-Z][a-z'’-]+(?:\s+[A-Z][a-z'’-]+){{0,2}}"
+
+# Lead-ins match at the start of a sentence too; names must stay capitalized
+INTRODUCTIONS = [
+    re.compile(rf"\b(?i:I'm|I am|my name is|my name's)\s+(?P<name>{_NAME})"),
+    re.compile(rf"\b(?i:this is|it's)\s+(?P<name>{_NAME})\s+(?:here|speaking|from|with|on the line)\b"),
+]
+
+# Capitalized words that follow "I'm" without being a name
+NOT_NAMES = {
+    "sorry", "sure", "happy", "glad", "going", "not", "just", "here", "back", "fine", "good", "great", "excited",
+    "afraid", "concerned", "curious", "thinking", "looking", "trying", "working", "hoping", "also", "really",
+    "still", "okay", "ok", "new", "pleased", "thrilled", "confident", "worried", "aware", "done", "ready",
+    "speaker", "the", "on", "in", "with", "from", "at", "so", "very", "all", "a", "an",
+    "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"
+}
+
+STOPWORDS = set("""
+a about above after again against all am an and any are as at be because been before being below between both but
+by can could did do does doing down during each few for from further had has have having he her here hers herself
+him himself his how i if in into is it its itself just let me more most my myself no nor not now of off on once
+only or other our ours ourselves out over own same she should so some such than that the their theirs them
+themselves then there these they this those through to too under until up very was we were what when where which
+while who whom why will with would you your yours yourself yourselves yeah yes okay ok um uh like think know going
+get got really right well also one two go see thing things lot kind sort gonna wanna
+""".split())
+
+# Features kept per signature, and the minimum words a speaker needs to be matched
+SIGNATURE_FEATURES = 300
+MIN_MATCH_WORDS = 40
+
+
+def is_label(speaker: str) -> bool:
+    """True for an anonymous diarization label such as "Speaker B"."""
+    return bool(LABEL.match(speaker or ""))
+
+
+def name_key(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+def find_introduction(texts: Iterable[str], turns: int = 3) -> Optional[str]:
+    """The name a speaker introduces themselves with in their first few turns, if any."""
+    for text in list(texts)[:turns]:
+        for pattern in INTRODUCTIONS:
+            match = pattern.search(text[:300])
+            if not match:
+                continue
+            words = match.group("name").split()
+            # "I'm Sure", "I'm Happy to ..." and the like
+            while words and words[-1].lower() in NOT_NAMES:
+                words.pop()
+            if words and words[0].lower() not in NOT_NAMES:
+                return " ".join(words)
+    return None
+
+
+def signature(texts: Iterable[str]) -> Dict[str, float]:
+    """Word and word-pair counts of a speaker's turns, without stopwords."""
+    counts: Counter = Counter()
+    for text in texts:
+        words = [w for w in re.findall(r"[a-z][a-z'-]+", text.lower()) if w not in STOPWORDS]
+        counts.update(words)
+        counts.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return dict(counts.most_common(SIGNATURE_FEATURES))
+
+
+def merge_signatures(old: Dict[str, float], new: Dict[str, float], decay: float = 0.9) -> Dict[str, float]:
+    """Add a meeting to a signature, fading older meetings so it follows how a person speaks now."""
+    merged = Counter({feature: weight * decay for feature, weight in old.items()})
+    merged.update(new)
+    return {feature: round(weight, 3) for feature, weight in merged.most_common(SIGNATURE_FEATURES)}
+
+
+def similarity(a: Dict[str, float], b: Dict[str, float]) -> float:
+    """Cosine similarity of two signatures (0..1)."""
+    if not a or not b:
+        return 0.0
+    dot = sum(weight * b.get(feature, 0.0) for feature, weight in a.items())
+    norm = math.sqrt(sum(w * w for w in a.values())) * math.sqrt(sum(w * w for w in b.values()))
+    return dot / norm if norm else 0.0
+
+
+def turns_by_speaker(segments: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    turns: Dict[str, List[str]] = defaultdict(list)
+    for segment in segments:
+        text = (segment.get("text") or "").strip()
+        if text:
+            turns[segment.get("speaker", "Unknown Speaker")].append(text)
+    return turns
+
+
+def parse_turns(text: str) -> List[Dict[str, Any]]:
+    """Segments ("speaker", "text") of formatted "Name: text" transcript content."""
+    segments = []
+    for block in re.split(r"\n\s*\n", text):
+        speaker, sep, body = block.strip().partition(": ")
+        if sep and speaker and len(speaker) <= 60 and "\n" not in speaker:
+            segments.append({"speaker": speaker, "text": body})
+        elif segments:
+            segments[-1]["text"] += "\n" + block.strip()
+    return segments
+
+
+def rename(text: str, mapping: Dict[str, str]) -> str:
+    """Replace speaker labels at the start of each turn, in one pass."""
+    if not mapping:
+        return text
+    pattern = re.compile(r"^(" + "|".join(re.escape(label) for label in sorted(mapping, key=len, reverse=True))
+                         + r"):", re.M)
+    return pattern.sub(lambda m: f"{mapping[m.group(1)]}:", text)
+
+
+class SpeakerDirectory:
+    """Known speakers of one organization and the logic that names diarized speakers."""
+
+    def __init__(self, db=None, organization: Optional[str] = None, threshold: Optional[float] = None,
+                 margin: float = 0.05, cache_seconds: Optional[float] = None):
+        self.db = db
+        self.organization = organization or os.getenv("MEETGIST_ORGANIZATION", "default")
+        self.threshold = float(threshold if threshold is not None else os.getenv("SPEAKER_MATCH_THRESHOLD", "0.35"))
+        self.margin = margin
+        self.cache_seconds = float(cache_seconds if cache_seconds is not None
+                                   else os.getenv("SPEAKER_CACHE_SECONDS", "300"))
+        self._identities: Optional[Dict[str, Dict[str, Any]]] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def identities(self) -> Dict[str, Dict[str, Any]]:
+        """Known identities by name key, from the cache or the database."""
+        with self._lock:
+            if self._identities is not None and time.monotonic() - self._loaded_at < self.cache_seconds:
+                metrics.CACHE_LOOKUPS.inc(cache="speakers", result="hit")
+                return self._identities
+        metrics.CACHE_LOOKUPS.inc(cache="speakers", result="miss")
+
+        rows = self.db.get_speaker_identities(self.organization) if self.db is not None else []
+        identities = {row["name_key"]: row for row in rows or []}
+        with self._lock:
+            self._identities, self._loaded_at = identities, time.monotonic()
+        return identities
+
+    def resolve(self, segments: List[Dict[str, Any]], learn: bool = True) -> Dict[str, str]:
+        """
+        Names for the anonymous speakers of a meeting, as {label: name}.
+
+        Introduced speakers are named first; the others are matched to
+        known signatures, each known person to at most one speaker and
+        only when the best match is clear. With learn, what the meeting
+        taught about named speakers is saved for the next one.
+        """
+        turns = turns_by_speaker(segments)
+        labels = [label for label in turns if is_label(label)]
+        if not labels:
+            return {}
+
+        with tracing.span("speakers.resolve", speakers=len(labels), organization=self.organization) as span:
+            mapping: Dict[str, str] = {}
+            for label in labels:
+                name = find_introduction(turns[label])
+                if name and name_key(name) not in {name_key(n) for n in mapping.values()}:
+                    mapping[label] = name
+            introduced = dict(mapping)
+
+            signatures = {label: signature(turns[label]) for label in labels}
+            mapping.update(self._match(
+                {label: signatures[label] for label in labels
+                 if label not in mapping and sum(len(t.split()) for t in turns[label]) >= MIN_MATCH_WORDS},
+                taken={name_key(name) for name in mapping.values()}
+            ))
+            span.set_attribute("introduced", len(introduced))
+            span.set_attribute("matched", len(mapping) - len(introduced))
+
+        if learn and introduced:
+            self.learn({introduced[label]: signatures[label] for label in introduced}, source="introduction")
+        if mapping:
+            print(f"Named speakers: {', '.join(f'{label} → {name}' for label, name in mapping.items())}")
+        return mapping
+
+    def _match(self, signatures: Dict[str, Dict[str, float]], taken: set) -> Dict[str, str]:
+        """Greedy best-first assignment of labels to known identities."""
+        identities = {key: row for key, row in self.identities().items() if key not in taken}
+        if not identities or not signatures:
+            return {}
+
+        scored = []
+        for label, sig in signatures.items():
+            scores = sorted(((similarity(sig, row.get("signature") or {}), key) for key, row in identities.items()),
+                            reverse=True)
+            best, key = scores[0]
+            runner_up = scores[1][0] if len(scores) > 1 else 0.0
+            if best >= self.threshold and best - runner_up >= self.margin:
+                scored.append((best, label, key))
+
+        mapping, used = {}, set()
+        for score, label, key in sorted(scored, reverse=True):
+            if key not in used and label not in mapping:
+                mapping[label] = identities[key]["name"]
+                used.add(key)
+        return mapping
+
+    def apply(self, segments: List[Dict[str, Any]], learn: bool = True) -> List[Dict[str, Any]]:
+        """Segments with resolved names in place of diarization labels."""
+        mapping = self.resolve(segments, learn=learn)
+        if not mapping:
+            return segments
+        return [{**segment, "speaker": mapping.get(segment.get("speaker"), segment.get("speaker"))}
+                for segment in segments]
+
+    def learn(self, signatures: Dict[str, Dict[str, float]], source: str = "correction") -> None:
+        """Fold the signatures of named speakers into their stored identities."""
+        if self.db is None or not signatures:
+            return
+        known = self.identities()
+        rows = []
+        for name, sig in signatures.items():
+            existing = known.get(name_key(name)) or {}
+            rows.append({
+                "organization": self.organization,
+                "name": name,
+                "name_key": name_key(name),
+                "signature": merge_signatures(existing.get("signature") or {}, sig),
+                "samples": existing.get("samples", 0) + 1,
+                "source": source if source == "correction" else existing.get("source", source)
+            })
+        saved = self.db.save_speaker_identities(rows)
+        if saved:
+            with self._lock:
+                if self._identities is not None:
+                    self._identities.update({row["name_key"]: row for row in saved})
+
+    def correct(self, content: str, corrections: Dict[str, str]) -> str:
+        """
+        Rename speakers of a stored transcript ({current name or label: correct
+        name}) and learn the corrected speakers' signatures.
+        """
+        corrections = {old: new.strip() for old, new in corrections.items() if new and new.strip() and old != new}
+        turns = turns_by_speaker(parse_turns(content))
+        self.learn({new: signature(turns[old]) for old, new in corrections.items() if turns.get(old)},
+                   source="correction")
+        return rename(content, corrections)
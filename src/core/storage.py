@@ -0,0 +1,345 @@
+import base64
+import gzip
+import io
+import json
+import os
+import re
+import zlib
+from pathlib import Path
+from typing import Dict, Any, Iterator, IO, Optional, Tuple
+
+try:
+    import zstandard as zstd
+except ImportError:  # zstd is optional, gzip is always available
+    zstd = None
+
+# Backup file suffix for each supported codec
+COMPRESSION_SUFFIXES = {
+    "zstd": ".zst",
+    "gzip": ".gz",
+    "none": ""
+}
+
+# Marker prepended to compressed values stored in the DB content column.
+# Values without the marker are treated as plain text, so old rows keep working.
+CONTENT_MARKER = "~mgz1:"
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def resolve_compression(compression: Optional[str] = None, env_var: str = "TRANSCRIPT_COMPRESSION",
+                        default: str = "gzip") -> str:
+    """Resolve a codec name, falling back to gzip when zstandard is not installed."""
+    codec = (compression or os.getenv(env_var) or default).lower()
+    if codec not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unsupported compression: {codec}")
+    if codec == "zstd" and zstd is None:
+        print("zstandard is not installed, falling back to gzip")
+        codec = "gzip"
+    return codec
+
+
+def detect_compression(path: str) -> str:
+    """Detect the codec of a backup file from its suffix."""
+    if path.endswith(COMPRESSION_SUFFIXES["zstd"]):
+        return "zstd"
+    if path.endswith(COMPRESSION_SUFFIXES["gzip"]):
+        return "gzip"
+    return "none"
+
+
+def with_compression_suffix(path: str, compression: str) -> str:
+    """Return the path with the suffix matching the codec (e.g. meeting.json.gz)."""
+    for suffix in (".zst", ".gz"):
+        if path.endswith(suffix):
+            path = path[:-len(suffix)]
+    return path + COMPRESSION_SUFFIXES[compression]
+
+
+def open_transcript(path: str, mode: str = "rt") -> IO:
+    """
+    Open a transcript backup, transparently (de)compressing based on its suffix.
+
+    Args:
+        path: Path to a .json, .json.gz or .json.zst file
+        mode: "rt"/"rb" for reading, "wt"/"wb" for writing
+
+    Returns:
+        A file object streaming the decompressed data
+    """
+    codec = detect_compression(path)
+    binary = "b" in mode
+    writing = "w" in mode
+
+    if codec == "gzip":
+        return gzip.open(path, mode, **({} if binary else {"encoding": "utf-8"}))
+
+    if codec == "zstd":
+        if zstd is None:
+            raise RuntimeError("zstandard is required to read .zst transcripts")
+        raw = open(path, "wb" if writing else "rb")
+        if writing:
+            stream = zstd.ZstdCompressor(level=10).stream_writer(raw, closefd=True)
+        else:
+            stream = zstd.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return stream if binary else io.TextIOWrapper(stream, encoding="utf-8")
+
+    return open(path, mode, **({} if binary else {"encoding": "utf-8"}))
+
+
+def save_transcript_file(data: Dict[str, Any], path: str, compression: Optional[str] = None) -> str:
+    """
+    Save a transcript backup as compact (optionally compressed) JSON.
+
+    Args:
+        data: Structured transcript to save
+        path: Target path, the codec suffix is added if missing
+        compression: "zstd", "gzip" or "none" (defaults to TRANSCRIPT_COMPRESSION)
+
+    Returns:
+        The path the file was actually written to
+    """
+    codec = resolve_compression(compression)
+    path = with_compression_suffix(str(path), codec)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open_transcript(path, "wt") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+
+    return path
+
+
+def load_transcript_file(path: str) -> Dict[str, Any]:
+    """Load a transcript backup of any supported format."""
+    with open_transcript(str(path), "rt") as f:
+        return json.load(f)
+
+
+def iter_segments(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the speaker turns of a transcript backup one at a time.
+
+    Transcriber backups hold the formatted transcript as one "content"
+    string of "Speaker: text" turns separated by blank lines, yielded as
+    {"speaker": ..., "text": ...} dicts. Synthetic meetings (see
+    src/synthetic) keep a "segments" array, yielded as stored. Either is
+    decoded as it is read, so only the current read buffer and one turn
+    are held in memory and multi-hour meetings can be scanned without
+    loading the whole file.
+    """
+    with open_transcript(str(path), "rt") as f:
+        key, buffer = _find_key(f)
+        if key == "segments":
+            yield from _iter_array(f, buffer)
+            return
+        if key is None:
+            return
+
+        pending = ""
+        for text in _iter_string(f, buffer, path):
+            pending += text
+            *turns, pending = pending.split("\n\n")
+            for turn in turns:
+                if turn.strip():
+                    yield _segment(turn)
+        if pending.strip():
+            yield _segment(pending)
+
+
+def _segment(turn: str) -> Dict[str, Any]:
+    speaker, separator, text = turn.strip().partition(": ")
+    return {"speaker": speaker, "text": text} if separator else {"speaker": None, "text": speaker}
+
+
+# The metadata object comes first; its values never hold these unescaped
+_TURNS_KEY = re.compile(r'"(segments)"\s*:\s*\[|"(content)"\s*:\s*"')
+
+
+def _find_key(f: IO) -> Tuple[Optional[str], str]:
+    """Read up to the "segments" array or "content" string; the key and what follows it."""
+    buffer = ""
+    while True:
+        chunk = f.read(READ_CHUNK_SIZE)
+        buffer += chunk
+        match = _TURNS_KEY.search(buffer)
+        if match:
+            return match.group(1) or match.group(2), buffer[match.end():]
+        if not chunk:
+            return None, ""
+        # Keep a tail in case the key is split across reads
+        buffer = buffer[-32:]
+
+
+def _iter_array(f: IO, buffer: str) -> Iterator[Any]:
+    """The items of a JSON array whose opening bracket was just read."""
+    decoder = json.JSONDecoder()
+    while True:
+        chunk = f.read(READ_CHUNK_SIZE)
+        buffer += chunk
+        while True:
+            buffer = buffer.lstrip().lstrip(",").lstrip()
+            if buffer.startswith("]"):
+                return
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                break  # Need more data
+            yield item
+            buffer = buffer[end:]
+        if not chunk:
+            return
+
+
+def _iter_string(f: IO, buffer: str, path: str) -> Iterator[str]:
+    """Decoded pieces, in order, of a JSON string whose opening quote was just read."""
+    while True:
+        end, safe = _scan_json_string(buffer)
+        if end is not None:
+            yield json.loads(f'"{buffer[:end]}"')
+            return
+        if safe:
+            yield json.loads(f'"{buffer[:safe]}"')
+            buffer = buffer[safe:]
+        chunk = f.read(READ_CHUNK_SIZE)
+        if not chunk:
+            raise ValueError(f"Unterminated content string in {path}")
+        buffer += chunk
+
+
+def _scan_json_string(raw: str) -> Tuple[Optional[int], int]:
+    """
+    (end, safe) for the body of a JSON string: end is the index of its
+    closing quote if raw contains it, safe how much of raw can be decoded
+    without cutting an escape sequence (or a surrogate pair) in half.
+    """
+    i = 0
+    while i < len(raw):
+        c = raw[i]
+        if c == '"':
+            return i, i
+        if c != "\\":
+            i += 1
+            continue
+        if i + 1 >= len(raw):
+            break
+        if raw[i + 1] != "u":
+            i += 2
+            continue
+        size = 6
+        if i + 6 <= len(raw) and raw[i + 2:i + 4].lower() in ("d8", "d9", "da", "db"):
+            size = 12  # High surrogate: keep its low half with it
+        if i + size > len(raw):
+            break
+        i += size
+    return None, i
+
+
+def compress_content(text: str, compression: Optional[str] = None) -> str:
+    """
+    Compress transcript text for storage in a text column.
+
+    The compressed bytes are base64 encoded and prefixed with CONTENT_MARKER
+    and the codec name, e.g. "~mgz1:zstd:KLUv/..."
+    """
+    codec = resolve_compression(compression, env_var="DB_CONTENT_COMPRESSION", default="none")
+    if codec == "none" or not text or text.startswith(CONTENT_MARKER):
+        return text
+
+    raw = text.encode("utf-8")
+    if codec == "zstd":
+        packed = zstd.ZstdCompressor(level=10).compress(raw)
+    else:
+        packed = zlib.compress(raw, 9)
+
+    encoded = f"{CONTENT_MARKER}{codec}:{base64.b64encode(packed).decode('ascii')}"
+    # Tiny transcripts can grow after base64, keep those as plain text
+    return encoded if len(encoded) < len(text) else text
+
+
+def decompress_content(value: Optional[str]) -> Optional[str]:
+    """Decompress a value written by compress_content, passing plain text through."""
+    if not value or not value.startswith(CONTENT_MARKER):
+        return value
+
+    codec, _, payload = value[len(CONTENT_MARKER):].partition(":")
+    packed = base64.b64decode(payload)
+
+    if codec == "zstd":
+        if zstd is None:
+            raise RuntimeError("zstandard is required to read zstd compressed content")
+        return zstd.ZstdDecompressor().decompress(packed).decode("utf-8")
+    if codec == "gzip":
+        return zlib.decompress(packed).decode("utf-8")
+
+    raise ValueError(f"Unknown content codec: {codec}")
+
+
+def migrate_file(path: str, compression: Optional[str] = None, keep_original: bool = False) -> Optional[str]:
+    """
+    Rewrite a single backup file in the target format.
+
+    Returns:
+        The new path, or None if the file already uses the target format
+    """
+    codec = resolve_compression(compression)
+    path = str(path)
+    if detect_compression(path) == codec:
+        return None
+
+    data = load_transcript_file(path)
+    new_path = save_transcript_file(data, path, compression=codec)
+
+    if not keep_original and new_path != path:
+        Path(path).unlink()
+
+    return new_path
+
+
+def _migrate_path(path: str, compression: Optional[str], keep_original: bool) -> Dict[str, Any]:
+    """Convert one backup for migrate_directory, reporting sizes or the error instead of raising."""
+    try:
+        size_before = Path(path).stat().st_size
+        new_path = migrate_file(path, compression=compression, keep_original=keep_original)
+        return {
+            "new_path": new_path,
+            "bytes_before": size_before,
+            "bytes_after": Path(new_path).stat().st_size if new_path else 0
+        }
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def migrate_directory(directory: str = "transcripts", compression: Optional[str] = None,
+                      keep_original: bool = False, pool=None) -> Dict[str, Any]:
+    """
+    Convert every transcript backup in a directory to the target format.
+
+    With a CpuPool (src/core/workers.py) the files are converted on its
+    worker processes, several at a time.
+    """
+    stats = {"converted": 0, "skipped": 0, "failed": 0, "bytes_before": 0, "bytes_after": 0}
+    codec = resolve_compression(compression)
+    paths = [str(path) for path in sorted(Path(directory).glob("*.json*"))]
+
+    if pool is not None:
+        results = pool.map(_migrate_path, paths, codec, keep_original)
+    else:
+        results = [_migrate_path(path, codec, keep_original) for path in paths]
+
+    for path, result in zip(paths, results):
+        if result.get("error"):
+            stats["failed"] += 1
+            print(f"Error converting {path}: {result['error']}")
+            continue
+        if result["new_path"] is None:
+            stats["skipped"] += 1
+            continue
+        stats["converted"] += 1
+        stats["bytes_before"] += result["bytes_before"]
+        stats["bytes_after"] += result["bytes_after"]
+        print(f"Converted {path} -> {result['new_path']}")
+
+    return stats
@@ -0,0 +1,309 @@
+"""
+Per-meeting tracing.
+
+Each meeting job opens a root span and every stage below it (AssemblyAI
+upload/submit/poll, one span per LLM prompt, Supabase queries, Slack sends)
+becomes a child span, so a slow job can be broken down afterwards.
+
+TRACING_EXPORTER selects where spans go:
+    none     tracing disabled, span() is a shared no-op (default)
+    file     one JSON object per finished span appended to TRACE_FILE
+             (default .cache/traces.jsonl)
+    otlp     OpenTelemetry SDK with the OTLP/HTTP exporter, configured by
+             the standard OTEL_EXPORTER_OTLP_* variables (requires the
+             opentelemetry-sdk and opentelemetry-exporter-otlp-proto-http packages)
+    console  OpenTelemetry SDK printing spans to stdout
+
+Trace files can be summarized with:
+    python -m src.core.tracing .cache/traces.jsonl            # indented tree per trace
+    python -m src.core.tracing .cache/traces.jsonl --folded   # input for flamegraph.pl / speedscope
+"""
+import argparse
+import contextvars
+import json
+import os
+import secrets
+import threading
+import time
+from collections import defaultdict
+from functools import wraps
+from pathlib import Path
+from typing import Dict, Any, Callable, List, Optional
+
+SERVICE_NAME = "meetgist"
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("meetgist_current_span", default=None)
+_configure_lock = threading.Lock()
+_tracer = None
+_configured = False
+
+
+class _NullSpan:
+    """Stand-in used when tracing is disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_exception(self, exception: BaseException) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """A timed operation in a trace, written to the exporter when it ends."""
+
+    def __init__(self, tracer: "FileTracer", name: str, attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = dict(attributes)
+        self.status = "ok"
+        self.error: Optional[str] = None
+
+        parent = _current_span.get()
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.parent_id = parent.span_id if parent else None
+        self.span_id = secrets.token_hex(8)
+
+    def __enter__(self):
+        self.start = time.time()
+        self._start_perf = time.perf_counter()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self._start_perf
+        _current_span.reset(self._token)
+        if exc is not None:
+            self.record_exception(exc)
+        self.tracer.export({
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(duration * 1000, 3),
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+            "thread": threading.current_thread().name
+        })
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, exception: BaseException) -> None:
+        self.status = "error"
+        self.error = f"{type(exception).__name__}: {exception}"
+
+
+class FileTracer:
+    """Dependency-free tracer appending finished spans to a JSON lines file."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def span(self, name: str, attributes: Dict[str, Any]) -> Span:
+        return Span(self, name, attributes)
+
+    def export(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+
+class OpenTelemetryTracer:
+    """Adapter over the OpenTelemetry SDK for the otlp and console exporters."""
+
+    def __init__(self, exporter_name: str):
+        try:
+            from opentelemetry import trace
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+        except ImportError as e:
+            raise ImportError(f"TRACING_EXPORTER={exporter_name} requires the opentelemetry-sdk package") from e
+
+        if exporter_name == "otlp":
+            try:
+                from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            except ImportError as e:
+                raise ImportError("TRACING_EXPORTER=otlp requires opentelemetry-exporter-otlp-proto-http") from e
+            exporter = OTLPSpanExporter()
+        else:
+            exporter = ConsoleSpanExporter()
+
+        provider = TracerProvider(resource=Resource.create({"service.name": SERVICE_NAME}))
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+        trace.set_tracer_provider(provider)
+        self._tracer = trace.get_tracer(SERVICE_NAME)
+
+    def span(self, name: str, attributes: Dict[str, Any]):
+        # OpenTelemetry only accepts primitive attribute values
+        clean = {k: v if isinstance(v, (str, bool, int, float)) else str(v)
+                 for k, v in attributes.items() if v is not None}
+        return self._tracer.start_as_current_span(name, attributes=clean)
+
+
+def _configure():
+    global _tracer, _configured
+    with _configure_lock:
+        if _configured:
+            return
+        exporter_name = os.getenv("TRACING_EXPORTER", "none").lower()
+        if exporter_name == "file":
+            _tracer = FileTracer(os.getenv("TRACE_FILE", ".cache/traces.jsonl"))
+        elif exporter_name in ("otlp", "console"):
+            _tracer = OpenTelemetryTracer(exporter_name)
+        elif exporter_name not in ("none", ""):
+            raise ValueError(f"Unknown TRACING_EXPORTER: {exporter_name}")
+        _configured = True
+
+
+def configure(exporter: Optional[str] = None, trace_file: Optional[str] = None) -> None:
+    """(Re)configure tracing explicitly instead of from the environment."""
+    global _tracer, _configured
+    with _configure_lock:
+        _configured = False
+        _tracer = None
+    if exporter is not None:
+        os.environ["TRACING_EXPORTER"] = exporter
+    if trace_file is not None:
+        os.environ["TRACE_FILE"] = trace_file
+    _configure()
+
+
+def span(name: str, **attributes: Any):
+    """
+    Context manager for a span named `name`, child of the current span.
+
+    Without a current span a new trace is started, so wrapping a meeting job
+    in span() gives it its own trace id.
+    """
+    if not _configured:
+        _configure()
+    if _tracer is None:
+        return _NULL_SPAN
+    return _tracer.span(name, attributes)
+
+
+def traced(name: str):
+    """Decorator running every call of the function inside span(name)."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _configured and _tracer is None:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def propagate(func: Callable) -> Callable:
+    """
+    Bind func to the caller's trace context so spans it opens on a worker
+    thread (e.g. in a ThreadPoolExecutor) nest under the caller's span.
+    """
+    context = contextvars.copy_context()
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        # A context can only be entered by one thread at a time
+        return context.copy().run(func, *args, **kwargs)
+    return wrapper
+
+
+def load_spans(path: str) -> Dict[str, List[Dict[str, Any]]]:
+    """Read a trace file into spans grouped by trace id."""
+    traces = defaultdict(list)
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            traces[record["trace_id"]].append(record)
+    return traces
+
+
+def _children(spans: List[Dict[str, Any]]) -> Dict[Optional[str], List[Dict[str, Any]]]:
+    ids = {s["span_id"] for s in spans}
+    children = defaultdict(list)
+    for s in sorted(spans, key=lambda s: s["start"]):
+        # Spans whose parent was never written are shown as roots
+        children[s["parent_id"] if s["parent_id"] in ids else None].append(s)
+    return children
+
+
+def format_tree(spans: List[Dict[str, Any]]) -> str:
+    """Indented tree of one trace with durations and start offsets."""
+    children = _children(spans)
+    origin = min(s["start"] for s in spans)
+    lines = []
+
+    def walk(node: Dict[str, Any], depth: int) -> None:
+        flag = "  !" if node["status"] == "error" else ""
+        lines.append(f"{'  ' * depth}{node['name']:<{max(40 - 2 * depth, 1)}} "
+                     f"+{(node['start'] - origin) * 1000:>9.1f} ms {node['duration_ms']:>10.1f} ms{flag}")
+        for child in children.get(node["span_id"], []):
+            walk(child, depth + 1)
+
+    for root in children.get(None, []):
+        walk(root, 0)
+    return "\n".join(lines)
+
+
+def folded_stacks(spans: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Self time in microseconds per stack, in the folded format used by flamegraph tools."""
+    children = _children(spans)
+    stacks: Dict[str, int] = defaultdict(int)
+
+    def walk(node: Dict[str, Any], prefix: str) -> None:
+        stack = f"{prefix};{node['name']}" if prefix else node["name"]
+        kids = children.get(node["span_id"], [])
+        # Children running in parallel can exceed the parent, never count negative self time
+        self_ms = max(node["duration_ms"] - sum(k["duration_ms"] for k in kids), 0)
+        stacks[stack] += int(self_ms * 1000)
+        for child in kids:
+            walk(child, stack)
+
+    for root in children.get(None, []):
+        walk(root, "")
+    return stacks
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize a MeetGist trace file")
+    parser.add_argument("path", nargs="?", default=".cache/traces.jsonl", help="Trace file written by the file exporter")
+    parser.add_argument("--folded", action="store_true", help="Print folded stacks for flamegraph tools")
+    parser.add_argument("--trace", help="Only show this trace id")
+    args = parser.parse_args()
+
+    traces = load_spans(args.path)
+    if args.trace:
+        traces = {args.trace: traces.get(args.trace, [])}
+
+    if args.folded:
+        totals: Dict[str, int] = defaultdict(int)
+        for spans in traces.values():
+            for stack, value in folded_stacks(spans).items():
+                totals[stack] += value
+        for stack, value in sorted(totals.items()):
+            print(f"{stack} {value}")
+    else:
+        for trace_id, spans in traces.items():
+            if spans:
+                print(f"\nTrace {trace_id}")
+                print(format_tree(spans))
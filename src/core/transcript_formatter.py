@@ -36,8 +36,8 @@ class TranscriptFormatter:
         if not structured:
             return formatted_text
 
-        # Create structured output
-        total_speakers = len(set(re.findall(r'Speaker [A-Z]:', formatted_text)))
+        # Create structured output; speakers are letters or names resolved at format time
+        total_speakers = len(set(re.findall(r'^([^:\n]+):\s', formatted_text, re.M)))
 
         return {
             "metadata": {
@@ -0,0 +1,222 @@
+"""
+Process pool for CPU-bound pipeline work.
+
+Chunking transcripts, parsing action items and compressing content are
+pure Python (or hold the GIL), so in the API or Streamlit process they
+run one at a time no matter how many threads are busy. CpuPool runs such
+functions in CPU_WORKERS worker processes instead: MeetingSummarizer
+chunks long transcripts through it, and the backfills of the archive
+(migrate_transcripts.py, storage.migrate_directory) keep every core of
+the node busy. Formatting AssemblyAI results stays in the calling thread;
+its input is the SDK's response object, not text worth shipping.
+
+Large strings are not pickled through the pool's pipe: arguments and
+results of at least SHARED_MEMORY_MIN_BYTES are copied once into a
+shared memory block and the other side reads them from there by name.
+Lists of strings (e.g. the chunks of a transcript) travel the same way.
+
+Functions sent to the pool must be importable module-level functions.
+Pipeline stages call offload(), which only leaves the calling thread
+for texts of at least CPU_OFFLOAD_MIN_CHARS, where the work outweighs
+the hand-off; with CPU_WORKERS=0 everything runs inline.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+from . import metrics
+
+
+class SharedText:
+    """
+    A string, or list of strings, handed to another process through shared memory.
+
+    Only the block name and the UTF-8 byte lengths are pickled.
+    """
+
+    def __init__(self, name: str, sizes: List[int], is_list: bool):
+        self.name = name
+        self.sizes = sizes
+        self.is_list = is_list
+
+    @classmethod
+    def create(cls, value: Any) -> Tuple["SharedText", shared_memory.SharedMemory]:
+        """Copy value into a new block; the caller owns (and must unlink) the block."""
+        parts = [part.encode("utf-8") for part in (value if isinstance(value, (list, tuple)) else [value])]
+        block = shared_memory.SharedMemory(create=True, size=max(1, sum(len(part) for part in parts)))
+        offset = 0
+        for part in parts:
+            block.buf[offset:offset + len(part)] = part
+            offset += len(part)
+        return cls(block.name, [len(part) for part in parts], isinstance(value, (list, tuple))), block
+
+    def read(self, unlink: bool = False) -> Any:
+        """The value, decoded from the block; unlink frees the block once read."""
+        block = shared_memory.SharedMemory(name=self.name)
+        try:
+            parts, offset = [], 0
+            for size in self.sizes:
+                parts.append(bytes(block.buf[offset:offset + size]).decode("utf-8"))
+                offset += size
+        finally:
+            block.close()
+            if unlink:
+                block.unlink()
+        return parts if self.is_list else parts[0]
+
+
+def _size(value: Any) -> int:
+    """Approximate UTF-8 size of a string or list of strings, 0 for anything else."""
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, (list, tuple)) and value and all(isinstance(v, str) for v in value):
+        return sum(len(v) for v in value)
+    return 0
+
+
+def _share(value: Any, min_bytes: int, blocks: List[shared_memory.SharedMemory]) -> Any:
+    """value, or a SharedText in its place if it is a large enough text."""
+    if min_bytes <= 0 or _size(value) < min_bytes:
+        return value
+    shared, block = SharedText.create(value)
+    blocks.append(block)
+    return shared
+
+
+def _unshare(value: Any, unlink: bool = False) -> Any:
+    return value.read(unlink=unlink) if isinstance(value, SharedText) else value
+
+
+def _call(func: Callable, args: tuple, kwargs: dict, min_bytes: int) -> Any:
+    """Runs in the worker: read shared arguments, call func, share a large result."""
+    args = tuple(_unshare(arg) for arg in args)
+    kwargs = {key: _unshare(value) for key, value in kwargs.items()}
+    result = func(*args, **kwargs)
+
+    blocks: List[shared_memory.SharedMemory] = []
+    shared = _share(result, min_bytes, blocks)
+    for block in blocks:
+        # The parent unlinks the block after reading it
+        block.close()
+    return shared
+
+
+class CpuPool:
+    """Worker processes for CPU-bound functions, shared by every thread of the process."""
+
+    def __init__(self, workers: Optional[int] = None, shared_min_bytes: Optional[int] = None,
+                 offload_min_chars: Optional[int] = None, start_method: Optional[str] = None):
+        if workers is None:
+            workers = int(os.getenv("CPU_WORKERS") or os.cpu_count() or 1)
+        self.workers = max(0, workers)
+        self.shared_min_bytes = int(shared_min_bytes if shared_min_bytes is not None
+                                    else os.getenv("SHARED_MEMORY_MIN_BYTES", str(256 * 1024)))
+        self.offload_min_chars = int(offload_min_chars if offload_min_chars is not None
+                                     else os.getenv("CPU_OFFLOAD_MIN_CHARS", "100000"))
+        # Forking a process that runs threads (uvicorn, Streamlit) can deadlock
+        # the child, so workers are started from a clean process instead
+        default_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self.start_method = start_method or os.getenv("CPU_WORKER_START_METHOD", default_method)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method)
+                )
+                print(f"Started {self.workers} CPU worker processes ({self.start_method})")
+            return self._executor
+
+    def submit(self, func: Callable, *args, **kwargs) -> Future:
+        """
+        Run func(*args, **kwargs) in a worker process.
+
+        Returns:
+            A Future of the result, with shared memory already read and freed
+        """
+        outcome: Future = Future()
+        if not self.enabled:
+            try:
+                outcome.set_result(func(*args, **kwargs))
+            except Exception as e:
+                outcome.set_exception(e)
+            return outcome
+
+        blocks: List[shared_memory.SharedMemory] = []
+        try:
+            shared_args = tuple(_share(arg, self.shared_min_bytes, blocks) for arg in args)
+            shared_kwargs = {key: _share(value, self.shared_min_bytes, blocks) for key, value in kwargs.items()}
+            executor = self._pool()
+            future = executor.submit(_call, func, shared_args, shared_kwargs, self.shared_min_bytes)
+        except Exception:
+            self._release(blocks)
+            raise
+
+        def done(future: Future) -> None:
+            self._release(blocks)
+            try:
+                outcome.set_result(_unshare(future.result(), unlink=True))
+            except BrokenProcessPool as e:
+                self._reset(executor, e)
+                outcome.set_exception(e)
+            except BaseException as e:
+                outcome.set_exception(e)
+
+        future.add_done_callback(done)
+        return outcome
+
+    def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run func in a worker process and wait for its result."""
+        return self.submit(func, *args, **kwargs).result()
+
+    def map(self, func: Callable, items: Iterable[Any], *args, **kwargs) -> List[Any]:
+        """[func(item, *args, **kwargs) for item in items], spread over the workers, in order."""
+        futures = [self.submit(func, item, *args, **kwargs) for item in items]
+        return [future.result() for future in futures]
+
+    def offload(self, func: Callable, text: str, *args, **kwargs) -> Any:
+        """func(text, ...) in a worker when text is large enough to be worth it, else inline."""
+        if not self.enabled or len(text or "") < self.offload_min_chars:
+            return func(text, *args, **kwargs)
+        return self.run(func, text, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _reset(self, executor: ProcessPoolExecutor, error: BaseException) -> None:
+        """
+        Forget a pool whose worker died (e.g. killed for memory); the next
+        call starts a new one. A broken pool has already shut itself down.
+        """
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        metrics.ERRORS.inc(component="cpu_pool")
+        print(f"CPU worker pool broken, restarting it on next use: {error}")
+
+    @staticmethod
+    def _release(blocks: List[shared_memory.SharedMemory]) -> None:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def offload(pool: Optional[CpuPool], func: Callable, text: str, *args, **kwargs) -> Any:
+    """Stage helper: dispatch func(text, ...) to pool, or run it inline when there is none."""
+    if pool is None:
+        return func(text, *args, **kwargs)
+    return pool.offload(func, text, *args, **kwargs)
@@ -0,0 +1,223 @@
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Set
+from ..core import quota
+from ..core.storage import save_transcript_file
+from ..core.transcript_formatter import TranscriptFormatter
+
+PROGRESS_FILE = "progress.jsonl"
+
+
+def plan_meeting(generator, index: int, seed: int, topic_keys: List[str],
+                 duration_minutes: Optional[int] = None) -> Dict[str, Any]:
+    """Deterministically pick topic, speakers, duration and seed for meeting `index`."""
+    meeting_seed = seed * 1_000_003 + index
+    rng = random.Random(meeting_seed)
+    topic_key = topic_keys[index % len(topic_keys)]
+    topic_data = generator.topics['topics'][topic_key]
+
+    return {
+        "index": index,
+        "seed": meeting_seed,
+        "topic_key": topic_key,
+        "num_speakers": rng.randint(topic_data['min_speakers'], topic_data['max_speakers']),
+        "duration_minutes": duration_minutes or topic_data['typical_duration']
+    }
+
+
+def load_progress(progress_path: Path) -> Set[int]:
+    """Return the indices already written by a previous run."""
+    done = set()
+    if progress_path.exists():
+        with open(progress_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    done.add(json.loads(line)["index"])
+                except (json.JSONDecodeError, KeyError):
+                    continue  # Partial last line from an interrupted run
+    return done
+
+
+def generate_batch(
+    generator,
+    count: int,
+    output_dir: str = "synthetic_corpus",
+    db=None,
+    topic_keys: Optional[List[str]] = None,
+    concurrency: int = 4,
+    seed: int = 0,
+    bulk_size: int = 50,
+    compression: Optional[str] = None,
+    duration_minutes: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Generate `count` synthetic meetings with bounded concurrency.
+
+    Meeting i always gets the same topic, speaker count and seed, and each
+    written meeting is appended to output_dir/progress.jsonl, so an
+    interrupted run can be restarted and only the missing meetings are
+    generated.
+
+    Args:
+        generator: SyntheticMeetingGenerator (or any object with topics and generate_meeting)
+        count: Total number of meetings in the corpus
+        output_dir: Directory for transcript files and the progress log
+        db: Optional DatabaseManager; meetings are then bulk inserted instead of written to disk
+        topic_keys: Topics to cycle through (defaults to all topics)
+        concurrency: Maximum meetings generated at the same time
+        seed: Base seed for the corpus
+        bulk_size: Rows per bulk insert when writing to the DB
+        compression: Codec for transcript files (defaults to TRANSCRIPT_COMPRESSION)
+        duration_minutes: Override the topics' typical duration for every meeting
+
+    Returns:
+        Throughput statistics for the run
+    """
+    out = Path(output_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    progress_path = out / PROGRESS_FILE
+
+    topic_keys = topic_keys or sorted(generator.topics['topics'].keys())
+    done = load_progress(progress_path)
+    pending = [i for i in range(count) if i not in done]
+    print(f"Generating {len(pending)} meetings ({len(done)} already done) with concurrency {concurrency}")
+
+    formatter = TranscriptFormatter()
+    stats = {"generated": 0, "failed": 0, "segments": 0, "skipped": len(done)}
+    buffer: List[tuple] = []
+    start = time.perf_counter()
+
+    def run(plan: Dict[str, Any]) -> Dict[str, Any]:
+        # A corpus run yields watsonx quota to interactive requests of the same process
+        with quota.priority(quota.BATCH):
+            meeting = generator.generate_meeting(
+                plan["topic_key"],
+                num_speakers=plan["num_speakers"],
+                duration_minutes=plan["duration_minutes"],
+                seed=plan["seed"]
+            )
+        meeting["metadata"]["filename"] = f"synthetic_{seed}_{plan['index']:06d}_{plan['topic_key']}"
+        meeting["metadata"]["seed"] = plan["seed"]
+        return meeting
+
+    def flush(progress) -> None:
+        if db is not None and buffer:
+            saved = db.save_transcripts_bulk([
+                {
+                    "title": meeting["metadata"]["filename"],
+                    "content": formatter.format_transcript(meeting, source_type='audio'),
+                    "source_type": "generated"
+                }
+                for _, meeting in buffer
+            ])
+            if saved is None:
+                stats["failed"] += len(buffer)
+                buffer.clear()
+                return
+        for index, _ in buffer:
+            progress.write(json.dumps({"index": index}) + "\n")
+        progress.flush()
+        buffer.clear()
+
+    with open(progress_path, "a", encoding="utf-8") as progress, \
+            ThreadPoolExecutor(max_workers=concurrency) as pool:
+        plans = iter(pending)
+        in_flight = {}
+
+        while True:
+            # Keep at most `concurrency` meetings queued beyond the running ones
+            while len(in_flight) < concurrency * 2:
+                plan = next(plans, None)
+                if plan is None:
+                    break
+                plan = plan_meeting(generator, plan, seed, topic_keys, duration_minutes)
+                in_flight[pool.submit(run, plan)] = plan
+
+            if not in_flight:
+                break
+
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                plan = in_flight.pop(future)
+                try:
+                    meeting = future.result()
+                except Exception as e:
+                    stats["failed"] += 1
+                    print(f"Meeting {plan['index']} failed: {e}")
+                    continue
+
+                stats["generated"] += 1
+                stats["segments"] += len(meeting["segments"])
+
+                if db is None:
+                    save_transcript_file(meeting, str(out / f"{meeting['metadata']['filename']}.json"), compression)
+                buffer.append((plan["index"], meeting))
+                if db is None or len(buffer) >= bulk_size:
+                    flush(progress)
+
+                if stats["generated"] % 100 == 0:
+                    elapsed = time.perf_counter() - start
+                    print(f"{stats['generated']}/{len(pending)} meetings, {stats['generated'] / elapsed:.1f}/s")
+
+        flush(progress)
+
+    elapsed = time.perf_counter() - start
+    stats.update({
+        "elapsed_s": elapsed,
+        "meetings_per_s": stats["generated"] / elapsed if elapsed else 0.0,
+        "segments_per_s": stats["segments"] / elapsed if elapsed else 0.0
+    })
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a corpus of synthetic meetings")
+    parser.add_argument("--count", type=int, required=True, help="Total meetings in the corpus")
+    parser.add_argument("--output-dir", default="synthetic_corpus", help="Directory for files and progress")
+    parser.add_argument("--db", action="store_true", help="Bulk insert into Supabase instead of writing files")
+    parser.add_argument("--topics", help="Comma separated topic keys (default: all)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Meetings generated concurrently")
+    parser.add_argument("--seed", type=int, default=0, help="Base seed for the corpus")
+    parser.add_argument("--bulk-size", type=int, default=50, help="Rows per DB insert")
+    parser.add_argument("--compression", choices=["zstd", "gzip", "none"], help="Codec for transcript files")
+    parser.add_argument("--duration-minutes", type=int, help="Override the duration of every meeting")
+    parser.add_argument("--offline", action="store_true",
+                        help="Use the procedural generator (no credentials or network needed)")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    if args.offline:
+        from .procedural import ProceduralMeetingGenerator
+        generator = ProceduralMeetingGenerator()
+    else:
+        from .meeting_generator import SyntheticMeetingGenerator
+        generator = SyntheticMeetingGenerator(api_key=os.getenv("IBM_API_KEY"), project_id=os.getenv("IBM_PROJECT_ID"))
+
+    db = None
+    if args.db:
+        from ..core.db import DatabaseManager
+        db = DatabaseManager()
+
+    stats = generate_batch(
+        generator,
+        count=args.count,
+        output_dir=args.output_dir,
+        db=db,
+        topic_keys=args.topics.split(",") if args.topics else None,
+        concurrency=args.concurrency,
+        seed=args.seed,
+        bulk_size=args.bulk_size,
+        compression=args.compression,
+        duration_minutes=args.duration_minutes
+    )
+
+    print(f"\nGenerated {stats['generated']} meetings ({stats['failed']} failed, {stats['skipped']} skipped) "
+          f"in {stats['elapsed_s']:.1f}s: {stats['meetings_per_s']:.2f} meetings/s, "
+          f"{stats['segments_per_s']:.0f} segments/s")
@@ -1,40 +1,29 @@
-import yaml
+import os
 import random
 from datetime import datetime, timedelta
+from functools import cached_property
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 import json
-import requests
+from ..core.llm_backends import LLMBackend, create_backend
 
 class SyntheticMeetingGenerator:
-    def __init__(self, api_key: str, project_id: str):
-        """Initialize the synthetic meeting generator with IBM Granite credentials"""
+    def __init__(self, api_key: str, project_id: str, backend: LLMBackend = None):
+        """Initialize the synthetic meeting generator with IBM Granite credentials or another LLM backend"""
         self.api_key = api_key
         self.project_id = project_id
-        self.topics = self._load_topics()
-        # Get initial IAM token
-        self.iam_token = self._get_iam_token()
-
-    def _get_iam_token(self) -> str:
-        """Get IAM token using API key"""
-        iam_url = "https://iam.cloud.ibm.com/identity/token"
-        headers = {
-            "Content-Type": "application/x-www-form-urlencoded",
-            "Accept": "application/json",
-        }
-        data = {
-            "grant_type": "urn:ibm:params:oauth:grant-type:apikey",
-            "apikey": self.api_key
-        }
-
-        response = requests.post(iam_url, headers=headers, data=data)
-        if response.status_code != 200:
-            raise Exception(f"Failed to get IAM token: {response.text}")
+        self.model_id = os.getenv("SYNTHETIC_MODEL_ID", "google/flan-ul2")
+        self.backend = backend or create_backend(api_key=api_key, project_id=project_id)
 
-        return response.json()["access_token"]
+    @cached_property
+    def topics(self) -> Dict[str, Any]:
+        """Meeting topics, parsed from YAML on first use"""
+        return self._load_topics()
 
     def _load_topics(self) -> Dict[str, Any]:
         """Load meeting topics from YAML file"""
+        import yaml
+
         topics_path = Path(__file__).parent / "meeting_topics.yaml"
         with open(topics_path, 'r') as f:
             return yaml.safe_load(f)
@@ -43,14 +32,16 @@ class SyntheticMeetingGenerator:
         self,
         topic_key: str,
         num_speakers: Optional[int] = None,
-        duration_minutes: Optional[int] = None
+        duration_minutes: Optional[int] = None,
+        seed: Optional[int] = None
     ) -> Dict[str, Any]:
         """Generate a synthetic meeting transcript"""
         topic_data = self.topics['topics'][topic_key]
+        rng = random.Random(seed) if seed is not None else random
 
         # Set number of speakers if not specified
         if num_speakers is None:
-            num_speakers = random.randint(
+            num_speakers = rng.randint(
                 topic_data['min_speakers'],
                 topic_data['max_speakers']
             )
@@ -83,36 +74,20 @@ class SyntheticMeetingGenerator:
         """Generate meeting content using IBM Granite"""
         prompt = self._create_meeting_prompt(context, num_speakers, duration_minutes)
 
-        # IBM Granite API call with proper authentication
-        response = requests.post(
-            "https://us-south.ml.cloud.ibm.com/ml/v1/text/generation?version=2023-05-29",
-            headers={
-                "Accept": "application/json",
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.iam_token}"
-            },
-            json={
-                "model_id": "google/flan-ul2",
-                "input": prompt,
-                "parameters": {
-                    "decoding_method": "greedy",
-                    "max_new_tokens": 1500,
-                    "min_new_tokens": 500,
-                    "temperature": 0.7
-                },
-                "project_id": self.project_id
+        # IBM Granite (or local) generation, the backend handles authentication
+        result = self.backend.generate(
+            prompt,
+            self.model_id,
+            {
+                "decoding_method": "greedy",
+                "max_new_tokens": 1500,
+                "min_new_tokens": 500,
+                "temperature": 0.7
             }
         )
 
-        if response.status_code == 401:
-            # Token might be expired, refresh and retry
-            self.iam_token = self._get_iam_token()
-            return self._generate_meeting_content(context, num_speakers, duration_minutes)
-        elif response.status_code != 200:
-            raise Exception(f"API request failed: {response.text}")
-
         # Process the generated text into segments
-        generated_text = response.json()['results'][0]['generated_text']
+        generated_text = result['text']
         segments = self._parse_generated_text(generated_text, duration_minutes)
 
         return segments
@@ -0,0 +1,218 @@
+import random
+import re
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+from .meeting_generator import SyntheticMeetingGenerator
+from ..core.llm_backends import LLMBackend
+from ..core.storage import iter_segments
+
+DEFAULT_CORPUS_DIR = Path(__file__).resolve().parents[2] / "transcripts"
+
+# Average speaking rate used to turn word counts into timestamps
+WORDS_PER_SECOND = 2.5
+
+SEED_TEXT = """
+Thanks everyone for joining today. Let's go through the open items from last week.
+I think we're mostly on track but there are a couple of risks we should talk about.
+The numbers look better than we expected this quarter. We still need to confirm the timeline with the other team.
+I had a question about the scope of the second phase. Can we make sure the budget covers the extra work?
+From my side the main blocker is waiting on feedback from the vendor. We should probably set up a follow up meeting.
+I agree with that approach as long as we keep the deadline. Let me share what we found in the last review.
+There were a few concerns raised by the customers about the onboarding process.
+We could split the work between the two teams to move faster. I don't think we have enough data to decide that yet.
+Let's take that offline and come back with a recommendation. The feedback so far has been mostly positive.
+We need to make sure everyone has access to the shared documents. I can put together a short summary after the call.
+The plan is to finalize the proposal before the end of the month. That makes sense to me.
+We should check whether the current process still works with the new requirements.
+I'll reach out to the stakeholders and get their input. Does anyone have concerns about the priorities?
+"""
+
+OPENINGS = [
+    "Good morning everyone, let's get started with the {title}.",
+    "Thanks for joining, this is the {title} and we have a full agenda today.",
+    "Okay, I think we have everyone. Welcome to the {title}."
+]
+AGENDA = [
+    "Today we want to cover {subject}, {subject2} and any other business.",
+    "The main topics are {subject} and {subject2}, so let's start with {subject}."
+]
+TRANSITIONS = [
+    "Let's move on to {subject}.",
+    "Next item is {subject}, who wants to start?",
+    "Can we spend a few minutes on {subject}?"
+]
+DECISIONS = [
+    "So we've agreed to {verb} {subject}.",
+    "Decision: we will {verb} {subject} this quarter.",
+    "Okay, then it's decided, we {verb} {subject}."
+]
+ACTIONS = [
+    "{speaker} will {verb} {subject} by {due}.",
+    "{speaker}, can you {verb} {subject} by {due}?",
+    "Action item for {speaker}: {verb} {subject} before {due}."
+]
+CLOSINGS = [
+    "Great, thanks everyone, I'll send out the notes after the meeting.",
+    "That's all for today, thanks for your time.",
+    "Let's wrap up here. Thanks all, talk again next week."
+]
+VERBS = ["review", "finalize", "update", "prepare", "schedule", "approve", "draft", "share", "follow up on"]
+DUE_DATES = ["Friday", "next Monday", "end of week", "the end of the month", "March 15", "next sprint", "tomorrow"]
+BACKCHANNEL = ["Yeah.", "Okay.", "Right.", "Mm-hmm.", "Sounds good.", "Agreed."]
+
+
+class MarkovChain:
+    """Word-level Markov chain producing sentences in the style of its training text."""
+
+    END = None
+
+    def __init__(self, order: int = 2):
+        self.order = order
+        self.transitions: Dict[Tuple[str, ...], List[Optional[str]]] = {}
+        self.starts: List[Tuple[str, ...]] = []
+
+    def train(self, text: str) -> None:
+        for sentence in re.split(r"(?<=[.!?])\s+", text):
+            words = sentence.split()
+            if len(words) <= self.order:
+                continue
+            self.starts.append(tuple(words[:self.order]))
+            for i in range(len(words) - self.order + 1):
+                state = tuple(words[i:i + self.order])
+                following = words[i + self.order] if i + self.order < len(words) else self.END
+                self.transitions.setdefault(state, []).append(following)
+
+    def sentence(self, rng: random.Random, max_words: int = 40) -> str:
+        state = self.starts[int(rng.random() * len(self.starts))]
+        words = list(state)
+
+        while len(words) < max_words:
+            options = self.transitions.get(state)
+            if not options:
+                break
+            following = options[int(rng.random() * len(options))]
+            if following is self.END:
+                break
+            words.append(following)
+            state = state[1:] + (following,)
+
+        sentence = " ".join(words)
+        return sentence if sentence[-1] in ".!?" else sentence + "."
+
+
+class NoModelBackend(LLMBackend):
+    """Backend of generators that never call a model; calling it is a bug."""
+
+    name = "none"
+
+    def generate(self, prompt: str, model_id: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        raise RuntimeError("ProceduralMeetingGenerator generates meetings without a model")
+
+
+class ProceduralMeetingGenerator(SyntheticMeetingGenerator):
+    """
+    Offline synthetic meeting generator built from templates and a Markov chain.
+
+    Needs no credentials or network. The chain is trained on the bundled
+    seed text plus any transcript backups in corpus_dir, and meeting
+    structure (opening, agenda, decisions, action items, closing) comes from
+    templates. Output has the same shape as SyntheticMeetingGenerator, and
+    the same seed always produces the same meeting.
+    """
+
+    def __init__(self, corpus_dir: Optional[str] = None, order: int = 2):
+        super().__init__(api_key=None, project_id=None, backend=NoModelBackend())
+        self.chain = MarkovChain(order=order)
+        self.chain.train(SEED_TEXT)
+
+        corpus = Path(corpus_dir) if corpus_dir else DEFAULT_CORPUS_DIR
+        if corpus.is_dir():
+            for path in sorted(corpus.glob("*.json*")):
+                try:
+                    for segment in iter_segments(str(path)):
+                        self.chain.train(segment["text"])
+                except Exception as e:
+                    print(f"Skipping corpus file {path}: {e}")
+
+    def generate_meeting(
+        self,
+        topic_key: str,
+        num_speakers: Optional[int] = None,
+        duration_minutes: Optional[int] = None,
+        seed: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Generate a synthetic meeting transcript without calling a model"""
+        rng = random.Random(seed)
+        topic_data = self.topics['topics'][topic_key]
+
+        if num_speakers is None:
+            num_speakers = rng.randint(topic_data['min_speakers'], topic_data['max_speakers'])
+        num_speakers = max(1, min(num_speakers, 26))
+
+        if duration_minutes is None:
+            duration_minutes = topic_data['typical_duration']
+
+        segments = self._generate_segments(topic_data, num_speakers, duration_minutes, rng)
+        return self._format_transcript(segments, topic_data['title'], num_speakers, duration_minutes)
+
+    def _generate_segments(
+        self,
+        topic_data: Dict[str, Any],
+        num_speakers: int,
+        duration_minutes: int,
+        rng: random.Random
+    ) -> List[Dict[str, Any]]:
+        speakers = [f"Speaker {chr(ord('A') + i)}" for i in range(num_speakers)]
+        subjects = [w.lower() for w in re.findall(r"[A-Za-z]+", topic_data['context']) if len(w) > 4] or ["the plan"]
+        total_seconds = duration_minutes * 60
+
+        def fill(template: str) -> str:
+            return template.format(
+                title=topic_data['title'],
+                subject=f"the {rng.choice(subjects)}",
+                subject2=f"the {rng.choice(subjects)}",
+                verb=rng.choice(VERBS),
+                speaker=rng.choice(speakers),
+                due=rng.choice(DUE_DATES)
+            )
+
+        segments = []
+        current_time = 0.0
+        previous = None
+
+        def add(speaker: str, text: str) -> None:
+            nonlocal current_time
+            end = current_time + max(len(text.split()) / WORDS_PER_SECOND, 0.5)
+            segments.append({
+                "text": text,
+                "start": round(current_time, 2),
+                "end": round(end, 2),
+                "speaker": speaker
+            })
+            current_time = end + rng.uniform(0.2, 1.5)
+
+        chair = speakers[0]
+        add(chair, fill(rng.choice(OPENINGS)) + " " + fill(rng.choice(AGENDA)))
+
+        closing_time = total_seconds - 30
+        while current_time < closing_time:
+            speaker = rng.choice([s for s in speakers if s != previous] or speakers)
+            roll = rng.random()
+
+            if roll < 0.1:
+                text = rng.choice(BACKCHANNEL)
+            elif roll < 0.15:
+                speaker = chair
+                text = fill(rng.choice(TRANSITIONS))
+            elif roll < 0.2:
+                text = self.chain.sentence(rng) + " " + fill(rng.choice(DECISIONS))
+            elif roll < 0.25:
+                text = fill(rng.choice(ACTIONS)) + " " + self.chain.sentence(rng)
+            else:
+                text = " ".join(self.chain.sentence(rng) for _ in range(rng.randint(1, 5)))
+
+            add(speaker, text)
+            previous = speaker
+
+        add(chair, rng.choice(CLOSINGS))
+        return segments
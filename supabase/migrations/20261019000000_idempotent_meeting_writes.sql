@@ -0,0 +1,135 @@
+-- Idempotent meeting writes.
+--
+-- * transcripts are keyed by a hash of title, source type and content, so
+--   re-ingesting the same meeting returns the existing row
+-- * summaries are versioned per transcript; exactly one version is latest
+-- * notifications are one row per transcript and channel, updated in place
+-- * save_meeting() writes a transcript, its summary and a pending
+--   notification in one transaction and one round trip
+
+-- Transcripts -------------------------------------------------------------
+
+alter table transcripts add column if not exists content_hash text;
+create unique index if not exists transcripts_content_hash_key on transcripts (content_hash);
+
+-- Summaries ---------------------------------------------------------------
+
+alter table summaries add column if not exists version integer not null default 1;
+alter table summaries add column if not exists is_latest boolean not null default true;
+alter table summaries add column if not exists content_hash text;
+
+-- Existing duplicates become versions, oldest first, newest latest
+with ranked as (
+    select
+        id,
+        row_number() over (partition by transcript_id order by created_at, id) as version,
+        row_number() over (partition by transcript_id order by created_at desc, id desc) = 1 as is_latest
+    from summaries
+)
+update summaries s
+set version = ranked.version, is_latest = ranked.is_latest
+from ranked
+where s.id = ranked.id;
+
+create unique index if not exists summaries_transcript_version_key on summaries (transcript_id, version);
+create unique index if not exists summaries_latest_key on summaries (transcript_id) where is_latest;
+
+-- Notifications -----------------------------------------------------------
+
+-- Keep only the newest row per transcript and channel
+delete from notifications older
+using notifications newer
+where older.transcript_id = newer.transcript_id
+  and older.notification_channel = newer.notification_channel
+  and (older.created_at, older.id) < (newer.created_at, newer.id);
+
+alter table notifications add column if not exists updated_at timestamptz not null default now();
+create unique index if not exists notifications_transcript_channel_key
+    on notifications (transcript_id, notification_channel);
+
+-- Functions ---------------------------------------------------------------
+
+-- Add a summary version unless it matches the latest one, which is returned as is
+create or replace function save_summary_version(
+    p_transcript_id uuid,
+    p_summary_text text,
+    p_key_decisions jsonb,
+    p_action_items jsonb,
+    p_content_hash text
+) returns summaries
+language plpgsql
+as $$
+declare
+    latest summaries;
+    saved summaries;
+begin
+    -- Serialize concurrent regenerations of the same transcript
+    perform pg_advisory_xact_lock(hashtext(p_transcript_id::text));
+
+    select * into latest from summaries where transcript_id = p_transcript_id and is_latest;
+    if found and latest.content_hash = p_content_hash then
+        return latest;
+    end if;
+
+    update summaries set is_latest = false where transcript_id = p_transcript_id and is_latest;
+
+    insert into summaries (transcript_id, summary_text, key_decisions, action_items, content_hash, version, is_latest)
+    values (
+        p_transcript_id, p_summary_text, p_key_decisions, p_action_items, p_content_hash,
+        coalesce((select max(version) from summaries where transcript_id = p_transcript_id), 0) + 1,
+        true
+    )
+    returning * into saved;
+
+    return saved;
+end;
+$$;
+
+-- Save a whole meeting: transcript, optional summary version and optional
+-- pending notification. A notification already sent stays sent.
+create or replace function save_meeting(
+    p_title text,
+    p_content text,
+    p_source_type text,
+    p_content_hash text,
+    p_summary jsonb default null,
+    p_notification_channel text default null
+) returns jsonb
+language plpgsql
+as $$
+declare
+    t transcripts;
+    s summaries;
+    n notifications;
+begin
+    insert into transcripts (meeting_title, content, source_type, content_hash)
+    values (p_title, p_content, p_source_type, p_content_hash)
+    on conflict (content_hash) do update set meeting_title = excluded.meeting_title
+    returning * into t;
+
+    if p_summary is not null then
+        s := save_summary_version(
+            t.id,
+            p_summary->>'summary_text',
+            p_summary->'key_decisions',
+            p_summary->'action_items',
+            p_summary->>'content_hash'
+        );
+    end if;
+
+    if p_notification_channel is not null then
+        insert into notifications (transcript_id, notification_channel, status)
+        values (t.id, p_notification_channel, 'pending')
+        on conflict (transcript_id, notification_channel) do update
+            set status = case when notifications.status = 'sent' then 'sent' else 'pending' end,
+                updated_at = now()
+        returning * into n;
+    end if;
+
+    return jsonb_build_object(
+        'transcript', to_jsonb(t),
+        'summary', case when s.id is null then null else to_jsonb(s) end,
+        'notification', case when n.id is null then null else to_jsonb(n) end
+    );
+end;
+$$;
@@ -0,0 +1,154 @@
+-- Notifications as a durable outbox.
+--
+-- A row is queued (status 'pending') in the same transaction that saves a
+-- summary and carries the message payload. The dispatcher claims due rows
+-- (status 'sending' with a lease), posts them to Slack, several per
+-- channel as one digest, and records 'sent', or 'pending' again with a
+-- backoff, or 'failed' after the last attempt. A claim whose lease runs
+-- out, e.g. because the process died, is picked up again.
+
+alter table notifications add column if not exists summary_id uuid references summaries (id) on delete set null;
+alter table notifications add column if not exists payload jsonb;
+alter table notifications add column if not exists attempts integer not null default 0;
+alter table notifications add column if not exists next_attempt_at timestamptz not null default now();
+alter table notifications add column if not exists last_error text;
+alter table notifications add column if not exists sent_at timestamptz;
+
+create index if not exists notifications_due_idx
+    on notifications (next_attempt_at)
+    where status in ('pending', 'sending');
+
+-- Queue a summary for a channel after p_delay_seconds (the digest window).
+-- A summary already queued or sent is left alone; a new summary version
+-- replaces the queued payload and is delivered again.
+create or replace function enqueue_notification(
+    p_transcript_id uuid,
+    p_channel text,
+    p_summary_id uuid,
+    p_payload jsonb,
+    p_delay_seconds integer default 0
+) returns notifications
+language plpgsql
+as $$
+declare
+    n notifications;
+begin
+    insert into notifications (
+        transcript_id, notification_channel, status, summary_id, payload, attempts, next_attempt_at
+    )
+    values (
+        p_transcript_id, p_channel, 'pending', p_summary_id, p_payload, 0,
+        now() + make_interval(secs => p_delay_seconds)
+    )
+    on conflict (transcript_id, notification_channel) do update
+        set status = 'pending',
+            summary_id = excluded.summary_id,
+            payload = excluded.payload,
+            attempts = 0,
+            last_error = null,
+            next_attempt_at = excluded.next_attempt_at,
+            updated_at = now()
+        where notifications.summary_id is distinct from excluded.summary_id
+           or notifications.status = 'failed'
+    returning * into n;
+
+    if not found then
+        select * into n
+        from notifications
+        where transcript_id = p_transcript_id and notification_channel = p_channel;
+    end if;
+    return n;
+end;
+$$;
+
+-- Claim up to p_limit notifications for delivery. The due rows of a
+-- channel are claimed together with its rows still waiting out the digest
+-- window (never attempted), so summaries that arrived within the window go
+-- out as one digest. Rows backing off after a failed attempt wait until due.
+create or replace function claim_notifications(
+    p_limit integer default 50,
+    p_lease_seconds integer default 120
+) returns setof notifications
+language sql
+as $$
+    with due_channels as (
+        select distinct notification_channel
+        from notifications
+        where status in ('pending', 'sending') and next_attempt_at <= now()
+    ),
+    claimable as (
+        select id
+        from notifications
+        where notification_channel in (select notification_channel from due_channels)
+          and status in ('pending', 'sending')
+          and (next_attempt_at <= now() or (status = 'pending' and attempts = 0))
+        order by created_at
+        limit p_limit
+        for update skip locked
+    )
+    update notifications n
+    set status = 'sending',
+        attempts = n.attempts + 1,
+        next_attempt_at = now() + make_interval(secs => p_lease_seconds),
+        updated_at = now()
+    from claimable
+    where n.id = claimable.id
+    returning n.*;
+$$;
+
+-- save_meeting now queues the notification through enqueue_notification
+drop function if exists save_meeting(text, text, text, text, jsonb, text);
+
+create or replace function save_meeting(
+    p_title text,
+    p_content text,
+    p_source_type text,
+    p_content_hash text,
+    p_summary jsonb default null,
+    p_notification_channel text default null,
+    p_notification_delay_seconds integer default 0
+) returns jsonb
+language plpgsql
+as $$
+declare
+    t transcripts;
+    s summaries;
+    n notifications;
+begin
+    insert into transcripts (meeting_title, content, source_type, content_hash)
+    values (p_title, p_content, p_source_type, p_content_hash)
+    on conflict (content_hash) do update set meeting_title = excluded.meeting_title
+    returning * into t;
+
+    if p_summary is not null then
+        s := save_summary_version(
+            t.id,
+            p_summary->>'summary_text',
+            p_summary->'key_decisions',
+            p_summary->'action_items',
+            p_summary->>'content_hash'
+        );
+
+        if p_notification_channel is not null then
+            n := enqueue_notification(
+                t.id,
+                p_notification_channel,
+                s.id,
+                jsonb_build_object(
+                    'meeting_title', t.meeting_title,
+                    'summary_text', s.summary_text,
+                    'key_decisions', s.key_decisions,
+                    'action_items', s.action_items
+                ),
+                p_notification_delay_seconds
+            );
+        end if;
+    end if;
+
+    return jsonb_build_object(
+        'transcript', to_jsonb(t),
+        'summary', case when s.id is null then null else to_jsonb(s) end,
+        'notification', case when n.id is null then null else to_jsonb(n) end
+    );
+end;
+$$;
@@ -0,0 +1,33 @@
+-- Daily and weekly digests of decisions and action items.
+--
+-- One row per channel, period ('daily' or 'weekly') and period start holds
+-- the running rollup: the latest summary of every meeting summarized in
+-- the period, keyed by transcript id. The digest scheduler folds in
+-- summaries created since the newest high_water_at of the channel and
+-- period, so no run rescans the summaries table, and posts a rollup once
+-- its period has ended. sent_at doubles as the claim, so a digest is
+-- posted once however many schedulers run.
+
+create table if not exists digests (
+    id uuid primary key default gen_random_uuid(),
+    channel text not null,
+    period text not null check (period in ('daily', 'weekly')),
+    period_start timestamptz not null,
+    period_end timestamptz not null,
+    meetings jsonb not null default '{}'::jsonb,
+    high_water_at timestamptz not null,
+    overview text,
+    sent_at timestamptz,
+    created_at timestamptz not null default now(),
+    updated_at timestamptz not null default now()
+);
+
+create unique index if not exists digests_channel_period_start_key
+    on digests (channel, period, period_start);
+
+create index if not exists digests_unsent_idx
+    on digests (channel, period, period_end)
+    where sent_at is null;
+
+-- The incremental scan reads summaries in creation order from the mark
+create index if not exists summaries_created_at_idx on summaries (created_at);
@@ -0,0 +1,166 @@
+-- Indexed action items.
+--
+-- Every action item of a transcript's latest summary, with the assignee,
+-- due date and status parsed from its text (src/core/action_items.py).
+-- The rows are replaced in the transaction that saves a new summary
+-- version; a status someone set by hand (done, blocked) is carried over to
+-- the same item in the new version.
+
+create table if not exists action_items (
+    id uuid primary key default gen_random_uuid(),
+    transcript_id uuid not null references transcripts (id) on delete cascade,
+    summary_id uuid not null references summaries (id) on delete cascade,
+    position integer not null,
+    text text not null,
+    text_key text not null,
+    assignee text,
+    assignee_key text,
+    due_date date,
+    status text not null default 'open' check (status in ('open', 'done', 'blocked')),
+    created_at timestamptz not null default now(),
+    updated_at timestamptz not null default now(),
+    unique (summary_id, position)
+);
+
+-- "Speaker B's open items, soonest first" and "everything overdue"
+create index if not exists action_items_assignee_due_idx
+    on action_items (assignee_key, due_date)
+    where status <> 'done';
+create index if not exists action_items_due_idx
+    on action_items (due_date)
+    where status <> 'done' and due_date is not null;
+create index if not exists action_items_transcript_idx on action_items (transcript_id);
+
+-- Replace the indexed action items of a transcript with p_items, a JSON
+-- array of {text, text_key, assignee, assignee_key, due_date, status}
+create or replace function index_action_items(
+    p_transcript_id uuid,
+    p_summary_id uuid,
+    p_items jsonb
+) returns setof action_items
+language sql
+as $$
+    with previous as (
+        delete from action_items
+        where transcript_id = p_transcript_id
+        returning text_key, status
+    )
+    insert into action_items (
+        transcript_id, summary_id, position, text, text_key, assignee, assignee_key, due_date, status
+    )
+    select
+        p_transcript_id,
+        p_summary_id,
+        e.position - 1,
+        e.item->>'text',
+        e.item->>'text_key',
+        e.item->>'assignee',
+        e.item->>'assignee_key',
+        (e.item->>'due_date')::date,
+        coalesce(
+            (select p.status from previous p where p.text_key = e.item->>'text_key' and p.status <> 'open' limit 1),
+            e.item->>'status',
+            'open'
+        )
+    from jsonb_array_elements(coalesce(p_items, '[]'::jsonb)) with ordinality as e(item, position)
+    returning *;
+$$;
+
+-- save_summary_version indexes the action items of each new version
+drop function if exists save_summary_version(uuid, text, jsonb, jsonb, text);
+
+create or replace function save_summary_version(
+    p_transcript_id uuid,
+    p_summary_text text,
+    p_key_decisions jsonb,
+    p_action_items jsonb,
+    p_content_hash text,
+    p_action_index jsonb default null
+) returns summaries
+language plpgsql
+as $$
+declare
+    latest summaries;
+    saved summaries;
+begin
+    -- Serialize concurrent regenerations of the same transcript
+    perform pg_advisory_xact_lock(hashtext(p_transcript_id::text));
+
+    select * into latest from summaries where transcript_id = p_transcript_id and is_latest;
+    if found and latest.content_hash = p_content_hash then
+        return latest;
+    end if;
+
+    update summaries set is_latest = false where transcript_id = p_transcript_id and is_latest;
+
+    insert into summaries (transcript_id, summary_text, key_decisions, action_items, content_hash, version, is_latest)
+    values (
+        p_transcript_id, p_summary_text, p_key_decisions, p_action_items, p_content_hash,
+        coalesce((select max(version) from summaries where transcript_id = p_transcript_id), 0) + 1,
+        true
+    )
+    returning * into saved;
+
+    if p_action_index is not null then
+        perform index_action_items(p_transcript_id, saved.id, p_action_index);
+    end if;
+
+    return saved;
+end;
+$$;
+
+-- save_meeting passes the parsed action items along with the summary
+create or replace function save_meeting(
+    p_title text,
+    p_content text,
+    p_source_type text,
+    p_content_hash text,
+    p_summary jsonb default null,
+    p_notification_channel text default null,
+    p_notification_delay_seconds integer default 0
+) returns jsonb
+language plpgsql
+as $$
+declare
+    t transcripts;
+    s summaries;
+    n notifications;
+begin
+    insert into transcripts (meeting_title, content, source_type, content_hash)
+    values (p_title, p_content, p_source_type, p_content_hash)
+    on conflict (content_hash) do update set meeting_title = excluded.meeting_title
+    returning * into t;
+
+    if p_summary is not null then
+        s := save_summary_version(
+            t.id,
+            p_summary->>'summary_text',
+            p_summary->'key_decisions',
+            p_summary->'action_items',
+            p_summary->>'content_hash',
+            p_summary->'action_index'
+        );
+
+        if p_notification_channel is not null then
+            n := enqueue_notification(
+                t.id,
+                p_notification_channel,
+                s.id,
+                jsonb_build_object(
+                    'meeting_title', t.meeting_title,
+                    'summary_text', s.summary_text,
+                    'key_decisions', s.key_decisions,
+                    'action_items', s.action_items
+                ),
+                p_notification_delay_seconds
+            );
+        end if;
+    end if;
+
+    return jsonb_build_object(
+        'transcript', to_jsonb(t),
+        'summary', case when s.id is null then null else to_jsonb(s) end,
+        'notification', case when n.id is null then null else to_jsonb(n) end
+    );
+end;
+$$;
@@ -0,0 +1,19 @@
+-- Known speakers per organization.
+--
+-- A row is a person who was named in a meeting, by a self-introduction or
+-- a correction, with a text signature: weighted words and word pairs they
+-- tend to use (src/core/speakers.py). New meetings match their unnamed
+-- speakers against these signatures at format time.
+
+create table if not exists speaker_identities (
+    id uuid primary key default gen_random_uuid(),
+    organization text not null default 'default',
+    name text not null,
+    name_key text not null,
+    signature jsonb not null default '{}'::jsonb,
+    samples integer not null default 0,
+    source text not null default 'introduction' check (source in ('introduction', 'correction')),
+    created_at timestamptz not null default now(),
+    updated_at timestamptz not null default now(),
+    unique (organization, name_key)
+);
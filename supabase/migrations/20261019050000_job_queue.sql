@@ -0,0 +1,162 @@
+-- Shared job queue.
+--
+-- With JOB_BACKEND=queue the API tier only inserts jobs here and worker
+-- processes (run_worker.py), on any number of nodes, run them. A worker
+-- claims queued jobs of the kinds it serves (status 'running', leased to
+-- its worker id) and renews the lease while the job runs. A job whose
+-- lease runs out, because its worker died, is claimed again by another
+-- worker until max_attempts is used up. A step waiting for an external
+-- callback (the AssemblyAI webhook) leaves the job 'waiting'; resume_job
+-- queues the rest of the work, even when the callback beats the step.
+
+create table if not exists jobs (
+    id uuid primary key default gen_random_uuid(),
+    kind text not null,
+    task text not null,
+    payload jsonb not null default '{}'::jsonb,
+    metadata jsonb not null default '{}'::jsonb,
+    status text not null default 'queued'
+        check (status in ('queued', 'running', 'waiting', 'succeeded', 'failed')),
+    attempts integer not null default 0,
+    max_attempts integer not null default 3,
+    run_after timestamptz not null default now(),
+    lease_owner text,
+    lease_expires_at timestamptz,
+    resumed boolean not null default false,
+    continuation jsonb,
+    progress jsonb,
+    result jsonb,
+    error text,
+    created_at timestamptz not null default now(),
+    started_at timestamptz,
+    finished_at timestamptz,
+    updated_at timestamptz not null default now()
+);
+
+create index if not exists jobs_queued_idx on jobs (kind, run_after) where status = 'queued';
+create index if not exists jobs_lease_idx on jobs (lease_expires_at) where status = 'running';
+create index if not exists jobs_created_idx on jobs (created_at desc);
+
+-- Claim up to p_limit due jobs of p_kinds (all kinds when null) for
+-- p_worker. Jobs are claimed exclusively between workers; a running job
+-- whose lease ran out counts as due.
+create or replace function claim_jobs(
+    p_worker text,
+    p_kinds text[] default null,
+    p_limit integer default 1,
+    p_lease_seconds integer default 300
+) returns setof jobs
+language plpgsql
+as $$
+begin
+    -- Jobs lost by their worker too often are given up on
+    update jobs
+    set status = 'failed',
+        error = format('Worker lost the job %s times', attempts),
+        lease_owner = null,
+        lease_expires_at = null,
+        finished_at = now(),
+        updated_at = now()
+    where status = 'running'
+      and lease_expires_at <= now()
+      and attempts >= max_attempts
+      and (p_kinds is null or kind = any (p_kinds));
+
+    return query
+    with claimable as (
+        select id
+        from jobs
+        where (p_kinds is null or kind = any (p_kinds))
+          and ((status = 'queued' and run_after <= now())
+               or (status = 'running' and lease_expires_at <= now()))
+        order by run_after, created_at
+        limit p_limit
+        for update skip locked
+    )
+    update jobs j
+    set status = 'running',
+        attempts = j.attempts + 1,
+        lease_owner = p_worker,
+        lease_expires_at = now() + make_interval(secs => p_lease_seconds),
+        started_at = coalesce(j.started_at, now()),
+        updated_at = now()
+    from claimable
+    where j.id = claimable.id
+    returning j.*;
+end;
+$$;
+
+-- Extend the leases p_worker still holds; returns the ids it still holds
+create or replace function renew_job_leases(
+    p_worker text,
+    p_ids uuid[],
+    p_lease_seconds integer default 300
+) returns setof uuid
+language sql
+as $$
+    update jobs
+    set lease_expires_at = now() + make_interval(secs => p_lease_seconds),
+        updated_at = now()
+    where id = any (p_ids) and lease_owner = p_worker and status = 'running'
+    returning id;
+$$;
+
+-- Record the outcome of the step p_worker ran: 'succeeded', 'failed' or
+-- 'waiting'. A waiting job that was resumed meanwhile is queued with its
+-- continuation straight away. No row is returned if the worker no longer
+-- holds the lease (another worker took the job over).
+create or replace function finish_job(
+    p_id uuid,
+    p_worker text,
+    p_status text,
+    p_result jsonb default null,
+    p_error text default null
+) returns setof jobs
+language sql
+as $$
+    update jobs j
+    set status = case
+            when p_status = 'waiting' and j.continuation is not null then 'queued'
+            else p_status
+        end,
+        task = case when p_status = 'waiting' and j.continuation is not null
+                    then j.continuation->>'task' else j.task end,
+        payload = case when p_status = 'waiting' and j.continuation is not null
+                       then j.continuation->'payload' else j.payload end,
+        continuation = case when p_status = 'waiting' then null else j.continuation end,
+        attempts = case when p_status = 'waiting' then 0 else j.attempts end,
+        run_after = now(),
+        result = p_result,
+        error = p_error,
+        lease_owner = null,
+        lease_expires_at = null,
+        finished_at = case when p_status in ('succeeded', 'failed') then now() end,
+        updated_at = now()
+    where j.id = p_id and j.lease_owner = p_worker and j.status = 'running'
+    returning j.*;
+$$;
+
+-- Continue a job with p_task/p_payload once its external callback
+-- arrived. Returns no row if the job was already resumed or finished.
+create or replace function resume_job(
+    p_id uuid,
+    p_task text,
+    p_payload jsonb
+) returns setof jobs
+language sql
+as $$
+    update jobs j
+    set resumed = true,
+        status = case when j.status = 'waiting' then 'queued' else j.status end,
+        task = case when j.status = 'waiting' then p_task else j.task end,
+        payload = case when j.status = 'waiting' then p_payload else j.payload end,
+        attempts = case when j.status = 'waiting' then 0 else j.attempts end,
+        -- The step that waits for the callback is still running; it
+        -- queues the continuation when it finishes
+        continuation = case when j.status = 'waiting' then null
+                            else jsonb_build_object('task', p_task, 'payload', p_payload) end,
+        run_after = now(),
+        updated_at = now()
+    where j.id = p_id and not j.resumed and j.status in ('queued', 'running', 'waiting')
+    returning j.*;
+$$;
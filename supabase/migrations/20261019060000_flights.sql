@@ -0,0 +1,75 @@
+-- Single-flight leases.
+--
+-- When several processes are asked for the same expensive result at once
+-- (two users generating the summary of one meeting, a Slack retry of an
+-- event), the first to call begin_flight becomes the flight's owner and
+-- computes it; the others find the key running under another owner, wait,
+-- and read the owner's result once finish_flight records it. A flight
+-- whose owner stops renewing the lease (it died) can be taken over.
+
+create table if not exists flights (
+    key text primary key,
+    owner text not null,
+    status text not null default 'running'
+        check (status in ('running', 'succeeded', 'failed')),
+    result jsonb,
+    error text,
+    expires_at timestamptz not null,
+    updated_at timestamptz not null default now()
+);
+
+create index if not exists flights_updated_idx on flights (updated_at) where status <> 'running';
+
+-- Start (or renew) p_owner's flight of p_key. Returns the flight row:
+-- owned by p_owner if it may compute, otherwise the flight it should
+-- wait for. A finished or expired flight is taken over.
+create or replace function begin_flight(
+    p_key text,
+    p_owner text,
+    p_lease_seconds integer default 300
+) returns setof flights
+language plpgsql
+as $$
+begin
+    -- Finished flights only matter to the callers that waited for them
+    delete from flights where status <> 'running' and updated_at < now() - interval '1 day';
+
+    return query
+    insert into flights as f (key, owner, status, expires_at, updated_at)
+    values (p_key, p_owner, 'running', now() + make_interval(secs => p_lease_seconds), now())
+    on conflict (key) do update
+    set owner = excluded.owner,
+        status = 'running',
+        result = null,
+        error = null,
+        expires_at = excluded.expires_at,
+        updated_at = now()
+    where f.owner = p_owner or f.status <> 'running' or f.expires_at <= now()
+    returning f.*;
+
+    if not found then
+        return query select * from flights where key = p_key;
+    end if;
+end;
+$$;
+
+-- Record the outcome of p_owner's flight ('succeeded' with p_result, or
+-- 'failed'). No row is returned if another owner took the flight over.
+create or replace function finish_flight(
+    p_key text,
+    p_owner text,
+    p_status text,
+    p_result jsonb default null,
+    p_error text default null
+) returns setof flights
+language sql
+as $$
+    update flights
+    set status = p_status,
+        result = p_result,
+        error = p_error,
+        expires_at = now(),
+        updated_at = now()
+    where key = p_key and owner = p_owner and status = 'running'
+    returning *;
+$$;
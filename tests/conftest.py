@@ -0,0 +1,112 @@
+"""
+Shared fixtures: tests run against the in-memory Supabase fake and the
+offline LLM backend from benchmarks/stubs.py, never a network service.
+"""
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Background delivery threads stay off unless a test starts them
+os.environ.setdefault("NOTIFICATION_DISPATCHER", "false")
+os.environ.setdefault("DIGEST_PERIODS", "")
+
+from benchmarks.stubs import FakeSupabaseClient, SlackStub  # noqa: E402
+from src.core import quota, resilience  # noqa: E402
+from src.api.integrations.slack.notifier import SlackNotifier  # noqa: E402
+from src.core.db import DatabaseManager  # noqa: E402
+from src.core.llm_backends import StubBackend  # noqa: E402
+from src.core.services import ServiceContainer, get_services  # noqa: E402
+from src.core.workers import CpuPool  # noqa: E402
+
+
+
+@pytest.fixture(autouse=True)
+def fresh_policies(monkeypatch):
+    """Every test gets its own circuit breakers, bulkheads and quota schedulers."""
+    monkeypatch.setattr(resilience, "_dependencies", {})
+    monkeypatch.setattr(quota, "_schedulers", {})
+
+
+@pytest.fixture
+def fake_client():
+    return FakeSupabaseClient()
+
+
+@pytest.fixture
+def db(fake_client):
+    return DatabaseManager(client=fake_client)
+
+
+@pytest.fixture(scope="session")
+def slack_server():
+    with SlackStub() as stub:
+        yield stub
+
+
+@pytest.fixture
+def slack(slack_server):
+    """Local Slack API recording every message posted to it."""
+    slack_server.messages.clear()
+    slack_server.users.clear()
+    slack_server.error_rate = 0.0
+    return slack_server
+
+
+@pytest.fixture
+def notifier(slack):
+    notifier = SlackNotifier(token="xoxb-test", channel="C-MEETINGS")
+    notifier.base_url = f"{slack.base_url}/api/chat.postMessage"
+    return notifier
+
+
+@pytest.fixture
+def services(db, monkeypatch):
+    """A container running on the in-memory database and the offline LLM backend."""
+    monkeypatch.setenv("SINGLE_FLIGHT_POLL_INTERVAL", "0.01")
+    container = ServiceContainer({
+        "db": lambda c: db,
+        "llm_backend": lambda c: StubBackend(),
+        "cpu": lambda c: CpuPool(workers=0)
+    })
+    yield container
+    for name in ("notifications", "digests"):
+        if container.is_built(name):
+            container.get(name).stop(timeout=5)
+    if container.is_built("jobs"):
+        container.jobs.shutdown()
+
+
+class RecordingJobs:
+    """Job manager that records what would run instead of running it"""
+
+    def __init__(self):
+        self.resumed = []
+
+    def resume(self, job_id, kind, fn, *args, **kwargs):
+        self.resumed.append((job_id, kind, fn.__name__))
+        return None if job_id == "finished" else type("Job", (), {"id": job_id or "job-1"})()
+
+    def get(self, job_id):
+        return None
+
+    def shutdown(self):
+        pass
+
+
+@pytest.fixture
+def api_key():
+    return "test-key"
+
+
+@pytest.fixture
+def client(services, api_key, monkeypatch):
+    """The API, on the services fixture, with MEETGIST_API_KEY set and no webhook secret."""
+    from src.api.main import app
+    monkeypatch.setenv("MEETGIST_API_KEY", api_key)
+    monkeypatch.delenv("ASSEMBLYAI_WEBHOOK_SECRET", raising=False)
+    services.register("jobs", lambda c: RecordingJobs())
+    app.dependency_overrides[get_services] = lambda: services
+    # Without the context manager the lifespan (dispatcher, digests) doesn't run
+    yield TestClient(app)
+    app.dependency_overrides.clear()
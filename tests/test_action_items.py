@@ -0,0 +1,155 @@
+import json
+from datetime import date
+
+import pytest
+
+from src.core.action_items import (
+    BLOCKED, DONE, OPEN, assignee_key, index_action_items, normalize_assignee, parse_action_item,
+    parse_assignee, parse_due_date, parse_status
+)
+
+# A Wednesday
+REFERENCE = date(2024, 3, 6)
+
+
+@pytest.mark.parametrize("text, assignee", [
+    ("Speaker B to confirm vendor pricing by Friday", "Speaker B"),
+    ("Alice will send the report", "Alice"),
+    ("Alice: send the report", "Alice"),
+    ("Speaker B - confirm pricing", "Speaker B"),
+    ("Send the report (Carol)", "Carol"),
+    ("Send the report - Dave", "Dave"),
+    ("Owner: Erin", "Erin"),
+    ("Update the roadmap, assigned to speaker c", "Speaker C"),
+    ("@frank please review the PR", "Frank"),
+    ("TODO: Speaker B to confirm pricing", "Speaker B"),
+    ("[x] Alice to book the room", "Alice"),
+    ("[x] Done: update roadmap", None),
+    ("Blocked - waiting on legal", None),
+    ("The team will review the budget", None),
+    ("We to follow up next week", None),
+    ("Friday: finalize the deck", None),
+    ("Review the budget", None),
+])
+def test_parse_assignee(text, assignee):
+    assert parse_assignee(text) == assignee
+
+
+def test_normalize_assignee():
+    assert normalize_assignee("speaker b") == "Speaker B"
+    assert normalize_assignee("@Speaker  B") == "Speaker B"
+    assert normalize_assignee("Everyone") is None
+    assert normalize_assignee("") is None
+    assert assignee_key("@Speaker  B") == "speaker b"
+
+
+@pytest.mark.parametrize("text, due", [
+    ("Ship it by 2024-04-02", date(2024, 4, 2)),
+    ("Draft by end of April", date(2024, 4, 30)),
+    ("Close the books by end of Jan", date(2025, 1, 31)),
+    ("Send by March 15th", date(2024, 3, 15)),
+    ("Send by 15 March", date(2024, 3, 15)),
+    ("Renew by January 10", date(2025, 1, 10)),
+    ("Send by 3/20", date(2024, 3, 20)),
+    ("Send by 3/20/25", date(2025, 3, 20)),
+    ("Fix it today", REFERENCE),
+    ("Fix it ASAP", REFERENCE),
+    ("Fix it tomorrow", date(2024, 3, 7)),
+    ("Follow up in 3 days", date(2024, 3, 9)),
+    ("Follow up in two weeks", date(2024, 3, 20)),
+    ("Wrap up by end of week", date(2024, 3, 8)),
+    ("Wrap up next week", date(2024, 3, 15)),
+    ("Report by EOM", date(2024, 3, 31)),
+    ("Report by end of quarter", date(2024, 3, 31)),
+    ("Confirm by Friday", date(2024, 3, 8)),
+    ("Confirm by next Friday", date(2024, 3, 15)),
+    ("Confirm by Wednesday", date(2024, 3, 13)),
+    ("Confirm by next Monday", date(2024, 3, 11)),
+    ("Send by 2024-02-30", None),
+    ("Review the budget", None),
+])
+def test_parse_due_date(text, due):
+    assert parse_due_date(text, REFERENCE) == due
+
+
+def test_end_of_week_on_a_friday_is_that_day():
+    assert parse_due_date("by EOW", date(2024, 3, 8)) == date(2024, 3, 8)
+
+
+@pytest.mark.parametrize("text, status", [
+    ("[x] Alice to book the room", DONE),
+    ("Done: update roadmap", DONE),
+    ("Alice booked the room - completed", DONE),
+    ("Migration blocked on the vendor", BLOCKED),
+    ("Hiring on hold until Q3", BLOCKED),
+    ("Alice to book the room", OPEN),
+])
+def test_parse_status(text, status):
+    assert parse_status(text) == status
+
+
+def test_parse_action_item():
+    item = parse_action_item("  Speaker B to confirm   pricing by Friday ", REFERENCE)
+    assert item["text"] == "Speaker B to confirm pricing by Friday"
+    assert item["assignee"] == "Speaker B"
+    assert item["assignee_key"] == "speaker b"
+    assert item["due_date"] == "2024-03-08"
+    assert item["status"] == OPEN
+    # The key survives a change of case, so the item is matched across summary versions
+    assert item["text_key"] == parse_action_item("speaker b to confirm pricing by friday", REFERENCE)["text_key"]
+
+
+def test_index_action_items_skips_placeholders():
+    items = index_action_items(["Alice to send the notes", "", "None", "N/A", "Bob: book the room"], REFERENCE)
+    assert [item["assignee"] for item in items] == ["Alice", "Bob"]
+    assert index_action_items("Carol to follow up", REFERENCE)[0]["assignee"] == "Carol"
+    assert index_action_items(None, REFERENCE) == []
+
+
+@pytest.fixture
+def slack_events(client, services, notifier, fake_client):
+    from src.api.main import app
+    from src.api.services.query import QueryService, get_query_service, get_slack_notifier
+    fake_client.tables["action_items"] = [
+        {"id": "1", "text": "Alice to send the notes", "assignee": "Alice", "assignee_key": "alice", "status": OPEN},
+        {"id": "2", "text": "Bob to book the room", "assignee": "Bob", "assignee_key": "bob", "status": OPEN},
+    ]
+    services.register("slack_notifier", lambda c: notifier)
+    app.dependency_overrides[get_slack_notifier] = lambda: notifier
+    app.dependency_overrides[get_query_service] = lambda: QueryService(db=services.db)
+
+    def mention(text, user="U0ALICE"):
+        event = {"type": "app_mention", "channel": "C-MEETINGS", "text": f"<@U0BOT> {text}", "user": user}
+        return client.post("/api/v1/events/", json={"type": "event_callback", "event": event})
+    return mention
+
+
+def test_my_actions_lists_only_the_askers_items(slack_events, slack):
+    slack.users["U0ALICE"] = "Alice"
+    assert slack_events("my actions").status_code == 200
+    [message] = slack.messages
+    assert message["text"] == "✅ Open action items for Alice"
+    assert "Bob" not in json.dumps(message["blocks"])
+
+
+@pytest.mark.parametrize("text", ["my actions", "actions for <@U0GONE>"])
+def test_unresolved_users_never_get_everyones_items(slack_events, slack, text):
+    assert slack_events(text).status_code == 200
+    [message] = slack.messages
+    assert message["text"].startswith("Sorry, I couldn't resolve")
+    assert "blocks" not in message
+
+
+def test_backfill_indexes_latest_summaries_through_the_manager(db, fake_client):
+    from migrate_transcripts import index_existing_action_items
+
+    fake_client.tables["summaries"] = [
+        {"id": f"s{i}", "transcript_id": f"t{i}", "is_latest": True, "created_at": "2024-05-08T09:00:00",
+         "action_items": ["Alice to send the notes by Friday"]} for i in range(3)
+    ] + [{"id": "s9", "transcript_id": "t0", "is_latest": False, "created_at": "2024-05-01T09:00:00",
+          "action_items": ["Bob to book the room"]}]
+
+    assert index_existing_action_items(batch_size=2, db=db) == 3
+    rows = fake_client.tables["action_items"]
+    assert sorted(r["summary_id"] for r in rows) == ["s0", "s1", "s2"]
+    assert {r["due_date"] for r in rows} == {"2024-05-10"}
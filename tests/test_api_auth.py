@@ -0,0 +1,54 @@
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+
+def _save(client, title="Standup", content="Speaker A: We ship Friday.", **headers):
+    return client.post("/api/v1/transcripts/text", json={"title": title, "content": content}, headers=headers)
+
+
+def test_meetings_api_requires_the_key(client):
+    assert _save(client).status_code == 401
+    assert _save(client, **{"X-API-Key": "wrong"}).status_code == 401
+    assert client.get("/api/v1/action-items").status_code == 401
+    assert client.patch("/api/v1/action-items/1", json={"status": "done"}).status_code == 401
+    assert client.post("/api/v1/transcripts/1/speakers", json={"names": {"Speaker A": "Alice"}}).status_code == 401
+
+
+def test_meetings_api_accepts_the_key_in_the_header_or_query(client, api_key):
+    response = _save(client, **{"X-API-Key": api_key})
+    assert response.status_code == 201
+    transcript_id = response.json()["transcript_id"]
+
+    response = client.get(f"/api/v1/transcripts/{transcript_id}", params={"api_key": api_key})
+    assert response.status_code == 200
+    assert response.json()["meeting_title"] == "Standup"
+
+
+def test_meetings_api_is_closed_without_a_configured_key(client, api_key, monkeypatch):
+    monkeypatch.delenv("MEETGIST_API_KEY")
+    assert _save(client, **{"X-API-Key": api_key}).status_code == 500
+
+
+def test_job_websocket_requires_the_key(client, api_key):
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with client.websocket_connect("/api/v1/jobs/missing/ws"):
+            pass
+    assert closed.value.code == 1008
+
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with client.websocket_connect(f"/api/v1/jobs/missing/ws?api_key={api_key}"):
+            pass
+    assert closed.value.code == 4404
+
+
+def test_health_stays_public(client):
+    assert client.get("/health").status_code == 200
+
+
+def test_cors_allows_only_configured_origins(client):
+    preflight = client.options("/api/v1/action-items", headers={
+        "Origin": "https://evil.example",
+        "Access-Control-Request-Method": "GET"
+    })
+    assert preflight.status_code == 400
+    assert "access-control-allow-origin" not in preflight.headers
@@ -0,0 +1,83 @@
+import argparse
+
+import assemblyai as aai
+import pytest
+
+from benchmarks.pipeline import StageTimer, compare, percentile, run_benchmark
+from benchmarks.stubs import FakeSupabaseClient
+
+
+def test_percentiles_use_the_nearest_rank():
+    values = [float(v) for v in range(1, 11)]
+    assert (percentile(values, 50), percentile(values, 95), percentile(values, 100)) == (5.0, 10.0, 10.0)
+    assert percentile([], 95) == 0.0
+
+
+def test_stage_timer_counts_none_and_exceptions_as_errors():
+    class Notifier:
+        def send(self, ok):
+            if ok is None:
+                raise ConnectionError
+            return ok
+
+    timer = StageTimer()
+    notifier = Notifier()
+    timer.wrap(notifier, "send", "notify")
+    notifier.send(True)
+    notifier.send(False)
+    with pytest.raises(ConnectionError):
+        notifier.send(None)
+
+    report = timer.report()
+    assert list(report) == ["notify"]
+    assert (report["notify"]["count"], report["notify"]["errors"]) == (3, 2)
+
+
+def test_regressions_against_a_baseline():
+    baseline = {"stages": {"summarize": {"p95_s": 1.0}, "notify": {"p95_s": 0.0}}, "throughput_meetings_per_s": 2.0}
+    results = {"stages": {"summarize": {"p95_s": 1.3}, "notify": {"p95_s": 0.5}, "format": {"p95_s": 9.0}},
+               "throughput_meetings_per_s": 1.5}
+    assert compare(results, baseline, 0.2) == ["summarize: p95 1.000s -> 1.300s", "throughput: 2.00/s -> 1.50/s"]
+    assert compare(results, baseline, 0.5) == []
+
+
+def test_fake_supabase_follows_postgrest():
+    client = FakeSupabaseClient()
+    client.table("digests").upsert([{"channel": "C1", "period": "daily", "sent_at": None}],
+                                   on_conflict="channel,period").execute()
+    client.table("digests").upsert({"channel": "C1", "period": "daily", "sent_at": "2026-10-19"},
+                                   on_conflict="channel,period").execute()
+    client.table("digests").insert({"channel": "C2", "period": "daily"}).execute()
+
+    rows = client.table("digests").select("*").order("sent_at", desc=False).execute().data
+    assert [row["channel"] for row in rows] == ["C1", "C2"]
+    assert client.table("digests").select("*").is_("sent_at", "null").single().execute().data["channel"] == "C2"
+    # maybe_single() returns no response at all rather than an empty one
+    assert client.table("digests").select("*").eq("channel", "C3").maybe_single().execute() is None
+    with pytest.raises(Exception):
+        client.table("digests").select("*").single().execute()
+
+
+def test_fake_supabase_injects_failures():
+    client = FakeSupabaseClient(error_rate=1.0)
+    with pytest.raises(Exception, match="injected"):
+        client.table("transcripts").select("*").execute()
+    assert client.stats == {"queries": 1, "errors": 1}
+
+
+def test_meetings_run_end_to_end_against_the_stand_ins(monkeypatch):
+    # The benchmark points the AssemblyAI SDK at its stub; put the settings back afterwards
+    monkeypatch.setattr(aai.settings, "base_url", aai.settings.base_url)
+    monkeypatch.setattr(aai.settings, "polling_interval", aai.settings.polling_interval)
+    args = argparse.Namespace(
+        meetings=2, concurrency=2, duration_minutes=2, audio_kb=4, asr_time=0.05, poll_interval=0.02,
+        llm_input_cost=0.0, llm_output_cost=0.0, http_latency=0.0, db_latency=0.0, error_rate=0.0
+    )
+    results = run_benchmark(args)
+
+    assert results["succeeded"] == 2
+    assert set(results["stages"]) == {"transcribe", "format", "save_transcript", "summarize", "save_summary",
+                                      "notify", "total"}
+    assert all(stats["errors"] == 0 for stats in results["stages"].values())
+    # Each meeting is formatted twice, structured and plain
+    assert {stage: stats["count"] for stage, stats in results["stages"].items() if stats["count"] != 2} == {"format": 4}
@@ -0,0 +1,112 @@
+import threading
+
+import pytest
+
+from src.core.chunk_cache import ChunkCache
+from src.core.chunking import chunk_transcript, content_hash, split_turns
+from src.core.llm_backends import StubBackend
+from src.core.meeting_summarizer import MeetingSummarizer
+
+
+class CountingBackend(StubBackend):
+    def __init__(self):
+        super().__init__()
+        self.prompts = []
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, model_id, parameters):
+        with self._lock:
+            self.prompts.append(prompt)
+        return super().generate(prompt, model_id, parameters)
+
+
+def _transcript(turns=300, edit=None):
+    lines = [f"Speaker {'AB'[i % 2]}: Item {i} of the agenda, discussed at some length by the team."
+             for i in range(turns)]
+    if edit is not None:
+        lines[edit] = "Speaker A: We changed our minds and will ship on Monday instead."
+    return "\n\n".join(lines)
+
+
+@pytest.fixture
+def summarizer(tmp_path, monkeypatch):
+    monkeypatch.setenv("SUMMARY_CHUNK_MIN_CHARS", "2000")
+    monkeypatch.setenv("SUMMARY_CHUNK_MAX_CHARS", "4000")
+    return MeetingSummarizer(None, None, backend=CountingBackend(), chunk_cache=ChunkCache(str(tmp_path)))
+
+
+def test_split_turns():
+    assert split_turns("A: one\n\nB: two\n\n\n") == ["A: one", "B: two"]
+    assert split_turns("A: one\nB: two") == ["A: one", "B: two"]
+
+
+def test_chunks_keep_whole_turns_within_bounds():
+    text = _transcript()
+    chunks = chunk_transcript(text, min_chars=2000, max_chars=4000)
+    assert len(chunks) > 3
+    assert "\n\n".join(chunks) == text
+    assert all(len(chunk) <= 4000 for chunk in chunks)
+    assert all(len(chunk) >= 2000 for chunk in chunks[:-1])
+
+
+def test_an_edit_only_changes_nearby_chunks():
+    before = chunk_transcript(_transcript(), min_chars=2000, max_chars=4000)
+    after = chunk_transcript(_transcript(edit=150), min_chars=2000, max_chars=4000)
+    changed = set(after) - set(before)
+    assert 1 <= len(changed) <= 2
+    assert before[0] == after[0] and before[-1] == after[-1]
+
+
+def test_content_hash_covers_every_part():
+    assert content_hash("text", "model-a") == content_hash("text", "model-a")
+    assert content_hash("text", "model-a") != content_hash("text", "model-b")
+    assert content_hash("text", "ab", "c") != content_hash("text", "a", "bc")
+
+
+def test_chunk_cache_persists_to_disk(tmp_path):
+    ChunkCache(str(tmp_path)).set("abcdef", {"summary": "notes"})
+    cache = ChunkCache(str(tmp_path))
+    assert cache.get("abcdef") == {"summary": "notes"}
+    assert cache.get("missing") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_chunk_cache_keeps_only_recent_entries_in_memory(tmp_path):
+    cache = ChunkCache(str(tmp_path), max_entries=2)
+    for key in ("aa1", "bb2", "cc3"):
+        cache.set(key, {"summary": key})
+    cache.get("bb2")
+    cache.set("dd4", {"summary": "dd4"})
+
+    assert list(cache._memory) == ["bb2", "dd4"]
+    # Evicted entries are still read back from disk
+    assert cache.get("aa1") == {"summary": "aa1"}
+
+
+def test_concurrent_writers_of_a_key_never_share_a_temp_file(tmp_path):
+    caches = [ChunkCache(str(tmp_path), max_entries=0) for _ in range(8)]
+    value = {"summary": "x" * 100000}
+    threads = [threading.Thread(target=cache.set, args=("abcdef", value)) for cache in caches]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert ChunkCache(str(tmp_path)).get("abcdef") == value
+    assert [path.name for path in (tmp_path / "ab").iterdir()] == ["abcdef.json"]
+
+
+def test_regeneration_only_maps_changed_chunks(summarizer):
+    first = summarizer.generate_summary(_transcript())
+    chunks = len(chunk_transcript(_transcript(), 2000, 4000))
+    # One map prompt per chunk, then one reduce prompt
+    assert len(summarizer.backend.prompts) == chunks + 1
+    assert first["mode"] == "map_reduce"
+
+    summarizer.backend.prompts.clear()
+    summarizer.generate_summary(_transcript(edit=150))
+    assert 2 <= len(summarizer.backend.prompts) <= 3
+
+    summarizer.backend.prompts.clear()
+    summarizer.generate_summary(_transcript(edit=150))
+    assert len(summarizer.backend.prompts) == 1
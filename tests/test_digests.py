@@ -0,0 +1,134 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from src.core.digests import DigestScheduler, period_bounds
+from src.core.llm_backends import StubBackend
+
+# Monday to Sunday, and the week after
+MONDAY = datetime(2024, 3, 4, 9, tzinfo=timezone.utc)
+NEXT_MONDAY = datetime(2024, 3, 11, 9, tzinfo=timezone.utc)
+MONDAY_AFTER = datetime(2024, 3, 18, 9, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def scheduler(db, notifier):
+    return DigestScheduler(db, notifier, periods=["weekly"], timezone_name="UTC", overview=False,
+                           settle_seconds=0)
+
+
+def _summarize(fake_client, transcript_id, created_at, version=1, title=None, decisions=("Ship on Friday",)):
+    row = {
+        "id": f"{transcript_id}-v{version}",
+        "created_at": created_at.isoformat(),
+        "transcript_id": transcript_id,
+        "version": version,
+        "summary_text": "Summary",
+        "key_decisions": list(decisions),
+        "action_items": ["Alice to update the roadmap"],
+        "transcripts": {"meeting_title": title or f"Meeting {transcript_id}"}
+    }
+    fake_client.tables.setdefault("summaries", []).append(row)
+    return row
+
+
+def _digest(db, start):
+    digests = db.get_digests("C-MEETINGS", "weekly", [start.isoformat()])
+    return digests[0] if digests else None
+
+
+def test_period_bounds():
+    assert period_bounds("weekly", datetime(2024, 3, 6, 15, tzinfo=timezone.utc)) == (
+        datetime(2024, 3, 4, tzinfo=timezone.utc), datetime(2024, 3, 11, tzinfo=timezone.utc)
+    )
+    assert period_bounds("daily", datetime(2024, 3, 6, 15, tzinfo=timezone.utc))[1] == \
+        datetime(2024, 3, 7, tzinfo=timezone.utc)
+    with pytest.raises(ValueError):
+        period_bounds("monthly", MONDAY)
+
+
+def test_rollup_is_posted_once_its_period_ends(scheduler, db, fake_client, slack):
+    _summarize(fake_client, "t1", MONDAY)
+    _summarize(fake_client, "t2", MONDAY.replace(day=6))
+    assert scheduler.run_once(now=MONDAY.replace(day=7)) == {"summaries": 2, "sent": 0, "failed": 0}
+    assert sorted(_digest(db, MONDAY.replace(hour=0))["meetings"]) == ["t1", "t2"]
+    assert slack.messages == []
+
+    assert scheduler.run_once(now=NEXT_MONDAY)["sent"] == 1
+    assert len(slack.messages) == 1
+    assert _digest(db, MONDAY.replace(hour=0))["sent_at"]
+    assert scheduler.run_once(now=NEXT_MONDAY)["sent"] == 0
+    assert len(slack.messages) == 1
+
+
+def test_each_channel_gets_its_own_rollup(db, notifier, fake_client, slack):
+    scheduler = DigestScheduler(db, notifier, periods=["weekly"], channels=["C-MEETINGS", "C-LEADS"],
+                                timezone_name="UTC", overview=False, settle_seconds=0)
+    _summarize(fake_client, "t1", MONDAY)
+    scheduler.run_once(now=MONDAY.replace(day=7))
+
+    assert scheduler.run_once(now=NEXT_MONDAY)["sent"] == 2
+    assert sorted(message["channel"] for message in slack.messages) == ["C-LEADS", "C-MEETINGS"]
+    assert db.get_digests("C-LEADS", "weekly", [MONDAY.replace(hour=0).isoformat()])[0]["meetings"].keys() == {"t1"}
+
+
+def test_digests_are_off_unless_periods_are_configured(db, notifier, monkeypatch):
+    monkeypatch.delenv("DIGEST_PERIODS", raising=False)
+    assert DigestScheduler(db, notifier).periods == []
+
+
+
+def test_a_new_summary_version_replaces_the_earlier_one(scheduler, db, fake_client):
+    _summarize(fake_client, "t1", MONDAY, decisions=["Ship on Friday"])
+    scheduler.run_once(now=MONDAY.replace(hour=10))
+    _summarize(fake_client, "t1", MONDAY.replace(hour=11), version=2, decisions=["Ship next Monday"])
+    scheduler.run_once(now=MONDAY.replace(hour=12))
+
+    meeting = _digest(db, MONDAY.replace(hour=0))["meetings"]["t1"]
+    assert meeting["version"] == 2
+    assert meeting["key_decisions"] == ["Ship next Monday"]
+
+
+def test_summary_arriving_after_its_digest_was_posted_goes_out_next_period(scheduler, db, fake_client, slack):
+    _summarize(fake_client, "t1", MONDAY)
+    scheduler.run_once(now=MONDAY.replace(hour=10))
+    assert scheduler.run_once(now=NEXT_MONDAY)["sent"] == 1
+
+    # Committed late: created on Sunday, read only after the week was posted
+    _summarize(fake_client, "t2", datetime(2024, 3, 10, 23, tzinfo=timezone.utc))
+    scheduler.run_once(now=NEXT_MONDAY.replace(hour=10))
+
+    assert sorted(_digest(db, MONDAY.replace(hour=0))["meetings"]) == ["t1"]
+    # The boundary summary read again isn't carried over with it
+    assert sorted(_digest(db, NEXT_MONDAY.replace(hour=0))["meetings"]) == ["t2"]
+
+    assert scheduler.run_once(now=MONDAY_AFTER)["sent"] == 1
+    assert len(slack.messages) == 2
+
+
+def test_failed_post_is_retried(scheduler, db, fake_client, slack):
+    _summarize(fake_client, "t1", MONDAY)
+    scheduler.run_once(now=MONDAY.replace(hour=10))
+    slack.error_rate = 1.0
+    stats = scheduler.run_once(now=NEXT_MONDAY)
+    assert (stats["sent"], stats["failed"]) == (0, 1)
+    assert _digest(db, MONDAY.replace(hour=0))["sent_at"] is None
+
+    slack.error_rate = 0.0
+    assert scheduler.run_once(now=NEXT_MONDAY)["sent"] == 1
+
+
+def test_overview_is_written_once(db, notifier, fake_client, slack):
+    backend = StubBackend()
+    scheduler = DigestScheduler(db, notifier, backend=backend, periods=["weekly"], timezone_name="UTC",
+                                overview=True, settle_seconds=0)
+    _summarize(fake_client, "t1", MONDAY)
+    scheduler.run_once(now=MONDAY.replace(hour=10))
+    assert scheduler.run_once(now=NEXT_MONDAY)["sent"] == 1
+    assert _digest(db, MONDAY.replace(hour=0))["overview"]
+
+
+def test_weekly_title(scheduler):
+    digest = {"period": "weekly", "period_start": "2024-03-04T00:00:00+00:00",
+              "period_end": "2024-03-11T00:00:00+00:00"}
+    assert scheduler.title(digest) == "Weekly digest: Mar 04 – Mar 10"
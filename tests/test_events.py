@@ -0,0 +1,120 @@
+import json
+import threading
+import time
+
+import pytest
+
+from src.core import events
+from src.core.events import EventBus
+from src.core.jobs import JobManager
+
+
+@pytest.fixture
+def bus(monkeypatch):
+    bus = EventBus()
+    monkeypatch.setattr(events, "BUS", bus)
+    return bus
+
+
+@pytest.fixture
+def jobs(services):
+    manager = JobManager(max_workers=1)
+    services.register("jobs", lambda c: manager)
+    return manager
+
+
+def _sse_events(response):
+    return [json.loads(line[len("data: "):]) for line in response.iter_lines() if line.startswith("data: ")]
+
+
+def test_progress_spans_only_the_planned_stages(bus):
+    bus.plan("job-1", ["summarize", "notify"])
+    assert bus.publish("job-1", "summarize", 0.5)["progress"] == pytest.approx(0.4375)
+    assert bus.publish("job-1", "notify", 1.0)["progress"] == 1.0
+
+
+def test_progress_never_moves_backwards(bus):
+    bus.publish("job-1", "summarize", 0.8)
+    retried = bus.publish("job-1", "transcribe", 0.1)
+    assert retried["progress"] == bus.history("job-1")[0]["progress"]
+    assert [event["seq"] for event in bus.history("job-1")] == [1, 2]
+
+
+def test_publishing_outside_a_topic_is_a_no_op(bus):
+    assert events.publish("summarize", 0.5) is None
+    with events.topic("job-1", stages=["summarize"]):
+        assert events.publish("summarize", 0.5)["progress"] == 0.5
+    assert bus.latest("job-1")["stage"] == "summarize"
+
+
+def test_a_failing_subscriber_does_not_stop_the_others(bus):
+    received = []
+    bus.subscribe("job-1", lambda event: 1 / 0)
+    unsubscribe = bus.subscribe("job-1", received.append)
+
+    bus.publish("job-1", "format", 1.0)
+    unsubscribe()
+    bus.publish("job-1", "save", 1.0)
+    assert [event["stage"] for event in received] == ["format"]
+
+
+def test_idle_topics_are_forgotten_first(bus):
+    bus.max_topics = 2
+    bus.subscribe("watched", lambda event: None)
+    for topic in ("old", "newer", "newest"):
+        bus.publish(topic, "job")
+    assert bus.latest("watched") is None and bus._topics.keys() == {"watched", "newest"}
+
+
+def test_sse_streams_a_job_from_start_to_finish(client, api_key, bus, jobs):
+    release = threading.Event()
+
+    def summarize():
+        events.plan("summarize")
+        events.publish("summarize", 0.0, "Summarizing")
+        release.wait(5)
+        events.publish("summarize", 1.0, "Summarized")
+        return {"summary_id": 1}
+
+    def release_once_subscribed():
+        # The rest of the job is only published after the stream is listening
+        while not bus._topics.get(job.id, {}).get("subscribers"):
+            time.sleep(0.01)
+        release.set()
+
+    job = jobs.submit("summary", summarize)
+    threading.Thread(target=release_once_subscribed, daemon=True).start()
+    with client.stream("GET", f"/api/v1/jobs/{job.id}/events", headers={"X-API-Key": api_key}) as response:
+        assert response.headers["content-type"].startswith("text/event-stream")
+        received = _sse_events(response)
+    assert release.is_set()
+
+    assert [event["seq"] for event in received] == list(range(1, len(received) + 1))
+    assert received[-1]["final"] and received[-1]["data"] == {"status": "succeeded"}
+    assert [event["message"] for event in received if event["stage"] == "summarize"] == ["Summarizing", "Summarized"]
+    assert received[-1]["progress"] == 1.0
+
+
+def test_finished_job_reports_its_outcome_once_events_are_gone(client, api_key, bus, jobs, monkeypatch):
+    job = jobs.submit("summary", lambda: 1 / 0)
+    jobs.shutdown()
+    monkeypatch.setattr(events, "BUS", EventBus())
+
+    with client.stream("GET", f"/api/v1/jobs/{job.id}/events", params={"api_key": api_key}) as response:
+        [outcome] = _sse_events(response)
+    assert outcome["final"] and outcome["data"] == {"status": "failed"}
+
+
+def test_websocket_sends_the_same_events(client, api_key, bus, jobs):
+    job = jobs.submit("summary", lambda: {"summary_id": 1})
+    jobs.shutdown()
+
+    with client.websocket_connect(f"/api/v1/jobs/{job.id}/ws?api_key={api_key}") as websocket:
+        running = websocket.receive_json()
+        done = websocket.receive_json()
+    assert running["data"] == {"status": "running"}
+    assert done["final"] and done["seq"] == 2
+
+
+def test_unknown_job_is_not_found(client, api_key, jobs):
+    assert client.get("/api/v1/jobs/missing/events", headers={"X-API-Key": api_key}).status_code == 404
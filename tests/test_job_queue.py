@@ -0,0 +1,111 @@
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from src.core import pipeline
+from src.core.job_queue import QueueJobManager, QueueWorker, task_name
+from src.core.jobs import FAILED, SUCCEEDED
+
+CONTENT = "Speaker A: We agreed to ship on Friday.\nSpeaker B: I will confirm vendor pricing by Monday."
+
+
+@pytest.fixture
+def queue(services, db):
+    services.register("jobs", lambda c: QueueJobManager(db))
+    return services.jobs
+
+
+@pytest.fixture
+def worker(services, queue):
+    worker = QueueWorker(services, concurrency=2, worker_id="worker-1", poll_interval=60)
+    yield worker
+    worker.stop(timeout=5)
+
+
+def _wait_idle(worker, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while worker.running_jobs and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert worker.running_jobs == 0
+
+
+def _expire(fake_client, job_id):
+    job = next(j for j in fake_client.tables["jobs"] if j["id"] == job_id)
+    job["lease_expires_at"] = datetime.now(timezone.utc).isoformat()
+
+
+def test_only_pipeline_tasks_can_be_queued(queue):
+    assert task_name(pipeline.process_text) == "process_text"
+    with pytest.raises(ValueError):
+        queue.submit("text", print, "hello")
+
+
+def test_queued_job_runs_on_a_worker(services, queue, worker):
+    job = queue.submit("text", pipeline.process_text, services, "Standup", CONTENT, metadata={"title": "Standup"})
+    assert queue.get(job.id).status == "queued"
+
+    assert worker.run_once() == 1
+    _wait_idle(worker)
+
+    done = queue.get(job.id)
+    assert done.status == SUCCEEDED
+    assert services.db.get_summary_by_transcript_id(done.result["transcript_id"])
+    assert done.progress["final"]
+
+
+def test_failed_job_records_the_error(services, queue, worker):
+    job = queue.submit("summarize", pipeline.summarize_transcript, services, "missing")
+    worker.run_once()
+    _wait_idle(worker)
+
+    failed = queue.get(job.id)
+    assert failed.status == FAILED
+    assert "not found" in failed.error
+
+
+def test_workers_claim_only_their_kinds(services, queue):
+    queue.submit("summarize", pipeline.summarize_transcript, services, "t1")
+    transcriber = QueueWorker(services, kinds=["transcribe"], worker_id="transcriber")
+    try:
+        assert transcriber.run_once() == 0
+    finally:
+        transcriber.stop(timeout=5)
+
+
+def test_lost_lease_is_taken_over(services, queue, db, fake_client):
+    job = queue.submit("summarize", pipeline.summarize_transcript, services, "t1")
+    assert [row["id"] for row in db.claim_jobs("worker-1")] == [job.id]
+    assert db.claim_jobs("worker-2") == []
+
+    # worker-1 died; its lease runs out and another worker takes over
+    _expire(fake_client, job.id)
+    claimed = db.claim_jobs("worker-2")
+    assert [(row["id"], row["attempts"]) for row in claimed] == [(job.id, 2)]
+
+    # The first worker's late outcome is discarded
+    assert db.renew_job_leases("worker-1", [job.id]) == []
+    assert db.finish_job(job.id, "worker-1", SUCCEEDED, result={"stale": True}) is None
+    assert db.renew_job_leases("worker-2", [job.id]) == [job.id]
+    assert db.finish_job(job.id, "worker-2", SUCCEEDED, result={"ok": True})["result"] == {"ok": True}
+
+
+def test_job_fails_after_max_attempts(services, db, fake_client):
+    queue = QueueJobManager(db, max_attempts=1)
+    job = queue.submit("summarize", pipeline.summarize_transcript, services, "t1")
+    db.claim_jobs("worker-1")
+    _expire(fake_client, job.id)
+
+    assert db.claim_jobs("worker-2") == []
+    assert queue.get(job.id).status == FAILED
+
+
+def test_repeated_callback_resumes_once(services, queue, db):
+    job = queue.submit("transcribe", pipeline.ingest_audio, services, "uploads/a.wav", "Standup")
+    db.claim_jobs("worker-1")
+    db.finish_job(job.id, "worker-1", "waiting")
+
+    resumed = queue.resume(job.id, "transcribe", pipeline.complete_transcription, services, "aai-1", "Standup")
+    assert resumed.id == job.id
+    assert queue.get(job.id).status == "queued"
+    assert queue.resume(job.id, "transcribe", pipeline.complete_transcription, services, "aai-1", "Standup") is None
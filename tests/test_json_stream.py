@@ -0,0 +1,52 @@
+import pytest
+
+from src.core.json_stream import IncrementalJSONParser, parse_json_object
+
+
+def test_object_is_returned_when_its_closing_brace_arrives():
+    parser = IncrementalJSONParser()
+    assert parser.feed('Here you go:\n```json\n{"summary": "Shipped", ') is None
+    assert parser.feed('"action_items": ["Alice to deploy"]}') == {
+        "summary": "Shipped", "action_items": ["Alice to deploy"]
+    }
+    # Anything after the object is ignored
+    assert parser.feed("\n``` Hope this helps!") == parser.value
+
+
+def test_brackets_inside_strings_are_text():
+    assert parse_json_object('{"a": [1, {"b": "}]\\"{["}]}') == {"a": [1, {"b": '}]"{['}]}
+
+
+def test_streamed_chunks_split_anywhere():
+    text = '{"summary": "a \\"quoted\\" word", "key_decisions": ["x", "y"]}'
+    assert parse_json_object(list(text)) == {"summary": 'a "quoted" word', "key_decisions": ["x", "y"]}
+
+
+@pytest.mark.parametrize("truncated, repaired", [
+    ('{"summary": "Done", "action_items": ["one", "tw', {"summary": "Done", "action_items": ["one"]}),
+    ('{"summary": "Done", "action_items":', {"summary": "Done"}),
+    ('{"summary": "Done", "key_decisions": [1, 2', {"summary": "Done", "key_decisions": [1, 2]}),
+    ('{"summary": "Done",', {"summary": "Done"}),
+])
+def test_truncated_output_is_repaired(truncated, repaired):
+    assert parse_json_object(truncated) == repaired
+
+
+def test_trailing_commas_are_tolerated():
+    assert parse_json_object('{"a": [1, 2,], }') == {"a": [1, 2]}
+
+
+@pytest.mark.parametrize("text", ['{"a": [1}', '{"a": {"b": 1]}', '{"a": [1}]'])
+def test_mismatched_closers_are_rejected(text):
+    with pytest.raises(ValueError, match="Malformed JSON"):
+        parse_json_object(text)
+
+
+def test_mismatched_closer_in_truncated_output_is_rejected():
+    with pytest.raises(ValueError, match="Malformed JSON"):
+        parse_json_object('{"a": {"b": [1}, "c": [')
+
+
+def test_output_without_an_object():
+    with pytest.raises(ValueError, match="No JSON object"):
+        parse_json_object("I could not summarize this meeting.")
@@ -0,0 +1,24 @@
+from benchmarks.cold_start import HEAVY_MODULES, run_once
+from src.core.llm_backends import WatsonxBackend
+from src.core.prompt_builder import TokenCounter
+from src.synthetic.procedural import ProceduralMeetingGenerator
+
+
+def test_first_render_imports_no_client_libraries():
+    run = run_once()
+    assert run["errors"] == []
+    assert "💬 Welcome to MeetGist" in run["titles"]
+    assert not set(run["imported"]) & set(HEAVY_MODULES)
+
+
+def test_clients_do_no_work_until_first_use(tmp_path):
+    # An unroutable IAM endpoint: constructing the backend must not call it
+    backend = WatsonxBackend(api_key="key", project_id="project", iam_url="http://127.0.0.1:9")
+    assert backend.iam_token is None
+
+    counter = TokenCounter("ibm/granite-3-8b-instruct")
+    assert counter._tokenizer_loaded is False
+
+    generator = ProceduralMeetingGenerator(corpus_dir=str(tmp_path))
+    assert "topics" not in vars(generator)
+    assert "project_kickoff" in generator.topics["topics"]
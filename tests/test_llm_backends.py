@@ -0,0 +1,133 @@
+import asyncio
+import importlib.util
+
+import pytest
+
+from benchmarks.stubs import WatsonxStub
+from src.core import quota
+from src.core.llm_backends import (
+    LLMBackend, LLMRequestError, LocalBackend, StubBackend, WatsonxBackend, create_backend, respond_to_prompt
+)
+
+MODEL = "ibm/granite-3-8b-instruct"
+PARAMETERS = {"decoding_method": "greedy", "max_new_tokens": 200}
+
+
+class ExpiringTokenStub(WatsonxStub):
+    """Answers 401 to the first generation request, as for an expired IAM token"""
+
+    def __init__(self, **kwargs):
+        super().__init__(seconds_per_input_token=0, seconds_per_output_token=0, **kwargs)
+        self.token_requests = 0
+        self.rejected = False
+
+    def handle(self, method, path, body, headers):
+        if path.startswith("/identity/token"):
+            self.token_requests += 1
+        elif not self.rejected:
+            self.rejected = True
+            return 401, {"error": "token expired"}, 0.0
+        return super().handle(method, path, body, headers)
+
+
+@pytest.fixture(scope="module")
+def watsonx_server():
+    with ExpiringTokenStub() as stub:
+        yield stub
+
+
+@pytest.fixture
+def watsonx(watsonx_server):
+    watsonx_server.token_requests = 0
+    watsonx_server.rejected = True
+    watsonx_server.error_rate = 0.0
+    return watsonx_server
+
+
+def _backend(stub):
+    return WatsonxBackend("api-key", "project", url=stub.base_url, iam_url=stub.base_url)
+
+
+def test_watsonx_generates_through_the_api(watsonx):
+    backend = _backend(watsonx)
+    result = backend.generate("Summarize this meeting.\n\nKey Decisions:", MODEL, PARAMETERS)
+    assert result["text"] == respond_to_prompt("Key Decisions:")
+    assert result["input_tokens"] > 0 and result["output_tokens"] > 0
+
+    backend.generate("Another prompt", MODEL, PARAMETERS)
+    # The IAM token is fetched once and reused
+    assert watsonx.token_requests == 1
+
+
+def test_watsonx_refreshes_an_expired_token(watsonx):
+    backend = _backend(watsonx)
+    backend.iam_token = "expired"
+    watsonx.rejected = False
+    assert backend.generate("Prompt", MODEL, PARAMETERS)["text"]
+    assert watsonx.token_requests == 1
+
+
+def test_watsonx_streams_with_a_refreshed_token_and_settles_the_quota(watsonx, monkeypatch):
+    settled = []
+    monkeypatch.setattr(quota.Ticket, "settle", lambda ticket, tokens: settled.append(tokens))
+    backend = _backend(watsonx)
+    backend.iam_token = "expired"
+    watsonx.rejected = False
+
+    prompt = "Summarize this meeting.\n\nAction Items:"
+    assert "".join(backend.stream(prompt, MODEL, PARAMETERS)) == respond_to_prompt(prompt)
+    assert watsonx.token_requests == 1
+    expected = backend.generate(prompt, MODEL, PARAMETERS)
+    assert settled == [expected["input_tokens"] + expected["output_tokens"]] * 2
+
+
+def test_watsonx_errors_carry_the_status(watsonx):
+    backend = _backend(watsonx)
+    backend.generate("Prompt", MODEL, PARAMETERS)
+    watsonx.error_rate = 1.0
+    with pytest.raises(LLMRequestError) as failed:
+        backend.generate("Prompt", MODEL, PARAMETERS)
+    assert failed.value.status_code == 503
+
+
+def test_watsonx_async(watsonx):
+    backend = _backend(watsonx)
+    result = asyncio.run(backend.agenerate("Prompt", MODEL, PARAMETERS))
+    assert result["text"] == respond_to_prompt("Prompt")
+
+
+def test_batches_keep_prompt_order():
+    prompts = ["Summary please", "...\n\nKey Decisions:", "...\n\nAction Items:"]
+    finished = []
+    results = StubBackend().generate_batch(prompts, MODEL, PARAMETERS, max_concurrency=3, on_result=finished.append)
+    assert [result["text"] for result in results] == [respond_to_prompt(prompt) for prompt in prompts]
+    assert sorted(finished) == [0, 1, 2]
+
+
+def test_base_backend_falls_back_to_generate():
+    class Echo(LLMBackend):
+        def generate(self, prompt, model_id, parameters):
+            return {"text": prompt.upper(), "input_tokens": 1, "output_tokens": 1}
+
+    assert list(Echo().stream("hi", MODEL, PARAMETERS)) == ["HI"]
+    assert asyncio.run(Echo().agenerate("hi", MODEL, PARAMETERS))["text"] == "HI"
+
+
+def test_stub_responds_in_the_requested_format():
+    assert respond_to_prompt("Answer as JSON").startswith("{")
+    assert "Key Decisions:" in respond_to_prompt("Transcript part 2 of 3")
+    assert respond_to_prompt("...\n\nAction Items:").startswith("- ")
+
+
+def test_create_backend(monkeypatch):
+    monkeypatch.setenv("LLM_BACKEND", "stub")
+    assert isinstance(create_backend(), StubBackend)
+    assert isinstance(create_backend("watsonx", api_key="key", project_id="project"), WatsonxBackend)
+    with pytest.raises(ValueError, match="Unknown LLM backend"):
+        create_backend("gpt")
+
+
+@pytest.mark.skipif(importlib.util.find_spec("llama_cpp") is not None, reason="llama-cpp-python is installed")
+def test_local_backend_needs_llama_cpp():
+    with pytest.raises(ImportError, match="llama-cpp-python"):
+        LocalBackend(model_path="model.gguf")
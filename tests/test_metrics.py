@@ -0,0 +1,83 @@
+import pytest
+
+from src.core import metrics
+
+
+@pytest.fixture
+def recording(monkeypatch):
+    monkeypatch.setattr(metrics, "_enabled", True)
+    return metrics.Registry()
+
+
+def test_nothing_is_recorded_while_disabled(monkeypatch):
+    monkeypatch.setattr(metrics, "_enabled", False)
+    counter = metrics.Counter("test_disabled_total", "Disabled", ["kind"])
+    histogram = metrics.Histogram("test_disabled_seconds", "Disabled")
+
+    counter.inc(kind="a")
+    histogram.observe(0.1)
+    with histogram.time():
+        pass
+    assert counter.value(kind="a") == 0
+    assert histogram.count() == 0
+
+
+def test_counter_renders_per_label_set(recording):
+    counter = recording.register(metrics.Counter("test_errors_total", "Errors", ["component"]))
+    counter.inc(component="db")
+    counter.inc(2, component="db")
+    counter.inc(component='slack "bot"\n')
+
+    assert counter.value(component="db") == 3
+    assert recording.render().splitlines() == [
+        "# HELP test_errors_total Errors",
+        "# TYPE test_errors_total counter",
+        'test_errors_total{component="db"} 3',
+        'test_errors_total{component="slack \\"bot\\"\\n"} 1',
+    ]
+
+
+def test_histogram_buckets_are_cumulative(recording):
+    histogram = recording.register(metrics.Histogram("test_seconds", "Latency", buckets=(0.1, 1.0)))
+    for value in (0.05, 0.1, 0.5, 5.0):
+        histogram.observe(value)
+
+    lines = recording.render().splitlines()[2:]
+    assert lines == [
+        'test_seconds_bucket{le="0.1"} 2',
+        'test_seconds_bucket{le="1"} 3',
+        'test_seconds_bucket{le="+Inf"} 4',
+        "test_seconds_sum 5.65",
+        "test_seconds_count 4",
+    ]
+
+
+def test_timers_observe_wall_time(recording):
+    histogram = metrics.Histogram("test_timed_seconds", "Timed", ["stage"])
+
+    @metrics.timed(histogram, stage="summarize")
+    def summarize():
+        return "summary"
+
+    assert summarize() == "summary"
+    with histogram.time(stage="format"):
+        pass
+    assert histogram.count(stage="summarize") == 1
+    assert histogram.count(stage="format") == 1
+
+
+def test_metric_names_are_unique(recording):
+    recording.register(metrics.Counter("test_total", "First"))
+    with pytest.raises(ValueError):
+        recording.register(metrics.Counter("test_total", "Second"))
+
+
+def test_endpoint_exposes_request_latency_by_route(client, api_key, monkeypatch):
+    monkeypatch.setattr(metrics, "_enabled", True)
+    client.get("/api/v1/transcripts/123", headers={"X-API-Key": api_key})
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'route="/api/v1/transcripts/{transcript_id}"' in response.text
+    assert "/api/v1/transcripts/123" not in response.text
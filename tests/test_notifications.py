@@ -0,0 +1,136 @@
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from src.core import resilience
+from src.core.notifications import NotificationDispatcher
+
+SUMMARY = {
+    "summary_text": "The team agreed to ship on Friday.",
+    "key_decisions": ["Ship on Friday"],
+    "action_items": ["Alice to update the roadmap"]
+}
+
+
+@pytest.fixture
+def dispatcher(db, notifier):
+    return NotificationDispatcher(db, notifier, window=0, poll_interval=60, max_attempts=3)
+
+
+def _queue(db, transcript_id, delay=0, channel="C-MEETINGS"):
+    return db.enqueue_notification(transcript_id, channel, f"summary-{transcript_id}",
+                                   {"meeting_title": f"Meeting {transcript_id}", **SUMMARY}, delay=delay)
+
+
+def _row(fake_client, transcript_id):
+    return next(r for r in fake_client.tables["notifications"] if r["transcript_id"] == transcript_id)
+
+
+def test_queued_summary_is_posted_once(db, dispatcher, slack, fake_client):
+    dispatcher.enqueue("t1", "Standup", SUMMARY, "summary-t1")
+    deadline = time.monotonic() + 5
+    while not slack.messages and time.monotonic() < deadline:
+        time.sleep(0.01)
+    dispatcher.stop(timeout=5)
+
+    assert len(slack.messages) == 1
+    assert _row(fake_client, "t1")["status"] == "sent"
+    assert dispatcher.run_once()["claimed"] == 0
+    assert len(slack.messages) == 1
+
+
+def test_the_same_summary_is_not_queued_twice(db, fake_client):
+    _queue(db, "t1")
+    _row(fake_client, "t1")["status"] = "sent"
+    _queue(db, "t1")
+    assert _row(fake_client, "t1")["status"] == "sent"
+
+
+def test_a_newer_summary_queued_while_sending_is_still_posted(db, dispatcher, notifier, slack, fake_client):
+    _queue(db, "t1")
+    deliver = notifier.deliver
+
+    def deliver_while_regenerated(payload):
+        db.enqueue_notification("t1", "C-MEETINGS", "summary-t1-v2", {"meeting_title": "Meeting t1", **SUMMARY})
+        notifier.deliver = deliver
+        return deliver(payload)
+
+    notifier.deliver = deliver_while_regenerated
+    assert dispatcher.run_once()["sent"] == 1
+    row = _row(fake_client, "t1")
+    assert (row["status"], row["summary_id"]) == ("pending", "summary-t1-v2")
+
+    assert dispatcher.run_once()["sent"] == 1
+    assert len(slack.messages) == 2
+    assert _row(fake_client, "t1")["status"] == "sent"
+
+
+def test_one_digest_per_channel(db, dispatcher, slack):
+    for transcript_id in ("t1", "t2", "t3"):
+        _queue(db, transcript_id)
+    _queue(db, "t4", channel="C-OTHER")
+
+    stats = dispatcher.run_once()
+    assert stats == {"claimed": 4, "messages": 2, "sent": 4, "retried": 0, "failed": 0}
+    assert sorted(message["channel"] for message in slack.messages) == ["C-MEETINGS", "C-OTHER"]
+
+
+def test_rows_wait_for_the_digest_window(db, dispatcher, slack):
+    _queue(db, "t1", delay=60)
+    assert dispatcher.run_once()["claimed"] == 0
+
+    # Once a row of the channel is due, the rest of its window goes along
+    _queue(db, "t2")
+    assert dispatcher.run_once()["sent"] == 2
+    assert len(slack.messages) == 1
+
+
+def test_failed_delivery_backs_off(db, dispatcher, slack, fake_client):
+    _queue(db, "t1")
+    slack.error_rate = 1.0
+    assert dispatcher.run_once()["retried"] == 1
+
+    row = _row(fake_client, "t1")
+    assert row["status"] == "pending"
+    assert row["attempts"] == 1
+    assert datetime.fromisoformat(row["next_attempt_at"]) > datetime.now(timezone.utc)
+    # Not claimed again before its backoff runs out
+    slack.error_rate = 0.0
+    assert dispatcher.run_once()["claimed"] == 0
+
+    row["next_attempt_at"] = datetime.now(timezone.utc).isoformat()
+    assert dispatcher.run_once()["sent"] == 1
+    assert _row(fake_client, "t1")["status"] == "sent"
+
+
+def test_delivery_gives_up_after_max_attempts(db, notifier, slack, fake_client):
+    dispatcher = NotificationDispatcher(db, notifier, window=0, max_attempts=1)
+    _queue(db, "t1")
+    slack.error_rate = 1.0
+    assert dispatcher.run_once()["failed"] == 1
+    assert _row(fake_client, "t1")["status"] == "failed"
+    assert dispatcher.run_once()["claimed"] == 0
+
+
+def test_rows_of_a_lost_claim_are_claimed_again(db, fake_client):
+    _queue(db, "t1")
+    assert len(db.claim_notifications(lease_seconds=60)) == 1
+    assert db.claim_notifications() == []
+
+    # The claiming process died; its lease runs out
+    _row(fake_client, "t1")["next_attempt_at"] = datetime.now(timezone.utc).isoformat()
+    claimed = db.claim_notifications()
+    assert [row["attempts"] for row in claimed] == [2]
+
+
+def test_nothing_is_claimed_while_slacks_circuit_is_open(db, dispatcher, notifier, slack, fake_client):
+    _queue(db, "t1")
+    breaker = notifier.resilience.breaker
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    assert breaker.state == resilience.OPEN
+
+    assert dispatcher.run_once()["claimed"] == 0
+    assert _row(fake_client, "t1")["attempts"] == 0
+    assert slack.messages == []
@@ -0,0 +1,56 @@
+import pytest
+
+from src.core import pipeline
+
+CONTENT = "Speaker A: We agreed to ship on Friday.\nSpeaker B: I will confirm vendor pricing by Monday."
+
+
+@pytest.fixture
+def llm_calls(services, monkeypatch):
+    calls = []
+    backend = services.llm_backend
+    generate = backend.generate
+
+    def counting(prompt, model_id, parameters):
+        calls.append(prompt)
+        return generate(prompt, model_id, parameters)
+
+    monkeypatch.setattr(backend, "generate", counting)
+    return calls
+
+
+def test_save_meeting_summarizes_a_new_meeting(services, llm_calls):
+    outcome = pipeline.process_text(services, "Standup", CONTENT)
+    assert llm_calls
+    assert services.db.get_transcript_by_id(outcome["transcript_id"])["meeting_title"] == "Standup"
+    summary = services.db.get_summary_by_transcript_id(outcome["transcript_id"])
+    assert summary["summary_text"]
+    assert summary["version"] == 1
+
+
+def test_ingesting_the_same_meeting_again_reuses_its_summary(services, llm_calls):
+    first = pipeline.process_text(services, "Standup", CONTENT)
+    calls = len(llm_calls)
+
+    again = pipeline.process_text(services, "Standup", CONTENT)
+    assert len(llm_calls) == calls
+    assert again["transcript_id"] == first["transcript_id"]
+    assert services.db.get_summary_by_transcript_id(first["transcript_id"])["summary_text"] == \
+        services.db.get_summary_by_transcript_id(again["transcript_id"])["summary_text"]
+
+
+def test_a_different_meeting_is_summarized(services, llm_calls):
+    pipeline.process_text(services, "Standup", CONTENT)
+    calls = len(llm_calls)
+    pipeline.process_text(services, "Retro", CONTENT + "\nSpeaker A: One more thing.")
+    assert len(llm_calls) > calls
+
+
+def test_transcript_is_saved_when_summarizing_fails(services, fake_client, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("watsonx is down")
+
+    monkeypatch.setattr(services.summarizer, "generate_summary", fail)
+    with pytest.raises(RuntimeError, match="watsonx is down"):
+        pipeline.process_text(services, "Standup", CONTENT)
+    assert [row["meeting_title"] for row in fake_client.tables["transcripts"]] == ["Standup"]
@@ -0,0 +1,63 @@
+import pytest
+
+from src.core.storage import save_transcript_file
+from src.synthetic.procedural import MarkovChain, NoModelBackend, ProceduralMeetingGenerator
+
+
+@pytest.fixture
+def generator(tmp_path):
+    return ProceduralMeetingGenerator(corpus_dir=str(tmp_path))
+
+
+def test_same_seed_same_meeting(generator):
+    first = generator.generate_meeting("project_kickoff", num_speakers=3, duration_minutes=5, seed=7)
+    again = generator.generate_meeting("project_kickoff", num_speakers=3, duration_minutes=5, seed=7)
+    other = generator.generate_meeting("project_kickoff", num_speakers=3, duration_minutes=5, seed=8)
+    assert first["segments"] == again["segments"]
+    assert first["segments"] != other["segments"]
+
+
+def test_meeting_shape(generator):
+    meeting = generator.generate_meeting("budget_review", num_speakers=4, duration_minutes=10, seed=1)
+    segments = meeting["segments"]
+
+    assert meeting["metadata"]["total_speakers"] == 4
+    assert meeting["metadata"]["source_type"] == "synthetic"
+    assert {segment["speaker"] for segment in segments} <= {"Speaker A", "Speaker B", "Speaker C", "Speaker D"}
+    assert all(a["end"] <= b["start"] for a, b in zip(segments, segments[1:]))
+    # Runs about as long as asked, ending with the chair's closing
+    assert 9 * 60 <= segments[-1]["end"] <= 11 * 60
+    assert segments[-1]["speaker"] == "Speaker A"
+    assert meeting["text"] == "\n".join(segment["text"] for segment in segments)
+
+
+def test_speaker_count_defaults_to_the_topic_range(generator):
+    topic = generator.topics["topics"]["sprint_retrospective"]
+    meeting = generator.generate_meeting("sprint_retrospective", duration_minutes=2, seed=3)
+    assert topic["min_speakers"] <= meeting["metadata"]["total_speakers"] <= topic["max_speakers"]
+
+
+def test_never_calls_a_model(generator):
+    assert isinstance(generator.backend, NoModelBackend)
+    assert generator.api_key is None
+    with pytest.raises(RuntimeError):
+        generator.backend.generate("prompt", "model", {})
+
+
+def test_trains_on_transcript_backups(tmp_path):
+    save_transcript_file({"content": "Speaker A: Zanzibar quarterly widgets ship tomorrow.\n\n"
+                                     "Speaker B: Zanzibar quarterly widgets need review."},
+                         str(tmp_path / "standup.json"), "gzip")
+    save_transcript_file({"segments": [{"speaker": "Speaker A", "text": "Quokka roadmaps look solid."}]},
+                         str(tmp_path / "synthetic.json"), "none")
+    chain = ProceduralMeetingGenerator(corpus_dir=str(tmp_path)).chain
+    assert ("Zanzibar", "quarterly") in chain.transitions
+    assert ("Quokka", "roadmaps") in chain.transitions
+
+
+def test_markov_sentences_end_with_punctuation():
+    import random
+    chain = MarkovChain()
+    chain.train("We ship on Friday. We review the budget on Monday.")
+    sentence = chain.sentence(random.Random(0))
+    assert sentence[0].isupper() and sentence[-1] in ".!?"
@@ -0,0 +1,101 @@
+import sys
+
+import pytest
+
+from src.core import prompt_builder
+from src.core.prompt_builder import SAFETY_MARGIN, PromptBuilder, TokenCounter, compress_filler
+
+
+class WordCounter(TokenCounter):
+    """One token per word, so budgets are easy to reason about"""
+
+    def __init__(self):
+        super().__init__("test-model")
+
+    def count(self, text):
+        return len(text.split())
+
+
+def _template(text):
+    return f"Summarize this meeting.\n\n{text}\n\nSummary:"
+
+
+def _builder(context_tokens, monkeypatch):
+    monkeypatch.setenv("LLM_CONTEXT_TOKENS", str(context_tokens))
+    return PromptBuilder("test-model", counter=WordCounter())
+
+
+def test_estimate_without_a_tokenizer(monkeypatch):
+    monkeypatch.delenv("LLM_TOKENIZER_PATH", raising=False)
+    counter = TokenCounter("unknown-model")
+    assert counter.tokenizer is None
+    assert counter.count("") == 0
+    # Word pieces of up to four characters are one token each
+    assert counter.count("Ship it, team.") == 5
+    assert counter.count("internationalization") == 5
+
+
+def test_missing_tokenizer_is_reported_once(monkeypatch, caplog):
+    monkeypatch.delenv("LLM_TOKENIZER_PATH", raising=False)
+    monkeypatch.setitem(sys.modules, "transformers", None)
+    monkeypatch.setattr(prompt_builder, "_estimated_models", set())
+
+    for _ in range(2):
+        assert TokenCounter("ibm/granite-3-8b-instruct").count("Ship it, team.") == 5
+    [record] = caplog.records
+    assert record.levelname == "WARNING" and "transformers is not installed" in record.getMessage()
+
+
+def test_short_transcript_is_untouched(monkeypatch):
+    built = _builder(1000, monkeypatch).build(_template, "Speaker A: We ship Friday.", max_new_tokens=100)
+    assert built["prompt"] == _template("Speaker A: We ship Friday.")
+    assert not built["trimmed"]
+    assert built["input_tokens"] == WordCounter().count(built["prompt"])
+    assert built["max_new_tokens"] == 100
+
+
+def test_filler_is_dropped_before_turns(monkeypatch):
+    text = "\n\n".join(["Speaker A: Um, so, uh, we ship Friday.", "Speaker B: Yeah.", "Speaker B: Okay."] * 10)
+    builder = _builder(5 + 80 + 30 + SAFETY_MARGIN, monkeypatch)
+    built = builder.build(_template, text, max_new_tokens=30)
+    assert built["trimmed"]
+    assert "Um" not in built["prompt"] and "Yeah." not in built["prompt"]
+    assert "omitted" not in built["prompt"]
+
+
+def test_middle_turns_are_omitted_to_fit(monkeypatch):
+    text = "\n\n".join(f"Speaker {'AB'[i % 2]}: Point number {i} about the roadmap." for i in range(100))
+    builder = _builder(200 + SAFETY_MARGIN, monkeypatch)
+    built = builder.build(_template, text, max_new_tokens=50)
+
+    assert built["input_tokens"] + built["max_new_tokens"] + SAFETY_MARGIN <= 200 + SAFETY_MARGIN
+    assert "Point number 0 " in built["prompt"] and "Point number 99 " in built["prompt"]
+    assert "turns omitted" in built["prompt"]
+
+
+def test_output_is_capped_by_the_model(monkeypatch):
+    builder = _builder(100000, monkeypatch)
+    assert builder.build(_template, "short", max_new_tokens=5000)["max_new_tokens"] == builder.max_output_tokens
+
+
+@pytest.mark.parametrize("words, budget", [(10, 150), (8 * 300, 300), (100000, 500)])
+def test_output_budget_scales_with_the_transcript(monkeypatch, words, budget):
+    assert _builder(1000, monkeypatch).output_budget("word " * words) == budget
+
+
+def test_compress_filler():
+    text = "\n\n".join([
+        "Speaker A: Hi everyone.",
+        "Speaker B: Hello.",
+        "Speaker A: Hi everyone.",
+        "Speaker A: Um, the launch [crosstalk] moves to Friday.",
+        "Speaker A: Uh, and the budget is approved.",
+        "Speaker B: Mm-hmm.",
+        "Speaker B: Sounds good."
+    ])
+    assert compress_filler(text) == (
+        "Speaker A: Hi everyone.\n\n"
+        "Speaker B: Hello.\n\n"
+        "Speaker A: the launch moves to Friday. and the budget is approved.\n\n"
+        "Speaker B: Sounds good."
+    )
@@ -0,0 +1,145 @@
+import threading
+import time
+
+import pytest
+
+from src.core import quota
+from src.core.quota import BATCH, INTERACTIVE, QuotaExceeded, QuotaScheduler, TokenBucket
+from src.core.resilience import DependencyUnavailable
+
+
+class Throttled(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after=None):
+        super().__init__("429 Too Many Requests")
+        self.retry_after = retry_after
+
+
+def test_token_bucket():
+    bucket = TokenBucket(60)
+    now = bucket.updated
+    assert bucket.wait_time(60, now) == 0
+    bucket.spend(90, now)
+    assert bucket.available(now) == -30
+    # One unit per second; a request larger than the bucket waits for a full one
+    assert bucket.wait_time(1, now) == pytest.approx(31)
+    assert bucket.wait_time(1000, now) == pytest.approx(90)
+    bucket.refund(40)
+    assert bucket.available(now) == 10
+
+    disabled = TokenBucket(0)
+    disabled.spend(100, now)
+    assert disabled.wait_time(1_000_000, now) == 0
+
+
+def test_limit_halves_once_per_burst_of_throttled_requests():
+    scheduler = QuotaScheduler("test", max_concurrency=8)
+    burst = [scheduler.acquire() for _ in range(6)]
+    for ticket in burst:
+        scheduler.release(ticket, Throttled())
+    assert scheduler.limit == 4
+    assert scheduler.throttled == 6
+
+    # A request sent after the decrease that is throttled again halves it again
+    scheduler.release(scheduler.acquire(), Throttled())
+    assert scheduler.limit == 2
+
+
+def test_limit_grows_back_additively():
+    scheduler = QuotaScheduler("test", max_concurrency=4)
+    scheduler.release(scheduler.acquire(), Throttled())
+    assert scheduler.limit == 2
+    for _ in range(2):
+        scheduler.release(scheduler.acquire())
+    assert scheduler.limit == pytest.approx(2 + 1 / 2 + 1 / 2.5)
+    for _ in range(20):
+        scheduler.release(scheduler.acquire())
+    assert scheduler.limit == 4
+
+
+def test_limit_never_drops_below_the_minimum():
+    scheduler = QuotaScheduler("test", max_concurrency=8, min_concurrency=3)
+    for _ in range(5):
+        scheduler.release(scheduler.acquire(), Throttled())
+    assert scheduler.limit == 3
+
+
+def test_slow_requests_lower_the_limit():
+    scheduler = QuotaScheduler("test", max_concurrency=8, latency_target=0.01)
+    ticket = scheduler.acquire()
+    time.sleep(0.02)
+    scheduler.release(ticket)
+    assert scheduler.limit == 4
+
+
+def test_retry_after_pauses_admission():
+    scheduler = QuotaScheduler("test", max_wait=0.05)
+    scheduler.release(scheduler.acquire(), Throttled(retry_after=30))
+    assert scheduler.snapshot()["paused_for"] > 29
+    with pytest.raises(QuotaExceeded):
+        scheduler.acquire()
+
+
+def test_requests_wait_for_the_token_quota():
+    scheduler = QuotaScheduler("test", tokens_per_minute=6000, max_wait=0.05)
+    with scheduler.slot(tokens=5000) as ticket:
+        # Only the tokens used are charged once the response is in
+        ticket.settle(1000)
+    assert scheduler.snapshot()["tokens_available"] == pytest.approx(5000, abs=5)
+
+    scheduler.acquire(tokens=5000)
+    with pytest.raises(QuotaExceeded, match="not admitted"):
+        scheduler.acquire(tokens=5000)
+
+
+def test_refused_requests_are_refunded():
+    scheduler = QuotaScheduler("test", requests_per_minute=2, max_wait=0.05)
+    for _ in range(3):
+        with pytest.raises(DependencyUnavailable):
+            with scheduler.slot():
+                raise DependencyUnavailable("watsonx", "circuit open")
+    assert scheduler.snapshot()["requests_available"] == pytest.approx(2, abs=0.1)
+
+
+def test_interactive_requests_go_before_batch():
+    scheduler = QuotaScheduler("test", max_concurrency=1)
+    held = scheduler.acquire()
+    admitted = []
+
+    def request(level):
+        with scheduler.slot(level=level):
+            admitted.append(level)
+
+    threads = []
+    for level in (BATCH, BATCH, INTERACTIVE):
+        threads.append(threading.Thread(target=request, args=(level,)))
+        threads[-1].start()
+        # Queued in this order
+        deadline = time.monotonic() + 5
+        while sum(scheduler.snapshot()["waiting"].values()) < len(threads) and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+    assert scheduler.snapshot()["waiting"] == {"interactive": 1, "batch": 2}
+    scheduler.release(held)
+    for thread in threads:
+        thread.join(5)
+    assert admitted == [INTERACTIVE, BATCH, BATCH]
+
+
+def test_priority_of_the_context():
+    assert quota.current_priority() == INTERACTIVE
+    with quota.priority(BATCH):
+        assert quota.current_priority() == BATCH
+    assert quota.current_priority() == INTERACTIVE
+
+
+def test_schedulers_are_configured_from_the_environment(monkeypatch):
+    monkeypatch.setenv("WATSONX_TOKENS_PER_MINUTE", "1200")
+    monkeypatch.setenv("WATSONX_MAX_CONCURRENCY", "3")
+    scheduler = quota.scheduler("watsonx")
+    assert scheduler is quota.scheduler("watsonx")
+    assert scheduler.snapshot()["concurrency_limit"] == 3
+    assert scheduler.snapshot()["tokens_available"] == 1200
+    assert scheduler.snapshot()["requests_available"] is None
+    assert set(quota.snapshot()) == {"watsonx"}
@@ -0,0 +1,165 @@
+import threading
+import time
+
+import httpx
+import pytest
+from postgrest.exceptions import APIError
+
+from src.core import resilience
+from src.core.db import _is_outage
+from src.core.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, Dependency, DependencyUnavailable
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def _api_error(code):
+    return APIError({"message": "query failed", "code": code, "hint": None, "details": None})
+
+
+def _dependency(**kwargs):
+    options = {"max_concurrency": 2, "timeout": 1, "queue_timeout": 0.05, "failure_threshold": 2,
+               "reset_timeout": 0.05}
+    return Dependency("test", **{**options, **kwargs})
+
+
+def test_breaker_opens_after_consecutive_failures(caplog):
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+    breaker.record_failure(RuntimeError("boom"))
+    assert breaker.state == OPEN
+    assert breaker.last_error == "boom"
+    assert not breaker.allow()
+    assert 0 < breaker.retry_after() <= 60
+    assert [(r.name, r.levelname, r.getMessage()) for r in caplog.records] == [
+        ("src.core.resilience", "WARNING", "Circuit breaker test: closed -> open (boom)")
+    ]
+
+
+def test_half_open_breaker_lets_one_probe_through():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    time.sleep(0.02)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_call_failures_trip_the_breaker():
+    dep = _dependency()
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            with dep.call():
+                raise TimeoutError("read timed out")
+    assert dep.breaker.state == OPEN
+
+    with pytest.raises(DependencyUnavailable) as refused:
+        with dep.call():
+            pytest.fail("an open circuit must not reach the service")
+    assert refused.value.reason == "circuit open"
+    assert refused.value.retry_after is not None
+
+
+def test_request_errors_do_not_count():
+    dep = _dependency(failure_threshold=1)
+    with pytest.raises(HTTPError):
+        with dep.call():
+            raise HTTPError(404)
+    with dep.call() as attempt:
+        attempt.fail(HTTPError(400))
+    assert dep.breaker.state == CLOSED
+
+    with dep.call() as attempt:
+        attempt.fail(HTTPError(503))
+    assert dep.breaker.state == OPEN
+
+
+def test_full_bulkhead_rejects_instead_of_waiting():
+    dep = _dependency(max_concurrency=1)
+    entered, release = threading.Event(), threading.Event()
+
+    def hold():
+        with dep.call():
+            entered.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    entered.wait(5)
+    try:
+        assert dep.snapshot()["in_flight"] == 1
+        with pytest.raises(DependencyUnavailable, match="slots busy"):
+            with dep.call():
+                pass
+    finally:
+        release.set()
+        holder.join(5)
+    # A full bulkhead says nothing about the service's health
+    assert dep.breaker.state == CLOSED
+    with dep.call():
+        pass
+
+
+def test_dependencies_are_configured_from_the_environment(monkeypatch):
+    monkeypatch.setenv("WATSONX_MAX_CONCURRENCY", "3")
+    monkeypatch.setenv("WATSONX_BREAKER_FAILURES", "7")
+    dep = resilience.dependency("watsonx")
+    assert (dep.max_concurrency, dep.breaker.failure_threshold, dep.timeout) == (3, 7, 120)
+    assert resilience.dependency("watsonx") is dep
+    assert set(resilience.snapshot()) >= {"watsonx", "assemblyai", "supabase", "slack"}
+
+
+@pytest.mark.parametrize("error, outage", [
+    (httpx.ConnectError("connection refused"), True),
+    (httpx.ReadTimeout("timed out"), True),
+    (_api_error("PGRST000"), True),
+    (_api_error("57014"), True),
+    (_api_error("503"), True),
+    (_api_error("23505"), False),
+    (_api_error("PGRST116"), False),
+    (KeyError("id"), False),
+    (Exception("Expected a single row, found 0"), False),
+])
+def test_is_outage(error, outage):
+    assert _is_outage(error) is outage
+
+
+def test_only_supabase_outages_open_its_breaker(db, fake_client, monkeypatch):
+    monkeypatch.setenv("SUPABASE_BREAKER_FAILURES", "2")
+    resilience._dependencies.pop("supabase", None)
+    db.resilience = resilience.dependency("supabase")
+
+    def fail(error):
+        def before_execute():
+            raise error
+        monkeypatch.setattr(fake_client, "_before_execute", before_execute)
+
+    fail(_api_error("23505"))
+    for _ in range(3):
+        assert db.get_transcript_by_id("t1") is None
+    assert db.resilience.breaker.state == CLOSED
+
+    fail(httpx.ConnectError("connection refused"))
+    for _ in range(2):
+        assert db.get_transcript_by_id("t1") is None
+    assert db.resilience.breaker.state == OPEN
+    with pytest.raises(DependencyUnavailable):
+        db.get_transcript_by_id("t1")
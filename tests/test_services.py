@@ -0,0 +1,80 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.core import services
+from src.core.services import ServiceContainer
+
+
+def test_services_are_built_once_on_first_use():
+    builds = []
+    container = ServiceContainer({"db": lambda c: builds.append("db") or object()})
+
+    assert container.built() == []
+    assert container.db is container.get("db")
+    assert builds == ["db"]
+    assert container.is_built("db") and not container.is_built("summarizer")
+
+
+def test_concurrent_first_use_builds_one_instance():
+    builds = []
+
+    def slow_db(container):
+        builds.append("db")
+        time.sleep(0.05)
+        return object()
+
+    container = ServiceContainer({"db": slow_db})
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append(container.db)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert builds == ["db"]
+    assert len({id(instance) for instance in seen}) == 1
+
+
+def test_a_slow_build_does_not_block_other_services():
+    release = threading.Event()
+    container = ServiceContainer({
+        "transcriber": lambda c: release.wait(5) and object(),
+        "db": lambda c: "db"
+    })
+    building = threading.Thread(target=lambda: container.transcriber)
+    building.start()
+    try:
+        assert container.db == "db"
+    finally:
+        release.set()
+        building.join()
+
+
+def test_dependencies_are_shared_between_services(db):
+    container = ServiceContainer({
+        "db": lambda c: db,
+        "slack_notifier": lambda c: SimpleNamespace(channel="C-MEETINGS")
+    })
+    assert container.notifications.db is db
+    assert container.digests.db is db
+    assert container.digests.notifier is container.slack_notifier
+
+
+def test_register_replaces_and_reset_rebuilds():
+    container = ServiceContainer({"db": lambda c: object()})
+    first = container.db
+    container.reset()
+    assert container.db is not first
+
+    container.register("db", lambda c: "stub")
+    assert container.db == "stub"
+    with pytest.raises(KeyError):
+        container.get("mailer")
+
+
+def test_one_container_per_process(monkeypatch):
+    monkeypatch.setattr(services, "_container", None)
+    assert services.get_services() is services.get_services()
@@ -0,0 +1,160 @@
+import threading
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from src.core import pipeline
+from src.core.llm_backends import StubBackend
+from src.core.resilience import DependencyUnavailable
+from src.core.single_flight import SingleFlight
+
+CONTENT = "Speaker A: We agreed to ship on Friday.\nSpeaker B: I will confirm vendor pricing by Monday."
+
+
+class Computation:
+    """compute() callable that blocks until released and counts its calls"""
+
+    def __init__(self, result="summary", error=None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def _in_thread(fn, *args):
+    outcome = {}
+
+    def run():
+        try:
+            outcome["value"] = fn(*args)
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread, outcome
+
+
+def _flight(db=None, owner=None, **kwargs):
+    return SingleFlight(db=db, lease_seconds=60, poll_interval=0.01, owner=owner, **kwargs)
+
+
+def test_concurrent_callers_share_one_computation():
+    flights, compute = _flight(), Computation()
+    leader, led = _in_thread(flights.do, "key", compute)
+    compute.started.wait(5)
+    waiters = [_in_thread(flights.do, "key", compute) for _ in range(3)]
+    time.sleep(0.05)
+    compute.release.set()
+
+    for thread, _ in [(leader, led), *waiters]:
+        thread.join(5)
+    assert compute.calls == 1
+    assert led["value"] == ("summary", False)
+    assert [outcome["value"] for _, outcome in waiters] == [("summary", True)] * 3
+
+    # Once done, the next call computes again
+    assert flights.do("key", lambda: "again") == ("again", False)
+
+
+def test_waiters_share_the_error():
+    flights, compute = _flight(), Computation(error=ValueError("bad transcript"))
+    leader, led = _in_thread(flights.do, "key", compute)
+    compute.started.wait(5)
+    waiter, waited = _in_thread(flights.do, "key", compute)
+    time.sleep(0.05)
+    compute.release.set()
+    leader.join(5)
+    waiter.join(5)
+    assert isinstance(led["error"], ValueError)
+    assert waited["error"] is led["error"]
+
+
+def test_waiter_gives_up_after_max_wait():
+    flights, compute = _flight(max_wait=0.05), Computation()
+    leader, _ = _in_thread(flights.do, "key", compute)
+    compute.started.wait(5)
+    try:
+        assert flights.do("key", lambda: "own") == ("own", False)
+    finally:
+        compute.release.set()
+        leader.join(5)
+
+
+def test_processes_share_a_flight_through_the_database(db):
+    first, second = _flight(db, "process-1"), _flight(db, "process-2")
+    compute, other = Computation({"version": 1}), Computation()
+    leader, led = _in_thread(first.do, "key", compute)
+    compute.started.wait(5)
+    waiter, waited = _in_thread(second.do, "key", other)
+    time.sleep(0.05)
+    compute.release.set()
+    leader.join(5)
+    waiter.join(5)
+
+    assert led["value"] == ({"version": 1}, False)
+    assert waited["value"] == ({"version": 1}, True)
+    assert other.calls == 0
+    assert db.get_flight("key")["status"] == "succeeded"
+
+
+def test_failed_flight_is_taken_over(db):
+    first, second = _flight(db, "process-1"), _flight(db, "process-2")
+    compute = Computation(error=RuntimeError("watsonx is down"))
+    leader, led = _in_thread(first.do, "key", compute)
+    compute.started.wait(5)
+    waiter, waited = _in_thread(second.do, "key", lambda: "recomputed")
+    time.sleep(0.05)
+    compute.release.set()
+    leader.join(5)
+    waiter.join(5)
+
+    assert isinstance(led["error"], RuntimeError)
+    assert waited["value"] == ("recomputed", False)
+    assert db.get_flight("key")["owner"] == "process-2"
+
+
+def test_expired_lease_is_taken_over(db, fake_client):
+    db.begin_flight("key", "dead-process", 60)
+    fake_client.tables["flights"][0]["expires_at"] = datetime.now(timezone.utc).isoformat()
+    assert _flight(db, "process-2").do("key", lambda: "mine") == ("mine", False)
+
+
+def test_hung_owner_is_not_waited_for_forever(db):
+    # Still renewing its lease, never finishing
+    db.begin_flight("key", "hung-process", 600)
+    assert _flight(db, "process-2", max_wait=0.05).do("key", lambda: "mine") == ("mine", False)
+    assert db.get_flight("key")["owner"] == "hung-process"
+
+
+def test_computes_locally_while_the_database_is_unavailable(db, monkeypatch):
+    def unavailable(*args, **kwargs):
+        raise DependencyUnavailable("supabase", "circuit open")
+
+    monkeypatch.setattr(db, "begin_flight", unavailable)
+    assert _flight(db, "process-1").do("key", lambda: "local") == ("local", False)
+
+
+def test_concurrent_summaries_save_one_version(services, db):
+    # Slow enough for the two requests to overlap
+    services.register("llm_backend", lambda c: StubBackend(latency=0.05))
+    transcript = db.save_transcript(title="Standup", content=CONTENT, source_type="text")
+
+    requests = [_in_thread(pipeline.summarize_transcript, services, transcript["id"]) for _ in range(2)]
+    for thread, _ in requests:
+        thread.join(10)
+
+    outcomes = [outcome["value"] for _, outcome in requests]
+    assert [outcome["summary_version"] for outcome in outcomes] == [1, 1]
+    assert sorted(bool(outcome.get("coalesced")) for outcome in outcomes) == [False, True]
+    assert db.get_summary_by_transcript_id(transcript["id"])["version"] == 1
@@ -0,0 +1,87 @@
+import pytest
+
+from src.core import speakers
+from src.core.speakers import SpeakerDirectory
+
+PLATFORM = ("The kubernetes cluster migration is blocked on the terraform modules. Once the deployment pipeline "
+            "is green we cut over the staging cluster, then production. Terraform state lives in the shared "
+            "bucket and the deployment pipeline runs the kubernetes manifests after the terraform plan.")
+FINANCE = ("The budget forecast for next quarter assumes flat revenue. Marketing spend is over budget by four "
+           "percent, so the forecast spreadsheet needs a second pass. Revenue recognition moves to the new "
+           "invoicing system and the budget forecast gets revised against actual revenue.")
+
+
+@pytest.fixture
+def directory(db):
+    return SpeakerDirectory(db=db, organization="acme", cache_seconds=0)
+
+
+def _meeting(*turns):
+    return [{"speaker": speaker, "text": text} for speaker, text in turns]
+
+
+@pytest.mark.parametrize("text, name", [
+    ("Hi everyone, I'm Sarah Chen from platform.", "Sarah Chen"),
+    ("Good evening, this is Mayor Thompson speaking.", "Mayor Thompson"),
+    ("This is Omar from finance.", "Omar"),
+    ("My name is Dr. Patel.", "Dr. Patel"),
+    ("I'm Sure we can get this done.", None),
+    ("I'm going to share my screen.", None),
+    ("Friday works for me.", None),
+])
+def test_introductions(text, name):
+    assert speakers.find_introduction([text]) == name
+
+
+def test_introduced_speakers_are_named(directory):
+    segments = _meeting(("Speaker A", "Hi, I'm Sarah Chen. " + PLATFORM), ("Speaker B", "Thanks Sarah."),
+                        ("Sarah", "Already named."))
+    named = directory.apply(segments, learn=False)
+    assert [segment["speaker"] for segment in named] == ["Sarah Chen", "Speaker B", "Sarah"]
+
+
+def test_known_speakers_are_recognized_by_how_they_speak(directory, fake_client):
+    directory.resolve(_meeting(("Speaker A", "Hi, I'm Sarah Chen. " + PLATFORM),
+                               ("Speaker B", "And I'm Omar Haddad. " + FINANCE)))
+    assert {row["name"] for row in fake_client.tables["speaker_identities"]} == {"Sarah Chen", "Omar Haddad"}
+
+    # Next meeting: nobody introduces themselves and the letters are swapped
+    later = _meeting(("Speaker A", FINANCE), ("Speaker B", PLATFORM), ("Speaker C", "Sounds good."))
+    assert directory.resolve(later) == {"Speaker A": "Omar Haddad", "Speaker B": "Sarah Chen"}
+
+
+def test_unclear_matches_stay_anonymous(directory):
+    directory.learn({"Sarah Chen": speakers.signature([PLATFORM]), "Sam Chen": speakers.signature([PLATFORM])})
+    assert directory.resolve(_meeting(("Speaker A", PLATFORM))) == {}
+
+
+def test_corrections_rename_the_transcript_and_teach_the_directory(directory):
+    content = f"Speaker A: {PLATFORM}\n\nSpeaker B: {FINANCE}\n\nSpeaker A: Agreed."
+    corrected = directory.correct(content, {"Speaker A": "Sarah Chen", "Speaker B": " "})
+
+    assert [turn["speaker"] for turn in speakers.parse_turns(corrected)] == ["Sarah Chen", "Speaker B", "Sarah Chen"]
+    assert directory.resolve(_meeting(("Speaker D", PLATFORM))) == {"Speaker D": "Sarah Chen"}
+    assert directory.identities()["sarah chen"]["source"] == "correction"
+
+
+def test_labels_can_be_swapped_in_one_pass():
+    content = "Speaker A: Hi.\n\nSpeaker B: Hello.\n\nSpeaker AB: Hey."
+    renamed = speakers.rename(content, {"Speaker A": "Speaker B", "Speaker B": "Speaker A"})
+    assert renamed == "Speaker B: Hi.\n\nSpeaker A: Hello.\n\nSpeaker AB: Hey."
+
+
+def test_api_renames_speakers_of_a_stored_transcript(client, api_key, services):
+    headers = {"X-API-Key": api_key}
+    transcript_id = client.post("/api/v1/transcripts/text", headers=headers, json={
+        "title": "Platform sync", "content": f"Speaker A: {PLATFORM}\n\nSpeaker B: Sounds good."
+    }).json()["transcript_id"]
+
+    response = client.post(f"/api/v1/transcripts/{transcript_id}/speakers", headers=headers,
+                           json={"names": {"Speaker A": "Sarah Chen"}})
+    assert response.status_code == 200
+    assert response.json()["speakers"] == ["Sarah Chen", "Speaker B"]
+    assert services.db.get_transcript_by_id(transcript_id)["content"].startswith("Sarah Chen: ")
+
+    response = client.post(f"/api/v1/transcripts/{transcript_id}/speakers", headers=headers,
+                           json={"names": {"Speaker Z": "Nobody"}})
+    assert response.status_code == 422
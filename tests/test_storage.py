@@ -0,0 +1,99 @@
+import json
+
+import pytest
+
+from src.core import storage
+from src.core.storage import (
+    compress_content, decompress_content, iter_segments, load_transcript_file, migrate_directory,
+    save_transcript_file
+)
+
+TURNS = [f'Speaker {"AB"[i % 2]}: turn {i} "quoted" é 😀 back\\slash\nnext line' for i in range(400)]
+CONTENT = "\n\n".join(TURNS)
+
+
+@pytest.fixture
+def small_reads(monkeypatch):
+    """Read backups in tiny chunks, so escapes and keys are split across reads."""
+    monkeypatch.setattr(storage, "READ_CHUNK_SIZE", 97)
+
+
+@pytest.mark.parametrize("codec", ["none", "gzip"])
+def test_backup_round_trip(tmp_path, codec):
+    data = {"metadata": {"filename": "standup"}, "content": CONTENT}
+    path = save_transcript_file(data, str(tmp_path / "standup.json"), codec)
+    assert path.endswith(".json" + storage.COMPRESSION_SUFFIXES[codec])
+    assert load_transcript_file(path) == data
+
+
+@pytest.mark.parametrize("codec", ["none", "gzip"])
+@pytest.mark.parametrize("ensure_ascii", [False, True])
+def test_iter_segments_streams_content_turns(tmp_path, small_reads, codec, ensure_ascii):
+    path = storage.with_compression_suffix(str(tmp_path / "meeting.json"), codec)
+    with storage.open_transcript(path, "wt") as f:
+        json.dump({"metadata": {"filename": "content"}, "content": CONTENT}, f, ensure_ascii=ensure_ascii)
+
+    segments = list(iter_segments(path))
+
+    assert len(segments) == len(TURNS)
+    assert segments[0] == {"speaker": "Speaker A", "text": TURNS[0].partition(": ")[2]}
+    assert "\n\n".join(f"{s['speaker']}: {s['text']}" for s in segments) == CONTENT
+
+
+def test_iter_segments_streams_synthetic_segments(tmp_path, small_reads):
+    segments = [{"speaker": "Speaker A", "text": f"line {i}", "start": i, "end": i + 1} for i in range(50)]
+    path = save_transcript_file({"metadata": {}, "segments": segments, "text": "ignored"},
+                                str(tmp_path / "synthetic.json"), "gzip")
+
+    assert list(iter_segments(path)) == segments
+
+
+def test_iter_segments_of_a_backup_without_turns(tmp_path):
+    path = save_transcript_file({"metadata": {"filename": "x"}}, str(tmp_path / "empty.json"), "none")
+    assert list(iter_segments(path)) == []
+
+
+def test_iter_segments_rejects_a_truncated_backup(tmp_path):
+    path = tmp_path / "cut.json"
+    path.write_text('{"metadata": {}, "content": "Speaker A: hello\\n\\nSpeaker B: wor', encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iter_segments(str(path)))
+
+
+@pytest.mark.parametrize("codec", ["none", "gzip"])
+def test_content_compression_round_trip(codec):
+    stored = compress_content(CONTENT, codec)
+    assert stored.startswith(storage.CONTENT_MARKER) == (codec != "none")
+    assert decompress_content(stored) == CONTENT
+
+
+def test_plain_content_is_left_alone():
+    assert decompress_content("Speaker A: hi") == "Speaker A: hi"
+    assert decompress_content(None) is None
+
+
+def test_migrate_directory_converts_backups(tmp_path):
+    save_transcript_file({"content": CONTENT}, str(tmp_path / "a.json"), "none")
+    save_transcript_file({"content": "Speaker A: short"}, str(tmp_path / "b.json"), "none")
+
+    stats = migrate_directory(str(tmp_path), "gzip")
+
+    assert stats["converted"] == 2 and stats["failed"] == 0
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.json.gz", "b.json.gz"]
+    assert load_transcript_file(str(tmp_path / "a.json.gz")) == {"content": CONTENT}
+
+
+def test_migrate_database_compresses_rows_through_the_manager(db, fake_client):
+    from migrate_transcripts import migrate_database
+
+    fake_client.tables["transcripts"] = [
+        {"id": f"t{i}", "content": CONTENT if i % 2 else "Speaker A: short"} for i in range(5)
+    ]
+    fake_client.tables["transcripts"].append({"id": "t9", "content": compress_content(CONTENT, "gzip")})
+
+    # Only the long transcripts shrink, the short ones stay plain text
+    assert migrate_database("gzip", batch_size=2, db=db) == 2
+    stored = {row["id"]: row["content"] for row in fake_client.tables["transcripts"]}
+    assert [i for i, content in stored.items() if content.startswith(storage.CONTENT_MARKER)] == ["t1", "t3", "t9"]
+    assert [db.get_transcript_by_id(f"t{i}")["content"] for i in (0, 1)] == ["Speaker A: short", CONTENT]
+    assert migrate_database("gzip", batch_size=2, db=db) == 0
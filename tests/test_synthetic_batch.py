@@ -0,0 +1,76 @@
+import pytest
+
+from src.core.storage import load_transcript_file
+from src.synthetic.batch import PROGRESS_FILE, generate_batch, load_progress, plan_meeting
+from src.synthetic.procedural import ProceduralMeetingGenerator
+
+
+@pytest.fixture
+def generator(tmp_path):
+    return ProceduralMeetingGenerator(corpus_dir=str(tmp_path / "no-corpus"))
+
+
+class FlakyGenerator:
+    """Fails the meetings of the given seeds"""
+
+    def __init__(self, generator, failing_seeds):
+        self.generator = generator
+        self.topics = generator.topics
+        self.failing_seeds = set(failing_seeds)
+
+    def generate_meeting(self, topic_key, **kwargs):
+        if kwargs["seed"] in self.failing_seeds:
+            raise RuntimeError("watsonx is down")
+        return self.generator.generate_meeting(topic_key, **kwargs)
+
+
+def test_plans_are_deterministic(generator):
+    keys = ["budget_review", "project_kickoff"]
+    assert plan_meeting(generator, 3, 42, keys) == plan_meeting(generator, 3, 42, keys)
+    assert plan_meeting(generator, 3, 42, keys)["topic_key"] == "project_kickoff"
+    assert plan_meeting(generator, 3, 42, keys, duration_minutes=5)["duration_minutes"] == 5
+
+
+def test_corpus_is_written_to_files(generator, tmp_path):
+    out = tmp_path / "corpus"
+    stats = generate_batch(generator, 5, output_dir=str(out), concurrency=2, duration_minutes=2, compression="none")
+    assert (stats["generated"], stats["failed"], stats["skipped"]) == (5, 0, 0)
+
+    files = sorted(out.glob("synthetic_*.json"))
+    assert len(files) == 5
+    assert load_transcript_file(str(files[0]))["segments"]
+    assert load_progress(out / PROGRESS_FILE) == set(range(5))
+
+
+def test_interrupted_run_only_generates_the_rest(generator, tmp_path):
+    out = tmp_path / "corpus"
+    generate_batch(generator, 3, output_dir=str(out), duration_minutes=2, compression="none")
+    # A partial line from the interrupted run is ignored
+    with open(out / PROGRESS_FILE, "a") as progress:
+        progress.write('{"ind')
+
+    stats = generate_batch(generator, 5, output_dir=str(out), duration_minutes=2, compression="none")
+    assert (stats["generated"], stats["skipped"]) == (2, 3)
+    assert len(list(out.glob("synthetic_*.json"))) == 5
+
+
+def test_failed_meetings_are_retried_next_run(generator, tmp_path):
+    out = tmp_path / "corpus"
+    failing = {plan_meeting(generator, 1, 0, sorted(generator.topics["topics"]))["seed"]}
+    stats = generate_batch(FlakyGenerator(generator, failing), 3, output_dir=str(out), duration_minutes=2)
+    assert (stats["generated"], stats["failed"]) == (2, 1)
+    assert load_progress(out / PROGRESS_FILE) == {0, 2}
+
+    assert generate_batch(generator, 3, output_dir=str(out), duration_minutes=2)["generated"] == 1
+
+
+def test_corpus_is_bulk_inserted_into_the_database(generator, db, fake_client, tmp_path):
+    out = tmp_path / "corpus"
+    stats = generate_batch(generator, 5, output_dir=str(out), db=db, bulk_size=2, duration_minutes=2)
+    assert stats["generated"] == 5
+
+    rows = fake_client.tables["transcripts"]
+    assert len(rows) == 5
+    assert {row["source_type"] for row in rows} == {"generated"}
+    assert not list(out.glob("synthetic_*"))
+    assert load_progress(out / PROGRESS_FILE) == set(range(5))
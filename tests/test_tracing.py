@@ -0,0 +1,101 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.core import tracing
+
+
+@pytest.fixture
+def trace_file(tmp_path, monkeypatch):
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setenv("TRACING_EXPORTER", "file")
+    monkeypatch.setenv("TRACE_FILE", str(path))
+    tracing.configure()
+    yield path
+    tracing.configure("none")
+
+
+def _spans(path):
+    [spans] = tracing.load_spans(str(path)).values()
+    return {span["name"]: span for span in spans}
+
+
+def test_disabled_tracing_is_a_shared_no_op(monkeypatch):
+    monkeypatch.setenv("TRACING_EXPORTER", "none")
+    tracing.configure()
+    assert tracing.span("meeting.job") is tracing.span("llm.generate")
+
+
+def test_unknown_exporter_is_rejected(monkeypatch):
+    monkeypatch.setenv("TRACING_EXPORTER", "zipkin")
+    with pytest.raises(ValueError):
+        tracing.configure()
+    tracing.configure("none")
+
+
+def test_spans_nest_under_the_meeting_job(trace_file):
+    @tracing.traced("db.save_summary")
+    def save():
+        pass
+
+    with tracing.span("meeting.job", transcript_id=7) as job:
+        with tracing.span("llm.generate") as generate:
+            generate.set_attribute("tokens", 120)
+        save()
+        job.set_attribute("status", "done")
+
+    spans = _spans(trace_file)
+    root = spans["meeting.job"]
+    assert root["parent_id"] is None
+    assert root["attributes"] == {"transcript_id": 7, "status": "done"}
+    assert spans["llm.generate"]["parent_id"] == root["span_id"]
+    assert spans["llm.generate"]["attributes"] == {"tokens": 120}
+    assert spans["db.save_summary"]["parent_id"] == root["span_id"]
+
+
+def test_each_job_gets_its_own_trace(trace_file):
+    for _ in range(2):
+        with tracing.span("meeting.job"):
+            pass
+    assert len(tracing.load_spans(str(trace_file))) == 2
+
+
+def test_worker_threads_join_the_callers_trace(trace_file):
+    def chunk(index):
+        with tracing.span("llm.chunk", index=index):
+            pass
+
+    with tracing.span("meeting.job") as job:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            list(pool.map(tracing.propagate(chunk), range(3)))
+
+    [spans] = tracing.load_spans(str(trace_file)).values()
+    chunks = [span for span in spans if span["name"] == "llm.chunk"]
+    assert len(chunks) == 3
+    assert {span["parent_id"] for span in chunks} == {job.span_id}
+
+
+def test_exceptions_mark_the_span_failed(trace_file):
+    with pytest.raises(TimeoutError):
+        with tracing.span("assemblyai.poll"):
+            raise TimeoutError("still processing")
+
+    span = _spans(trace_file)["assemblyai.poll"]
+    assert span["status"] == "error"
+    assert span["error"] == "TimeoutError: still processing"
+
+
+def test_trace_summaries():
+    spans = [
+        {"trace_id": "t", "span_id": "a", "parent_id": None, "name": "job", "start": 0.0,
+         "duration_ms": 10.0, "status": "ok"},
+        {"trace_id": "t", "span_id": "b", "parent_id": "a", "name": "llm", "start": 0.001,
+         "duration_ms": 6.0, "status": "error"},
+        {"trace_id": "t", "span_id": "c", "parent_id": "lost", "name": "slack", "start": 0.02,
+         "duration_ms": 1.0, "status": "ok"},
+    ]
+    assert tracing.folded_stacks(spans) == {"job": 4000, "job;llm": 6000, "slack": 1000}
+
+    tree = tracing.format_tree(spans).splitlines()
+    assert [line.split()[0] for line in tree] == ["job", "llm", "slack"]
+    assert tree[1].startswith("  llm") and tree[1].endswith("!")
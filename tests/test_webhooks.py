@@ -0,0 +1,45 @@
+import pytest
+
+from src.core.audio_transcriber import WEBHOOK_AUTH_HEADER
+
+
+def _deliver(client, secret=None, job_id="job-1"):
+    return client.post(
+        "/api/v1/webhooks/assemblyai",
+        params={"title": "Standup", "job_id": job_id},
+        json={"transcript_id": "aai-1", "status": "completed"},
+        headers={WEBHOOK_AUTH_HEADER: secret} if secret else {}
+    )
+
+
+def test_webhooks_are_refused_without_a_configured_secret(client, services):
+    assert _deliver(client).status_code == 403
+    assert _deliver(client, secret="anything").status_code == 403
+    assert services.jobs.resumed == []
+
+
+def test_webhooks_require_the_secret(client, services, monkeypatch):
+    monkeypatch.setenv("ASSEMBLYAI_WEBHOOK_SECRET", "s3cret")
+    assert _deliver(client).status_code == 401
+    assert _deliver(client, secret="wrong").status_code == 401
+    assert services.jobs.resumed == []
+
+    response = _deliver(client, secret="s3cret")
+    assert response.status_code == 200
+    assert response.json() == {"status": "accepted", "job_id": "job-1"}
+    assert services.jobs.resumed == [("job-1", "transcribe", "complete_transcription")]
+
+
+def test_repeated_webhook_delivery_is_a_duplicate(client, monkeypatch):
+    monkeypatch.setenv("ASSEMBLYAI_WEBHOOK_SECRET", "s3cret")
+    assert _deliver(client, secret="s3cret", job_id="finished").json() == {"status": "duplicate", "job_id": "finished"}
+
+
+def test_webhook_url_needs_a_secret(monkeypatch):
+    from src.core import pipeline
+    monkeypatch.setenv("ASSEMBLYAI_WEBHOOK_URL", "https://meetgist.example/api/v1/webhooks/assemblyai")
+    monkeypatch.delenv("ASSEMBLYAI_WEBHOOK_SECRET", raising=False)
+    with pytest.raises(ValueError):
+        pipeline.webhook_url()
+    monkeypatch.setenv("ASSEMBLYAI_WEBHOOK_SECRET", "s3cret")
+    assert pipeline.webhook_url().endswith("/assemblyai")
@@ -0,0 +1,64 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from src.core.workers import CpuPool, SharedText, offload
+
+
+@pytest.fixture
+def pool():
+    # Everything of at least 16 bytes goes through shared memory
+    pool = CpuPool(workers=2, shared_min_bytes=16, offload_min_chars=1000)
+    yield pool
+    pool.shutdown()
+
+
+def test_functions_run_in_worker_processes(pool):
+    assert pool.run(os.getpid) != os.getpid()
+    assert pool.run(divmod, 7, 2) == (3, 1)
+
+
+def test_large_arguments_and_results_travel_through_shared_memory(pool):
+    text = "speaker a: we ship friday. " * 1000
+    assert pool.run(str.upper, text) == text.upper()
+    assert pool.run(str.split, text, ". ") == text.split(". ")
+    assert pool.run(len, ["ünïcode"] * 10) == 10
+
+
+def test_map_keeps_order(pool):
+    assert pool.map(str.upper, ["a" * 20, "b", "c" * 30]) == ["A" * 20, "B", "C" * 30]
+
+
+def test_errors_are_raised_to_the_caller(pool):
+    with pytest.raises(ValueError):
+        pool.run(int, "not a number")
+
+
+def test_pool_restarts_after_a_worker_dies(pool):
+    with pytest.raises(BrokenProcessPool):
+        pool.run(os._exit, 1)
+    assert pool.run(divmod, 7, 2) == (3, 1)
+
+
+def test_offload_runs_small_texts_inline(pool):
+    assert pool.offload(lambda text: os.getpid(), "short") == os.getpid()
+    assert pool.offload(str.upper, "x" * 2000) == "X" * 2000
+    assert offload(None, str.upper, "inline") == "INLINE"
+
+
+def test_without_workers_everything_runs_inline():
+    pool = CpuPool(workers=0)
+    assert not pool.enabled
+    assert pool.run(os.getpid) == os.getpid()
+    assert pool.offload(lambda text: os.getpid(), "x" * 1_000_000) == os.getpid()
+    with pytest.raises(ValueError):
+        pool.run(int, "not a number")
+
+
+def test_shared_text_round_trip():
+    shared, block = SharedText.create(["first", "sécond", ""])
+    block.close()
+    assert shared.read(unlink=True) == ["first", "sécond", ""]
+    with pytest.raises(FileNotFoundError):
+        shared.read()